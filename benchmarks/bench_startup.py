@@ -0,0 +1,92 @@
+"""
+Startup-time benchmark
+======================
+Measures how long the entry points take to start and fails if a budget is
+exceeded. Batch scripts run the converter once per file, so startup cost is
+paid on every call.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 20 --budget-ms 100
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+# Modules that must not be loaded by a CLI no-op
+HEAVY_MODULES = ("pydantic", "pandas", "numpy", "flet", "multiprocessing")
+
+# name -> command
+COMMANDS: Dict[str, List[str]] = {
+    "python (bare interpreter)": [sys.executable, "-c", "pass"],
+    "python -m app --help": [sys.executable, "-m", "app", "--help"],
+    "python -m app convert --help": [sys.executable, "-m", "app", "convert", "--help"],
+}
+
+# Commands checked against the budget (the bare interpreter is for reference)
+BUDGETED = ("python -m app --help", "python -m app convert --help")
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def time_command(command: List[str], runs: int) -> float:
+    """Median wall time of a command in milliseconds (after one warm-up run)"""
+    env = _env()
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def loaded_heavy_modules(module: str = "app.cli") -> List[str]:
+    """Heavy modules loaded as a side effect of importing an entry-point module"""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], env=_env(), capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark entry-point startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per command")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Maximum median startup time")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, command in COMMANDS.items():
+        median_ms = time_command(command, args.runs)
+        verdict = ""
+        if name in BUDGETED:
+            over = median_ms > args.budget_ms
+            failed |= over
+            verdict = "OVER BUDGET" if over else "ok"
+        print(f"{name:32s} {median_ms:8.1f} ms  {verdict}")
+
+    heavy = loaded_heavy_modules()
+    if heavy:
+        failed = True
+        print(f"\napp.cli imports heavy modules at load: {', '.join(heavy)}")
+
+    print(f"\nBudget: {args.budget_ms:.0f} ms -> {'FAILED' if failed else 'passed'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Benchmark runner
+================
+Times and memory-profiles the SRT → CSV pipeline on synthetic flights and
+compares the results against the JSON baselines in ``baselines.json``.
+
+Usage:
+    python -m benchmarks.run_benchmarks                    # 10m flights, check baselines
+    python -m benchmarks.run_benchmarks --sizes 10m,1h     # larger flights
+    python -m benchmarks.run_benchmarks --update-baseline  # record new baselines (median of 3 suite runs)
+"""
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.srt_generator import DURATIONS, LENSES, generate_flight_set  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+# Slowdown always allowed, in seconds: for sub-100 ms cases a relative tolerance
+# is smaller than the run-to-run noise of timers and the scheduler
+TIME_SLACK_S = 0.05
+
+
+def _case_extract(srt_path: Path, work_dir: Path) -> None:
+    from app.services.video_metadata_service import VideoMetadataService
+
+    VideoMetadataService().extract_from_video(srt_path)
+
+
+def _case_export(srt_path: Path, work_dir: Path) -> Callable[[], None]:
+    from app.services.video_metadata_service import VideoMetadataService
+    from app.services.csv_export_service import CsvExportService
+
+    frames = VideoMetadataService().extract_from_video(srt_path)
+    return lambda: CsvExportService().export(frames, work_dir / "export.csv")
+
+
+def _case_end_to_end(srt_path: Path, work_dir: Path) -> None:
+    from app.services.video_metadata_service import VideoMetadataService
+    from app.services.csv_export_service import CsvExportService
+
+    frames = VideoMetadataService().extract_from_video(srt_path)
+    CsvExportService().export(frames, work_dir / "end_to_end.csv")
+
+
+def _case_pipeline(srt_path: Path, work_dir: Path) -> None:
+    from app.services.pipeline_service import PipelineService
+
+    PipelineService().run(srt_path, work_dir / "pipeline.csv")
+
+
+def _case_process_srt(srt_path: Path, work_dir: Path) -> None:
+    import srt_to_csv
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        srt_to_csv.process_srt(srt_path)
+
+
+# name -> (function, needs_setup)
+# Cases with setup return the callable to measure, so preparation is excluded.
+CASES: Dict[str, tuple] = {
+    "service.extract": (_case_extract, False),
+    "service.export": (_case_export, True),
+    "service.end_to_end": (_case_end_to_end, False),
+    "service.pipeline": (_case_pipeline, False),
+    "script.process_srt": (_case_process_srt, False),
+}
+
+
+def measure(case: str, srt_path: Path, work_dir: Path, repeat: int = 1, memory: bool = True) -> Dict[str, float]:
+    """Run one case and return best wall time (seconds) and peak traced memory (MB)"""
+    func, needs_setup = CASES[case]
+
+    def prepare() -> Callable[[], None]:
+        return func(srt_path, work_dir) if needs_setup else (lambda: func(srt_path, work_dir))
+
+    best = float("inf")
+    for _ in range(repeat):
+        run = prepare()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+
+    result = {"seconds": round(best, 4)}
+
+    if memory:
+        run = prepare()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_mb"] = round(peak / (1024 * 1024), 3)
+
+    return result
+
+
+def run_suite(sizes: List[str], lenses: List[str], cases: List[str], data_dir: Path,
+              repeat: int = 1, memory: bool = True, only: Optional[Set[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Run every case for every size/lens combination (or only the result keys given)"""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        for size in sizes:
+            flights = generate_flight_set(data_dir / size, size, lenses)
+            for lens, srt_path in flights.items():
+                for case in cases:
+                    key = f"{case}/{lens}/{size}"
+                    if only is not None and key not in only:
+                        continue
+                    results[key] = measure(case, srt_path, work_dir, repeat=repeat, memory=memory)
+                    print(f"{key:40s} {_format_result(results[key])}")
+    return results
+
+
+def _format_result(result: Dict[str, float]) -> str:
+    text = f"{result['seconds']:8.3f} s"
+    if "peak_mb" in result:
+        text += f"  {result['peak_mb']:9.2f} MB peak"
+    return text
+
+
+def median_results(runs: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Per case and metric, the median over several suite runs (what baselines store)"""
+    merged: Dict[str, Dict[str, float]] = {}
+    for key in runs[0]:
+        metrics = runs[0][key]
+        merged[key] = {metric: round(statistics.median(run[key][metric] for run in runs), 4) for metric in metrics}
+    return merged
+
+
+def check_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                      time_tolerance: float = 0.25, memory_tolerance: float = 0.10,
+                      time_slack: float = TIME_SLACK_S) -> List[str]:
+    """
+    Return a description of every metric that got worse than its baseline
+    allows: the tolerance (a fraction), and for times at least time_slack seconds
+    """
+    tolerances = {"seconds": time_tolerance, "peak_mb": memory_tolerance}
+    slacks = {"seconds": time_slack, "peak_mb": 0.0}
+    regressions: List[str] = []
+    for key, measured in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        for metric, tolerance in tolerances.items():
+            if metric not in measured or metric not in expected:
+                continue
+            limit = max(expected[metric] * (1 + tolerance), expected[metric] + slacks[metric])
+            if measured[metric] > limit:
+                regressions.append(
+                    f"{key} {metric}: {measured[metric]} > {limit:.4f} "
+                    f"(baseline {expected[metric]}, tolerance {tolerance:.0%})"
+                )
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """Load stored baseline results (empty if no baseline exists yet)"""
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: Path = BASELINE_PATH) -> None:
+    """Merge results into the baseline file, keeping entries for cases not re-run"""
+    merged = load_baseline(path)
+    merged.update(results)
+    payload = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": dict(sorted(merged.items())),
+    }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DJI SRT → CSV pipeline")
+    parser.add_argument("--sizes", default="10m", help=f"Comma-separated flight lengths ({', '.join(DURATIONS)})")
+    parser.add_argument("--lenses", default=",".join(LENSES), help="Comma-separated lens variants")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated benchmark cases")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "dji_srt_bench",
+                        help="Where generated SRT files are cached")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="Suite runs whose median is stored by --update-baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Allowed peak memory growth")
+    parser.add_argument("--confirm-runs", type=int, default=2,
+                        help="Extra runs of slow cases before they count as regressions (median of all)")
+    parser.add_argument("--time-slack", type=float, default=TIME_SLACK_S,
+                        help="Slowdown in seconds that is always allowed (timer noise of short cases)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    sizes = [s for s in args.sizes.split(",") if s]
+    lenses = [lens.upper() for lens in args.lenses.split(",") if lens]
+    cases = [c for c in args.cases.split(",") if c]
+    for case in cases:
+        if case not in CASES:
+            parser.error(f"Unknown case: {case}")
+
+    # One run is noisy: a baseline is the median of several
+    runs = args.baseline_runs if args.update_baseline else 1
+    results = median_results([
+        run_suite(sizes, lenses, cases, args.data_dir, repeat=args.repeat, memory=not args.no_memory)
+        for _ in range(max(runs, 1))
+    ])
+
+    if args.output:
+        with args.output.open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    tolerances = (args.time_tolerance, args.memory_tolerance, args.time_slack)
+    slow = {key for key in results if check_regressions({key: results[key]}, baseline, *tolerances)}
+    if slow and args.confirm_runs > 0:
+        # A slow run only counts if the median of more runs is slow too
+        print(f"\nRe-running {len(slow)} slow cases {args.confirm_runs} more times")
+        reruns = [run_suite(sizes, lenses, cases, args.data_dir, repeat=args.repeat,
+                            memory=not args.no_memory, only=slow) for _ in range(args.confirm_runs)]
+        results.update(median_results([{key: results[key] for key in slow}] + reruns))
+    regressions = check_regressions(results, baseline, *tolerances)
+    if regressions:
+        print("\nPerformance regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Synthetic DJI SRT generator
+===========================
+Writes realistic DJI SRT files for every lens variant (T/S/W/Z) at any flight
+length. Block layouts are copied from the sample files in DJI_202512221456_005.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+FPS = 30
+
+# Flight lengths used by the benchmark suite (seconds)
+DURATIONS: Dict[str, int] = {
+    "10m": 10 * 60,
+    "1h": 60 * 60,
+    "10h": 10 * 60 * 60,
+}
+
+LENSES = ("T", "S", "W", "Z")
+
+# Camera settings line, per lens
+_CAMERA_LINES = {
+    "T": "[fnum: 1.0] [focal_len: 58.00] [dzoom: 1.00] ",
+    "S": "[iso: 120] [shutter: 1/30.0] [fnum: 2.8] [ev: 0] [focal_len: 24.00] [dzoom: 1.00] ",
+    "W": "[iso: 120] [shutter: 1/30.0] [fnum: 2.8] [ev: 0] [focal_len: 24.00] [dzoom: 1.00] ",
+    "Z": "[iso: 4380] [shutter: 1/30.0] [fnum: 3.5] [ev: 1.3] [focal_len: 117.80] [dzoom: 1.00] ",
+}
+
+# Lines after the "0" separator line, per lens ("{ct}" is the color temperature)
+_TRAILERS = {
+    "T": "[dzoom_ratio: 10000, delta:0] [color_md : default] \n</font>",
+    "S": "[ae_meter_md : 0] [dzoom_ratio: 10000, delta:0] [color_md : default] [ct : {ct}] \n</font>",
+    "W": (
+        "[ae_meter_md : 0] [dzoom_ratio: 10000, delta:0] [color_md : default] [ct : {ct}] \n"
+        "vsync[       0] target[0.0000 0.0000 0.0000 0.0000], shift[0.000000, 0.000000]</font>"
+    ),
+    "Z": (
+        "[ae_meter_md : 0] [dzoom_ratio: 10000, delta:0] [color_md : default] [ct : {ct}] \n"
+        "[af cnn:0,1,1,0,env:18,move:0,laser:1280469,3,1]\n"
+        "vsync[       0] target[0.0000 0.0000 0.0000 0.0000], shift[0.000000, 0.000000]</font>"
+    ),
+}
+
+_EARTH_RADIUS_M = 6371000.0
+
+
+def _timecode(ms: int) -> str:
+    """Convert milliseconds to SRT HH:MM:SS,mmm format"""
+    seconds, milliseconds = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+def generate_srt(
+    output_path: Path,
+    lens: str = "T",
+    duration_s: float = 600,
+    seed: int = 0,
+    start: Optional[datetime] = None,
+    origin: tuple = (31.240786, 34.787997, 298.109),
+    gps_dropout: float = 0.0,
+) -> int:
+    """
+    Write a synthetic SRT file and return the number of blocks written.
+
+    The drone flies a lawnmower pattern at ~8 m/s around ``origin`` with a
+    slow altitude oscillation. ``gps_dropout`` is the fraction of blocks
+    written without the latitude/longitude line.
+    """
+    lens = lens.upper()
+    if lens not in _CAMERA_LINES:
+        raise ValueError(f"Unknown lens variant: {lens}")
+
+    rng = random.Random(seed)
+    start = start or datetime(2025, 12, 22, 15, 8, 1, 318000)
+    lat0, lon0, alt0 = origin
+    m_per_deg_lat = math.pi * _EARTH_RADIUS_M / 180.0
+    m_per_deg_lon = m_per_deg_lat * math.cos(math.radians(lat0))
+
+    camera_line = _CAMERA_LINES[lens]
+    trailer = _TRAILERS[lens]
+    frame_count = int(duration_s * FPS)
+
+    speed = 8.0
+    leg_length = 400.0
+    leg_spacing = 30.0
+    north = east = 0.0
+    heading = 0.0
+
+    with output_path.open("w", encoding="utf-8", newline="\n") as f:
+        buffer = []
+        for i in range(frame_count):
+            start_ms = i * 1000 // FPS
+            end_ms = (i + 1) * 1000 // FPS
+            t = start_ms / 1000.0
+
+            # Lawnmower pattern: north/south legs joined by short east steps
+            leg_time = leg_length / speed
+            step_time = leg_spacing / speed
+            cycle = leg_time + step_time
+            leg, phase = divmod(t, cycle)
+            direction = 1.0 if int(leg) % 2 == 0 else -1.0
+            if phase < leg_time:
+                vn, ve = speed * direction, 0.0
+                heading = 0.0 if direction > 0 else 180.0
+            else:
+                vn, ve = 0.0, speed
+                heading = 90.0
+            dt = (end_ms - start_ms) / 1000.0
+            north += vn * dt
+            east += ve * dt
+            vz = 0.5 * math.sin(t / 30.0)
+            rel_alt = 60.0 + 15.0 * (1 - math.cos(t / 30.0))
+
+            lat = lat0 + north / m_per_deg_lat + rng.gauss(0, 2e-7)
+            lon = lon0 + east / m_per_deg_lon + rng.gauss(0, 2e-7)
+            abs_alt = alt0 + rel_alt
+            yaw = heading if heading <= 180.0 else heading - 360.0
+            wall = start + timedelta(milliseconds=start_ms + rng.randint(-2, 2))
+            diff_ms = end_ms - start_ms + rng.choice((-1, 0, 0, 0, 1))
+
+            lines = [
+                f"{i + 1}",
+                f"{_timecode(start_ms)} --> {_timecode(end_ms)}",
+                f'<font size="28">FrameCnt: {i + 1}, DiffTime: {diff_ms}ms',
+                wall.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+                camera_line,
+            ]
+            if gps_dropout <= 0 or rng.random() >= gps_dropout:
+                lines.append(
+                    f"[latitude: {lat:.6f}] [longitude: {lon:.6f}] "
+                    f"[rel_alt: {rel_alt:.3f} abs_alt: {abs_alt:.3f}] "
+                )
+            lines.extend([
+                f"[drone_speedx: {vn:.1f} drone_speedy: {ve:.1f} drone_speedz: {vz:.1f}] ",
+                f"[drone_yaw: {yaw:.1f} drone_pitch: {rng.uniform(-8, 8):.1f} drone_roll: {rng.uniform(-3, 3):.1f}] ",
+                f"[gb_yaw: {yaw:.1f} gb_pitch: -90.0 gb_roll: 0.0] ",
+                "",
+                "0",
+                trailer.format(ct=6680 + rng.randint(0, 5)),
+                "",
+                "",
+            ])
+            buffer.append("\n".join(lines))
+
+            if len(buffer) >= 1000:
+                f.write("".join(buffer))
+                buffer.clear()
+        f.write("".join(buffer))
+
+    return frame_count
+
+
+def generate_flight_set(output_dir: Path, size: str, lenses=LENSES, seed: int = 0) -> Dict[str, Path]:
+    """Generate one SRT per lens for a named flight length ("10m", "1h", "10h")"""
+    if size not in DURATIONS:
+        raise ValueError(f"Unknown flight length: {size}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths: Dict[str, Path] = {}
+    for lens in lenses:
+        path = output_dir / f"DJI_SYNTH_{size}_{lens}.SRT"
+        if not path.exists():
+            generate_srt(path, lens=lens, duration_s=DURATIONS[size], seed=seed)
+        paths[lens] = path
+    return paths
@@ -0,0 +1,975 @@
+"""
+DJI SRT command line interface
+==============================
+Headless entry point for batch scripts (no prompts, meaningful exit codes).
+The app package lives in src/: run the examples from there, or from the
+repository root with PYTHONPATH=src (set PYTHONPATH=src on Windows).
+
+    python -m app convert DJI_*.SRT                  # CSV next to each SRT
+    python -m app "/ingest/**/*.SRT" -o - --jobs 4   # one CSV stream on stdout
+    python -m app flights/ -o out/ --format jsonl    # directory in, directory out
+    python -m app DJI_0001.SRT -f xlsx               # Excel workbook with typed cells
+    python -m app archive/*.zip -j 8                 # .zip members, .SRT.gz and .SRT.zst are read in place
+    python -m app watch /mnt/ingest --mirror /data   # convert SD-card dumps as they land
+    python -m app index flights/                     # .SRT.idx sidecars for random access
+    python -m app trim DJI_0001.SRT -r 1:00-1:30     # cut to a time window (renumbered SRT)
+    python -m app photos DJI_202512221456_005/       # photo geotags matched to video frames
+    python -m app serve --port 8000 -j 4             # HTTP conversion service for the team
+    python -m app quality flights/                   # telemetry anomaly reports (.quality.json)
+    python -m app stitch DJI_202512221456_005/ -j 4  # split recordings joined into one flight CSV
+    python -m app parsers --benchmark DJI_0001.SRT --save  # pick the fastest SRT parser for this machine
+    python -m app coverage archive/ -g site.npz -o site.asc  # heatmap of how often each area was flown
+    python -m app card1/ card2/ --fingerprints seen.json     # re-copied SD cards are linked, not converted
+
+"convert" is the default command, so it may be omitted.
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# Keep startup fast: services, pydantic and multiprocessing are imported by the
+# command that needs them, never at module load (see benchmarks/bench_startup.py)
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from app.services.fingerprint_service import FingerprintService
+    from app.services.frame_filter import FrameFilter
+    from app.services.pipeline_service import ConversionOptions
+
+logger = logging.getLogger(__name__)
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILURE = 1  # at least one input could not be converted
+EXIT_USAGE = 2    # bad arguments or no input files matched
+
+# Top-level options that may precede the sub-command
+GLOBAL_FLAGS = ("-h", "--help", "-v", "--verbose", "-q", "--quiet")
+
+
+class OutputCollisionError(ValueError):
+    """Different inputs would be written to the same output file"""
+
+
+def expand_inputs(patterns: Sequence[str]) -> List[Path]:
+    """
+    Expand files, directories (searched recursively) and glob patterns to SRT paths.
+
+    Compressed SRTs (.SRT.gz, .SRT.zst) are kept as they are and .zip archives
+    are expanded to their SRT members (flight.zip/DJI_0001.SRT). Videos without
+    an SRT sidecar are included: their embedded telemetry track is read.
+    """
+    from zipfile import BadZipFile
+    from app.services.srt_io import ARCHIVE_SUFFIX, is_srt_source, list_archive_srts
+    from app.services.video_metadata_service import VideoMetadataService
+
+    def is_video_without_srt(path: Path) -> bool:
+        return path.suffix.upper() in VideoMetadataService.VIDEO_SUFFIXES and not path.with_suffix(".SRT").exists()
+
+    found: Dict[str, Path] = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            candidates = [Path(p) for p in glob.glob(pattern, recursive=True)]
+        else:
+            candidates = [Path(pattern)]
+
+        for candidate in candidates:
+            if candidate.is_dir():
+                files = [p for p in candidate.rglob("*") if p.is_file()]
+            elif candidate.is_file():
+                files = [candidate]
+            else:
+                logger.warning(f"Input not found: {candidate}")
+                files = []
+
+            matches = []
+            for path in files:
+                if path.suffix.upper() == ARCHIVE_SUFFIX:
+                    try:
+                        matches.extend(list_archive_srts(path))
+                    except (OSError, BadZipFile) as err:
+                        logger.warning(f"Cannot read archive {path}: {err}")
+                elif candidate.is_file() or is_srt_source(path) or is_video_without_srt(path):
+                    matches.append(path)
+            for match in matches:
+                found.setdefault(os.path.normcase(str(match.resolve())), match)
+
+    return sorted(found.values())
+
+
+def _render_job(srt_path: Path, fmt: str, options: "ConversionOptions") -> Tuple[bool, str]:
+    """Worker: render one file without header into a temporary file, returning (ok, path or error message)"""
+    import tempfile
+    from app.services.conversion_service import ConversionService
+
+    fd, tmp_name = tempfile.mkstemp(prefix="dji_srt_", suffix=".part")
+    os.close(fd)
+    try:
+        ConversionService().convert(srt_path, Path(tmp_name), fmt, header=False, options=options)
+        return True, tmp_name
+    except Exception as err:
+        os.unlink(tmp_name)
+        return False, f"{type(err).__name__}: {err}"
+
+
+def _convert_job(srt_path: Path, output_path: Path, fmt: str, options: "ConversionOptions") -> Tuple[bool, str]:
+    """Worker: convert one file to its own output, returning (ok, frame count or error message)"""
+    from app.services.conversion_service import ConversionService
+
+    try:
+        return True, str(ConversionService().convert(srt_path, output_path, fmt, options=options))
+    except Exception as err:
+        return False, f"{type(err).__name__}: {err}"
+
+
+def _make_executor(jobs: int) -> Optional["Executor"]:
+    if jobs <= 1:
+        return None
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=jobs)
+
+
+def _ordered_results(executor: Optional["Executor"], func: Callable, items: Sequence[tuple]) -> Iterator[tuple]:
+    """Run jobs inline or on the pool, yielding results in input order"""
+    if executor is None:
+        for item in items:
+            yield item, func(*item)
+    else:
+        futures = [executor.submit(func, *item) for item in items]
+        for item, future in zip(items, futures):
+            yield item, future.result()
+
+
+def _output_path_for(srt_path: Path, output: Optional[Path], suffix: str) -> Path:
+    from app.services.srt_io import source_base
+
+    # DJI_0001.SRT.gz and flight.zip/DJI_0001.SRT are written as DJI_0001.csv
+    base = source_base(srt_path)
+    if output is None:
+        return base.with_suffix(suffix)
+    return output / (base.stem + suffix)
+
+
+def _check_output_collisions(targets: Dict[Path, Path], owners: Dict[Path, Path]) -> None:
+    """
+    Raise OutputCollisionError when inputs with different content map to one
+    output (the same DJI name on two cards into one -o directory, or
+    DJI_0001.SRT next to DJI_0001.SRT.gz). owners maps duplicates to the
+    source or output whose content they share; those may share an output.
+    """
+    by_target: Dict[str, List[Path]] = {}
+    for source, target in targets.items():
+        by_target.setdefault(os.path.normcase(str(target.resolve())), []).append(source)
+    clashes = []
+    for target, sources in by_target.items():
+        if len({owners.get(source, source) for source in sources}) > 1:
+            clashes.append(f"{', '.join(map(str, sources))} -> {target}")
+    if clashes:
+        raise OutputCollisionError("Inputs would overwrite each other's output "
+                                   "(convert them to separate directories): " + "; ".join(clashes))
+
+
+def _convert_to_stream(inputs: List[Path], stream: TextIO, fmt: str, jobs: int,
+                       options: "ConversionOptions", dedupe: Optional["FingerprintService"] = None) -> int:
+    """Write all inputs to one stream with a single header, in input order"""
+    import shutil
+    from app.services.conversion_service import ConversionService
+    from app.services.exporters import get_exporter
+    from app.services.pipeline_service import PipelineService
+
+    if dedupe is not None:
+        from app.services.fingerprint_service import output_profile
+
+        # Copies would repeat their rows; outputs of earlier runs are not part of this stream
+        inputs, copies, _ = dedupe.plan(inputs, output_profile(fmt, options), reuse=False)
+        for source, first in copies.items():
+            logger.info(f"Skipping {source}: same content as {first}")
+
+    extra_header = dict.fromkeys(PipelineService.extra_column_names(options), ())
+    get_exporter(fmt).write([], stream, header=True, extra_columns=extra_header,
+                            formatter=PipelineService.formatter(options))
+    failures = 0
+
+    executor = _make_executor(jobs)
+    if executor is None:
+        # Frames flow straight from the parser into the stream
+        for srt_path in inputs:
+            try:
+                ConversionService().convert_to_stream(srt_path, stream, fmt, header=False, options=options)
+                stream.flush()
+                logger.info(f"Converted {srt_path}")
+            except BrokenPipeError:
+                raise
+            except Exception as err:
+                failures += 1
+                logger.error(f"Failed {srt_path}: {type(err).__name__}: {err}")
+        return failures
+
+    # Workers render into temporary files that are copied out in input order
+    try:
+        for (srt_path, *_), (ok, result) in _ordered_results(executor, _render_job, [(p, fmt, options) for p in inputs]):
+            if not ok:
+                failures += 1
+                logger.error(f"Failed {srt_path}: {result}")
+                continue
+            try:
+                with open(result, "r", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, stream)
+                stream.flush()
+            finally:
+                os.unlink(result)
+            logger.info(f"Converted {srt_path}")
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return failures
+
+
+def _convert_to_files(inputs: List[Path], output_dir: Optional[Path], fmt: str, jobs: int,
+                      options: "ConversionOptions", dedupe: Optional["FingerprintService"] = None) -> int:
+    """Convert each input to its own output file"""
+    from concurrent.futures import as_completed
+    from app.services.exporters import format_suffix
+    from app.services.fingerprint_service import output_profile
+
+    suffix = format_suffix(fmt)
+    profile = output_profile(fmt, options)
+    copies: Dict[Path, Path] = {}
+    reused: Dict[Path, Path] = {}
+    if dedupe is not None:
+        # Duplicates are linked to an existing output instead of being parsed again
+        inputs, copies, reused = dedupe.plan(inputs, profile)
+    targets = {p: _output_path_for(p, output_dir, suffix) for p in [*inputs, *copies, *reused]}
+    _check_output_collisions(targets, {**copies, **reused})
+    items = [(p, targets[p], fmt, options) for p in inputs]
+    failures = 0
+    converted: Dict[Path, Path] = {}
+
+    executor = _make_executor(jobs)
+    try:
+        if executor is None:
+            results = ((item, _convert_job(*item)) for item in items)
+        else:
+            futures = {executor.submit(_convert_job, *item): item for item in items}
+            results = ((futures[f], f.result()) for f in as_completed(futures))
+
+        for (srt_path, output_path, *_), (ok, message) in results:
+            if ok:
+                logger.info(f"{srt_path} -> {output_path} ({message} frames)")
+                converted[srt_path] = output_path
+                if dedupe is not None:
+                    dedupe.record(srt_path, output_path, profile)
+            else:
+                failures += 1
+                logger.error(f"Failed {srt_path}: {message}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for source, first in copies.items():
+        reused[source] = converted.get(first)
+    for source, existing in reused.items():
+        if existing is None:
+            failures += 1
+            logger.error(f"Failed {source}: same content as a file that failed")
+            continue
+        try:
+            dedupe.link(source, existing, targets[source], profile)
+        except OSError as err:
+            failures += 1
+            logger.error(f"Failed {source}: {err}")
+    return failures
+
+
+def _frame_filter(args: argparse.Namespace) -> Optional["FrameFilter"]:
+    """FrameFilter from the filter options, None without any (ValueError / OSError on bad values)"""
+    from app.services.annotation_service import parse_time_ms
+    from app.services.frame_filter import FrameFilter
+
+    filters = {}
+    # Times with a date are wall-clock times, others are video (SRT) times
+    for bound in ("start", "end"):
+        value = getattr(args, bound)
+        if value is None:
+            continue
+        if len(value) >= 10 and value[4] == "-":
+            filters[f"{bound}_time"] = value
+        else:
+            filters[f"{bound}_ms"] = parse_time_ms(value)
+    if args.bbox is not None:
+        parts = [float(part) for part in args.bbox.split(",")]
+        if len(parts) != 4:
+            raise ValueError(f"--bbox needs MIN_LON,MIN_LAT,MAX_LON,MAX_LAT: {args.bbox}")
+        filters["bbox"] = tuple(parts)
+    if args.polygon is not None:
+        filters["polygon"] = FrameFilter.load_polygon(Path(args.polygon))
+    if args.min_alt is not None or args.max_alt is not None:
+        filters.update(min_alt=args.min_alt, max_alt=args.max_alt, relative_alt=args.relative_alt)
+
+    if not filters:
+        return None
+    return FrameFilter.between(filters.pop("start_time", None), filters.pop("end_time", None), **filters)
+
+
+def _cmd_convert(args: argparse.Namespace) -> int:
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        logger.error("No SRT files matched the given inputs")
+        return EXIT_USAGE
+
+    from app.services.exporters import is_binary_format
+    from app.services.pipeline_service import ConversionOptions, PipelineService
+
+    try:
+        frame_filter = _frame_filter(args)
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as err:
+        logger.error(f"Invalid filter: {err}")
+        return EXIT_USAGE
+
+    options = ConversionOptions(
+        kinematics=args.kinematics,
+        resample_hz=args.resample,
+        footprint=args.footprint,
+        ground_alt=args.ground_alt,
+        annotations=args.annotations,
+        annotation_mode=args.annotation_match,
+        annotation_tolerance_ms=None if args.annotation_tolerance is None else round(args.annotation_tolerance * 1000),
+        template=args.template,
+        frame_filter=frame_filter,
+    )
+
+    # Fail once up front instead of once per input file
+    if options.annotations:
+        from app.services.annotation_service import AnnotationService
+
+        try:
+            AnnotationService.from_csv(Path(options.annotations))
+        except (OSError, ValueError) as err:
+            logger.error(f"Cannot read annotations: {err}")
+            return EXIT_USAGE
+
+    if options.template:
+        try:
+            PipelineService.formatter(options).function(PipelineService.extra_column_names(options))
+        except (OSError, ValueError) as err:
+            logger.error(f"Invalid template: {err}")
+            return EXIT_USAGE
+
+    jobs = args.jobs or os.cpu_count() or 1
+    output = args.output
+    dedupe = _fingerprint_service(args)
+
+    to_dir = bool(output) and output != "-" and (Path(output).is_dir() or output.endswith(("/", os.sep)))
+
+    if output and not to_dir and is_binary_format(args.format):
+        # A workbook cannot be concatenated: only a single input may go to one file
+        if output == "-" or len(inputs) > 1:
+            logger.error(f"{args.format} output needs an output directory (or a single input file)")
+            return EXIT_USAGE
+        ok, message = _convert_job(inputs[0], Path(output), args.format, options)
+        failures = 0 if ok else 1
+        if not ok:
+            logger.error(f"Failed {inputs[0]}: {message}")
+    elif output == "-":
+        failures = _convert_to_stream(inputs, sys.stdout, args.format, jobs, options, dedupe)
+    elif output and not to_dir:
+        from app.services.exporters import open_output
+
+        # Never truncate in place: the output may be hard-linked to a duplicate's
+        with open_output(Path(output), newline="") as f:
+            failures = _convert_to_stream(inputs, f, args.format, jobs, options, dedupe)
+    else:
+        output_dir = Path(output) if to_dir else None
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            failures = _convert_to_files(inputs, output_dir, args.format, jobs, options, dedupe)
+        except OutputCollisionError as err:
+            logger.error(str(err))
+            return EXIT_USAGE
+
+    if failures:
+        logger.error(f"{failures} of {len(inputs)} files failed")
+        return EXIT_FAILURE
+    logger.info(f"Converted {len(inputs)} files")
+    return EXIT_OK
+
+
+def _fingerprint_service(args: argparse.Namespace) -> Optional["FingerprintService"]:
+    """Duplicate detection for the dedupe options (None with --no-dedupe)"""
+    if args.no_dedupe:
+        return None
+    from app.services.fingerprint_service import FingerprintIndex, FingerprintService
+
+    return FingerprintService(FingerprintIndex(args.fingerprints), lenses=args.dedupe_lenses)
+
+
+def _add_dedupe_arguments(parser: argparse.ArgumentParser, index_default: Optional[Path] = None) -> None:
+    dedupe = parser.add_argument_group("duplicates", "Link copies of an SRT to the existing output instead of "
+                                                     "converting them again (checked before parsing)")
+    dedupe.add_argument("--fingerprints", type=Path, default=index_default, metavar="JSON",
+                        help="Fingerprint index shared across runs"
+                             + (" (default: %(default)s)" if index_default else " (default: this run only)"))
+    dedupe.add_argument("--dedupe-lenses", action="store_true",
+                        help="Also link the S/T/W/Z lens files of one recording (identical GPS) "
+                             "to the first one's output")
+    dedupe.add_argument("--no-dedupe", action="store_true", help="Convert every input")
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive: {value}")
+    return number
+
+
+def _add_convert_parser(subparsers) -> None:
+    from app.services.exporters import EXPORT_FORMATS
+
+    parser = subparsers.add_parser("convert", help="Convert SRT files (default command)")
+    parser.add_argument("inputs", nargs="+", help="SRT files, directories or glob patterns")
+    parser.add_argument(
+        "-o", "--output",
+        help="Output: '-' for stdout, a directory, or a single file for all inputs "
+             "(default: next to each SRT)",
+    )
+    parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel worker processes (0 = all cores)")
+    parser.add_argument(
+        "-t", "--template", metavar="NAME|JSON",
+        help="Output column layout: a built-in template (tsira) or a JSON template file",
+    )
+    parser.add_argument(
+        "--kinematics", action="store_true",
+        help="Add distance, ground speed, heading and vertical speed columns",
+    )
+    parser.add_argument(
+        "--resample", type=_positive_float, metavar="HZ",
+        help="Interpolate telemetry to a fixed rate, e.g. the video frame rate (29.97)",
+    )
+    parser.add_argument(
+        "--footprint", action="store_true",
+        help="Add the ground point and image-corner footprint of each frame "
+             "(as polygons with --format geojsonl)",
+    )
+    parser.add_argument(
+        "--ground-alt", type=float, metavar="M",
+        help="Ground elevation above sea level for --footprint (default: take-off level)",
+    )
+    parser.add_argument(
+        "--annotations", metavar="CSV",
+        help="CSV of time and comment (optionally VIDEO NAME) merged into the COMMENTS column",
+    )
+    parser.add_argument(
+        "--annotation-match", choices=("nearest", "preceding"), default="nearest",
+        help="Attach each annotation to the nearest frame or the last frame before it",
+    )
+    parser.add_argument(
+        "--annotation-tolerance", type=_positive_float, metavar="SECONDS",
+        help="Drop annotations further than this from every frame (default: keep all)",
+    )
+    filters = parser.add_argument_group("filters", "Keep only matching frames (applied while parsing)")
+    filters.add_argument(
+        "--start", metavar="TIME",
+        help="Start of the time window: video time (00:10:00) or wall-clock time (2025-12-22T15:10:00)",
+    )
+    filters.add_argument("--end", metavar="TIME", help="End of the time window (reading stops after it)")
+    filters.add_argument("--bbox", metavar="MIN_LON,MIN_LAT,MAX_LON,MAX_LAT", help="Geographic bounding box")
+    filters.add_argument("--polygon", metavar="GEOJSON", help="GeoJSON file with the area (first polygon)")
+    filters.add_argument("--min-alt", type=float, metavar="M", help="Lowest ALTITUDE to keep")
+    filters.add_argument("--max-alt", type=float, metavar="M", help="Highest ALTITUDE to keep")
+    filters.add_argument(
+        "--relative-alt", action="store_true",
+        help="Apply --min-alt/--max-alt to the height above take-off (rel_alt)",
+    )
+    _add_dedupe_arguments(parser)
+    parser.set_defaults(handler=_cmd_convert)
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    import signal
+    import threading
+    from app.services.watch_service import WatchService
+
+    missing = [d for d in args.directories if not Path(d).is_dir()]
+    if missing:
+        logger.error(f"Not a directory: {', '.join(missing)}")
+        return EXIT_USAGE
+
+    service = WatchService(
+        [Path(d) for d in args.directories],
+        output_root=args.mirror,
+        fmt=args.format,
+        jobs=args.jobs or os.cpu_count() or 1,
+        state_path=args.state,
+        settle_seconds=args.settle,
+        poll_interval=args.poll_interval,
+        use_inotify=False if args.polling else None,
+        dedupe=_fingerprint_service(args),
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        service.run(stop)
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def _add_watch_parser(subparsers) -> None:
+    from app.services.exporters import EXPORT_FORMATS
+
+    parser = subparsers.add_parser("watch", help="Convert SRT files as they appear in import folders")
+    parser.add_argument("directories", nargs="+", help="Import folders to watch (recursively)")
+    parser.add_argument("--mirror", type=Path, help="Write outputs into this mirror tree instead of next to each SRT")
+    parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel worker processes (0 = all cores)")
+    parser.add_argument("--state", type=Path, default=Path(".dji_watch_state.json"),
+                        help="State file of processed files (survives restarts)")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="Seconds a file must stay unchanged before it is converted")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between checks")
+    parser.add_argument("--polling", action="store_true", help="Force polling instead of inotify")
+    _add_dedupe_arguments(parser, Path(".dji_fingerprints.json"))
+    parser.set_defaults(handler=_cmd_watch)
+
+
+def _cmd_index(args: argparse.Namespace) -> int:
+    from app.services.srt_index_service import SrtIndexService, unindexable_reason
+
+    inputs = []
+    for path in expand_inputs(args.inputs):
+        try:
+            reason = unindexable_reason(path)
+        except OSError as err:
+            reason = str(err)
+        if reason is None:
+            inputs.append(path)
+        else:
+            logger.warning(f"Skipping {path}: {reason}")
+    if not inputs:
+        logger.error("No plain SRT files matched the given inputs")
+        return EXIT_USAGE
+
+    service = SrtIndexService()
+    failures = 0
+    for srt_path in inputs:
+        try:
+            index = service.index(srt_path, rebuild=args.force)
+            logger.info(f"{srt_path}: {len(index)} blocks")
+        except (OSError, ValueError) as err:
+            logger.error(f"Failed to index {srt_path}: {err}")
+            failures += 1
+    return EXIT_FAILURE if failures else EXIT_OK
+
+
+def _add_index_parser(subparsers) -> None:
+    parser = subparsers.add_parser("index", help="Build .SRT.idx sidecar indexes for random access")
+    parser.add_argument("inputs", nargs="+", help="SRT files, directories or glob patterns")
+    parser.add_argument("--force", action="store_true", help="Rebuild indexes that are still current")
+    parser.set_defaults(handler=_cmd_index)
+
+
+def _time_window(value: str) -> Tuple[int, int]:
+    """argparse type for "START-END" video times (e.g. 00:01:00-00:01:30 or 60-90.5)"""
+    from app.services.annotation_service import parse_time_ms
+
+    start, sep, end = value.partition("-")
+    try:
+        if not sep:
+            raise ValueError(value)
+        return parse_time_ms(start), parse_time_ms(end)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START-END, got {value!r}") from None
+
+
+def _cmd_trim(args: argparse.Namespace) -> int:
+    from app.services.srt_trim_service import SrtTrimService
+
+    srt_path = args.input
+    if not srt_path.is_file():
+        logger.error(f"Input not found: {srt_path}")
+        return EXIT_USAGE
+    output_path = args.output or srt_path.with_name(f"{srt_path.stem}_trim{srt_path.suffix}")
+    if output_path.resolve() == srt_path.resolve():
+        logger.error("The output would overwrite the input")
+        return EXIT_USAGE
+
+    try:
+        count = SrtTrimService().trim(srt_path, output_path, args.ranges, rebase=args.rebase)
+        logger.info(f"{output_path}: {count} blocks")
+        if args.csv:
+            from app.services.conversion_service import ConversionService
+
+            ConversionService().convert(output_path, output_path.with_suffix(".csv"))
+    except (OSError, ValueError) as err:
+        logger.error(f"Failed to trim {srt_path}: {err}")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _add_trim_parser(subparsers) -> None:
+    parser = subparsers.add_parser("trim", help="Cut an SRT file to time windows")
+    parser.add_argument("input", type=Path, help="SRT file")
+    parser.add_argument("-r", "--range", dest="ranges", action="append", type=_time_window, required=True,
+                        metavar="START-END", help="Time window to keep (repeatable)")
+    parser.add_argument("-o", "--output", type=Path, help="Output SRT (default: <name>_trim.SRT)")
+    parser.add_argument("--rebase", action="store_true",
+                        help="Shift timecodes so the output starts at 0 (for a clip cut from the video)")
+    parser.add_argument("--csv", action="store_true", help="Also write a CSV of the trimmed range")
+    parser.set_defaults(handler=_cmd_trim)
+
+
+def _cmd_photos(args: argparse.Namespace) -> int:
+    from app.services.photo_metadata_service import PHOTO_SUFFIXES, PhotoMetadataService
+
+    photos: Dict[str, Path] = {}
+    tracks = []
+    for path in expand_inputs(args.inputs):
+        if path.suffix.upper() in PHOTO_SUFFIXES:
+            photos.setdefault(os.path.normcase(str(path.resolve())), path)
+        else:
+            tracks.append(path)
+    # Directories only expand to SRT sources; collect their photos here
+    for pattern in args.inputs:
+        for candidate in ([Path(p) for p in glob.glob(pattern, recursive=True)] if glob.has_magic(pattern)
+                          else [Path(pattern)]):
+            if candidate.is_dir():
+                for path in candidate.rglob("*"):
+                    if path.suffix.upper() in PHOTO_SUFFIXES and path.is_file():
+                        photos.setdefault(os.path.normcase(str(path.resolve())), path)
+    tracks += expand_inputs(args.tracks) if args.tracks else []
+    if not photos:
+        logger.error("No photos matched the given inputs")
+        return EXIT_USAGE
+
+    photo_paths = sorted(photos.values())
+    output_path = args.output or photo_paths[0].parent / "photos.csv"
+    service = PhotoMetadataService()
+    try:
+        metadata = service.read_many(photo_paths)
+        if tracks:
+            metadata = service.correlate(metadata, service.track_columns(tracks), max_offset_s=args.max_offset)
+        service.export_csv(metadata, output_path)
+    except (OSError, ValueError) as err:
+        logger.error(f"Failed to export photos: {err}")
+        return EXIT_FAILURE
+    logger.info(f"{output_path}: {len(metadata)} photos")
+    return EXIT_OK if len(metadata) == len(photo_paths) else EXIT_FAILURE
+
+
+def _add_photos_parser(subparsers) -> None:
+    parser = subparsers.add_parser("photos", help="Export photo geotags, matched to the nearest video frame")
+    parser.add_argument("inputs", nargs="+",
+                        help="Photos (JPG), SRT files or videos, directories or glob patterns")
+    parser.add_argument("-t", "--tracks", nargs="+", help="More SRT files or videos to match the photos against")
+    parser.add_argument("-o", "--output", type=Path, help="Output CSV (default: photos.csv next to the photos)")
+    parser.add_argument("--max-offset", type=_positive_float, default=2.0,
+                        help="Seconds between a photo and its frame before it is left unmatched (default: 2)")
+    parser.set_defaults(handler=_cmd_photos)
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    import signal
+    import threading
+    from app.services.http_service import ConversionServer, JobQueue
+
+    queue = JobQueue(jobs=args.jobs or os.cpu_count() or 1, spool_dir=args.spool, max_pending=args.max_pending)
+    try:
+        server = ConversionServer((args.host, args.port), queue, roots=args.root or (),
+                                  max_upload=int(args.max_upload * 1024 * 1024))
+    except OSError as err:
+        queue.close()
+        logger.error(f"Cannot listen on {args.host}:{args.port}: {err}")
+        return EXIT_FAILURE
+
+    # serve_forever must be stopped from another thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    logger.warning(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return EXIT_OK
+
+
+def _add_serve_parser(subparsers) -> None:
+    parser = subparsers.add_parser("serve", help="Run the HTTP conversion service")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (0.0.0.0 for the whole network)")
+    parser.add_argument("--port", type=int, default=8000, help="TCP port")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel worker processes (0 = all cores)")
+    parser.add_argument("--root", type=Path, action="append",
+                        help="Directory whose SRT files may be converted by path (repeatable)")
+    parser.add_argument("--spool", type=Path, help="Directory for uploads and results (default: a temporary one)")
+    parser.add_argument("--max-upload", type=_positive_float, default=512, help="Upload size limit in MB")
+    parser.add_argument("--max-pending", type=int, default=16,
+                        help="Jobs queued or running before new requests are refused (503)")
+    parser.set_defaults(handler=_cmd_serve)
+
+
+def _cmd_quality(args: argparse.Namespace) -> int:
+    from app.services.quality_service import QualityService
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        logger.error("No SRT files matched the given inputs")
+        return EXIT_USAGE
+
+    service = QualityService(max_speed_mps=args.max_speed, max_vertical_speed_mps=args.max_vertical_speed)
+    failures = flagged = 0
+    for srt_path in inputs:
+        try:
+            report = service.scan_file(srt_path)
+            if not args.no_sidecar:
+                service.write_sidecar(report, srt_path)
+        except (OSError, ValueError) as err:
+            logger.error(f"Failed to scan {srt_path}: {err}")
+            failures += 1
+            continue
+        flagged += bool(report["issues"])
+        print(f"{srt_path}: {service.summary(report)}")
+    if failures or (args.strict and flagged):
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _add_quality_parser(subparsers) -> None:
+    parser = subparsers.add_parser("quality", help="Scan telemetry for gaps, jitter, jumps and missing GPS")
+    parser.add_argument("inputs", nargs="+", help="SRT files, directories or glob patterns")
+    parser.add_argument("--max-speed", type=_positive_float, default=40.0,
+                        help="Ground speed (m/s) above which a GPS step is a jump")
+    parser.add_argument("--max-vertical-speed", type=_positive_float, default=15.0,
+                        help="Vertical speed (m/s) above which an altitude step is a spike")
+    parser.add_argument("--no-sidecar", action="store_true", help="Only print the summary, no .quality.json files")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 when any issue is found")
+    parser.set_defaults(handler=_cmd_quality)
+
+
+def _cmd_stitch(args: argparse.Namespace) -> int:
+    from app.services.exporters import format_suffix, is_binary_format
+    from app.services.srt_io import source_base
+    from app.services.stitch_service import StitchService
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        logger.error("No SRT files matched the given inputs")
+        return EXIT_USAGE
+
+    output = args.output
+    to_dir = bool(output) and output != "-" and (Path(output).is_dir() or output.endswith(("/", os.sep)))
+    if output == "-" and is_binary_format(args.format):
+        logger.error(f"{args.format} output cannot go to stdout")
+        return EXIT_USAGE
+
+    service = StitchService(max_gap_s=args.max_gap, jobs=args.jobs or os.cpu_count() or 1)
+    flights = service.stitch(inputs)
+    if not flights:
+        logger.error("No GPS frames in any input")
+        return EXIT_FAILURE
+
+    try:
+        if output and not to_dir:
+            # One output holds one flight: its time columns would restart mid-file otherwise
+            if len(flights) > 1:
+                logger.error(f"{len(flights)} flights found; write them to an output directory")
+                return EXIT_USAGE
+            if output == "-":
+                service.write(flights[0], sys.stdout, args.format)
+            else:
+                service.export(flights[0], Path(output), args.format)
+        else:
+            if to_dir:
+                Path(output).mkdir(parents=True, exist_ok=True)
+            suffix = format_suffix(args.format)
+            for flight in flights:
+                base = source_base(flight.sources[0])
+                folder = Path(output) if to_dir else base.parent
+                service.export(flight, folder / f"{base.stem}_stitched{suffix}", args.format)
+    except OSError as err:
+        logger.error(f"Failed to write the stitched flight: {err}")
+        return EXIT_FAILURE
+
+    logger.info(f"Stitched {len(inputs) - len(service.failed)} files into {len(flights)} flights")
+    return EXIT_FAILURE if service.failed else EXIT_OK
+
+
+def _add_stitch_parser(subparsers) -> None:
+    from app.services.exporters import EXPORT_FORMATS
+
+    parser = subparsers.add_parser("stitch", help="Join recordings split into several files into flights")
+    parser.add_argument("inputs", nargs="+", help="SRT files or videos, directories or glob patterns")
+    parser.add_argument(
+        "-o", "--output",
+        help="Output: a directory (one file per flight), or '-' / a file when there is a single flight "
+             "(default: <first file>_stitched next to each flight's first file)",
+    )
+    parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel worker processes (0 = all cores)")
+    parser.add_argument("--max-gap", type=_positive_float, default=10.0, metavar="SECONDS",
+                        help="Largest wall-clock gap between two files of the same flight (default: 10)")
+    parser.set_defaults(handler=_cmd_stitch)
+
+
+def _cmd_parsers(args: argparse.Namespace) -> int:
+    from app.services.parser_engine import BACKENDS, DEFAULT_BACKEND, DEFAULT_PARALLEL_MIN_BYTES, ParserEngine
+
+    engine = ParserEngine(jobs=args.jobs or None)
+    if args.benchmark is None:
+        config = engine.config
+        parallel_min_bytes = config.get("parallel_min_bytes", DEFAULT_PARALLEL_MIN_BYTES)
+        print(f"backends: {', '.join(BACKENDS)}")
+        print(f"config: {engine.config_path}" + ("" if config else " (not saved, defaults)"))
+        print(f"serial: {config.get('backend', DEFAULT_BACKEND)}")
+        if parallel_min_bytes is None or engine.jobs < 2:
+            print(f"parallel: off ({engine.jobs} cores)")
+        else:
+            print(f"parallel: files from {parallel_min_bytes / 1e6:.1f} MB on {engine.jobs} cores")
+        return EXIT_OK
+
+    srt_path = args.benchmark
+    if not srt_path.is_file():
+        logger.error(f"Input not found: {srt_path}")
+        return EXIT_USAGE
+    try:
+        results = engine.benchmark(srt_path, repeat=args.repeat)
+        size_mb = srt_path.stat().st_size / 1e6
+        for name, seconds in sorted(results.items(), key=lambda item: item[1]):
+            print(f"{name:<10} {seconds:8.3f} s {size_mb / seconds:8.1f} MB/s")
+        if args.save:
+            config = engine.save(results, srt_path)
+            parallel = config["parallel_min_bytes"]
+            print(f"saved {engine.config_path}: serial {config['backend']}, parallel "
+                  + ("off" if parallel is None else f"from {parallel / 1e6:.1f} MB"))
+    except (OSError, ValueError) as err:
+        logger.error(f"Failed to benchmark {srt_path}: {err}")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _add_parsers_parser(subparsers) -> None:
+    parser = subparsers.add_parser("parsers", help="Show, benchmark and save the SRT parser backend choice")
+    parser.add_argument("--benchmark", type=Path, metavar="SRT", help="Time every backend on this file")
+    parser.add_argument("--save", action="store_true", help="Store the benchmark's choice for later runs")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend; the best one counts")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Cores for the parallel backend (0 = all)")
+    parser.set_defaults(handler=_cmd_parsers)
+
+
+def _cmd_coverage(args: argparse.Namespace) -> int:
+    from app.services.coverage_service import RASTER_SUFFIXES, CoverageGrid, CoverageService
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        logger.error("No SRT files matched the given inputs")
+        return EXIT_USAGE
+    outputs = args.outputs or [args.grid.with_suffix(".asc")]
+    for output in outputs:
+        if output.suffix.lower() not in RASTER_SUFFIXES:
+            logger.error(f"Unknown raster format: {output} (use {' or '.join(RASTER_SUFFIXES)})")
+            return EXIT_USAGE
+
+    grid = None
+    if args.grid.exists():
+        try:
+            grid = CoverageGrid.load(args.grid)
+        except (OSError, ValueError) as err:
+            logger.error(f"Failed to read {args.grid}: {err}")
+            return EXIT_FAILURE
+        if args.cell is not None and args.cell != grid.cell_m:
+            logger.warning(f"{args.grid} has {grid.cell_m:g} m cells; --cell {args.cell:g} is ignored")
+
+    service = CoverageService(cell_m=args.cell or 10.0, jobs=args.jobs or os.cpu_count() or 1)
+    try:
+        grid = service.update(inputs, grid)
+        if grid is None:
+            logger.error("No GPS frames in any input")
+            return EXIT_FAILURE
+        grid.save(args.grid)
+        for output in outputs:
+            grid.write(output)
+    except (OSError, ValueError) as err:
+        logger.error(f"Failed to update the coverage grid: {err}")
+        return EXIT_FAILURE
+
+    print(f"{args.grid}: {service.summary(grid)}")
+    return EXIT_FAILURE if service.failed else EXIT_OK
+
+
+def _add_coverage_parser(subparsers) -> None:
+    parser = subparsers.add_parser("coverage", help="Count how many flights passed over each grid cell")
+    parser.add_argument("inputs", nargs="+", help="SRT files or videos, directories or glob patterns")
+    parser.add_argument("-g", "--grid", type=Path, required=True,
+                        help="Grid file (.npz); created on first use, later runs only add new flights")
+    parser.add_argument("-o", "--output", dest="outputs", type=Path, action="append",
+                        help="Raster to write: .asc (ESRI ASCII grid) or .npy (with a .wld world file); "
+                             "repeatable (default: the grid path with .asc)")
+    parser.add_argument("--cell", type=_positive_float, metavar="METRES",
+                        help="Cell size of a new grid (default: 10)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Parallel worker processes (0 = all cores)")
+    parser.set_defaults(handler=_cmd_coverage)
+
+
+# Sub-command registration, in help order
+SUBCOMMANDS = {
+    "convert": _add_convert_parser,
+    "watch": _add_watch_parser,
+    "index": _add_index_parser,
+    "trim": _add_trim_parser,
+    "photos": _add_photos_parser,
+    "serve": _add_serve_parser,
+    "quality": _add_quality_parser,
+    "stitch": _add_stitch_parser,
+    "parsers": _add_parsers_parser,
+    "coverage": _add_coverage_parser,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app", description="DJI SRT telemetry tools")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="Log every file")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Only log errors")
+    subparsers = parser.add_subparsers(dest="command")
+    for add_parser in SUBCOMMANDS.values():
+        add_parser(subparsers)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    # "convert" is the default command: python -m app a.SRT b.SRT
+    i = 0
+    while i < len(argv) and argv[i] in GLOBAL_FLAGS:
+        i += 1
+    if i < len(argv) and argv[i] not in SUBCOMMANDS:
+        argv.insert(i, "convert")
+
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return EXIT_OK if exc.code == 0 else EXIT_USAGE
+
+    if args.command is None:
+        parser.print_usage(sys.stderr)
+        return EXIT_USAGE
+
+    level = logging.INFO if args.verbose else logging.ERROR if args.quiet else logging.WARNING
+    logging.basicConfig(level=level, format="%(levelname)s: %(message)s", stream=sys.stderr)
+    # Per-frame extraction progress is too chatty for batch runs
+    logging.getLogger("app.services.video_metadata_service").setLevel(max(level, logging.WARNING))
+
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. "| head"); silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FAILURE
@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class PhotoMetadata(BaseModel):
+    photo_name: Optional[str] = Field(default="", alias="PHOTO NAME")
+    date: Optional[str] = Field(default="", alias="DATE")
+    time: Optional[str] = Field(default="", alias="TIME")
+    latitude: Optional[float] = Field(default=None, alias="LATITUDE")
+    longitude: Optional[float] = Field(default=None, alias="LONGITUDE")
+    altitude: Optional[float] = Field(default=None, alias="ALTITUDE")
+    relative_altitude: Optional[float] = Field(default=None, alias="RELATIVE ALTITUDE")
+    gimbal_yaw: Optional[float] = Field(default=None, alias="GIMBAL YAW")
+    gimbal_pitch: Optional[float] = Field(default=None, alias="GIMBAL PITCH")
+    gimbal_roll: Optional[float] = Field(default=None, alias="GIMBAL ROLL")
+    # Nearest video frame (PhotoMetadataService.correlate)
+    video_name: Optional[str] = Field(default="", alias="VIDEO NAME")
+    video_time: Optional[str] = Field(default="", alias="VIDEO TIME")
+    time_offset: Optional[float] = Field(default=None, alias="TIME OFFSET")
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, NamedTuple, Optional
+import csv
+import logging
+import re
+
+if TYPE_CHECKING:
+    from app.models.video_frame_metadata import VideoFrameMetadata
+
+logger = logging.getLogger(__name__)
+
+# "HH:MM:SS", "MM:SS", with optional milliseconds after ":", "." or "," (TIME column, SRT, editors)
+TIME_RE = re.compile(r"^\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})(?:[:.,](\d{1,3}))?\s*$")
+SECONDS_RE = re.compile(r"^\s*\d+(?:\.\d+)?\s*$")
+
+TIME_HEADERS = ("TIME", "TIMESTAMP", "TIMECODE")
+COMMENT_HEADERS = ("COMMENTS", "COMMENT", "NOTE", "NOTES", "TEXT")
+VIDEO_HEADERS = ("VIDEO NAME", "VIDEO", "FILE")
+
+
+def parse_time_ms(text: str) -> int:
+    """Parse a video-relative time ("00:10:24", "10:24", "00:10:24:500", "624.5") to milliseconds"""
+    match = TIME_RE.match(text)
+    if match:
+        hours, minutes, seconds, fraction = match.groups()
+        ms = int(fraction.ljust(3, "0")) if fraction else 0
+        return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + ms
+    if SECONDS_RE.match(text):
+        return round(float(text) * 1000)
+    raise ValueError(f"Invalid time: {text!r}")
+
+
+class Annotation(NamedTuple):
+    time_ms: int
+    comment: str
+    video_name: str = ""  # empty: applies to every video
+
+
+class AnnotationService:
+    """
+    Merge operator notes (a CSV of time and comment) into the COMMENTS column.
+
+    Each annotation is attached to one frame, the nearest in time or the
+    last one at or before it ("preceding"). Frames and annotations are both
+    in time order, so the join is a single two-pointer pass over the frame
+    stream (O(frames + annotations)) with one frame of look-ahead.
+    """
+
+    MODES = ("nearest", "preceding")
+
+    def __init__(self, annotations: Iterable[Annotation], mode: str = "nearest",
+                 tolerance_ms: Optional[int] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown annotation mode: {mode}")
+        self.annotations = sorted(annotations, key=lambda a: a.time_ms)
+        self.mode = mode
+        # Annotations further than this from their frame are dropped
+        self.tolerance_ms = tolerance_ms
+
+    @classmethod
+    def from_csv(cls, path: Path, mode: str = "nearest", tolerance_ms: Optional[int] = None) -> AnnotationService:
+        """
+        Load annotations from a CSV file.
+
+        Columns are found by header (TIME / COMMENTS, optional VIDEO NAME, any
+        case); without a recognised header the first two columns are time and
+        comment. Rows with an empty comment are skipped.
+        """
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+
+        time_col, comment_col, video_col = 0, 1, None
+        if rows:
+            header = [cell.strip().upper() for cell in rows[0]]
+            if any(name in header for name in TIME_HEADERS):
+                time_col = next(header.index(n) for n in TIME_HEADERS if n in header)
+                comment_col = next((header.index(n) for n in COMMENT_HEADERS if n in header), None)
+                video_col = next((header.index(n) for n in VIDEO_HEADERS if n in header), None)
+                if comment_col is None:
+                    raise ValueError(f"No comment column in {path}")
+                rows = rows[1:]
+
+        annotations: List[Annotation] = []
+        for line_no, row in enumerate(rows, start=1):
+            comment = row[comment_col].strip() if comment_col < len(row) else ""
+            if not comment:
+                continue
+            try:
+                time_ms = parse_time_ms(row[time_col])
+            except (IndexError, ValueError) as err:
+                raise ValueError(f"{path}: row {line_no}: {err}") from None
+            video_name = row[video_col].strip() if video_col is not None and video_col < len(row) else ""
+            annotations.append(Annotation(time_ms, comment, video_name))
+
+        logger.info(f"Loaded {len(annotations)} annotations from {path}")
+        return cls(annotations, mode=mode, tolerance_ms=tolerance_ms)
+
+    def for_video(self, video_name: str) -> AnnotationService:
+        """The annotations that apply to one video (named ones must match the SRT name)"""
+        wanted = video_name.casefold()
+        selected = [a for a in self.annotations if not a.video_name or Path(a.video_name).stem.casefold() == wanted]
+        return AnnotationService(selected, mode=self.mode, tolerance_ms=self.tolerance_ms)
+
+    def _belongs_to(self, annotation: Annotation, frame_ms: int, next_ms: int) -> bool:
+        """Whether the annotation goes to the frame at frame_ms rather than a later one"""
+        if self.mode == "preceding":
+            return annotation.time_ms < next_ms
+        return 2 * annotation.time_ms <= frame_ms + next_ms
+
+    def _attach(self, frame: VideoFrameMetadata, frame_ms: int, notes: List[Annotation]) -> VideoFrameMetadata:
+        comments = [frame.comments] if frame.comments else []
+        for note in notes:
+            if self.tolerance_ms is not None and abs(note.time_ms - frame_ms) > self.tolerance_ms:
+                logger.warning(f"Annotation at {note.time_ms} ms has no frame within {self.tolerance_ms} ms")
+                continue
+            comments.append(note.comment)
+        if comments:
+            frame.comments = "; ".join(comments)
+        return frame
+
+    def merge(self, frames: Iterable[VideoFrameMetadata]) -> Iterator[VideoFrameMetadata]:
+        """Yield the frames (in time order) with the annotations merged into COMMENTS"""
+        annotations = self.annotations
+        index = 0
+        pending: Optional[VideoFrameMetadata] = None
+        pending_ms = 0
+
+        for frame in frames:
+            frame_ms = parse_time_ms(frame.time)
+            if pending is not None:
+                start = index
+                while index < len(annotations) and self._belongs_to(annotations[index], pending_ms, frame_ms):
+                    index += 1
+                yield self._attach(pending, pending_ms, annotations[start:index]) if index > start else pending
+            pending, pending_ms = frame, frame_ms
+
+        if pending is not None:
+            # Everything left is at or after the last frame
+            notes = annotations[index:]
+            index = len(annotations)
+            yield self._attach(pending, pending_ms, notes) if notes else pending
+
+        if index < len(annotations):
+            logger.warning(f"{len(annotations) - index} annotations were not merged (no frames)")
@@ -0,0 +1,27 @@
+from pathlib import Path
+from typing import Optional, TextIO
+import logging
+
+from app.services.pipeline_service import ConversionOptions, PipelineService
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionService:
+    """Convert a single SRT file to an output format (safe to run in worker processes)"""
+
+    def convert(self, srt_path: Path, output_path: Path, fmt: str = "csv", header: bool = True,
+                options: Optional[ConversionOptions] = None) -> int:
+        """Convert an SRT file to a file and return the number of frames written"""
+        return PipelineService().run(srt_path, output_path, fmt, header=header, options=options)
+
+    def convert_to_stream(self, srt_path: Path, stream: TextIO, fmt: str = "csv", header: bool = True,
+                          options: Optional[ConversionOptions] = None) -> int:
+        """Stream an SRT file into an open text stream (e.g. stdout)"""
+        pipeline = PipelineService()
+        frames, extra_columns = pipeline.frames(srt_path, options)
+        count = pipeline.write(frames, stream, fmt, header=header, extra_columns=extra_columns,
+                               formatter=pipeline.formatter(options))
+        if count == 0:
+            raise ValueError(f"No GPS data found in {srt_path}")
+        return count
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import logging
+import math
+import os
+import re
+
+from app.services.exporters import open_output
+from app.services.quality_service import EARTH_RADIUS_M
+from app.services.srt_io import source_name
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Raster formats written by CoverageGrid.write, by suffix
+RASTER_SUFFIXES = (".asc", ".npy")
+
+# Largest grid held in memory (uint32 counts: 400 MB)
+MAX_CELLS = 100_000_000
+
+# DJI_<date+time>_<index>_<lens>: the S/T/W/Z lens files (SRT or MP4) of one recording
+_RECORDING_RE = re.compile(r"(DJI_\d+_\d+)(?:_[A-Z]+)?")
+
+# Coordinate system of the rasters, written as a .prj next to them
+WGS84_WKT = (
+    'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563]],'
+    'PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433]]'
+)
+
+
+def _read_positions(source: Path) -> Tuple[bool, object]:
+    """Worker: (ok, (latitudes, longitudes) or error message) of one source"""
+    import numpy as np
+    from app.services.video_metadata_service import VideoMetadataService
+
+    try:
+        records = list(VideoMetadataService().iter_records(source, fields=False))
+    except Exception as err:
+        return False, f"{type(err).__name__}: {err}"
+    latitudes = np.array([record[2] for record in records], dtype=np.float64)
+    longitudes = np.array([record[3] for record in records], dtype=np.float64)
+    return True, (latitudes, longitudes)
+
+
+class CoverageGrid:
+    """
+    Number of flights that passed over each cell of a longitude/latitude grid.
+
+    Cells are dx by dy degrees and aligned to multiples of dx and dy, so the
+    grid grows in any direction without resampling as flights are added.
+    counts[row, col] is the cell whose south-west corner is at
+    ((col_min + col) * dx, (row_min + row) * dy): rows run south to north.
+    sources lists the flights already counted, so adding one again is a no-op.
+    """
+
+    VERSION = 1
+
+    def __init__(self, dx: float, dy: float, cell_m: float = 0.0, counts: Optional[np.ndarray] = None,
+                 row_min: int = 0, col_min: int = 0, sources: Sequence[str] = ()):
+        import numpy as np
+
+        self.dx = dx
+        self.dy = dy
+        self.cell_m = cell_m
+        self.counts = np.zeros((0, 0), dtype=np.uint32) if counts is None else counts
+        self.row_min = row_min
+        self.col_min = col_min
+        self.sources: List[str] = list(sources)
+
+    @classmethod
+    def for_cell_size(cls, cell_m: float, latitude: float) -> CoverageGrid:
+        """An empty grid of about cell_m x cell_m cells around latitude"""
+        dy = cell_m / (math.pi * EARTH_RADIUS_M / 180.0)
+        dx = dy / max(math.cos(math.radians(latitude)), 1e-6)
+        return cls(dx, dy, cell_m)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(west, south, east, north) in degrees"""
+        rows, cols = self.counts.shape
+        west, south = self.col_min * self.dx, self.row_min * self.dy
+        return west, south, west + cols * self.dx, south + rows * self.dy
+
+    def add(self, source: str, latitudes: np.ndarray, longitudes: np.ndarray) -> int:
+        """
+        Count one flight in every cell it passes over and return the number
+        of those cells. Frames are deduplicated per flight: hovering over a
+        cell for minutes still counts once.
+        """
+        import numpy as np
+
+        if source in self.sources:
+            logger.info(f"Already counted: {source}")
+            return 0
+        known = np.isfinite(latitudes) & np.isfinite(longitudes)
+        rows = np.floor(latitudes[known] / self.dy).astype(np.int64)
+        cols = np.floor(longitudes[known] / self.dx).astype(np.int64)
+        self.sources.append(source)
+        if not len(rows):
+            return 0
+
+        row_lo, col_lo = int(rows.min()), int(cols.min())
+        width = int(cols.max()) - col_lo + 1
+        # One key per cell; np.unique drops the repeated frames of a cell
+        cells = np.unique((rows - row_lo) * width + (cols - col_lo))
+        self._extend(row_lo, int(rows.max()), col_lo, int(cols.max()))
+        self.counts[cells // width + (row_lo - self.row_min), cells % width + (col_lo - self.col_min)] += 1
+        return len(cells)
+
+    def _extend(self, row_lo: int, row_hi: int, col_lo: int, col_hi: int) -> None:
+        """Grow counts to cover rows row_lo..row_hi and columns col_lo..col_hi"""
+        import numpy as np
+
+        rows, cols = self.counts.shape
+        if rows:
+            row_lo, col_lo = min(row_lo, self.row_min), min(col_lo, self.col_min)
+            row_hi, col_hi = max(row_hi, self.row_min + rows - 1), max(col_hi, self.col_min + cols - 1)
+        shape = (row_hi - row_lo + 1, col_hi - col_lo + 1)
+        if shape == (rows, cols):
+            return
+        if shape[0] * shape[1] > MAX_CELLS:
+            raise ValueError(f"Coverage grid of {shape[1]} x {shape[0]} cells is too large; use larger cells")
+        counts = np.zeros(shape, dtype=np.uint32)
+        if rows:
+            top, left = self.row_min - row_lo, self.col_min - col_lo
+            counts[top:top + rows, left:left + cols] = self.counts
+        self.counts, self.row_min, self.col_min = counts, row_lo, col_lo
+
+    def save(self, path: Path) -> None:
+        """Write the grid and its flight list atomically (NumPy .npz)"""
+        import numpy as np
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.int64(self.VERSION),
+                cell=np.array([self.dx, self.dy, self.cell_m]),
+                origin=np.array([self.row_min, self.col_min], dtype=np.int64),
+                counts=self.counts,
+                sources=np.array(self.sources, dtype=str),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> CoverageGrid:
+        """Read a saved grid (ValueError if it is not one)"""
+        import numpy as np
+        from zipfile import BadZipFile
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != cls.VERSION:
+                    raise ValueError(f"Not a coverage grid (or another version): {path}")
+                dx, dy, cell_m = data["cell"].tolist()
+                row_min, col_min = data["origin"].tolist()
+                return cls(dx, dy, cell_m, data["counts"], row_min, col_min, data["sources"].tolist())
+        except (KeyError, BadZipFile) as err:
+            raise ValueError(f"Not a coverage grid: {path}") from err
+
+    def write(self, path: Path) -> None:
+        """
+        Write the counts as a north-up raster with a WGS 84 .prj: an ESRI
+        ASCII grid (.asc) or a NumPy array (.npy) with a .wld world file
+        """
+        import numpy as np
+
+        if not self.counts.size:
+            raise ValueError("The coverage grid is empty")
+        suffix = path.suffix.lower()
+        if suffix not in RASTER_SUFFIXES:
+            raise ValueError(f"Unknown raster format: {path.suffix} (use {' or '.join(RASTER_SUFFIXES)})")
+        north_up = self.counts[::-1]
+        west, south, _, north = self.bounds
+
+        if suffix == ".npy":
+            with open_output(path, binary=True) as f:
+                np.save(f, north_up)
+            # Pixel sizes, rotations, then the centre of the upper-left pixel
+            world = (self.dx, 0.0, 0.0, -self.dy, west + self.dx / 2, north - self.dy / 2)
+            with open_output(path.with_suffix(".wld")) as f:
+                f.write("".join(f"{value:.12f}\n" for value in world))
+        else:
+            rows, cols = self.counts.shape
+            header = [f"ncols {cols}", f"nrows {rows}", f"xllcorner {west:.12f}", f"yllcorner {south:.12f}"]
+            # Cells are only square at the equator; dx/dy is the GDAL extension for the rest
+            header += [f"dx {self.dx:.12f}", f"dy {self.dy:.12f}"]
+            with open_output(path) as f:
+                f.write("\n".join(header) + "\n")
+                np.savetxt(f, north_up, fmt="%d")
+        with open_output(path.with_suffix(".prj")) as f:
+            f.write(WGS84_WKT)
+        logger.info(f"Coverage raster saved: {path}")
+
+
+class CoverageService:
+    """
+    Accumulate the positions of many flights into a CoverageGrid.
+
+    Sources are parsed on jobs worker processes and only their positions
+    come back; a saved grid is updated with the flights it does not have
+    yet, so an archive is never re-read as it grows.
+    """
+
+    def __init__(self, cell_m: float = 10.0, jobs: int = 1):
+        self.cell_m = cell_m
+        self.jobs = jobs
+        # Sources that could not be read in the last update()
+        self.failed: List[Path] = []
+
+    @staticmethod
+    def source_key(source: Path) -> str:
+        """
+        Name of the flight of a source in CoverageGrid.sources: the recording
+        (DJI_20251222150801_0005) for DJI names, so its lens files and copies
+        count once, else the resolved path. Keys map to themselves.
+        """
+        match = _RECORDING_RE.fullmatch(source_name(Path(source)))
+        return match.group(1) if match else str(Path(source).resolve())
+
+    def update(self, sources: Sequence[Path], grid: Optional[CoverageGrid] = None) -> Optional[CoverageGrid]:
+        """
+        Add the flights of sources that grid has not counted yet. A new grid
+        is started when grid is None (and stays None without any GPS frame).
+        """
+        self.failed = []
+        # Grids saved before recordings were keyed list paths: map them the same way
+        counted = {self.source_key(Path(key)) for key in grid.sources} if grid is not None else set()
+        new = []
+        for source in sources:
+            key = self.source_key(source)
+            if key not in counted:
+                # Only the first lens file of a recording is read
+                counted.add(key)
+                new.append(source)
+        if len(new) < len(sources):
+            logger.info(f"Skipping {len(sources) - len(new)} files of flights already counted")
+
+        if self.jobs > 1 and len(new) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(new))) as executor:
+                results = executor.map(_read_positions, new)
+                grid = self._add_all(grid, new, results)
+        else:
+            grid = self._add_all(grid, new, map(_read_positions, new))
+        return grid
+
+    def _add_all(self, grid: Optional[CoverageGrid], sources: Sequence[Path], results) -> Optional[CoverageGrid]:
+        # Flights without GPS read before there is a grid: listed in it once it exists
+        empty: List[str] = []
+        for source, (ok, result) in zip(sources, results):
+            if not ok:
+                logger.error(f"Failed {source}: {result}")
+                self.failed.append(source)
+                continue
+            latitudes, longitudes = result
+            if not len(latitudes):
+                logger.warning(f"No GPS frames in {source}")
+            if grid is None and len(latitudes):
+                # Cells are cell_m wide at the latitude of the first flight
+                grid = CoverageGrid.for_cell_size(self.cell_m, float(latitudes[0]))
+                grid.sources.extend(empty)
+            if grid is None:
+                empty.append(self.source_key(source))
+                continue
+            cells = grid.add(self.source_key(source), latitudes, longitudes)
+            logger.info(f"{source}: {cells} cells")
+        return grid
+
+    @staticmethod
+    def summary(grid: CoverageGrid) -> str:
+        flown = int((grid.counts > 0).sum())
+        most = int(grid.counts.max()) if grid.counts.size else 0
+        area_km2 = flown * grid.cell_m ** 2 / 1e6
+        return f"{len(grid.sources)} flights, {flown} cells flown ({area_km2:.2f} km2), up to {most} flights per cell"
@@ -1,26 +1,56 @@
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, TextIO
+import csv
 import logging
 
-import pandas as pd
+from app.services.exporters import extra_rows, open_output
 
-from app.models.video_frame_metadata import VideoFrameMetadata
+if TYPE_CHECKING:
+    # pydantic is only imported when frames are actually built or exported
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.output_template import RowFormatter
 
 logger = logging.getLogger(__name__)
 
 
 class CsvExportService:
-    def export(self, frames: Sequence[VideoFrameMetadata], output_path: Path) -> None:
+    def export(self, frames: Sequence[VideoFrameMetadata], output_path: Path,
+               extra_columns: Optional[Mapping[str, Sequence]] = None,
+               formatter: Optional[RowFormatter] = None) -> None:
         logger.info(f"Starting CSV export: {len(frames)} frames")
         
         if not frames:
             logger.error("No frames to export")
             raise ValueError("No frames to export")
 
-        logger.info("Converting frames to DataFrame")
-        # Use by_alias=True to get correct column names (UPPERCASE)
-        df = pd.DataFrame([f.model_dump(by_alias=True) for f in frames])
-
+        # Rows are written straight to the file (no intermediate DataFrame copy)
         logger.info(f"Saving CSV to file: {output_path}")
-        df.to_csv(output_path, index=False)
+        with open_output(output_path) as f:
+            self.write(frames, f, extra_columns=extra_columns, formatter=formatter)
         logger.info(f"CSV file saved successfully: {output_path}")
+
+    def write(self, frames: Iterable[VideoFrameMetadata], stream: TextIO, header: bool = True,
+              extra_columns: Optional[Mapping[str, Sequence]] = None,
+              formatter: Optional[RowFormatter] = None) -> None:
+        """Write frames to an open text stream (e.g. stdout), header first if requested
+
+        extra_columns adds optional columns after the standard ones, one value per frame.
+        formatter (a compiled OutputTemplate) replaces the default layout.
+        """
+        from app.models.video_frame_metadata import VideoFrameMetadata
+
+        writer = csv.writer(stream, lineterminator="\n")
+        if formatter is not None:
+            if header:
+                writer.writerow(formatter.header)
+            writer.writerows(formatter.rows(frames, extra_columns))
+            return
+
+        if header:
+            # Alias names give the correct (UPPERCASE) column names
+            names = [field.alias for field in VideoFrameMetadata.model_fields.values()]
+            writer.writerow(names + list(extra_columns or ()))
+        for frame, extras in zip(frames, extra_rows(extra_columns)):
+            writer.writerow([*frame.model_dump(by_alias=True).values(), *extras])
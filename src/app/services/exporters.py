@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from importlib import import_module
+from itertools import repeat
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+import os
+
+if TYPE_CHECKING:
+    from app.models.video_frame_metadata import VideoFrameMetadata
+
+# format name -> (module, class, file suffix)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "csv": ("app.services.csv_export_service", "CsvExportService", ".csv"),
+    "jsonl": ("app.services.jsonl_export_service", "JsonlExportService", ".jsonl"),
+    "geojsonl": ("app.services.geojson_export_service", "GeoJsonExportService", ".geojsonl"),
+    "xlsx": ("app.services.xlsx_export_service", "XlsxExportService", ".xlsx"),
+}
+
+# Whole-file formats: written to binary streams, in one write() call with all frames
+BINARY_FORMATS = frozenset({"xlsx"})
+
+
+def get_exporter(fmt: str):
+    """Create the export service for an output format"""
+    try:
+        module_name, class_name, _ = EXPORT_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {fmt}") from None
+    return getattr(import_module(module_name), class_name)()
+
+
+def format_suffix(fmt: str) -> str:
+    """File suffix used for an output format"""
+    return EXPORT_FORMATS[fmt][2]
+
+
+def is_binary_format(fmt: str) -> bool:
+    return fmt in BINARY_FORMATS
+
+
+@contextmanager
+def open_output(output_path: Path, binary: bool = False, newline: Optional[str] = None) -> Iterator[IO]:
+    """
+    Open an output file for writing through a temporary file that replaces it
+    on success. An existing output is never truncated in place, so outputs
+    hard-linked to it (duplicates) keep their contents, and a failed write
+    leaves the old file. Text files are UTF-8; newline is passed to open().
+    """
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        if binary:
+            f = tmp_path.open("wb")
+        else:
+            f = tmp_path.open("w", encoding="utf-8", newline=newline)
+        with f:
+            yield f
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def extra_rows(extra_columns: Optional[Mapping[str, Sequence]]) -> Iterator[tuple]:
+    """
+    Row-wise values of optional extra columns (e.g. kinematics), aligned with the frames.
+
+    Columns may be lists or NumPy arrays; NaN becomes None so exporters write an empty cell.
+    """
+    if not extra_columns:
+        return repeat(())
+    columns = [v.tolist() if hasattr(v, "tolist") else list(v) for v in extra_columns.values()]
+    return (tuple(None if x != x else x for x in row) for row in zip(*columns))
+
+
+def records(frames: Iterable["VideoFrameMetadata"],
+            extra_columns: Optional[Mapping[str, Sequence]] = None) -> Iterator[Dict[str, Any]]:
+    """Frames as dicts keyed by column name: the CSV aliases followed by the extra columns"""
+    names = list(extra_columns or ())
+    for frame, extras in zip(frames, extra_rows(extra_columns)):
+        record = frame.model_dump(by_alias=True)
+        record.update(zip(names, extras))
+        yield record
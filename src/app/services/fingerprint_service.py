@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Sequence, Tuple
+import codecs
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from app.services.parser_engine import LINE_RE, BlockParser
+from app.services.srt_dialect import DETECT_LINES
+from app.services.srt_io import detect_encoding, is_packed_source, open_byte_lines, source_name
+
+if TYPE_CHECKING:
+    from app.services.pipeline_service import ConversionOptions
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed at the start and end of a file, and at SAMPLES evenly spaced offsets in between
+EDGE_BYTES = 64 << 10
+SAMPLE_BYTES = 4 << 10
+SAMPLES = 8
+
+# GPS records hashed from each end of a file for the lens-independent track hash
+TRACK_RECORDS = 16
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Cheap identity of an SRT's content, read without parsing the whole file.
+
+    content hashes the size and sampled bytes of the file: equal for copies.
+    track hashes the first and last GPS records, which the S/T/W/Z lens files
+    of one recording share although their camera lines differ.
+    """
+
+    size: int
+    content: str
+    track: str
+    first_ms: Optional[int] = None
+    last_ms: Optional[int] = None
+    first_stamp: str = ""
+    last_stamp: str = ""
+
+    @property
+    def content_key(self) -> str:
+        return f"{self.size}:{self.content}"
+
+    @property
+    def track_key(self) -> str:
+        """Empty when the file has no GPS record"""
+        if self.first_ms is None:
+            return ""
+        return f"{self.first_ms}-{self.last_ms}:{self.first_stamp}-{self.last_stamp}:{self.track}"
+
+
+def output_profile(fmt: str, options: Optional[ConversionOptions] = None) -> str:
+    """
+    Identity of the output settings: an output is only reused for the same
+    ones, including the current contents of the annotation and template files
+    """
+    from app.services.pipeline_service import ConversionOptions
+
+    options = options or ConversionOptions()
+    digest = hashlib.blake2b(repr(options).encode("utf-8"), digest_size=8)
+    for name in (options.annotations, options.template):
+        # Built-in template names are not files
+        if name is not None and Path(name).is_file():
+            digest.update(Path(name).read_bytes())
+    return f"{fmt}:{digest.hexdigest()}"
+
+
+def link_output(existing: Path, output_path: Path) -> None:
+    """
+    Make output_path the same file as existing (a hard link, or a copy across
+    file systems). Outputs are written through open_output, which replaces
+    a file instead of truncating it, so relinked outputs never share a rewrite.
+    """
+    if output_path.exists() and os.path.samefile(existing, output_path):
+        return
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    try:
+        os.link(existing, tmp_path)
+    except OSError:
+        shutil.copyfile(existing, tmp_path)
+    os.replace(tmp_path, output_path)
+
+
+class FingerprintIndex:
+    """Outputs written so far by source fingerprint; a small JSON file when path is given"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._entries: List[dict] = []
+        if path is not None and path.exists():
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as err:
+                logger.warning(f"Ignoring unreadable fingerprint index {path}: {err}")
+
+    def find(self, fingerprint: Fingerprint, name: str, profile: str, lenses: bool = False) -> Optional[dict]:
+        """
+        The latest entry whose output still exists for the same content and
+        source name (so VIDEO NAME matches) or, with lenses, the same track
+        """
+        for entry in reversed(self._entries):
+            if entry["profile"] != profile:
+                continue
+            same_content = entry["content"] == fingerprint.content_key and entry["name"] == name
+            same_track = lenses and fingerprint.track_key and entry["track"] == fingerprint.track_key
+            if (same_content or same_track) and Path(entry["output"]).exists():
+                return entry
+        return None
+
+    def add(self, fingerprint: Fingerprint, source: Path, output_path: Path, profile: str) -> None:
+        entry = {
+            "source": str(source),
+            "name": source_name(source),
+            "output": str(output_path),
+            "profile": profile,
+            "content": fingerprint.content_key,
+            "track": fingerprint.track_key,
+        }
+        self._entries = [e for e in self._entries if (e["source"], e["profile"]) != (entry["source"], profile)]
+        self._entries.append(entry)
+        self.save()
+
+    def save(self) -> None:
+        """Write the index atomically so a crash never leaves a truncated file"""
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FingerprintService:
+    """
+    Skip sources whose output already exists, before anything is parsed.
+
+    Plain files are fingerprinted from EDGE_BYTES at each end and SAMPLES
+    short samples in between; compressed sources, archive members and
+    UTF-16 files are streamed once without parsing. Duplicates are linked
+    to the output written for the first copy instead of being converted.
+    """
+
+    def __init__(self, index: Optional[FingerprintIndex] = None, lenses: bool = False):
+        self.index = index if index is not None else FingerprintIndex()
+        # Also treat the lens files of one recording (identical GPS) as duplicates
+        self.lenses = lenses
+        # Fingerprints of the last check() of each source, for key() and record()
+        self._fingerprints: Dict[Path, Fingerprint] = {}
+
+    def fingerprint(self, source: Path) -> Fingerprint:
+        """Fingerprint of a source (OSError if it cannot be read)"""
+        plain = not is_packed_source(source)
+        if plain:
+            with source.open("rb") as f:
+                plain = detect_encoding(f.read(4)) is None
+        size, content, head, tail = self._sample(source) if plain else self._stream(source)
+        return self._with_track(size, content, head, tail)
+
+    @staticmethod
+    def _sample(source: Path) -> Tuple[int, str, List[bytes], List[bytes]]:
+        """(size, content hash, head lines, tail lines) of a plain file from a few reads"""
+        size = source.stat().st_size
+        digest = hashlib.blake2b(str(size).encode("ascii"), digest_size=16)
+        with source.open("rb") as f:
+            head = f.read(EDGE_BYTES)
+            digest.update(head)
+            for i in range(1, SAMPLES + 1):
+                f.seek(size * i // (SAMPLES + 1))
+                digest.update(f.read(SAMPLE_BYTES))
+            tail_start = max(size - EDGE_BYTES, 0)
+            f.seek(tail_start)
+            tail = f.read()
+            digest.update(tail)
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):]
+        head_lines, tail_lines = LINE_RE.findall(head), LINE_RE.findall(tail)
+        if tail_start:
+            # Both cut through a line
+            head_lines, tail_lines = head_lines[:-1], tail_lines[1:]
+        return size, digest.hexdigest(), head_lines, tail_lines
+
+    @staticmethod
+    def _stream(source: Path) -> Tuple[int, str, List[bytes], List[bytes]]:
+        """_sample for sources without random access: one pass over the decoded lines"""
+        digest = hashlib.blake2b(digest_size=16)
+        size = tail_size = 0
+        head: List[bytes] = []
+        tail: Deque[bytes] = deque()
+        lines = open_byte_lines(source)
+        try:
+            for line in lines:
+                digest.update(line)
+                size += len(line)
+                if size <= EDGE_BYTES:
+                    head.append(line)
+                tail.append(line)
+                tail_size += len(line)
+                while tail_size > EDGE_BYTES and len(tail) > 1:
+                    tail_size -= len(tail.popleft())
+        finally:
+            lines.close()
+        digest.update(str(size).encode("ascii"))
+        return size, digest.hexdigest(), head, list(tail)
+
+    @staticmethod
+    def _with_track(size: int, content: str, head: List[bytes], tail: List[bytes]) -> Fingerprint:
+        parser = BlockParser()
+        parser.detect_layout(head[:DETECT_LINES])
+        # Head windows must be whole: a block cut at the end of the head would parse differently
+        first = _records(parser, head, whole=size > EDGE_BYTES)[:TRACK_RECORDS]
+        last = _records(parser, tail, whole=False)[-TRACK_RECORDS:]
+        track = hashlib.blake2b(repr((first, last)).encode("utf-8"), digest_size=16).hexdigest()
+        if not first or not last:
+            return Fingerprint(size, content, track)
+        return Fingerprint(size, content, track, first[0][0], last[-1][0], first[0][1], last[-1][1])
+
+    def key(self, source: Path) -> str:
+        """Sources with the same key have the same output (after check() of source)"""
+        fingerprint = self._fingerprints[source]
+        if self.lenses and fingerprint.track_key:
+            return fingerprint.track_key
+        return f"{fingerprint.content_key}:{source_name(source)}"
+
+    def check(self, source: Path, profile: str) -> Tuple[bool, Optional[Path]]:
+        """(whether source could be fingerprinted, output already written for its content or None)"""
+        try:
+            fingerprint = self.fingerprint(source)
+        except OSError as err:
+            logger.warning(f"Cannot fingerprint {source}: {err}")
+            self._fingerprints.pop(source, None)
+            return False, None
+        self._fingerprints[source] = fingerprint
+        entry = self.index.find(fingerprint, source_name(source), profile, self.lenses)
+        return True, None if entry is None else Path(entry["output"])
+
+    def plan(self, sources: Sequence[Path], profile: str, reuse: bool = True
+             ) -> Tuple[List[Path], Dict[Path, Path], Dict[Path, Path]]:
+        """
+        Split sources into (to convert, copies of a source converted in this
+        run -> that source, sources already in the index -> their output);
+        reuse=False leaves the index out (outputs that are not files)
+        """
+        convert: List[Path] = []
+        copies: Dict[Path, Path] = {}
+        reused: Dict[Path, Path] = {}
+        first: Dict[str, Path] = {}
+        for source in sources:
+            ok, existing = self.check(source, profile)
+            if not ok:
+                convert.append(source)
+            elif reuse and existing is not None:
+                reused[source] = existing
+            elif self.key(source) in first:
+                copies[source] = first[self.key(source)]
+            else:
+                first[self.key(source)] = source
+                convert.append(source)
+        if copies or reused:
+            logger.info(f"{len(copies) + len(reused)} of {len(sources)} sources are duplicates")
+        return convert, copies, reused
+
+    def record(self, source: Path, output_path: Path, profile: str) -> None:
+        """Remember the output written for a source"""
+        fingerprint = self._fingerprints.get(source)
+        if fingerprint is not None:
+            self.index.add(fingerprint, source, output_path, profile)
+
+    def link(self, source: Path, existing: Path, output_path: Path, profile: str) -> None:
+        """Give a duplicate source existing's output instead of converting it"""
+        link_output(existing, output_path)
+        self.record(source, output_path, profile)
+        logger.info(f"Duplicate {source} linked to {existing}")
+
+
+def _records(parser: BlockParser, lines: List[bytes], whole: bool) -> List[tuple]:
+    """(time_ms, date, lat, lon, alt) of the GPS blocks starting in lines"""
+    size = parser.BLOCK_LINES
+    records = []
+    for i in range(len(lines) - (size - 1 if whole else 0)):
+        record = parser.parse(lines[i:i + size], fields=False)
+        if record is not None:
+            records.append(record[:5])
+    return records
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Optional
+import logging
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+# Diagonal of a 36 x 24 mm frame: DJI writes focal_len as a 35 mm equivalent
+FULL_FRAME_DIAGONAL_MM = 43.267
+
+# Image corners in normalised image coordinates (right, down), clockwise from top left
+CORNERS = {
+    "TOP LEFT": (-1.0, -1.0),
+    "TOP RIGHT": (1.0, -1.0),
+    "BOTTOM RIGHT": (1.0, 1.0),
+    "BOTTOM LEFT": (-1.0, 1.0),
+}
+
+TARGET_COLUMNS = ("TARGET LATITUDE", "TARGET LONGITUDE", "TARGET DISTANCE")
+CORNER_COLUMNS = tuple(f"{corner} {axis}" for corner in CORNERS for axis in ("LATITUDE", "LONGITUDE"))
+
+
+class FootprintService:
+    """
+    Project the camera boresight and image corners of every frame onto the ground.
+
+    Uses the gimbal attitude (gb_yaw / gb_pitch / gb_roll, yaw from north),
+    the 35 mm equivalent focal length times dzoom, and a flat ground: either
+    the take-off level (rel_alt is the height) or a constant elevation above
+    sea level (abs_alt - ground_alt). All frames are projected at once as
+    (frames x rays) arrays; rays that do not hit the ground give NaN.
+    """
+
+    COLUMNS = TARGET_COLUMNS + CORNER_COLUMNS
+
+    # Image aspect ratio (width / height) per lens suffix of the file name
+    LENS_ASPECT = {"T": 640 / 512}
+    DEFAULT_ASPECT = 16 / 9
+
+    # Rays reaching the ground further away than this (near the horizon) are dropped
+    MAX_RANGE_M = 10000.0
+
+    def __init__(self, ground_alt: Optional[float] = None, aspect: Optional[float] = None):
+        self.ground_alt = ground_alt
+        self.aspect = aspect
+
+    def _aspect_for(self, video_name: str) -> float:
+        if self.aspect is not None:
+            return self.aspect
+        lens = video_name.rsplit("_", 1)[-1].upper() if "_" in video_name else ""
+        return self.LENS_ASPECT.get(lens, self.DEFAULT_ASPECT)
+
+    @staticmethod
+    def rotation_matrices(yaw, pitch, roll) -> np.ndarray:
+        """Camera → north/east/down rotation matrices (n x 3 x 3) from angles in degrees (Z-Y-X order)"""
+        import numpy as np
+
+        psi, theta, phi = (np.radians(np.asarray(a, dtype=np.float64)) for a in (yaw, pitch, roll))
+        cps, sps = np.cos(psi), np.sin(psi)
+        cth, sth = np.cos(theta), np.sin(theta)
+        cph, sph = np.cos(phi), np.sin(phi)
+        return np.stack([
+            np.stack([cth * cps, sph * sth * cps - cph * sps, cph * sth * cps + sph * sps], axis=-1),
+            np.stack([cth * sps, sph * sth * sps + cph * cps, cph * sth * sps - sph * cps], axis=-1),
+            np.stack([-sth, sph * cth, cph * cth], axis=-1),
+        ], axis=-2)
+
+    def compute(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Return the target point and corner columns, aligned with the input frames"""
+        import numpy as np
+
+        count = len(columns["latitude"])
+        names = columns["video_name"]
+        aspect = np.array([self._aspect_for(n) for n in names.tolist()]) if count else np.empty(0)
+
+        # Half fields of view from the equivalent focal length (dzoom multiplies it)
+        focal = columns["focal_len"] * np.nan_to_num(columns["dzoom"], nan=1.0)
+        half_width = FULL_FRAME_DIAGONAL_MM * aspect / np.hypot(aspect, 1.0) / 2
+        half_height = FULL_FRAME_DIAGONAL_MM / np.hypot(aspect, 1.0) / 2
+        tan_x = half_width / focal
+        tan_y = half_height / focal
+
+        # Rays in camera axes (forward, right, down): boresight first, then the corners
+        offsets = np.array([(0.0, 0.0)] + list(CORNERS.values()))
+        rays = np.empty((count, len(offsets), 3))
+        rays[:, :, 0] = 1.0
+        rays[:, :, 1] = offsets[:, 0] * tan_x[:, None]
+        rays[:, :, 2] = offsets[:, 1] * tan_y[:, None]
+
+        rotation = self.rotation_matrices(columns["gb_yaw"], columns["gb_pitch"], columns["gb_roll"])
+        ned = np.einsum("nij,nrj->nri", rotation, rays)
+
+        if self.ground_alt is None:
+            height = columns["rel_alt"]
+        else:
+            height = columns["abs_alt"] - self.ground_alt
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = height[:, None] / ned[:, :, 2]
+            north = scale * ned[:, :, 0]
+            east = scale * ned[:, :, 1]
+            distance = scale * np.linalg.norm(ned, axis=-1)
+        missed = ~(ned[:, :, 2] > 0) | ~(height[:, None] > 0) | (distance > self.MAX_RANGE_M)
+        north[missed] = np.nan
+        east[missed] = np.nan
+        distance[missed] = np.nan
+
+        # Local flat-earth offsets are accurate to centimetres over a few kilometres
+        latitude = columns["latitude"][:, None]
+        lat = latitude + np.degrees(north / EARTH_RADIUS_M)
+        lon = columns["longitude"][:, None] + np.degrees(east / (EARTH_RADIUS_M * np.cos(np.radians(latitude))))
+
+        footprint = {
+            "TARGET LATITUDE": np.round(lat[:, 0], 7),
+            "TARGET LONGITUDE": np.round(lon[:, 0], 7),
+            "TARGET DISTANCE": np.round(distance[:, 0], 2),
+        }
+        for i, corner in enumerate(CORNERS, start=1):
+            footprint[f"{corner} LATITUDE"] = np.round(lat[:, i], 7)
+            footprint[f"{corner} LONGITUDE"] = np.round(lon[:, i], 7)
+
+        hits = int(np.count_nonzero(~missed[:, 0]))
+        logger.info(f"Projected {count} frames ({hits} with a ground target)")
+        return footprint
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Sequence, Tuple, Union
+import json
+
+# (min_lon, min_lat, max_lon, max_lat), the GeoJSON bbox order
+BBox = Tuple[float, float, float, float]
+# Ring of (lon, lat) vertices; closing the ring is optional
+Polygon = Tuple[Tuple[float, float], ...]
+
+
+def _srt_datetime(value: Union[str, datetime]) -> bytes:
+    """A wall-clock bound in the SRT date line format, so bounds compare as plain byte strings"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3].encode("ascii")
+
+
+@dataclass(frozen=True)
+class FrameFilter:
+    """
+    Frame selection pushed down into the SRT parser.
+
+    VideoMetadataService checks each condition as soon as the numbers it
+    needs are read: the time window straight after the timecode, position
+    and altitude before the date is decoded, and no model is built for a
+    dropped frame. Once the frames are past the end of the time window the
+    scan stops. Picklable, so it can be sent to worker processes.
+    """
+
+    start_ms: Optional[int] = None  # SRT (video) time window, inclusive
+    end_ms: Optional[int] = None
+    start_time: Optional[bytes] = None  # wall-clock window from the SRT date line (see between())
+    end_time: Optional[bytes] = None
+    bbox: Optional[BBox] = None
+    polygon: Optional[Polygon] = None
+    min_alt: Optional[float] = None  # ALTITUDE (abs_alt) band, or rel_alt with relative_alt
+    max_alt: Optional[float] = None
+    relative_alt: bool = False
+
+    @classmethod
+    def between(cls, start: Union[str, datetime, None] = None, end: Union[str, datetime, None] = None,
+                **kwargs: Any) -> FrameFilter:
+        """A filter with a wall-clock window given as datetimes or ISO strings ("2025-12-22 15:08:00")"""
+        return cls(
+            start_time=None if start is None else _srt_datetime(start),
+            end_time=None if end is None else _srt_datetime(end),
+            **kwargs,
+        )
+
+    @staticmethod
+    def load_polygon(path: Path) -> Polygon:
+        """
+        Outer ring of the first polygon in a GeoJSON file (geometry, Feature or
+        FeatureCollection), or a JSON list of [lon, lat] pairs.
+        """
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            if data.get("type") == "FeatureCollection":
+                geometries = [feature.get("geometry") or {} for feature in data.get("features", [])]
+            elif data.get("type") == "Feature":
+                geometries = [data.get("geometry") or {}]
+            else:
+                geometries = [data]
+            rings = [g["coordinates"][0] for g in geometries if g.get("type") == "Polygon"]
+            rings += [g["coordinates"][0][0] for g in geometries if g.get("type") == "MultiPolygon"]
+            if not rings:
+                raise ValueError(f"No polygon in {path}")
+            data = rings[0]
+        polygon = tuple((float(point[0]), float(point[1])) for point in data)
+        if len(polygon) < 3:
+            raise ValueError(f"A polygon needs at least 3 points: {path}")
+        return polygon
+
+    def __post_init__(self):
+        for low, high in ((self.start_ms, self.end_ms), (self.start_time, self.end_time), (self.min_alt, self.max_alt)):
+            if low is not None and high is not None and high < low:
+                raise ValueError(f"Empty filter range: {low!r} > {high!r}")
+        if self.bbox is not None and (self.bbox[0] > self.bbox[2] or self.bbox[1] > self.bbox[3]):
+            raise ValueError(f"bbox must be (min_lon, min_lat, max_lon, max_lat): {self.bbox}")
+        if self.polygon is not None:
+            # Bounding box of the polygon, a cheap test before the ray casting
+            lons = [p[0] for p in self.polygon]
+            lats = [p[1] for p in self.polygon]
+            object.__setattr__(self, "_polygon_bbox", (min(lons), min(lats), max(lons), max(lats)))
+
+    @property
+    def has_position(self) -> bool:
+        return self.bbox is not None or self.polygon is not None
+
+    @property
+    def has_altitude(self) -> bool:
+        return self.min_alt is not None or self.max_alt is not None
+
+    @property
+    def has_datetime(self) -> bool:
+        return self.start_time is not None or self.end_time is not None
+
+    def before(self, time_ms: int) -> bool:
+        return self.start_ms is not None and time_ms < self.start_ms
+
+    def past(self, time_ms: int) -> bool:
+        """Whether the frame (and, SRT time being monotonic, every later one) is after the window"""
+        return self.end_ms is not None and time_ms > self.end_ms
+
+    def accepts_position(self, latitude: float, longitude: float) -> bool:
+        bbox = self.bbox
+        if bbox is not None and not (bbox[0] <= longitude <= bbox[2] and bbox[1] <= latitude <= bbox[3]):
+            return False
+        if self.polygon is not None:
+            bounds = self._polygon_bbox
+            if not (bounds[0] <= longitude <= bounds[2] and bounds[1] <= latitude <= bounds[3]):
+                return False
+            return self._in_polygon(longitude, latitude)
+        return True
+
+    def accepts_altitude(self, altitude: Optional[float]) -> bool:
+        if altitude is None:
+            return False
+        if self.min_alt is not None and altitude < self.min_alt:
+            return False
+        return self.max_alt is None or altitude <= self.max_alt
+
+    def datetime_state(self, date_str: Union[bytes, str]) -> int:
+        """-1 before the wall-clock window, 0 inside it, 1 past it (frames without a date are dropped)"""
+        if not date_str:
+            return -1
+        if isinstance(date_str, str):
+            date_str = date_str.encode("ascii", "replace")
+        stamp = date_str[:23]
+        if self.end_time is not None and stamp > self.end_time:
+            return 1
+        if self.start_time is not None and stamp < self.start_time:
+            return -1
+        return 0
+
+    def _in_polygon(self, x: float, y: float) -> bool:
+        """Even-odd ray casting"""
+        inside = False
+        points: Sequence[Tuple[float, float]] = self.polygon
+        x1, y1 = points[-1]
+        for x2, y2 in points:
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+            x1, y1 = x2, y2
+        return inside
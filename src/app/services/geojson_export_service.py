@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, TextIO
+import json
+import logging
+
+from app.services.exporters import extra_rows, open_output
+
+if TYPE_CHECKING:
+    # pydantic is only imported when frames are actually built or exported
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.output_template import RowFormatter
+
+logger = logging.getLogger(__name__)
+
+
+class GeoJsonExportService:
+    """
+    Export frames as newline-delimited GeoJSON features (GeoJSONSeq, one Feature per line).
+
+    A frame is a Point at the drone position, or the camera footprint Polygon
+    when the footprint columns (FootprintService) are among the extra columns.
+    One feature per line keeps the output streamable and concatenable.
+    """
+
+    def export(self, frames: Sequence[VideoFrameMetadata], output_path: Path,
+               extra_columns: Optional[Mapping[str, Sequence]] = None,
+               formatter: Optional[RowFormatter] = None) -> None:
+        logger.info(f"Starting GeoJSON export: {len(frames)} frames")
+
+        if not frames:
+            logger.error("No frames to export")
+            raise ValueError("No frames to export")
+
+        with open_output(output_path) as f:
+            self.write(frames, f, extra_columns=extra_columns, formatter=formatter)
+        logger.info(f"GeoJSON file saved successfully: {output_path}")
+
+    def write(self, frames: Iterable[VideoFrameMetadata], stream: TextIO, header: bool = True,
+              extra_columns: Optional[Mapping[str, Sequence]] = None,
+              formatter: Optional[RowFormatter] = None) -> None:
+        """Write frames to an open text stream (no header); extra_columns become properties
+
+        With a formatter (a compiled OutputTemplate) the properties come from it.
+        """
+        from app.services.footprint_service import CORNER_COLUMNS
+
+        names = list(extra_columns or ())
+        has_footprint = set(CORNER_COLUMNS) <= set(names)
+        format_row = formatter.function(names) if formatter is not None else None
+
+        for frame, extras in zip(frames, extra_rows(extra_columns)):
+            record = frame.model_dump(by_alias=True)
+            record.update(zip(names, extras))
+            geometry = None
+            if has_footprint:
+                corners = [record[name] for name in CORNER_COLUMNS]
+                if None not in corners:
+                    # GeoJSON positions are [longitude, latitude]; the corners run clockwise
+                    # on the ground, RFC 7946 wants closed counterclockwise exterior rings
+                    ring = [[corners[i + 1], corners[i]] for i in range(0, len(corners), 2)][::-1]
+                    geometry = {"type": "Polygon", "coordinates": [ring + ring[:1]]}
+            if geometry is None:
+                position = [frame.longitude, frame.latitude]
+                if frame.altitude is not None:
+                    position.append(frame.altitude)
+                geometry = {"type": "Point", "coordinates": position}
+
+            properties = record if format_row is None else dict(zip(formatter.header, format_row(frame, extras)))
+            feature = {"type": "Feature", "geometry": geometry, "properties": properties}
+            stream.write(json.dumps(feature, ensure_ascii=False))
+            stream.write("\n")
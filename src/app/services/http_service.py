@@ -0,0 +1,430 @@
+"""
+HTTP conversion service
+=======================
+A standard-library HTTP server that converts SRT files for other machines,
+so the desktop app does not have to be installed everywhere.
+
+    POST /convert?format=csv&name=DJI_0001.SRT   body: the SRT; the result streams back
+    POST /jobs?format=jsonl&name=DJI_0001.SRT    body: the SRT; 202 with the job status
+    POST /jobs?path=/data/DJI_0001.SRT           a file on the server (under an allowed root)
+    GET  /jobs                                   status of every job
+    GET  /jobs/<id>                              status of one job
+    GET  /jobs/<id>/result                       the output, once the job is done
+    DELETE /jobs/<id>                            forget a job and delete its files
+
+    curl --data-binary @DJI_0001.SRT "http://host:8000/convert?name=DJI_0001.SRT" > DJI_0001.csv
+
+Conversions run on a process pool. Uploads are spooled to disk in fixed-size
+pieces and results are streamed from disk with chunked transfer encoding, so
+memory use does not grow with file size. Backpressure: uploads larger than
+max_upload get 413, and once max_pending jobs are queued or running, or
+max_uploads uploads are in progress, new requests get 503 with Retry-After.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from app.services.conversion_service import ConversionService
+from app.services.exporters import EXPORT_FORMATS, format_suffix
+from app.services.srt_io import is_srt_source, source_base
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+HEX_DIGITS = b"0123456789abcdefABCDEF"
+RETRY_AFTER_S = 5
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "geojsonl": "application/geo+json-seq",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class QueueFullError(RuntimeError):
+    """Too many jobs are queued or running"""
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    fmt: str
+    source: Path
+    output: Path
+    created: float = field(default_factory=time.time)
+    future: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        if self.future is None or self.future.cancelled():
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def to_dict(self) -> dict:
+        status = self.status
+        info = {"id": self.id, "name": self.name, "format": self.fmt, "status": status, "created": self.created}
+        if status == "done":
+            info["frames"] = self.future.result()
+            info["result"] = f"/jobs/{self.id}/result"
+        elif status == "failed":
+            err = self.future.exception()
+            info["error"] = f"{type(err).__name__}: {err}"
+        return info
+
+
+class JobQueue:
+    """Conversion jobs on a process pool, with their files in a spool directory"""
+
+    def __init__(self, jobs: int = 1, spool_dir: Optional[Path] = None, max_pending: int = 16,
+                 max_finished: int = 100):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._own_spool = spool_dir is None
+        self.spool_dir = Path(tempfile.mkdtemp(prefix="dji_srt_jobs_")) if spool_dir is None else spool_dir
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ProcessPoolExecutor(max_workers=max(1, jobs))
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.spool_dir / job_id
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:12]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def submit(self, source: Path, fmt: str, name: Optional[str] = None, job_id: Optional[str] = None) -> Job:
+        """Queue a conversion of source (QueueFullError when max_pending jobs are waiting)"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported output format: {fmt}")
+        job_id = job_id or self.new_id()
+        output = self.job_dir(job_id) / (source_base(source).stem + format_suffix(fmt))
+        job = Job(job_id, name or source.name, fmt, source, output)
+        with self._lock:
+            if sum(1 for j in self._jobs.values() if not j.future.done()) >= self.max_pending:
+                raise QueueFullError(f"{self.max_pending} jobs are already waiting")
+            output.parent.mkdir(parents=True, exist_ok=True)
+            job.future = self._executor.submit(ConversionService().convert, source, output, fmt)
+            self._jobs[job_id] = job
+        job.future.add_done_callback(lambda _: self._finished(job))
+        logger.info(f"Queued job {job_id}: {job.name} ({fmt})")
+        return job
+
+    def _finished(self, job: Job) -> None:
+        logger.info(f"Job {job.id} {job.status}")
+        # Keep the last max_finished jobs; older results are deleted
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.future.done()]
+            expired = finished[:max(0, len(finished) - self.max_finished)]
+            for old in expired:
+                del self._jobs[old.id]
+        for old in expired:
+            shutil.rmtree(self.job_dir(old.id), ignore_errors=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def forget(self, job_id: str) -> Optional[Job]:
+        """Drop a job from the listing, keeping its files"""
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def remove(self, job_id: str) -> bool:
+        """Forget a job (cancelled if it has not started) and delete its files"""
+        job = self.forget(job_id)
+        if job is None:
+            return False
+        job.future.cancel()
+        if job.future.done():
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        else:
+            job.future.add_done_callback(lambda _: shutil.rmtree(self.job_dir(job_id), ignore_errors=True))
+        return True
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        if self._own_spool:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server: "ConversionServer"
+    protocol_version = "HTTP/1.1"  # needed for chunked responses
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info(f"{self.address_string()} {format % args}")
+
+    # -- responses ---------------------------------------------------------
+
+    def _send_json(self, status: HTTPStatus, body: object, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _send_busy(self, message: str) -> None:
+        self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, message, {"Retry-After": str(RETRY_AFTER_S)})
+
+    def _stream_result(self, job: Job) -> None:
+        """Send the output file with chunked transfer encoding"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES.get(job.fmt, "application/octet-stream"))
+        self.send_header("Content-Disposition", f'attachment; filename="{job.output.name}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            with job.output.open("rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"Client closed the connection while receiving job {job.id}")
+            self.close_connection = True
+
+    def _send_job(self, job: Job) -> None:
+        status = job.status
+        if status == "done":
+            self._stream_result(job)
+        elif status == "failed":
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, job.to_dict())
+        else:
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    # -- request bodies ----------------------------------------------------
+
+    def _body_chunks(self) -> Optional[Iterator[bytes]]:
+        """The request body in pieces (Content-Length or chunked), None when there is none"""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            return self._chunked_body()
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            return None
+        if length > self.server.max_upload:
+            raise OverflowError(length)
+        return self._sized_body(length)
+
+    def _sized_body(self, length: int) -> Iterator[bytes]:
+        while length > 0:
+            chunk = self.rfile.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                raise ConnectionError("Upload ended early")
+            length -= len(chunk)
+            yield chunk
+
+    def _chunked_body(self) -> Iterator[bytes]:
+        received = 0
+        while True:
+            size = self._chunk_size(self.rfile.readline())
+            if size == 0:
+                # Trailers end with an empty line
+                while self.rfile.readline().strip():
+                    pass
+                return
+            received += size
+            if received > self.server.max_upload:
+                raise OverflowError(received)
+            yield from self._sized_body(size)
+            self.rfile.readline()
+
+    @staticmethod
+    def _chunk_size(line: bytes) -> int:
+        """The size on a chunk header line; int() alone would also take signs, 0x and underscores"""
+        digits = line.split(b";", 1)[0].strip()
+        if not digits or digits.strip(HEX_DIGITS):
+            raise ValueError(f"Invalid chunk size: {digits[:20]!r}")
+        return int(digits, 16)
+
+    def _spool_upload(self, job_id: str, name: str) -> Optional[Path]:
+        """Write the request body to the job directory (None and an error response on failure)"""
+        if not self.server.upload_slots.acquire(blocking=False):
+            self._send_busy("Too many uploads in progress")
+            self.close_connection = True
+            return None
+        target = self.server.queue.job_dir(job_id) / name
+        try:
+            chunks = self._body_chunks()
+            if chunks is None:
+                self._send_error(HTTPStatus.LENGTH_REQUIRED, "Send the SRT as the request body")
+                return None
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open("wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            return target
+        except OverflowError:
+            status, message = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Uploads are limited to {self.server.max_upload} bytes"
+        except (ValueError, ConnectionError) as err:
+            status, message = HTTPStatus.BAD_REQUEST, f"Bad upload: {err}"
+        finally:
+            self.server.upload_slots.release()
+        # Drop the partial upload before answering
+        shutil.rmtree(target.parent, ignore_errors=True)
+        self.close_connection = True
+        self._send_error(status, message)
+        return None
+
+    # -- routing -----------------------------------------------------------
+
+    def _route(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return parts, query
+
+    def do_GET(self) -> None:
+        parts, _ = self._route()
+        if parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, [job.to_dict() for job in self.server.queue.list()])
+            return
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[2:] in ([], ["result"]):
+            job = self.server.queue.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"No job {parts[1]}")
+            elif len(parts) == 3:
+                self._send_job(job)
+            else:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+            return
+        self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+
+    def do_DELETE(self) -> None:
+        parts, _ = self._route()
+        if len(parts) == 2 and parts[0] == "jobs" and self.server.queue.remove(parts[1]):
+            self._send_json(HTTPStatus.OK, {"id": parts[1], "status": "deleted"})
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"No job at {self.path}")
+
+    def do_POST(self) -> None:
+        parts, query = self._route()
+        if parts not in (["jobs"], ["convert"]):
+            self.close_connection = True
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+            return
+        fmt = query.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Unsupported format {fmt!r} ({', '.join(sorted(EXPORT_FORMATS))})")
+            return
+        queue = self.server.queue
+        if queue.pending() >= queue.max_pending:
+            # Refuse before reading the body
+            self.close_connection = True
+            self._send_busy(f"{queue.max_pending} jobs are already waiting")
+            return
+
+        job_id = queue.new_id()
+        if "path" in query:
+            source = self.server.resolve_path(query["path"])
+            if source is None:
+                self._send_error(HTTPStatus.FORBIDDEN, f"Not an SRT file under an allowed root: {query['path']}")
+                return
+            name = source.name
+        else:
+            name = Path(query.get("name", "upload.SRT")).name
+            if not is_srt_source(Path(name)):
+                self.close_connection = True
+                self._send_error(HTTPStatus.BAD_REQUEST, f"Not an SRT file name: {name!r}")
+                return
+            source = self._spool_upload(job_id, name)
+            if source is None:
+                return
+
+        try:
+            job = queue.submit(source, fmt, name=name, job_id=job_id)
+        except QueueFullError as err:
+            shutil.rmtree(queue.job_dir(job_id), ignore_errors=True)
+            self._send_busy(str(err))
+            return
+
+        if parts == ["jobs"]:
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+            return
+        # /convert: wait for the result, unlist the job before the response
+        # ends (clients may list jobs next), stream it back, then delete it
+        try:
+            job.future.exception()
+            queue.forget(job.id)
+            self._send_job(job)
+        finally:
+            queue.forget(job.id)
+            shutil.rmtree(queue.job_dir(job.id), ignore_errors=True)
+
+    # curl -T uploads with PUT
+    do_PUT = do_POST
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP front end of a JobQueue"""
+
+    daemon_threads = True
+
+    def __init__(self, address, queue: JobQueue, roots: Sequence[Path] = (),
+                 max_upload: int = 512 * 1024 * 1024, max_uploads: int = 4):
+        super().__init__(address, ConversionRequestHandler)
+        self.queue = queue
+        # Server-side paths are only converted below these directories
+        self.roots = [Path(root).resolve() for root in roots]
+        self.max_upload = max_upload
+        self.upload_slots = threading.BoundedSemaphore(max_uploads)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def resolve_path(self, value: str) -> Optional[Path]:
+        """An existing SRT path inside one of the roots, else None"""
+        path = Path(value).resolve()
+        if not is_srt_source(path) or not path.is_file():
+            return None
+        if not any(path == root or root in path.parents for root in self.roots):
+            return None
+        return path
+
+    def handle_error(self, request, client_address) -> None:
+        error = sys.exc_info()[1]
+        if isinstance(error, ConnectionError):
+            # Clients that hang up between or during requests
+            logger.info(f"{client_address[0]}: {error}")
+            return
+        logger.exception(f"Error while handling a request from {client_address[0]}")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.queue.close()
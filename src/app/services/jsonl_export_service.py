@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, TextIO
+import json
+import logging
+
+from app.services.exporters import open_output, records
+
+if TYPE_CHECKING:
+    # pydantic is only imported when frames are actually built or exported
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.output_template import RowFormatter
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlExportService:
+    """Export frames as JSON Lines (one object per frame, CSV column names as keys)"""
+
+    def export(self, frames: Sequence[VideoFrameMetadata], output_path: Path,
+               extra_columns: Optional[Mapping[str, Sequence]] = None,
+               formatter: Optional[RowFormatter] = None) -> None:
+        logger.info(f"Starting JSONL export: {len(frames)} frames")
+
+        if not frames:
+            logger.error("No frames to export")
+            raise ValueError("No frames to export")
+
+        with open_output(output_path) as f:
+            self.write(frames, f, extra_columns=extra_columns, formatter=formatter)
+        logger.info(f"JSONL file saved successfully: {output_path}")
+
+    def write(self, frames: Iterable[VideoFrameMetadata], stream: TextIO, header: bool = True,
+              extra_columns: Optional[Mapping[str, Sequence]] = None,
+              formatter: Optional[RowFormatter] = None) -> None:
+        """Write frames to an open text stream (JSONL has no header); extra_columns add keys
+
+        With a formatter (a compiled OutputTemplate) the keys and formatted values come from it.
+        """
+        if formatter is not None:
+            rows = (dict(zip(formatter.header, row)) for row in formatter.rows(frames, extra_columns))
+        else:
+            rows = records(frames, extra_columns)
+        for record in rows:
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write("\n")
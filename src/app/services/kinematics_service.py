@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict
+import logging
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mean Earth radius used by the haversine formula (metres)
+EARTH_RADIUS_M = 6371008.8
+
+
+class KinematicsService:
+    """
+    Derived flight metrics computed over whole columns in single NumPy passes.
+
+    Input is the output of VideoMetadataService.extract_columns. Speeds and
+    heading are taken over a span of frames: DJI positions are rounded to six
+    decimals (about 0.1 m), which makes frame-to-frame speeds at 30 fps noisy.
+    """
+
+    DEFAULT_SPAN = 30  # frames, about one second of video
+
+    # Output column names (exported next to the CSV columns)
+    COLUMNS = (
+        "STEP DISTANCE",
+        "CUMULATIVE DISTANCE",
+        "GROUND SPEED",
+        "HEADING",
+        "VERTICAL SPEED",
+        "SRT GROUND SPEED",
+        "SRT VERTICAL SPEED",
+        "SPEED RESIDUAL",
+        "VERTICAL SPEED RESIDUAL",
+    )
+
+    def __init__(self, span: int = DEFAULT_SPAN):
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        self.span = span
+
+    @staticmethod
+    def haversine(lat1, lon1, lat2, lon2):
+        """Great-circle distance in metres between arrays of points given in degrees"""
+        import numpy as np
+
+        lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @staticmethod
+    def bearing(lat1, lon1, lat2, lon2):
+        """Initial bearing in degrees (0-360, clockwise from north) between arrays of points"""
+        import numpy as np
+
+        lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+        dlon = lon2 - lon1
+        y = np.sin(dlon) * np.cos(lat2)
+        x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        return np.degrees(np.arctan2(y, x)) % 360.0
+
+    def compute(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Return the derived metric columns, aligned with the input frames (NaN where undefined)"""
+        import numpy as np
+
+        latitude = columns["latitude"]
+        longitude = columns["longitude"]
+        altitude = columns["abs_alt"]
+        seconds = columns["time_ms"].astype(np.float64) / 1000.0
+        count = len(latitude)
+
+        step = np.zeros(count)
+        if count > 1:
+            step[1:] = self.haversine(latitude[:-1], longitude[:-1], latitude[1:], longitude[1:])
+        cumulative = np.cumsum(step)
+
+        # Differences between each frame and the frame `span` earlier (clipped at the start)
+        previous = np.maximum(np.arange(count) - self.span, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            elapsed = seconds - seconds[previous]
+            elapsed[elapsed <= 0] = np.nan
+            ground_speed = (cumulative - cumulative[previous]) / elapsed
+            vertical_speed = (altitude - altitude[previous]) / elapsed
+
+        heading = self.bearing(latitude[previous], longitude[previous], latitude, longitude)
+        # A hovering drone has no track direction
+        heading[cumulative - cumulative[previous] == 0] = np.nan
+
+        srt_ground_speed = np.hypot(columns["drone_speedx"], columns["drone_speedy"])
+        srt_vertical_speed = columns["drone_speedz"]
+
+        metrics = {
+            "STEP DISTANCE": step,
+            "CUMULATIVE DISTANCE": cumulative,
+            "GROUND SPEED": ground_speed,
+            "HEADING": heading,
+            "VERTICAL SPEED": vertical_speed,
+            "SRT GROUND SPEED": srt_ground_speed,
+            "SRT VERTICAL SPEED": srt_vertical_speed,
+            "SPEED RESIDUAL": ground_speed - srt_ground_speed,
+            "VERTICAL SPEED RESIDUAL": vertical_speed - srt_vertical_speed,
+        }
+        logger.info(f"Computed kinematics for {count} frames ({cumulative[-1] if count else 0:.1f} m)")
+        # Millimetre precision is already far beyond what the GPS provides
+        return {name: np.round(values, 3) for name, values in metrics.items()}
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+import math
+import mmap
+import re
+import struct
+
+from app.services.parser_engine import BlockParser
+from app.services.srt_dialect import DEFAULT_DIALECT
+
+logger = logging.getLogger(__name__)
+
+# Sample entry formats of embedded telemetry tracks
+PROTOBUF_FORMATS = {b"djmd"}           # DJI protobuf frame metadata ("DJI meta" handler)
+TEXT_FORMATS = {b"tx3g", b"text"}      # SRT-like subtitle text, as in the .SRT sidecar
+
+# (timecode, latitude, longitude, altitude, date) regexes of the text samples
+TEXT_PATTERNS = DEFAULT_DIALECT.patterns()
+
+# DJI_20251222150704_0004_T.MP4: the recording start in local time, like the SRT date lines
+FILE_TIME_RE = re.compile(r"(\d{14})")
+MP4_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+# djmd protobuf layout: top-level field -> message of the per-frame fields
+DJMD_GPS_FIELD = 6
+DJMD_FRAME_CNT = 3      # in each frame message
+DJMD_LATITUDE = 4       # double, radians
+DJMD_LONGITUDE = 5      # double, radians
+DJMD_ABS_ALT_MM = 6     # varint, millimetres above sea level
+
+
+class Box(NamedTuple):
+    type: bytes
+    start: int  # payload start
+    end: int
+
+
+class SampleTable(NamedTuple):
+    format: bytes
+    timescale: int
+    creation_time: int      # seconds since 1904 (UTC)
+    offsets: List[int]
+    sizes: List[int]
+    times: List[int]        # sample start times in timescale units
+    durations: List[int]
+
+
+def iter_boxes(buf, start: int, end: int) -> Iterator[Box]:
+    """Yield the boxes between start and end, reading only their headers"""
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", buf, position)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", buf, position + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header or position + size > end:
+            raise ValueError(f"Corrupt MP4 box {box_type!r} at {position}")
+        yield Box(box_type, position + header, position + size)
+        position += size
+
+
+def read_varint(buf, position: int) -> Tuple[int, int]:
+    """Decode a protobuf varint, returning (value, next position)"""
+    value = shift = 0
+    while True:
+        byte = buf[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def iter_protobuf(buf) -> Iterator[Tuple[int, int, object]]:
+    """Yield (field number, wire type, value) of a protobuf message without a schema"""
+    position = 0
+    end = len(buf)
+    while position < end:
+        key, position = read_varint(buf, position)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, position = read_varint(buf, position)
+        elif wire == 1:
+            value = buf[position:position + 8]
+            position += 8
+        elif wire == 2:
+            length, position = read_varint(buf, position)
+            value = buf[position:position + length]
+            position += length
+        elif wire == 5:
+            value = buf[position:position + 4]
+            position += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, wire, value
+
+
+class Mp4TelemetryService:
+    """
+    Read the telemetry track embedded in DJI MP4 files.
+
+    The file is memory-mapped and only the box headers, the sample tables of
+    the telemetry track and its samples are touched, so the video payload is
+    never read. Records have the shape of BlockParser.parse:
+    (time_ms, date, latitude, longitude, abs_alt, fields).
+    """
+
+    def find_track(self, buf) -> SampleTable:
+        """Sample table of the first telemetry track (ValueError if there is none)"""
+        moov = next((box for box in iter_boxes(buf, 0, len(buf)) if box.type == b"moov"), None)
+        if moov is None:
+            raise ValueError("No moov box (not an MP4 file, or not finalised)")
+        for trak in iter_boxes(buf, moov.start, moov.end):
+            if trak.type != b"trak":
+                continue
+            table = self._track_table(buf, trak)
+            if table is not None:
+                return table
+        raise ValueError("No embedded telemetry track")
+
+    def _track_table(self, buf, trak: Box) -> Optional[SampleTable]:
+        boxes = self._children(buf, trak)
+        mdia = boxes.get(b"mdia")
+        if mdia is None:
+            return None
+        mdia_boxes = self._children(buf, mdia)
+        minf = mdia_boxes.get(b"minf")
+        mdhd = mdia_boxes.get(b"mdhd")
+        stbl = self._children(buf, minf).get(b"stbl") if minf else None
+        if stbl is None or mdhd is None:
+            return None
+        tables = self._children(buf, stbl)
+        stsd = tables.get(b"stsd")
+        if stsd is None:
+            return None
+        sample_format = bytes(buf[stsd.start + 12:stsd.start + 16])
+        if sample_format not in PROTOBUF_FORMATS | TEXT_FORMATS:
+            return None
+
+        if buf[mdhd.start] == 1:
+            creation_time, timescale = struct.unpack_from(">Q8xI", buf, mdhd.start + 4)
+        else:
+            creation_time, timescale = struct.unpack_from(">I4xI", buf, mdhd.start + 4)
+
+        sizes = self._sample_sizes(buf, tables[b"stsz"])
+        durations = self._sample_durations(buf, tables[b"stts"], len(sizes))
+        offsets = self._sample_offsets(buf, tables, sizes)
+        times = [0] + list(accumulate(durations))[:-1]
+        return SampleTable(sample_format, timescale, creation_time, offsets, sizes, times, durations)
+
+    @staticmethod
+    def _children(buf, box: Box) -> Dict[bytes, Box]:
+        children: Dict[bytes, Box] = {}
+        for child in iter_boxes(buf, box.start, box.end):
+            children.setdefault(child.type, child)
+        return children
+
+    @staticmethod
+    def _sample_sizes(buf, stsz: Box) -> List[int]:
+        sample_size, count = struct.unpack_from(">II", buf, stsz.start + 4)
+        if sample_size:
+            return [sample_size] * count
+        return list(struct.unpack_from(f">{count}I", buf, stsz.start + 12))
+
+    @staticmethod
+    def _sample_durations(buf, stts: Box, count: int) -> List[int]:
+        entries = struct.unpack_from(">I", buf, stts.start + 4)[0]
+        durations: List[int] = []
+        for i in range(entries):
+            run, delta = struct.unpack_from(">II", buf, stts.start + 8 + 8 * i)
+            durations.extend([delta] * run)
+        return durations[:count]
+
+    @staticmethod
+    def _sample_offsets(buf, tables: Dict[bytes, Box], sizes: List[int]) -> List[int]:
+        """File offset of every sample, from the chunk offsets and the sample-to-chunk runs"""
+        if b"co64" in tables:
+            box, code = tables[b"co64"], "Q"
+        else:
+            box, code = tables[b"stco"], "I"
+        chunk_count = struct.unpack_from(">I", buf, box.start + 4)[0]
+        chunks = struct.unpack_from(f">{chunk_count}{code}", buf, box.start + 8)
+
+        stsc = tables[b"stsc"]
+        entries = struct.unpack_from(">I", buf, stsc.start + 4)[0]
+        runs = [struct.unpack_from(">III", buf, stsc.start + 8 + 12 * i)[:2] for i in range(entries)]
+        first_chunks = [first for first, _ in runs]
+
+        offsets: List[int] = []
+        sample = 0
+        for chunk_number, chunk_offset in enumerate(chunks, start=1):
+            per_chunk = runs[bisect_right(first_chunks, chunk_number) - 1][1] if runs else 1
+            position = chunk_offset
+            for _ in range(per_chunk):
+                if sample >= len(sizes):
+                    return offsets
+                offsets.append(position)
+                position += sizes[sample]
+                sample += 1
+        return offsets
+
+    @staticmethod
+    def start_time(video_path: Path, table: SampleTable) -> datetime:
+        """Recording start: from the DJI file name (local time, as in SRT files), else the MP4 header (UTC)"""
+        match = FILE_TIME_RE.search(video_path.stem)
+        if match:
+            try:
+                return datetime.strptime(match.group(1), "%Y%m%d%H%M%S")
+            except ValueError:
+                pass
+        return (MP4_EPOCH + timedelta(seconds=table.creation_time)).replace(tzinfo=None)
+
+    def iter_records(self, video_path: Path) -> Iterator[tuple]:
+        """Yield (time_ms, date, latitude, longitude, abs_alt, fields) for every sample with a position"""
+        with video_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            table = self.find_track(buf)
+            start = self.start_time(video_path, table)
+            scale = 1000.0 / table.timescale
+            decode = self._decode_djmd if table.format in PROTOBUF_FORMATS else self._decode_text
+            logger.info(f"Reading {len(table.sizes)} {table.format.decode('ascii')} samples from {video_path}")
+
+            for offset, size, time, duration in zip(table.offsets, table.sizes, table.times, table.durations):
+                values = decode(buf[offset:offset + size])
+                if values is None:
+                    continue
+                latitude, longitude, altitude, fields, date_str = values
+                time_ms = round(time * scale)
+                fields.setdefault(b"DiffTime", round(duration * scale))
+                if not date_str:
+                    stamp = start + timedelta(milliseconds=time_ms)
+                    date_str = stamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                yield time_ms, date_str, latitude, longitude, altitude, fields
+
+    @staticmethod
+    def _decode_djmd(sample: bytes) -> Optional[tuple]:
+        for field, wire, value in iter_protobuf(sample):
+            if field != DJMD_GPS_FIELD or wire != 2:
+                continue
+            latitude = longitude = altitude = None
+            # proto3 leaves out zero values: the first frame has no counter field
+            fields: Dict[bytes, float] = {b"FrameCnt": 0}
+            for sub_field, sub_wire, sub_value in iter_protobuf(value):
+                if sub_field == DJMD_LATITUDE and sub_wire == 1:
+                    latitude = round(math.degrees(struct.unpack("<d", sub_value)[0]), 6)
+                elif sub_field == DJMD_LONGITUDE and sub_wire == 1:
+                    longitude = round(math.degrees(struct.unpack("<d", sub_value)[0]), 6)
+                elif sub_field == DJMD_ABS_ALT_MM and sub_wire == 0:
+                    altitude = sub_value / 1000.0
+                elif sub_field == DJMD_FRAME_CNT and sub_wire == 0:
+                    fields[b"FrameCnt"] = sub_value
+            # The SRT files leave the position out when there is no fix (0, 0)
+            if latitude is None or longitude is None or (latitude == 0 and longitude == 0):
+                return None
+            return latitude, longitude, altitude, fields, None
+        return None
+
+    def _decode_text(self, sample: bytes) -> Optional[tuple]:
+        """tx3g sample: 16-bit text length, then text with the fields of an SRT block"""
+        _, lat_re, lon_re, alt_re, date_re = TEXT_PATTERNS
+
+        length = struct.unpack_from(">H", sample)[0] if len(sample) >= 2 else 0
+        text = sample[2:2 + length]
+        lat_match = lat_re.search(text)
+        lon_match = lon_re.search(text)
+        if not lat_match or not lon_match:
+            return None
+        alt_match = alt_re.search(text)
+        date_match = date_re.search(text)
+        fields = dict(reversed(BlockParser.KEY_VALUE_RE.findall(text)))
+        return (
+            float(lat_match.group(1)),
+            float(lon_match.group(1)),
+            float(alt_match.group(1)) if alt_match else None,
+            fields,
+            date_match.group(1).decode("ascii", "replace") if date_match else None,
+        )
@@ -0,0 +1,589 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AnyStr, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import codecs
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import time
+
+from app.services.srt_dialect import DEFAULT_DIALECT, DETECT_LINES, DIALECTS, SrtLayout, iso_date
+from app.services.srt_io import (
+    decode_text, detect_encoding, is_packed_source, iter_byte_lines, open_byte_lines, open_source,
+)
+
+if TYPE_CHECKING:
+    from app.services.frame_filter import FrameFilter
+
+logger = logging.getLogger(__name__)
+
+# Returned by the block parsers once a FrameFilter's window has passed: stop reading
+END_OF_WINDOW = object()
+
+# Saved benchmark of the backends on this machine (python -m app parsers --benchmark FILE --save)
+CONFIG_ENV = "DJI_SRT_PARSER_CONFIG"
+DEFAULT_CONFIG_PATH = Path.home() / ".dji_srt" / "parser.json"
+
+# Without a saved benchmark: the serial backend for plain files, and the size from which
+# they are split across all cores
+DEFAULT_BACKEND = "mmap"
+DEFAULT_PARALLEL_MIN_BYTES = 64 << 20
+
+# Bytes of a file scanned per parallel task, and tasks in flight per job: the parent
+# holds the records of at most PARALLEL_IN_FLIGHT x jobs tasks, whatever the file size
+PARALLEL_CHUNK_BYTES = 1 << 20
+PARALLEL_IN_FLIGHT = 2
+
+LINE_RE = re.compile(rb"[^\n]*\n|[^\n]+")
+
+
+def config_path() -> Path:
+    return Path(os.environ.get(CONFIG_ENV) or DEFAULT_CONFIG_PATH)
+
+
+@lru_cache(maxsize=None)
+def load_config(path: Path) -> Dict[str, Any]:
+    """The saved backend choice ({} when there is none or it cannot be read)"""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        logger.warning(f"Ignoring parser config {path}: {err}")
+        return {}
+
+
+class BlockParser:
+    """
+    Parses one SRT block at a time into a record.
+
+    A record is (time_ms, date, latitude, longitude, abs_alt, fields), the
+    shape every telemetry reader yields (see also Mp4TelemetryService). The
+    parser holds the state of the file being read: its layout (dialect and
+    field lines, see detect_layout) and the times of the blocks it skipped
+    for missing GPS (no_gps_ms). Use one parser per file at a time.
+
+    mode "bytes" parses raw bytes and decodes only the date; "text" parses
+    str lines (see open_text_lines), which fails on stray bytes.
+    """
+
+    # Lines searched for a frame's fields, starting at its timecode line
+    BLOCK_LINES = 12
+
+    # "key: value" pairs of a block, returned as fields
+    KEY_VALUE_RE = re.compile(rb"(\w+)\s*:\s*(-?[\d.]+)")
+    REL_ALT_RE = re.compile(rb"rel_alt:\s*([-\d.]+)")
+
+    MODES = ("bytes", "text")
+
+    def __init__(self, mode: str = "bytes", dialect: Optional[str] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown parsing mode: {mode}")
+        if dialect is not None and dialect not in DIALECTS:
+            raise ValueError(f"Unknown SRT dialect: {dialect}")
+        self.mode = mode
+        # None: detect the dialect of every file from its first blocks (see SrtLayout)
+        self.dialect = None if dialect is None else DIALECTS[dialect]
+        self.use_layout(SrtLayout(self.dialect or DEFAULT_DIALECT))
+        # SRT times (ms) of the blocks skipped for missing GPS since the last reset()
+        self.no_gps_ms = array("q")
+
+    def reset(self) -> None:
+        """Forget the skipped blocks of the previous file"""
+        self.no_gps_ms = array("q")
+
+    @staticmethod
+    def open_text_lines(srt_path: Path) -> Iterator[str]:
+        """The lines of an SRT decoded as strict UTF-8, for the text mode"""
+        with io.TextIOWrapper(open_source(srt_path), encoding="utf-8") as f:
+            yield from f
+
+    def with_layout(self, lines: Iterator[AnyStr]) -> Iterator[AnyStr]:
+        """Detect the layout of a file from its first lines and return all lines again"""
+        head = list(islice(lines, DETECT_LINES))
+        self.detect_layout([line.encode("utf-8") if isinstance(line, str) else line for line in head])
+        return chain(head, lines)
+
+    def detect_layout(self, head: Sequence[bytes]) -> None:
+        """Detect the layout of a file from its first lines (bytes) and parse with it"""
+        self.use_layout(SrtLayout.detect(head, self.dialect))
+        if self.layout.dialect is not DEFAULT_DIALECT:
+            logger.info(f"זוהה פורמט SRT: {self.layout.dialect.name}")
+
+    def use_layout(self, layout: SrtLayout) -> None:
+        """Parse with a layout detected before (e.g. by the process that split the file)"""
+        self.layout = layout
+        self._patterns = layout.dialect.patterns(text=self.mode == "text")
+
+    def parse(self, window: Sequence[AnyStr], frame_filter: Optional[FrameFilter] = None,
+              fields: bool = True) -> Any:
+        """
+        Parse the block starting at window[0] (its timecode line and up to
+        BLOCK_LINES - 1 lines after it) into a record: None if it is not a
+        GPS frame start or is dropped by frame_filter, END_OF_WINDOW after
+        its window. fields ("key: value" pairs of the block) is left empty
+        unless asked for.
+        """
+        time_re = self._patterns[0]
+
+        # Search for timecode
+        time_match = time_re.search(window[0])
+        if not time_match:
+            return None
+
+        # int()/float() accept ASCII bytes directly, so numbers are never decoded
+        h, m, s, ms = map(int, time_match.groups())
+        timestamp_ms = ((h * 60 + m) * 60 + s) * 1000 + ms
+        if frame_filter is not None:
+            # Cheapest test first: nothing else of the block is read
+            if frame_filter.past(timestamp_ms):
+                return END_OF_WINDOW
+            if frame_filter.before(timestamp_ms):
+                return None
+
+        # Extract GPS data from the next block (up to BLOCK_LINES lines)
+        (latitude, longitude, altitude, date_str), block_text = self._find_fields(window, self._patterns[1:])
+
+        # Skip frame if no GPS data
+        latitude, longitude = self._position(latitude, longitude)
+        if latitude is None:
+            self.no_gps_ms.append(timestamp_ms)
+            return None
+        altitude = None if altitude is None else float(altitude)
+
+        if date_str and not self.layout.dialect.iso_dates:
+            date_str = iso_date(date_str)
+        if frame_filter is not None or fields:
+            if block_text is None:
+                block_text = window[0][:0].join(window)
+            if frame_filter is not None:
+                keep = self._filter_block(frame_filter, block_text, latitude, longitude, altitude, date_str)
+                if keep is not True:
+                    return keep or None
+        if fields:
+            if isinstance(block_text, str):
+                block_text = block_text.encode("utf-8", "replace")
+            # First occurrence wins, like the single-field regex searches
+            fields = dict(reversed(self.KEY_VALUE_RE.findall(block_text)))
+
+        # The date is the only text field that is decoded
+        if isinstance(date_str, bytes):
+            date_str = decode_text(date_str)
+        return timestamp_ms, date_str or "", latitude, longitude, altitude, fields or {}
+
+    @staticmethod
+    def filter_values(frame_filter: FrameFilter, latitude: float, longitude: float,
+                      altitude: Optional[float], date_str: Optional[AnyStr]) -> Any:
+        """
+        The FrameFilter test of parse() for values that are already parsed
+        (altitude is the one the filter uses): True to keep the frame, False
+        to drop it, END_OF_WINDOW once the wall-clock window has passed
+        """
+        if frame_filter.has_position and not frame_filter.accepts_position(latitude, longitude):
+            return False
+        if frame_filter.has_altitude and not frame_filter.accepts_altitude(altitude):
+            return False
+        if frame_filter.has_datetime:
+            state = frame_filter.datetime_state(date_str)
+            if state:
+                return END_OF_WINDOW if state > 0 else False
+        return True
+
+    def _filter_block(self, frame_filter: FrameFilter, block_text: AnyStr, latitude: float, longitude: float,
+                      altitude: Optional[float], date_str: Optional[AnyStr]) -> Any:
+        if frame_filter.has_altitude and frame_filter.relative_alt:
+            if isinstance(block_text, str):
+                block_text = block_text.encode("utf-8", "replace")
+            match = self.REL_ALT_RE.search(block_text)
+            altitude = float(match.group(1)) if match else None
+        return self.filter_values(frame_filter, latitude, longitude, altitude, date_str)
+
+    def _find_fields(self, window: Sequence[AnyStr], patterns: Sequence[re.Pattern]
+                     ) -> Tuple[List[Optional[AnyStr]], Optional[AnyStr]]:
+        """
+        Raw latitude, longitude, altitude and date of the block at window[0],
+        plus the joined window text if it had to be searched (else None)
+        """
+        block_text = None
+        values = []
+        size = len(window)
+        for pattern, line in zip(patterns, self.layout.lines):
+            # The field's fixed line first, the whole window only when that misses
+            match = pattern.search(window[line]) if line is not None and line < size else None
+            if match is None:
+                if block_text is None:
+                    block_text = window[0][:0].join(window)
+                match = pattern.search(block_text)
+            values.append(match.group(1) if match else None)
+        return values, block_text
+
+    def _position(self, latitude: Optional[AnyStr], longitude: Optional[AnyStr]) -> Tuple[Optional[float], ...]:
+        """(latitude, longitude) as floats, (None, None) when the block has no GPS fix"""
+        if latitude is None or longitude is None:
+            return None, None
+        latitude, longitude = float(latitude), float(longitude)
+        if self.layout.dialect.zero_is_no_fix and latitude == 0 and longitude == 0:
+            return None, None
+        return latitude, longitude
+
+
+class ParserBackend:
+    """
+    Cuts an SRT source into block windows for BlockParser.parse.
+
+    A window is the timecode line of a block and the lines after it, up to
+    BLOCK_LINES. Every backend detects the file's layout from its first
+    lines and yields the same records in the same order; they differ in how
+    the bytes are read and where the windows are found.
+    """
+
+    name = ""
+
+    def available(self, parser: BlockParser, srt_path: Path) -> bool:
+        raise NotImplementedError
+
+    def records(self, parser: BlockParser, srt_path: Path, frame_filter: Optional[FrameFilter] = None,
+                fields: bool = True, offset: int = 0) -> Iterator[tuple]:
+        raise NotImplementedError
+
+
+class LineBackend(ParserBackend):
+    """
+    Pure-Python line streaming through a sliding window of BLOCK_LINES lines.
+
+    Reads any source (compressed, zip members, UTF-16) and the strict text
+    mode in constant memory; every line is tried as a block start.
+    """
+
+    name = "lines"
+
+    def available(self, parser: BlockParser, srt_path: Path) -> bool:
+        return True
+
+    def records(self, parser: BlockParser, srt_path: Path, frame_filter: Optional[FrameFilter] = None,
+                fields: bool = True, offset: int = 0) -> Iterator[tuple]:
+        if offset:
+            lines = self._lines_from(srt_path, offset)
+        elif parser.mode == "text":
+            lines = parser.open_text_lines(srt_path)
+        else:
+            lines = open_byte_lines(srt_path)
+        try:
+            for window in self._windows(parser.with_layout(lines), parser.BLOCK_LINES):
+                record = parser.parse(window, frame_filter, fields)
+                if record is None:
+                    continue
+                if record is END_OF_WINDOW:
+                    return
+                yield record
+        finally:
+            lines.close()
+
+    @staticmethod
+    def _lines_from(srt_path: Path, offset: int) -> Iterator[bytes]:
+        """Byte lines starting at a byte offset (a block start, see SrtIndex)"""
+        with open_source(srt_path, prefetch=False) as f:
+            if f.seekable():
+                f.seek(offset)
+            else:
+                # zstandard streams: decompress up to the offset
+                while offset > 0 and f.read(min(offset, 1 << 20)):
+                    offset -= 1 << 20
+            yield from iter_byte_lines(f)
+
+    @staticmethod
+    def _windows(lines: Iterable[Any], size: int) -> Iterator[Deque[Any]]:
+        """Yield, for every line, a window of that line and the lines that follow it"""
+        from collections import deque
+
+        window: Deque[Any] = deque(maxlen=size)
+        for line in lines:
+            window.append(line)
+            if len(window) == size:
+                yield window
+
+        # Drain the lines left in the window at end of file
+        if len(window) == size:
+            window.popleft()
+        while window:
+            yield window
+            window.popleft()
+
+
+class MmapBackend(ParserBackend):
+    """
+    Memory-mapped plain files, scanned from timecode line to timecode line.
+
+    One regex scan over the mapping finds the lines that may start blocks and a
+    second one cuts each window, so the parser is only called once per
+    block instead of once per line.
+    """
+
+    name = "mmap"
+
+    def available(self, parser: BlockParser, srt_path: Path) -> bool:
+        if parser.mode != "bytes" or is_packed_source(srt_path):
+            return False
+        try:
+            if srt_path.stat().st_size == 0:
+                return False  # an empty file cannot be mapped
+            with srt_path.open("rb") as f:
+                return detect_encoding(f.read(4)) is None
+        except OSError:
+            return False
+
+    def records(self, parser: BlockParser, srt_path: Path, frame_filter: Optional[FrameFilter] = None,
+                fields: bool = True, offset: int = 0) -> Iterator[tuple]:
+        with srt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            start = self.data_start(buf, offset)
+            parser.detect_layout(self.head(buf, start))
+            for record in self.scan(parser, buf, start, len(buf), frame_filter, fields):
+                if record is END_OF_WINDOW:
+                    return
+                yield record
+
+    @staticmethod
+    def data_start(buf, offset: int) -> int:
+        """offset, past a UTF-8 BOM at the start of the file"""
+        if offset == 0 and buf[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            return len(codecs.BOM_UTF8)
+        return offset
+
+    @staticmethod
+    def head(buf, start: int) -> List[bytes]:
+        """The first DETECT_LINES lines from start, for SrtLayout.detect"""
+        end = start
+        for _ in range(DETECT_LINES):
+            end = buf.find(b"\n", end) + 1
+            if end == 0:
+                end = len(buf)
+                break
+        return LINE_RE.findall(buf[start:end])
+
+    @staticmethod
+    def scan(parser: BlockParser, buf, start: int, end: int, frame_filter: Optional[FrameFilter],
+             fields: bool) -> Iterator[Any]:
+        """Records of the blocks whose timecode line starts in [start, end), END_OF_WINDOW last if it stops"""
+        # One match per line that may start a block; parse() tells the real ones
+        candidates = re.compile(parser.layout.dialect.timecode_anchor + rb"[^\n]*")
+        window_re = re.compile(rb"(?:[^\n]*\n){0,%d}[^\n]*\n?" % (parser.BLOCK_LINES - 1))
+        # Lines end at b"\n" only, like iter_byte_lines
+        split_lines = LINE_RE.findall
+        parse = parser.parse
+
+        for match in candidates.finditer(buf, start, end):
+            line_start = max(buf.rfind(b"\n", start, match.start()) + 1, start)
+            window = split_lines(window_re.match(buf, line_start).group())
+            record = parse(window, frame_filter, fields)
+            if record is None:
+                continue
+            yield record
+            if record is END_OF_WINDOW:
+                return
+
+
+def _parse_chunk(srt_path: Path, start: int, end: int, dialect: str, lines: Tuple[Optional[int], ...],
+                 frame_filter: Optional[FrameFilter], fields: bool) -> Tuple[List[tuple], List[int], bool]:
+    """Worker: (records, no-GPS times, whether the filter window ended) of one chunk of a file"""
+    parser = BlockParser(dialect=dialect)
+    parser.use_layout(SrtLayout(DIALECTS[dialect], lines))
+    records = []
+    with srt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for record in MmapBackend.scan(parser, buf, start, end, frame_filter, fields):
+            if record is END_OF_WINDOW:
+                return records, parser.no_gps_ms.tolist(), True
+            records.append(record)
+    return records, parser.no_gps_ms.tolist(), False
+
+
+class ParallelBackend(ParserBackend):
+    """
+    Large plain files split into line-aligned chunks of about chunk_bytes,
+    each scanned by MmapBackend on a worker process. Windows may run past the
+    end of their chunk, so the records are exactly those of a single scan, in
+    order. Only PARALLEL_IN_FLIGHT chunks per job are submitted ahead of the
+    one being yielded, so memory does not grow with the file.
+    """
+
+    name = "parallel"
+
+    def __init__(self, jobs: Optional[int] = None, chunk_bytes: Optional[int] = None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes or PARALLEL_CHUNK_BYTES
+
+    def available(self, parser: BlockParser, srt_path: Path) -> bool:
+        from multiprocessing import parent_process
+
+        # Worker processes (convert -j, serve) already use every core
+        return self.jobs > 1 and parent_process() is None and MmapBackend().available(parser, srt_path)
+
+    def records(self, parser: BlockParser, srt_path: Path, frame_filter: Optional[FrameFilter] = None,
+                fields: bool = True, offset: int = 0) -> Iterator[tuple]:
+        from collections import deque
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        with srt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            start = MmapBackend.data_start(buf, offset)
+            parser.detect_layout(MmapBackend.head(buf, start))
+            bounds = self.chunks(buf, start, max(-(-(len(buf) - start) // self.chunk_bytes), 1))
+
+        layout = parser.layout
+        pending = iter(bounds)
+        futures: Deque[Future] = deque()
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(bounds))) as executor:
+            try:
+                while True:
+                    for chunk_start, chunk_end in pending:
+                        futures.append(executor.submit(_parse_chunk, srt_path, chunk_start, chunk_end,
+                                                       layout.dialect.name, layout.lines, frame_filter, fields))
+                        if len(futures) >= PARALLEL_IN_FLIGHT * self.jobs:
+                            break
+                    if not futures:
+                        return
+                    records, no_gps_ms, ended = futures.popleft().result()
+                    parser.no_gps_ms.extend(no_gps_ms)
+                    yield from records
+                    if ended:
+                        return
+            finally:
+                # Stopped early (window ended, error, or the caller closed the generator)
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def chunks(buf, start: int, count: int) -> List[Tuple[int, int]]:
+        """count (start, end) byte ranges of about equal size, each starting at a line start"""
+        size = len(buf)
+        edges = [start]
+        for i in range(1, count):
+            edge = buf.find(b"\n", start + (size - start) * i // count) + 1
+            if edge == 0 or edge <= edges[-1]:
+                continue
+            edges.append(edge)
+        edges.append(size)
+        return [(a, b) for a, b in zip(edges, edges[1:]) if a < b]
+
+
+class ParserEngine:
+    """
+    Runs a BlockParser over an SRT with the best backend.
+
+    The backend is picked per file: "lines" for anything that cannot be
+    memory-mapped (compressed files, zip members, UTF-16, the text mode),
+    "parallel" for plain files of at least parallel_min_bytes on a
+    multi-core machine (without a FrameFilter, which can stop a scan early),
+    and the saved serial backend ("mmap" by default) otherwise. benchmark()
+    and save() calibrate that choice on this machine.
+    """
+
+    def __init__(self, backend: Optional[str] = None, jobs: Optional[int] = None,
+                 config: Optional[Path] = None):
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend: {backend}")
+        self.backend = backend
+        self.jobs = jobs or os.cpu_count() or 1
+        self.config_path = config or config_path()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return load_config(self.config_path)
+
+    def _backend(self, name: str) -> ParserBackend:
+        return ParallelBackend(self.jobs) if name == "parallel" else BACKENDS[name]
+
+    def choose(self, parser: BlockParser, srt_path: Path, frame_filter: Optional[FrameFilter] = None,
+               offset: int = 0) -> ParserBackend:
+        """The backend that will read srt_path"""
+        if self.backend is not None:
+            backend = self._backend(self.backend)
+            if backend.available(parser, srt_path):
+                return backend
+            logger.info(f"Parser backend {self.backend} cannot read {srt_path}, using lines")
+            return BACKENDS["lines"]
+
+        if offset or not BACKENDS["mmap"].available(parser, srt_path):
+            return BACKENDS["lines"]
+        config = self.config
+        parallel_min_bytes = config.get("parallel_min_bytes", DEFAULT_PARALLEL_MIN_BYTES)
+        if frame_filter is None and parallel_min_bytes is not None and self.jobs > 1:
+            if srt_path.stat().st_size >= parallel_min_bytes:
+                parallel = self._backend("parallel")
+                if parallel.available(parser, srt_path):
+                    return parallel
+        return BACKENDS.get(config.get("backend"), BACKENDS[DEFAULT_BACKEND])
+
+    def records(self, srt_path: Path, frame_filter: Optional[FrameFilter] = None, fields: bool = True,
+                offset: int = 0, parser: Optional[BlockParser] = None) -> Iterator[tuple]:
+        """
+        Records (time_ms, date, latitude, longitude, altitude, fields) of the
+        GPS frames of an SRT file; fields is {} unless requested. parser
+        (a new bytes-mode BlockParser by default) collects the skipped blocks.
+        """
+        if parser is None:
+            parser = BlockParser()
+        backend = self.choose(parser, srt_path, frame_filter, offset)
+        logger.debug(f"Parsing {srt_path} with the {backend.name} backend")
+        return backend.records(parser, srt_path, frame_filter, fields, offset)
+
+    def benchmark(self, srt_path: Path, repeat: int = 3) -> Dict[str, float]:
+        """Best time (seconds) of every backend that can read srt_path"""
+        results: Dict[str, float] = {}
+        for name in BACKENDS:
+            backend = self._backend(name)
+            if not backend.available(BlockParser(), srt_path):
+                continue
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in backend.records(BlockParser(), srt_path, fields=False):
+                    pass
+                best = min(best, time.perf_counter() - started)
+            results[name] = best
+            logger.info(f"{name}: {best:.3f} s")
+        return results
+
+    def save(self, results: Dict[str, float], srt_path: Path) -> Dict[str, Any]:
+        """
+        Store the choice a benchmark implies and return it (ValueError
+        without the time of a serial backend).
+
+        The fastest serial backend becomes the default. Parallel parsing is
+        only enabled when it won; it then starts at the size where its fixed
+        cost (time beyond a perfect split over the cores) is paid back.
+        """
+        size = srt_path.stat().st_size
+        timed = [name for name in results if name != "parallel"]
+        if not timed:
+            # Parallel parsing only pays off against a serial time
+            raise ValueError("No serial parser backend was benchmarked; nothing to compare parallel parsing with")
+        serial = min(timed, key=results.get)
+        parallel_min_bytes = None
+        if "parallel" in results and results["parallel"] < results[serial]:
+            overhead = max(results["parallel"] - results[serial] / self.jobs, 0.0)
+            parallel_min_bytes = int(overhead * size / results[serial] / (1 - 1 / self.jobs))
+        config = {
+            "backend": serial,
+            "parallel_min_bytes": parallel_min_bytes,
+            "jobs": self.jobs,
+            "benchmark_bytes": size,
+            "seconds": {name: round(seconds, 4) for name, seconds in results.items()},
+        }
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.config_path.open("w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        load_config.cache_clear()
+        logger.info(f"Parser choice saved: {self.config_path}")
+        return config
+
+
+BACKENDS: Dict[str, ParserBackend] = {
+    backend.name: backend for backend in (LineBackend(), MmapBackend(), ParallelBackend())
+}
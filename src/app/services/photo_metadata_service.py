@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime
+import csv
+import logging
+import re
+import struct
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.models.photo_metadata import PhotoMetadata
+
+logger = logging.getLogger(__name__)
+
+PHOTO_SUFFIXES = (".JPG", ".JPEG")
+
+# JPEG markers
+SOI = b"\xff\xd8"
+APP1 = 0xE1
+SOS = 0xDA
+EOI = 0xD9
+
+EXIF_HEADER = b"Exif\x00\x00"
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+
+# TIFF tags
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+DATE_TIME_ORIGINAL = 0x9003
+SUB_SEC_TIME_ORIGINAL = 0x9291
+GPS_LATITUDE_REF, GPS_LATITUDE = 1, 2
+GPS_LONGITUDE_REF, GPS_LONGITUDE = 3, 4
+GPS_ALTITUDE_REF, GPS_ALTITUDE = 5, 6
+
+# TIFF type -> (struct code, size)
+TIFF_TYPES = {1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8), 7: ("B", 1), 9: ("i", 4), 10: ("ii", 8)}
+
+# DJI XMP tags, as attributes (drone-dji:GpsLatitude="+31.24") or elements
+XMP_TAG_RE = re.compile(rb'drone-dji:(\w+)(?:="([^"]*)"|>([^<]*)<)')
+
+# XMP tag -> model field
+XMP_FIELDS = {
+    b"GpsLatitude": "latitude",
+    b"GpsLongitude": "longitude",
+    b"AbsoluteAltitude": "altitude",
+    b"RelativeAltitude": "relative_altitude",
+    b"GimbalYawDegree": "gimbal_yaw",
+    b"GimbalPitchDegree": "gimbal_pitch",
+    b"GimbalRollDegree": "gimbal_roll",
+}
+
+
+class PhotoMetadataService:
+    """
+    Geotags and timestamps from DJI photos, read from the JPEG APP1 segments only.
+
+    Segments are walked by their length fields and every segment other than
+    APP1 (thermal data, thumbnails, the image itself) is skipped with a seek,
+    so a photo costs a few small reads. XMP (drone-dji) values win over EXIF
+    GPS, which has less precision.
+    """
+
+    def read(self, photo_path: Path) -> PhotoMetadata:
+        """Metadata of one photo (ValueError if it is not a JPEG)"""
+        from app.models.photo_metadata import PhotoMetadata
+
+        with photo_path.open("rb") as f:
+            exif, xmp = self._app1_segments(f)
+        if exif is None and xmp is None:
+            logger.warning(f"No EXIF or XMP metadata in {photo_path}")
+
+        values: Dict[str, object] = {"photo_name": photo_path.stem}
+        if exif is not None:
+            values.update(self._parse_exif(exif))
+        if xmp is not None:
+            values.update(self._parse_xmp(xmp))
+        return PhotoMetadata(**values)
+
+    def read_many(self, photo_paths: Iterable[Path]) -> List[PhotoMetadata]:
+        """Metadata of several photos; unreadable ones are logged and skipped"""
+        photos = []
+        for path in photo_paths:
+            try:
+                photos.append(self.read(path))
+            except (OSError, ValueError, struct.error) as err:
+                logger.error(f"Cannot read {path}: {err}")
+        logger.info(f"Read metadata of {len(photos)} photos")
+        return photos
+
+    @staticmethod
+    def _app1_segments(f: BinaryIO) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """(EXIF TIFF data, XMP packet) from the segments before the image data"""
+        if f.read(2) != SOI:
+            raise ValueError("Not a JPEG file")
+        exif = xmp = None
+        while exif is None or xmp is None:
+            header = f.read(4)
+            if len(header) < 4 or header[0] != 0xFF:
+                break
+            marker = header[1]
+            if marker in (SOS, EOI):
+                break
+            length = struct.unpack(">H", header[2:])[0] - 2
+            if marker != APP1:
+                f.seek(length, 1)
+                continue
+            payload = f.read(length)
+            if payload.startswith(EXIF_HEADER):
+                exif = payload[len(EXIF_HEADER):]
+            elif payload.startswith(XMP_HEADER):
+                xmp = payload[len(XMP_HEADER):]
+        return exif, xmp
+
+    @staticmethod
+    def _parse_exif(tiff: bytes) -> Dict[str, object]:
+        order = "<" if tiff[:2] == b"II" else ">"
+
+        def entries(offset: int) -> Dict[int, object]:
+            count = struct.unpack_from(order + "H", tiff, offset)[0]
+            values: Dict[int, object] = {}
+            for i in range(count):
+                tag, kind, number = struct.unpack_from(order + "HHI", tiff, offset + 2 + 12 * i)
+                if kind not in TIFF_TYPES:
+                    continue
+                code, size = TIFF_TYPES[kind]
+                position = offset + 10 + 12 * i
+                if size * number > 4:
+                    position = struct.unpack_from(order + "I", tiff, position)[0]
+                if kind == 2:
+                    values[tag] = tiff[position:position + number].split(b"\x00", 1)[0].decode("ascii", "replace")
+                elif kind in (5, 10):
+                    pairs = struct.unpack_from(order + code[0] * 2 * number, tiff, position)
+                    values[tag] = [a / b if b else 0.0 for a, b in zip(pairs[::2], pairs[1::2])]
+                else:
+                    values[tag] = struct.unpack_from(order + code * number, tiff, position)
+            return values
+
+        ifd0 = entries(struct.unpack_from(order + "I", tiff, 4)[0])
+        values: Dict[str, object] = {}
+
+        if EXIF_IFD_POINTER in ifd0:
+            exif = entries(ifd0[EXIF_IFD_POINTER][0])
+            stamp = exif.get(DATE_TIME_ORIGINAL)
+            if stamp and PhotoMetadataService._is_real_stamp(stamp):
+                # "2025:12:22 14:57:45" -> DATE 2025-12-22, TIME 14:57:45(.sss)
+                day, _, clock = stamp.partition(" ")
+                values["date"] = day.replace(":", "-")
+                sub_seconds = exif.get(SUB_SEC_TIME_ORIGINAL)
+                values["time"] = f"{clock}.{sub_seconds.strip()[:3].ljust(3, '0')}" if sub_seconds else clock
+
+        if GPS_IFD_POINTER in ifd0:
+            gps = entries(ifd0[GPS_IFD_POINTER][0])
+            for field, ref_tag, tag, negative in (("latitude", GPS_LATITUDE_REF, GPS_LATITUDE, "S"),
+                                                  ("longitude", GPS_LONGITUDE_REF, GPS_LONGITUDE, "W")):
+                if tag in gps and len(gps[tag]) == 3:
+                    degrees, minutes, seconds = gps[tag]
+                    value = round(degrees + minutes / 60 + seconds / 3600, 7)
+                    values[field] = -value if gps.get(ref_tag) == negative else value
+            if GPS_ALTITUDE in gps:
+                altitude = gps[GPS_ALTITUDE][0]
+                below_sea_level = gps.get(GPS_ALTITUDE_REF, (0,))[0] == 1
+                values["altitude"] = -altitude if below_sea_level else altitude
+        return values
+
+    @staticmethod
+    def _is_real_stamp(stamp: str) -> bool:
+        """False for placeholders like "0000:00:00 00:00:00" written by cameras with an unset clock"""
+        try:
+            datetime.strptime(stamp.strip(), "%Y:%m:%d %H:%M:%S")
+        except ValueError:
+            logger.debug(f"Ignoring EXIF date {stamp!r}")
+            return False
+        return True
+
+    @staticmethod
+    def _parse_xmp(xmp: bytes) -> Dict[str, object]:
+        values: Dict[str, object] = {}
+        for tag, attribute, element in XMP_TAG_RE.findall(xmp):
+            field = XMP_FIELDS.get(tag)
+            if field is None:
+                continue
+            try:
+                values[field] = float(attribute or element)
+            except ValueError:
+                continue
+        return values
+
+    @staticmethod
+    def track_columns(sources: Iterable[Path]) -> Dict[str, np.ndarray]:
+        """The columns correlate() needs, concatenated over several SRT files or videos"""
+        import numpy as np
+        from app.services.video_metadata_service import VideoMetadataService
+
+        service = VideoMetadataService()
+        parts = [service.extract_columns(source) for source in sources]
+        names = ("datetime", "time_ms", "video_name")
+        if not parts:
+            return {
+                "datetime": np.empty(0, dtype="datetime64[ms]"),
+                "time_ms": np.empty(0, dtype=np.int64),
+                "video_name": np.empty(0, dtype=object),
+            }
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+    def correlate(self, photos: Sequence[PhotoMetadata], columns: Dict[str, "np.ndarray"],
+                  max_offset_s: float = 2.0) -> List[PhotoMetadata]:
+        """
+        Attach each photo to the video frame nearest in wall-clock time.
+
+        columns is VideoMetadataService.extract_columns output (several videos
+        may be concatenated); frames are searched by bisection on "datetime".
+        Photos further than max_offset_s from every frame stay unmatched.
+        """
+        import numpy as np
+
+        stamps = columns["datetime"]
+        known = ~np.isnat(stamps)
+        order = np.flatnonzero(known)[np.argsort(stamps[known], kind="stable")]
+        sorted_stamps = stamps[order].astype(np.int64)
+
+        matched = []
+        for photo in photos:
+            photo = photo.model_copy()
+            if photo.date and photo.time and len(sorted_stamps):
+                try:
+                    target = np.datetime64(f"{photo.date}T{photo.time}", "ms").astype(np.int64)
+                except ValueError:
+                    # A bad stamp leaves this photo unmatched instead of failing the batch
+                    logger.warning(f"Cannot read the time of {photo.photo_name}: {photo.date} {photo.time}")
+                    matched.append(photo)
+                    continue
+                position = int(np.searchsorted(sorted_stamps, target))
+                candidates = [i for i in (position - 1, position) if 0 <= i < len(sorted_stamps)]
+                best = min(candidates, key=lambda i: abs(int(sorted_stamps[i]) - target))
+                offset_s = (int(target) - int(sorted_stamps[best])) / 1000.0
+                if abs(offset_s) <= max_offset_s:
+                    frame = order[best]
+                    photo.video_name = str(columns["video_name"][frame])
+                    photo.video_time = self._video_time(int(columns["time_ms"][frame]))
+                    photo.time_offset = offset_s
+            matched.append(photo)
+
+        logger.info(f"Matched {sum(1 for p in matched if p.video_name)} of {len(photos)} photos to video frames")
+        return matched
+
+    @staticmethod
+    def _video_time(ms: int) -> str:
+        from app.services.video_metadata_service import VideoMetadataService
+
+        return VideoMetadataService._ms_to_hms(ms)
+
+    def export_csv(self, photos: Sequence[PhotoMetadata], output_path: Path) -> None:
+        from app.models.photo_metadata import PhotoMetadata
+        from app.services.exporters import open_output
+
+        with open_output(output_path, newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow([field.alias for field in PhotoMetadata.model_fields.values()])
+            for photo in photos:
+                writer.writerow(["" if v is None else v for v in photo.model_dump(by_alias=True).values()])
+        logger.info(f"Photo CSV saved: {output_path} ({len(photos)} photos)")
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import chain, islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, TextIO, Tuple
+import logging
+
+from app.services.exporters import get_exporter, is_binary_format, open_output
+from app.services.srt_io import source_name
+from app.services.video_metadata_service import VideoMetadataService
+
+if TYPE_CHECKING:
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.frame_filter import FrameFilter
+    from app.services.output_template import RowFormatter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ConversionOptions:
+    """Optional pipeline stages (picklable, so it can be sent to worker processes)"""
+
+    kinematics: bool = False  # add distance / speed / heading columns (KinematicsService)
+    resample_hz: Optional[float] = None  # one row per 1/rate seconds instead of per SRT frame
+    footprint: bool = False  # add camera target / footprint corner columns (FootprintService)
+    ground_alt: Optional[float] = None  # footprint ground elevation (m ASL); default: take-off level
+    annotations: Optional[str] = None  # CSV of time + comment merged into COMMENTS (AnnotationService)
+    annotation_mode: str = "nearest"  # or "preceding"
+    annotation_tolerance_ms: Optional[int] = None  # drop annotations further than this from any frame
+    template: Optional[str] = None  # output layout: built-in name or JSON file (OutputTemplate)
+    frame_filter: Optional[FrameFilter] = None  # bbox / polygon / time window / altitude band, applied in the parser
+
+    @property
+    def needs_columns(self) -> bool:
+        """Whether the SRT has to be read into columns instead of streamed"""
+        return self.kinematics or self.footprint or self.resample_hz is not None
+
+
+class PipelineService:
+    """
+    Constant-memory SRT → output pipeline.
+
+    Frames are pulled from VideoMetadataService.iter_frames and handed to the
+    exporter in batches of at most batch_size frames, so peak memory depends
+    on the batch size and not on the length of the flight.
+    """
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+
+    def _batches(self, frames: Iterable[VideoFrameMetadata]) -> Iterator[List[VideoFrameMetadata]]:
+        iterator = iter(frames)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def write(self, frames: Iterable[VideoFrameMetadata], stream: TextIO, fmt: str = "csv",
+              header: bool = True, extra_columns: Optional[Mapping[str, Sequence]] = None,
+              formatter: Optional[RowFormatter] = None) -> int:
+        """Stream frames to an open text stream (binary for XLSX) and return the number written"""
+        exporter = get_exporter(fmt)
+        if is_binary_format(fmt):
+            # A workbook is one file: all frames go through a single write() call
+            written = 0
+
+            def counted() -> Iterator[VideoFrameMetadata]:
+                nonlocal written
+                for frame in frames:
+                    written += 1
+                    yield frame
+
+            exporter.write(counted(), stream, header=header, extra_columns=extra_columns, formatter=formatter)
+            return written
+        count = 0
+        for batch in self._batches(frames):
+            extras = None
+            if extra_columns:
+                extras = {name: values[count:count + len(batch)] for name, values in extra_columns.items()}
+            exporter.write(batch, stream, header=header and count == 0, extra_columns=extras, formatter=formatter)
+            count += len(batch)
+        return count
+
+    @staticmethod
+    def extra_column_names(options: Optional[ConversionOptions] = None) -> List[str]:
+        """Names of the extra columns the options add, in output order"""
+        names: List[str] = []
+        if options is None:
+            return names
+        if options.kinematics:
+            from app.services.kinematics_service import KinematicsService
+
+            names.extend(KinematicsService.COLUMNS)
+        if options.footprint:
+            from app.services.footprint_service import FootprintService
+
+            names.extend(FootprintService.COLUMNS)
+        return names
+
+    @staticmethod
+    def formatter(options: Optional[ConversionOptions] = None) -> Optional[RowFormatter]:
+        """The compiled output template of the options (a fresh one per output file)"""
+        if options is None or options.template is None:
+            return None
+        from app.services.output_template import OutputTemplate
+
+        return OutputTemplate.load(options.template).compile()
+
+    def frames(self, video_path: Path, options: Optional[ConversionOptions] = None
+               ) -> Tuple[Iterator[VideoFrameMetadata], Optional[Dict[str, Sequence]]]:
+        """
+        Frames of an SRT plus the extra columns requested by options.
+
+        Without options the frames are streamed. Derived columns need whole
+        columns, so then the SRT is read into compact NumPy arrays first and
+        frame models are still built one batch at a time.
+        """
+        if options is None:
+            return VideoMetadataService().iter_frames(video_path), None
+
+        if options.needs_columns:
+            frames, extra_columns = self._column_frames(video_path, options)
+        else:
+            frames, extra_columns = VideoMetadataService().iter_frames(video_path, options.frame_filter), None
+
+        if options.annotations:
+            from app.services.annotation_service import AnnotationService
+
+            annotations = AnnotationService.from_csv(
+                Path(options.annotations),
+                mode=options.annotation_mode,
+                tolerance_ms=options.annotation_tolerance_ms,
+            )
+            frames = annotations.for_video(source_name(video_path)).merge(frames)
+        return frames, extra_columns
+
+    def _column_frames(self, video_path: Path, options: ConversionOptions
+                       ) -> Tuple[Iterator[VideoFrameMetadata], Optional[Dict[str, Sequence]]]:
+        service = VideoMetadataService()
+        columns = service.extract_columns(video_path, options.frame_filter)
+        if options.resample_hz is not None:
+            from app.services.resample_service import ResampleService
+
+            columns = ResampleService().resample(columns, rate_hz=options.resample_hz)
+
+        extra_columns: Dict[str, Sequence] = {}
+        if options.kinematics:
+            from app.services.kinematics_service import KinematicsService
+
+            extra_columns.update(KinematicsService().compute(columns))
+        if options.footprint:
+            from app.services.footprint_service import FootprintService
+
+            extra_columns.update(FootprintService(ground_alt=options.ground_alt).compute(columns))
+        return service.frames_from_columns(columns), extra_columns or None
+
+    def run(self, video_path: Path, output_path: Path, fmt: str = "csv", header: bool = True,
+            options: Optional[ConversionOptions] = None) -> int:
+        """Extract an SRT straight into an output file and return the number of frames"""
+        frames, extra_columns = self.frames(video_path, options)
+
+        # Peek first so an SRT without GPS data does not leave an empty output file
+        first = next(frames, None)
+        if first is None:
+            logger.error(f"No GPS frames in {video_path}")
+            raise ValueError("No frames to export")
+
+        logger.info(f"Streaming {video_path} -> {output_path}")
+        binary = is_binary_format(fmt)
+        with open_output(output_path, binary) as f:
+            count = self.write(chain([first], frames), f, fmt, header=header, extra_columns=extra_columns,
+                               formatter=self.formatter(options))
+        logger.info(f"Pipeline finished: {count} frames written to {output_path}")
+        return count
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import json
+import logging
+
+from app.services.exporters import open_output
+from app.services.srt_io import source_base, source_name
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+SIDECAR_SUFFIX = ".quality.json"
+
+# Report check name -> description (also the order of the report)
+CHECKS = {
+    "frame_cnt_gaps": "FrameCnt skips numbers (frames missing from the SRT)",
+    "frame_cnt_repeats": "FrameCnt repeats or goes backwards",
+    "diff_time_jitter": "DiffTime far from the nominal frame interval",
+    "non_monotonic_time": "SRT timecode does not increase",
+    "gps_jumps": "Position change implies an impossible ground speed",
+    "altitude_spikes": "Altitude change implies an impossible vertical speed",
+    "missing_gps": "Frames skipped for missing GPS",
+}
+
+
+def sidecar_path_for(source: Path) -> Path:
+    """DJI_0001.SRT (or .SRT.gz, flight.zip/DJI_0001.SRT) -> DJI_0001.quality.json"""
+    base = source_base(source)
+    return base.with_name(base.stem + SIDECAR_SUFFIX)
+
+
+class QualityService:
+    """
+    Single-pass telemetry quality scan over extract_columns output.
+
+    Every check is one vectorised comparison over whole columns; flagged
+    rows are collapsed into index ranges (0-based data rows of the CSV), so
+    the report stays small even for a bad multi-hour flight. "events" counts
+    the ranges; gaps and skipped frames also report their "frames".
+
+    Speeds are measured between successive distinct GPS fixes, timed at the
+    first frame showing each fix: positions update slower than the frame
+    rate, so frame-to-frame steps would look like bursts of speed.
+    """
+
+    def __init__(self, max_speed_mps: float = 40.0, max_vertical_speed_mps: float = 15.0,
+                 jitter_ms: float = 8.0, max_ranges: int = 50):
+        self.max_speed_mps = max_speed_mps
+        self.max_vertical_speed_mps = max_vertical_speed_mps
+        self.jitter_ms = jitter_ms
+        self.max_ranges = max_ranges
+
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        return {
+            "max_speed_mps": self.max_speed_mps,
+            "max_vertical_speed_mps": self.max_vertical_speed_mps,
+            "jitter_ms": self.jitter_ms,
+        }
+
+    def scan_file(self, video_path: Path, columns: Optional[Dict[str, np.ndarray]] = None,
+                  no_gps_ms: Sequence[int] = ()) -> dict:
+        """
+        Read an SRT (or video) and scan it. Callers that already extracted its
+        columns (and the service's no_gps_ms) pass them to skip the second parse.
+        """
+        if columns is None:
+            from app.services.video_metadata_service import VideoMetadataService
+
+            service = VideoMetadataService()
+            columns = service.extract_columns(video_path)
+            no_gps_ms = service.no_gps_ms
+        report = self.scan(columns, no_gps_ms=no_gps_ms)
+        report["source"] = source_name(video_path)
+        return report
+
+    def scan(self, columns: Dict[str, np.ndarray], no_gps_ms: Sequence[int] = ()) -> dict:
+        """Quality report of the frames: counts and index ranges per check"""
+        import numpy as np
+
+        time_ms = columns["time_ms"]
+        count = len(time_ms)
+        flags: Dict[str, np.ndarray] = {}
+
+        # Row i is flagged for a problem between rows i - 1 and i
+        frame_cnt = columns["frame_cnt"]
+        step = np.diff(frame_cnt)
+        known = ~np.isnan(step)
+        flags["frame_cnt_gaps"] = self._rows(known & (step > 1), count)
+        missing_frames = int(np.sum(step[known & (step > 1)] - 1))
+        flags["frame_cnt_repeats"] = self._rows(known & (step <= 0), count)
+
+        diff_time = columns["diff_time_ms"]
+        known_diff = diff_time[~np.isnan(diff_time)]
+        if len(known_diff):
+            nominal = float(np.median(known_diff))
+            flags["diff_time_jitter"] = np.abs(diff_time - nominal) > self.jitter_ms  # NaN compares False
+        else:
+            nominal = None
+            flags["diff_time_jitter"] = np.zeros(count, dtype=bool)
+
+        flags["non_monotonic_time"] = self._rows(np.diff(time_ms) <= 0, count)
+
+        flags["gps_jumps"] = self._fast_changes(
+            time_ms, self._ground_distances(columns["latitude"], columns["longitude"]),
+            columns["latitude"], columns["longitude"], self.max_speed_mps,
+        )
+        altitude = columns["abs_alt"]
+        flags["altitude_spikes"] = self._fast_changes(
+            time_ms, np.abs(np.diff(altitude)), altitude, None, self.max_vertical_speed_mps,
+        )
+
+        checks = {}
+        for name, mask in flags.items():
+            ranges = self._ranges(mask)
+            checks[name] = {
+                "rows": int(np.count_nonzero(mask)),
+                "events": len(ranges),
+                "ranges": [self._range_info(columns, first, last) for first, last in ranges[:self.max_ranges]],
+            }
+            if len(ranges) > self.max_ranges:
+                checks[name]["truncated"] = True
+        checks["frame_cnt_gaps"]["frames"] = missing_frames
+        checks["missing_gps"] = self._missing_gps(time_ms, no_gps_ms)
+        checks = {name: checks[name] for name in CHECKS}
+
+        issues = sum(check["events"] for check in checks.values())
+        report = {
+            "frames": count,
+            "duration_s": round(float(time_ms[-1] - time_ms[0]) / 1000, 3) if count else 0.0,
+            "nominal_diff_time_ms": nominal,
+            "issues": issues,
+            "thresholds": self.thresholds,
+            "checks": checks,
+        }
+        logger.info(f"Quality scan: {count} frames, {issues} issues")
+        return report
+
+    @staticmethod
+    def _rows(between: np.ndarray, count: int) -> np.ndarray:
+        """Row flags from flags between consecutive rows (the later row is flagged)"""
+        import numpy as np
+
+        rows = np.zeros(count, dtype=bool)
+        rows[1:] = between
+        return rows
+
+    @staticmethod
+    def _ground_distances(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """Haversine distance in metres between consecutive positions"""
+        import numpy as np
+
+        lat = np.radians(latitude)
+        dlat = np.diff(lat)
+        dlon = np.diff(np.radians(longitude))
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    @staticmethod
+    def _fast_changes(time_ms: np.ndarray, distances: np.ndarray, values: np.ndarray,
+                      other: Optional[np.ndarray], max_speed: float) -> np.ndarray:
+        """
+        Flag rows where a value changes faster than max_speed (units per second).
+
+        A change is timed from the first row that showed the previous value,
+        so a value that is held for several frames is not mistaken for a jump.
+        """
+        import numpy as np
+
+        count = len(time_ms)
+        flags = np.zeros(count, dtype=bool)
+        if count < 2:
+            return flags
+        moved = values[1:] != values[:-1]
+        if other is not None:
+            moved |= other[1:] != other[:-1]
+        changes = np.flatnonzero(np.concatenate(([True], moved & ~np.isnan(distances))))
+
+        later = changes[1:]
+        elapsed_s = (time_ms[later] - time_ms[changes[:-1]]) / 1000.0
+        # The distance of each change is the step into its first row
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = distances[later - 1] / elapsed_s
+        flags[later[(elapsed_s > 0) & (speed > max_speed)]] = True
+        return flags
+
+    @staticmethod
+    def _ranges(mask: np.ndarray) -> List[tuple]:
+        """(first, last) index pairs of the runs of True"""
+        import numpy as np
+
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+        return list(zip(edges[::2].tolist(), (edges[1::2] - 1).tolist()))
+
+    @staticmethod
+    def _range_info(columns: Dict[str, np.ndarray], first: int, last: int) -> dict:
+        from app.services.video_metadata_service import VideoMetadataService
+
+        return {
+            "first": first,
+            "last": last,
+            "time": VideoMetadataService._ms_to_hms(int(columns["time_ms"][first])),
+        }
+
+    def _missing_gps(self, time_ms: np.ndarray, no_gps_ms: Sequence[int]) -> dict:
+        """Skipped frames grouped by the row they precede (a run of dropped frames is one range)"""
+        import numpy as np
+        from app.services.video_metadata_service import VideoMetadataService
+
+        dropped = np.asarray(no_gps_ms, dtype=np.int64)
+        before, starts, counts = np.unique(np.searchsorted(time_ms, dropped), return_index=True, return_counts=True)
+        ranges = [
+            {"before": int(row), "frames": int(frames), "time": VideoMetadataService._ms_to_hms(int(dropped[start]))}
+            for row, start, frames in zip(before[:self.max_ranges], starts, counts)
+        ]
+        check = {"rows": 0, "events": len(before), "frames": len(dropped), "ranges": ranges}
+        if len(before) > self.max_ranges:
+            check["truncated"] = True
+        return check
+
+    @staticmethod
+    def summary(report: dict) -> str:
+        """A few lines for people: one per check that found something"""
+        lines = [f"{report['frames']} frames, {report['duration_s']:.1f} s: "
+                 + (f"{report['issues']} issues" if report["issues"] else "no issues found")]
+        for name, check in report["checks"].items():
+            if not check["events"]:
+                continue
+            where = ", ".join(r["time"] for r in check["ranges"][:3])
+            more = " ..." if len(check["ranges"]) > 3 or check.get("truncated") else ""
+            lines.append(f"• {CHECKS[name]}: {check['events']} (at {where}{more})")
+        return "\n".join(lines)
+
+    @staticmethod
+    def write_sidecar(report: dict, source: Path) -> Path:
+        """Write the report as JSON next to the source and return its path"""
+        path = sidecar_path_for(source)
+        with open_output(path) as f:
+            json.dump(report, f, indent=1)
+        logger.info(f"Quality report saved: {path}")
+        return path
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+import logging
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResampleService:
+    """
+    Resample extracted telemetry columns to a fixed rate or to given timestamps.
+
+    Works on the output of VideoMetadataService.extract_columns. Positions and
+    other continuous values are interpolated linearly, yaw angles along the
+    shortest arc (so -179° → 179° does not sweep through 0°), and discrete
+    fields (frame counter, camera settings, names) hold the previous sample.
+    """
+
+    # Angles in degrees that wrap at ±180
+    ANGLE_FIELDS = ("drone_yaw", "gb_yaw")
+
+    # Step-wise fields: the value of the latest sample at or before the target time
+    HOLD_FIELDS = ("frame_cnt", "diff_time_ms", "focal_len", "dzoom", "iso", "fnum", "ev", "date", "video_name")
+
+    # Interpolated values are rounded (7 decimals of a degree is about 1 cm); other fields keep 3
+    DECIMALS = {"latitude": 7, "longitude": 7}
+
+    def __init__(self, max_gap_ms: Optional[float] = None):
+        # Targets inside a longer gap between samples get NaN instead of a straight line
+        self.max_gap_ms = max_gap_ms
+
+    @staticmethod
+    def grid(start_ms: float, end_ms: float, rate_hz: float) -> np.ndarray:
+        """Times (ms) of a fixed-rate grid anchored at 0, e.g. video frame times, within [start, end]"""
+        import numpy as np
+
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        period = 1000.0 / rate_hz
+        first = np.ceil(start_ms / period - 1e-9)
+        last = np.floor(end_ms / period + 1e-9)
+        return np.arange(first, last + 1) * period
+
+    def resample(self, columns: Dict[str, np.ndarray], rate_hz: Optional[float] = None,
+                 timestamps_ms: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Return the columns sampled at rate_hz (within the recorded time range)
+        or at timestamps_ms. Times outside the recorded range give NaN.
+        """
+        import numpy as np
+
+        if (rate_hz is None) == (timestamps_ms is None):
+            raise ValueError("Give exactly one of rate_hz or timestamps_ms")
+
+        times = columns["time_ms"].astype(np.float64)
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        if timestamps_ms is None:
+            if len(times) == 0:
+                targets = np.empty(0)
+            else:
+                targets = self.grid(times[0], times[-1], rate_hz)
+        else:
+            targets = np.asarray(timestamps_ms, dtype=np.float64)
+
+        # Index of the latest sample at or before each target (-1 before the first one)
+        previous = np.searchsorted(times, targets, side="right") - 1
+        outside = (previous < 0) | (targets > (times[-1] if len(times) else -np.inf))
+        held = np.clip(previous, 0, max(len(times) - 1, 0))
+
+        gap_mask = outside
+        if self.max_gap_ms is not None and len(times) > 1:
+            following = np.clip(previous + 1, 0, len(times) - 1)
+            gap_mask = outside | (times[following] - times[held] > self.max_gap_ms)
+
+        resampled: Dict[str, np.ndarray] = {"time_ms": np.round(targets).astype(np.int64)}
+        for name, values in columns.items():
+            if name == "time_ms":
+                continue
+            values = values[order]
+            if name in self.HOLD_FIELDS or values.dtype == object:
+                if len(values):
+                    out = values[held]
+                else:
+                    out = np.empty(len(targets), dtype=values.dtype)
+                if out.dtype.kind == "f":
+                    out = np.where(outside, np.nan, out)
+            elif values.dtype.kind == "M":
+                stamps = self._interp(times, values.astype(np.int64).astype(np.float64), targets, nat=True)
+                out = np.full(len(targets), np.datetime64("NaT"), dtype=values.dtype)
+                known = ~np.isnan(stamps)
+                out[known] = np.round(stamps[known]).astype(np.int64).astype(values.dtype)
+            elif name in self.ANGLE_FIELDS:
+                out = np.round(self._interp_angle(times, values, targets), 3)
+            else:
+                out = np.round(self._interp(times, values.astype(np.float64), targets), self.DECIMALS.get(name, 3))
+            if out.dtype.kind == "f":
+                out[gap_mask] = np.nan
+            elif out.dtype.kind == "M":
+                out[gap_mask] = np.datetime64("NaT")
+            resampled[name] = out
+
+        logger.info(f"Resampled {len(times)} samples to {len(targets)} timestamps")
+        return resampled
+
+    @staticmethod
+    def _interp(times: np.ndarray, values: np.ndarray, targets: np.ndarray, nat: bool = False) -> np.ndarray:
+        """Linear interpolation over the valid (non-NaN / non-NaT) samples only"""
+        import numpy as np
+
+        valid = values != np.iinfo(np.int64).min if nat else ~np.isnan(values)
+        if not valid.any():
+            return np.full(len(targets), np.nan)
+        return np.interp(targets, times[valid], values[valid], left=np.nan, right=np.nan)
+
+    @classmethod
+    def _interp_angle(cls, times: np.ndarray, degrees: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Interpolate angles along the shortest arc and wrap the result to [-180, 180)"""
+        import numpy as np
+
+        valid = ~np.isnan(degrees)
+        unwrapped = np.full(len(degrees), np.nan)
+        unwrapped[valid] = np.unwrap(degrees[valid], period=360.0)
+        out = cls._interp(times, unwrapped, targets)
+        return (out + 180.0) % 360.0 - 180.0
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import AnyStr, Dict, List, Optional, Pattern, Sequence, Tuple
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Lines read from the top of a file to detect its dialect and layout
+DETECT_LINES = 200
+
+# SRT timecode line, the first line of every block searched
+TIMECODE_RE = re.compile(rb"\d+:\d+:\d+,\d+\s*-->")
+
+
+@dataclass(frozen=True)
+class SrtDialect:
+    """
+    Where one DJI firmware family writes the fields of an SRT block.
+
+    Each field pattern is a bytes regex whose group 1 is the value; timecode
+    captures hours, minutes, seconds and milliseconds. Dates that are not
+    "YYYY-MM-DD HH:MM:SS.fff" (iso_dates False) are rewritten by iso_date.
+    """
+
+    name: str
+    latitude: bytes
+    longitude: bytes
+    altitude: bytes
+    date: bytes
+    timecode: bytes = rb"(\d+):(\d+):(\d+),(\d+)"
+    # Part of every timecode match that starts with a literal, so a whole file can be scanned for it fast
+    timecode_anchor: bytes = rb":\d+,\d"
+    iso_dates: bool = True
+    zero_is_no_fix: bool = False  # GPS(0.0000,0.0000,0) is written before the first fix
+
+    def patterns(self, text: bool = False) -> Tuple[Pattern, ...]:
+        """(timecode, latitude, longitude, altitude, date) regexes, for str lines when text is True"""
+        sources = (self.timecode, self.latitude, self.longitude, self.altitude, self.date)
+        return tuple(re.compile(s.decode("ascii") if text else s) for s in sources)
+
+
+# Detection order: the first dialect with the most position matches wins
+DIALECTS: Dict[str, SrtDialect] = {
+    # Mavic 3 / Mini 3 / Mini 4 / Air 3 / Matrice 30 / Avata:
+    # [latitude: 31.240786] [longitude: 34.787997] [rel_alt: 60.000 abs_alt: 358.109]
+    "bracket": SrtDialect(
+        name="bracket",
+        latitude=rb"\[latitude:\s*([-\d.]+)\]",
+        longitude=rb"\[longitude:\s*([-\d.]+)\]",
+        altitude=rb"abs_alt:\s*([-\d.]+)",
+        date=rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)",
+    ),
+    # Mavic Air 2 / Mini 2 early firmware:
+    # [latitude : 22.541200] [longtitude : 113.951300] [altitude: 27.104000], 2020-07-25 17:13:26,427,016
+    "legacy_bracket": SrtDialect(
+        name="legacy_bracket",
+        latitude=rb"\[latitude\s*:\s*([-\d.]+)\]",
+        longitude=rb"\[longt?itude\s*:\s*([-\d.]+)\]",
+        altitude=rb"\[altitude\s*:\s*([-\d.]+)\]",
+        date=rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[.,]\d+)",
+        # The date line "17:13:26,427,016" would pass for a timecode
+        timecode=rb"(\d+):(\d+):(\d+),(\d+)\s*-->",
+        iso_dates=False,
+    ),
+    # Phantom 3 / Phantom 4 / Mavic Pro / Inspire 2 (longitude first):
+    # HOME(149.0251,-20.2532) 2017.08.05 14:11:51  GPS(149.0251,-20.2533,16) BAROMETER:1.9
+    # F/2.8, SS 320, ISO 100, EV 0, GPS (8.6088, 49.8438, 19), D 24.35m, H 6.60m
+    "gps": SrtDialect(
+        name="gps",
+        latitude=rb"GPS\s*\(\s*[-\d.]+\s*,\s*([-\d.]+)",
+        longitude=rb"GPS\s*\(\s*([-\d.]+)",
+        altitude=rb"GPS\s*\(\s*[-\d.]+\s*,\s*[-\d.]+\s*,\s*([-\d.]+)",
+        date=rb"(\d{4}[.-]\d{2}[.-]\d{2} \d{2}:\d{2}:\d{2}(?:[.,]\d+)?)",
+        iso_dates=False,
+        zero_is_no_fix=True,
+    ),
+}
+
+DEFAULT_DIALECT = DIALECTS["bracket"]
+
+
+def iso_date(stamp: AnyStr) -> AnyStr:
+    """2017.08.05 14:11:51 -> 2017-08-05 14:11:51, 2020-07-25 17:13:26,427,016 -> ...26.427"""
+    space, dot, dash, comma = (" ", ".", "-", ",") if isinstance(stamp, str) else (b" ", b".", b"-", b",")
+    day, _, clock = stamp.partition(space)
+    seconds, _, fraction = clock.partition(comma)
+    if fraction:
+        clock = seconds + dot + fraction.split(comma)[0]
+    return day.replace(dot, dash) + space + clock
+
+
+class SrtLayout:
+    """
+    A dialect plus the fixed positions of its fields in this file's blocks.
+
+    lines holds, for latitude, longitude, altitude and date, the line offset
+    from the timecode line at which the field was found in every sampled
+    block, or None when it moves around. The parsers try that one line
+    first and search the whole block window only when it does not match.
+    """
+
+    def __init__(self, dialect: SrtDialect, lines: Sequence[Optional[int]] = (None, None, None, None)):
+        self.dialect = dialect
+        self.lines = tuple(lines)
+
+    def __repr__(self) -> str:
+        return f"SrtLayout({self.dialect.name!r}, lines={self.lines})"
+
+    @classmethod
+    def detect(cls, head: Sequence[bytes], dialect: Optional[SrtDialect] = None) -> SrtLayout:
+        """
+        Layout of a file from its first lines (bytes).
+
+        The dialect with the most latitude matches wins (DEFAULT_DIALECT when
+        none matches, e.g. no GPS fix yet); a given dialect is only measured.
+        """
+        text = b"\n".join(head)
+        if dialect is None:
+            counts = [(len(re.findall(d.latitude, text)), d) for d in DIALECTS.values()]
+            best, found = max(counts, key=lambda item: item[0])
+            dialect = found if best else DEFAULT_DIALECT
+
+        starts = [i for i, line in enumerate(head) if TIMECODE_RE.search(line)]
+        # The last block may be cut off by the end of the head
+        blocks = [head[start:end] for start, end in zip(starts, starts[1:])]
+        lines: List[Optional[int]] = []
+        for source in (dialect.latitude, dialect.longitude, dialect.altitude, dialect.date):
+            pattern = re.compile(source)
+            offsets = {next((i for i, line in enumerate(block) if pattern.search(line)), None) for block in blocks}
+            # Blocks without the field (no GPS fix yet) do not count against a position
+            offsets.discard(None)
+            lines.append(offsets.pop() if len(offsets) == 1 else None)
+        layout = cls(dialect, lines)
+        logger.debug(f"Detected {layout}")
+        return layout
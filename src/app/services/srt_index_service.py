@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional
+import codecs
+import logging
+import os
+import re
+import struct
+import sys
+
+from app.services.srt_io import SRT_SUFFIX, detect_encoding, is_packed_source
+from app.services.video_metadata_service import VideoMetadataService
+
+if TYPE_CHECKING:
+    from app.models.video_frame_metadata import VideoFrameMetadata
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+
+# Unsigned 32-bit typecode of this platform ("I" everywhere in practice)
+_U32 = "I" if array("I").itemsize == 4 else "L"
+
+_TIME_RE = re.compile(rb"(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->")
+_FRAME_CNT_RE = re.compile(rb"FrameCnt\s*:\s*(\d+)")
+
+
+def index_path_for(srt_path: Path) -> Path:
+    """Sidecar index path: DJI_0001.SRT -> DJI_0001.SRT.idx"""
+    return srt_path.with_name(srt_path.name + INDEX_SUFFIX)
+
+
+def unindexable_reason(srt_path: Path) -> Optional[str]:
+    """
+    Why a source cannot be indexed, None when it can. Offsets point into the
+    file as stored, so only plain (not compressed or archived) 8-bit SRTs qualify.
+    """
+    if is_packed_source(srt_path):
+        return "compressed and archived SRTs cannot be indexed"
+    if srt_path.suffix.upper() != SRT_SUFFIX:
+        return "only .SRT files can be indexed"
+    with srt_path.open("rb") as f:
+        if detect_encoding(f.read(4)) is not None:
+            return "UTF-16/32 encoded SRTs cannot be indexed"
+    return None
+
+
+class SrtIndex:
+    """
+    Byte offset, FrameCnt and start time of every block of an SRT file.
+
+    Stored as packed little-endian arrays (16 bytes per block) after a small
+    header that records the size and mtime of the indexed file, so a stale
+    index is detected and rebuilt.
+    """
+
+    MAGIC = b"DJISRTIX"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIQqQ")  # magic, version, source size, source mtime_ns, block count
+
+    def __init__(self, offsets: array, frame_counts: array, times_ms: array,
+                 source_size: int = 0, source_mtime_ns: int = 0):
+        self.offsets = offsets            # "Q": byte offset of the block (its counter line)
+        self.frame_counts = frame_counts  # u32: FrameCnt, 0 when the block has none
+        self.times_ms = times_ms          # u32: start timecode in milliseconds
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls, srt_path: Path) -> SrtIndex:
+        """Index an SRT file in one scan over its raw lines"""
+        reason = unindexable_reason(srt_path)
+        if reason is not None:
+            raise ValueError(f"Cannot index {srt_path}: {reason}")
+        offsets, frame_counts, times_ms = array("Q"), array(_U32), array(_U32)
+        st = srt_path.stat()
+
+        with srt_path.open("rb") as f:
+            position = 0
+            previous_line = b""
+            previous_position = 0
+            in_block = False
+            for line in f:
+                if b"-->" in line:
+                    time_match = _TIME_RE.search(line)
+                    if time_match:
+                        if in_block:
+                            frame_counts.append(0)  # previous block had no FrameCnt
+                        h, m, s, ms = map(int, time_match.groups())
+                        # The block starts at its counter line when there is one
+                        counter = previous_line.lstrip(codecs.BOM_UTF8).strip()
+                        start = previous_position if counter.isdigit() else position
+                        offsets.append(start)
+                        times_ms.append(((h * 60 + m) * 60 + s) * 1000 + ms)
+                        in_block = True
+                elif in_block and b"FrameCnt" in line:
+                    frame_match = _FRAME_CNT_RE.search(line)
+                    if frame_match:
+                        frame_counts.append(int(frame_match.group(1)))
+                        in_block = False
+                previous_line, previous_position = line, position
+                position += len(line)
+            if in_block:
+                frame_counts.append(0)
+
+        logger.info(f"Indexed {len(offsets)} blocks of {srt_path}")
+        return cls(offsets, frame_counts, times_ms, st.st_size, st.st_mtime_ns)
+
+    def save(self, path: Path) -> None:
+        """Write the index atomically"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.source_size, self.source_mtime_ns, len(self)))
+            for values in (self.offsets, self.frame_counts, self.times_ms):
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> SrtIndex:
+        """Read an index file (ValueError if it is not a valid index)"""
+        with path.open("rb") as f:
+            header = f.read(cls.HEADER.size)
+            if len(header) != cls.HEADER.size:
+                raise ValueError(f"Truncated index: {path}")
+            magic, version, size, mtime_ns, count = cls.HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f"Not an SRT index (or another version): {path}")
+            columns = []
+            for typecode in ("Q", _U32, _U32):
+                values = array(typecode)
+                try:
+                    values.fromfile(f, count)
+                except EOFError:
+                    raise ValueError(f"Truncated index: {path}") from None
+                if sys.byteorder == "big":
+                    values.byteswap()
+                columns.append(values)
+        return cls(*columns, source_size=size, source_mtime_ns=mtime_ns)
+
+    def is_current(self, srt_path: Path) -> bool:
+        """Whether the index still describes the file (same size and mtime)"""
+        st = srt_path.stat()
+        return st.st_size == self.source_size and st.st_mtime_ns == self.source_mtime_ns
+
+    def _is_sorted(self, values: array) -> bool:
+        return all(a <= b for a, b in zip(values, values[1:]))
+
+    def position_of_frame(self, frame_cnt: int) -> Optional[int]:
+        """Position (block number) of the block with this FrameCnt, or None"""
+        counts = self.frame_counts
+        if self._is_sorted(counts):
+            position = bisect_left(counts, frame_cnt)
+            return position if position < len(counts) and counts[position] == frame_cnt else None
+        try:
+            return counts.index(frame_cnt)
+        except ValueError:
+            return None
+
+    def positions_between(self, start_ms: int, end_ms: int) -> range:
+        """Positions of the blocks whose start time is within [start_ms, end_ms] (timecodes are ascending)"""
+        return range(bisect_left(self.times_ms, start_ms), bisect_right(self.times_ms, end_ms))
+
+
+class SrtIndexService:
+    """Random access to SRT frames through a sidecar .SRT.idx index (built on first use)"""
+
+    def __init__(self, persist: bool = True):
+        # Write built indexes next to the SRT so later reads skip the scan
+        self.persist = persist
+        self._metadata = VideoMetadataService()
+
+    def index(self, srt_path: Path, rebuild: bool = False) -> SrtIndex:
+        """Load the sidecar index, or build (and save) it when missing or stale"""
+        path = index_path_for(srt_path)
+        if not rebuild and path.exists():
+            try:
+                index = SrtIndex.load(path)
+                if index.is_current(srt_path):
+                    return index
+                logger.info(f"Index is stale, rebuilding: {path}")
+            except (OSError, ValueError) as err:
+                logger.warning(f"Ignoring unreadable index {path}: {err}")
+
+        index = SrtIndex.build(srt_path)
+        if self.persist:
+            try:
+                index.save(path)
+            except OSError as err:
+                # Read-only media: the index still works in memory
+                logger.warning(f"Cannot write index {path}: {err}")
+        return index
+
+    def read_frame(self, srt_path: Path, frame_cnt: int) -> Optional[VideoFrameMetadata]:
+        """The frame with this FrameCnt, or None if there is no such GPS frame"""
+        index = self.index(srt_path)
+        position = index.position_of_frame(frame_cnt)
+        if position is None:
+            return None
+        end_ms = index.times_ms[position]
+        frames = self._metadata.iter_frames_from(srt_path, index.offsets[position], end_ms=end_ms, limit=1)
+        return next(frames, None)
+
+    def iter_range(self, srt_path: Path, start_ms: int, end_ms: int) -> Iterator[VideoFrameMetadata]:
+        """Yield the GPS frames whose SRT time is within [start_ms, end_ms], reading only that part"""
+        index = self.index(srt_path)
+        positions = index.positions_between(start_ms, end_ms)
+        if not positions:
+            return iter(())
+        return self._metadata.iter_frames_from(srt_path, index.offsets[positions.start], end_ms=end_ms)
+
+    def read_range(self, srt_path: Path, start_ms: int, end_ms: int) -> List[VideoFrameMetadata]:
+        return list(self.iter_range(srt_path, start_ms, end_ms))
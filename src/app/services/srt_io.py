@@ -0,0 +1,251 @@
+import codecs
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+# Encodings tried, in order, for the few text fields that need decoding
+TEXT_FALLBACK_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+
+SRT_SUFFIX = ".SRT"
+# Compressed SRTs (DJI_0001.SRT.gz); zstandard is an optional dependency
+COMPRESSED_SUFFIXES = (".GZ", ".ZST")
+# Archives whose SRT members are addressed as paths below them: flight.zip/DJI_0001.SRT
+ARCHIVE_SUFFIX = ".ZIP"
+
+# Decompressed chunks buffered between the reader thread and the parser
+PREFETCH_CHUNK_SIZE = 1 << 20
+PREFETCH_DEPTH = 4
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+def detect_encoding(head: bytes) -> Optional[str]:
+    """
+    Detect a wide (UTF-16/32) encoding from the first bytes of a file.
+
+    Returns None for ASCII-compatible files (UTF-8, cp1252, ...), which are
+    parsed as raw bytes. BOM-less UTF-16 is recognised by its NUL bytes.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return None if encoding == "utf-8-sig" else encoding
+    if len(head) >= 4 and head[0] != 0 and head[1] == 0 and head[3] == 0:
+        return "utf-16-le"
+    if len(head) >= 4 and head[0] == 0 and head[1] != 0 and head[2] == 0:
+        return "utf-16-be"
+    return None
+
+
+def iter_byte_lines(f: BinaryIO) -> Iterator[bytes]:
+    """
+    Yield the lines of an SRT stream as ASCII-compatible bytes.
+
+    Regular files are passed through untouched (no decoding at all); a UTF-8
+    BOM is dropped and UTF-16/32 files are transcoded to UTF-8 line by line.
+    """
+    head = f.peek(4)[:4] if hasattr(f, "peek") else b""
+    encoding = detect_encoding(head)
+
+    if encoding is not None:
+        text = io.TextIOWrapper(f, encoding=encoding, errors="replace")
+        try:
+            for line in text:
+                yield line.lstrip("\ufeff").encode("utf-8")
+        finally:
+            # Leave the caller's stream open
+            text.detach()
+        return
+
+    first = True
+    for line in f:
+        if first:
+            first = False
+            if line.startswith(codecs.BOM_UTF8):
+                line = line[len(codecs.BOM_UTF8):]
+        yield line
+
+
+def open_byte_lines(path: Path) -> Iterator[bytes]:
+    """Open an SRT source and yield its lines as bytes (see iter_byte_lines and open_source)"""
+    with open_source(path) as f:
+        yield from iter_byte_lines(f)
+
+
+def decode_text(raw: bytes) -> str:
+    """Decode a text field, falling back through TEXT_FALLBACK_ENCODINGS"""
+    for encoding in TEXT_FALLBACK_ENCODINGS:
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("latin-1")  # pragma: no cover - latin-1 decodes any byte
+
+
+def split_archive_path(path: Path) -> Optional[Tuple[Path, str]]:
+    """(archive, member name) when path points inside a .zip archive, else None"""
+    for parent in path.parents:
+        if parent.suffix.upper() == ARCHIVE_SUFFIX and parent.is_file():
+            return parent, path.relative_to(parent).as_posix()
+    return None
+
+
+def is_srt_source(path: Path) -> bool:
+    """Whether the name is an SRT, plain or compressed (DJI_0001.SRT, DJI_0001.SRT.gz)"""
+    suffixes = [s.upper() for s in path.suffixes[-2:]]
+    if suffixes and suffixes[-1] in COMPRESSED_SUFFIXES:
+        suffixes.pop()
+    return bool(suffixes) and suffixes[-1] == SRT_SUFFIX
+
+
+def is_packed_source(path: Path) -> bool:
+    """Whether the SRT has to be decompressed (compressed file or archive member)"""
+    return path.suffix.upper() in COMPRESSED_SUFFIXES or split_archive_path(path) is not None
+
+
+def source_base(path: Path) -> Path:
+    """
+    The plain SRT path a source stands for, used to name outputs:
+    DJI_0001.SRT.gz -> DJI_0001.SRT, flight.zip/DJI_0001.SRT -> DJI_0001.SRT next to the archive.
+    """
+    if path.suffix.upper() in COMPRESSED_SUFFIXES:
+        path = path.with_suffix("")
+    archive = split_archive_path(path)
+    if archive is not None:
+        return archive[0].parent / Path(archive[1]).name
+    return path
+
+
+def source_name(path: Path) -> str:
+    """Video name of a source (the SRT file name without suffixes)"""
+    return source_base(path).stem
+
+
+def source_exists(path: Path) -> bool:
+    archive = split_archive_path(path)
+    if archive is None:
+        return path.is_file()
+    import zipfile
+
+    with zipfile.ZipFile(archive[0]) as zf:
+        return archive[1] in zf.NameToInfo
+
+
+def list_archive_srts(archive: Path) -> List[Path]:
+    """Paths of the SRT members of a .zip archive (flight.zip/DJI_0001.SRT, ...)"""
+    import zipfile
+
+    with zipfile.ZipFile(archive) as zf:
+        names = [info.filename for info in zf.infolist() if not info.is_dir()]
+    return [archive / name for name in names if is_srt_source(Path(name))]
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Raw stream filled by a background thread that reads (and so decompresses)
+    the wrapped stream ahead of the consumer, through a bounded queue.
+
+    zlib and zstandard release the GIL while decompressing, so decompression
+    overlaps with parsing in the calling thread.
+    """
+
+    def __init__(self, raw: BinaryIO, chunk_size: int = PREFETCH_CHUNK_SIZE, depth: int = PREFETCH_DEPTH):
+        super().__init__()
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name="srt-prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                chunk = self._raw.read(self._chunk_size)
+                if not self._put(chunk) or not chunk:
+                    return
+        except BaseException as err:  # re-raised in the reading thread
+            self._put(err)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk = memoryview(item)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def _open_decompressed(path: Path) -> BinaryIO:
+    suffix = path.suffix.upper()
+    if suffix == ".GZ":
+        import gzip
+
+        return gzip.open(path, "rb")
+    if suffix == ".ZST":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"Reading {path.name} needs the optional zstandard package") from None
+        # The zstandard reader has no readline / line iteration of its own
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+
+    archive = split_archive_path(path)
+    if archive is not None:
+        import zipfile
+
+        # The member keeps the archive file open after the ZipFile itself is closed
+        with zipfile.ZipFile(archive[0]) as zf:
+            return zf.open(archive[1])
+    return path.open("rb")
+
+
+def open_source(path: Path, prefetch: bool = True) -> BinaryIO:
+    """
+    Open an SRT source as a binary stream: a plain file, a .gz / .zst file or
+    a .zip member. Nothing is extracted to disk; with prefetch, packed sources
+    are decompressed in a background thread (the stream is then not seekable).
+    """
+    if not is_packed_source(path):
+        return path.open("rb")
+    stream = _open_decompressed(path)
+    if not prefetch:
+        return stream
+    return io.BufferedReader(PrefetchReader(stream))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+import logging
+import re
+
+from app.services.exporters import open_output
+from app.services.srt_index_service import SrtIndex, SrtIndexService
+
+logger = logging.getLogger(__name__)
+
+_TIMECODE_RE = re.compile(rb"(\d{2}):(\d{2}):(\d{2}),(\d{3})")
+
+
+def _timecode(ms: int) -> bytes:
+    seconds, ms = divmod(max(ms, 0), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return b"%02d:%02d:%02d,%03d" % (hours, minutes, seconds, ms)
+
+
+def _timecode_ms(match: re.Match) -> int:
+    h, m, s, ms = map(int, match.groups())
+    return ((h * 60 + m) * 60 + s) * 1000 + ms
+
+
+class SrtTrimService:
+    """
+    Cut SRT files to time windows and write a valid, renumbered SRT.
+
+    Window boundaries are found by bisecting the block start times of the
+    .SRT.idx index (see SrtIndexService), and the blocks in between are copied
+    as raw bytes: only the counter line (and, with rebase, the timecode line)
+    of each block is rewritten. Nothing is parsed as telemetry.
+    """
+
+    def __init__(self, index_service: Optional[SrtIndexService] = None):
+        self.index_service = index_service or SrtIndexService()
+
+    @staticmethod
+    def block_ranges(index: SrtIndex, windows: Iterable[Tuple[int, int]]) -> List[range]:
+        """Block positions of each window (start/end in ms, inclusive), sorted and with overlaps merged"""
+        ranges: List[range] = []
+        for start_ms, end_ms in sorted(windows):
+            if end_ms < start_ms:
+                raise ValueError(f"Window ends before it starts: {start_ms}-{end_ms} ms")
+            positions = index.positions_between(start_ms, end_ms)
+            if not positions:
+                continue
+            if ranges and positions.start <= ranges[-1].stop:
+                positions = range(ranges[-1].start, max(ranges[-1].stop, positions.stop))
+                ranges[-1] = positions
+            else:
+                ranges.append(positions)
+        return ranges
+
+    def trim(self, srt_path: Path, output_path: Path, windows: Sequence[Tuple[int, int]],
+             rebase: bool = False) -> int:
+        """
+        Write the blocks starting within the windows to output_path and return their count.
+
+        With rebase, the timecodes are shifted so that the output starts at 0 and
+        the windows follow each other, matching a clip cut from the video.
+        """
+        index = self.index_service.index(srt_path)
+        ranges = self.block_ranges(index, windows)
+        if not ranges:
+            raise ValueError(f"No SRT blocks within the given time range in {srt_path}")
+
+        number = 0
+        cursor_ms = 0
+        with srt_path.open("rb") as src, open_output(output_path, binary=True) as out:
+            for positions in ranges:
+                # One block in memory at a time: blocks of a window follow each other in the file
+                src.seek(index.offsets[positions.start])
+                shift_ms = cursor_ms - index.times_ms[positions.start] if rebase else None
+                for i in positions:
+                    if i + 1 < len(index):
+                        raw = src.read(index.offsets[i + 1] - index.offsets[i])
+                    else:
+                        raw = src.read()
+                    number += 1
+                    block, end_ms = self._rewrite_block(raw, number, shift_ms)
+                    out.write(block)
+                    if end_ms is not None:
+                        cursor_ms = end_ms
+
+        logger.info(f"Trimmed {srt_path} to {number} blocks in {output_path}")
+        return number
+
+    @staticmethod
+    def _rewrite_block(block: bytes, number: int, shift_ms: Optional[int]) -> Tuple[bytes, Optional[int]]:
+        """Renumber one raw block (and shift its timecodes); returns the block and its shifted end time"""
+        newline = b"\r\n" if b"\r\n" in block[:64] else b"\n"
+        first_end = block.find(b"\n") + 1
+        first_line = block[:first_end] if first_end else block
+        if first_line.strip().lstrip(b"\xef\xbb\xbf").isdigit():
+            block = block[first_end:] if first_end else b""
+        counter = str(number).encode("ascii") + newline
+
+        end_ms = None
+        if shift_ms is not None:
+            line_end = block.find(b"\n") + 1 or len(block)
+            timecode_line = block[:line_end]
+            times = list(_TIMECODE_RE.finditer(timecode_line))
+            if times:
+                end_ms = _timecode_ms(times[-1]) + shift_ms
+                timecode_line = _TIMECODE_RE.sub(lambda m: _timecode(_timecode_ms(m) + shift_ms), timecode_line)
+                block = timecode_line + block[line_end:]
+
+        # The last block of a file may lack the blank separator line
+        if not block.endswith(newline * 2):
+            block = block.rstrip(b"\r\n") + newline * 2
+        return counter + block, end_ms
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, TextIO, Tuple
+import logging
+import re
+
+from app.services.exporters import is_binary_format, open_output
+from app.services.srt_io import source_name
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# DJI_20251222150801_0005_T: file index 0005 of the recording, camera stream T
+DJI_FILE_RE = re.compile(r"_(\d{4})_([A-Z]+)$")
+
+# Output columns added to every stitched row, after the standard ones
+COLUMNS = ("FLIGHT TIME", "VIDEO OFFSET")
+
+
+def _read_columns(source: Path) -> Tuple[bool, object]:
+    """Worker: extract_columns of one source, returning (ok, columns or error message)"""
+    from app.services.video_metadata_service import VideoMetadataService
+
+    try:
+        return True, VideoMetadataService().extract_columns(source)
+    except Exception as err:
+        return False, f"{type(err).__name__}: {err}"
+
+
+@dataclass
+class Flight:
+    """Consecutive files of one camera stream, concatenated into one timeline"""
+
+    sources: List[Path]
+    columns: Dict[str, np.ndarray]  # extract_columns layout plus flight_time_ms and video_offset_ms
+    offsets_ms: List[int] = field(default_factory=list)  # flight time of each source's 00:00:00,000
+
+    @property
+    def frames(self) -> int:
+        return len(self.columns["time_ms"])
+
+    @property
+    def duration_s(self) -> float:
+        flight_time = self.columns["flight_time_ms"]
+        return float(flight_time[-1] - flight_time[0]) / 1000 if len(flight_time) else 0.0
+
+
+class StitchService:
+    """
+    Stitch DJI recordings that were split into several files back into flights.
+
+    Every SRT restarts at 00:00:00,000, so files are ordered and grouped by
+    the wall-clock stamps in their blocks instead: within one camera stream
+    (the _T / _W / _Z / _S suffix), a file continues the previous one when it
+    starts at most max_gap_s after that one ends. Files are parsed in
+    parallel; "flight_time_ms" is the time since the first file's start and
+    "video_offset_ms" the flight time at which each row's file starts.
+    """
+
+    def __init__(self, max_gap_s: float = 10.0, jobs: int = 1):
+        self.max_gap_s = max_gap_s
+        self.jobs = jobs
+        # Sources that could not be read in the last stitch()
+        self.failed: List[Path] = []
+
+    def stitch(self, sources: Sequence[Path]) -> List[Flight]:
+        """Flights of the sources, in order of their start time"""
+        parts = self.read(sources)
+        flights = [self._concatenate(group) for group in self.group(parts)]
+        for flight in flights:
+            logger.info(f"Flight {source_name(flight.sources[0])}: {len(flight.sources)} files, "
+                        f"{flight.frames} frames, {flight.duration_s:.1f} s")
+        return flights
+
+    def read(self, sources: Sequence[Path]) -> List[Tuple[Path, Dict[str, np.ndarray]]]:
+        """(source, columns) of every readable source with frames, parsed on jobs worker processes"""
+        self.failed = []
+        if self.jobs > 1 and len(sources) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(sources))) as executor:
+                results = list(executor.map(_read_columns, sources))
+        else:
+            results = [_read_columns(source) for source in sources]
+
+        parts = []
+        for source, (ok, result) in zip(sources, results):
+            if not ok:
+                logger.error(f"Failed {source}: {result}")
+                self.failed.append(source)
+            elif not len(result["time_ms"]):
+                logger.warning(f"No GPS frames in {source}, left out of the flight")
+            else:
+                parts.append((source, result))
+        return parts
+
+    def group(self, parts: Sequence[Tuple[Path, Dict[str, np.ndarray]]]
+              ) -> List[List[Tuple[Path, Dict[str, np.ndarray], int]]]:
+        """
+        Group parts into flights of (source, columns, start) in time order.
+
+        start is the wall clock (ms since the epoch) of the file's 00:00:00,000.
+        Files without any wall-clock stamp cannot be placed and stay on their own.
+        """
+        streams: Dict[str, List[tuple]] = {}
+        loose = []
+        for source, columns in parts:
+            span = self._span(columns)
+            if span is None:
+                logger.warning(f"No date/time in {source}, not stitched")
+                loose.append([(source, columns, 0)])
+                continue
+            match = DJI_FILE_RE.search(source_name(source))
+            streams.setdefault(match.group(2) if match else "", []).append((span, source, columns))
+
+        flights = []
+        for stream_parts in streams.values():
+            stream_parts.sort(key=lambda part: part[0])
+            flight: List[tuple] = []
+            end = None
+            for (start, last), source, columns in stream_parts:
+                if flight and start - end > self.max_gap_s * 1000:
+                    flights.append(flight)
+                    flight = []
+                end = max(end, last) if flight else last
+                flight.append((source, columns, start))
+            flights.append(flight)
+        flights.sort(key=lambda flight: flight[0][2])
+        return flights + loose
+
+    @staticmethod
+    def _span(columns: Dict[str, np.ndarray]) -> Optional[Tuple[int, int]]:
+        """(wall clock of the file's 00:00:00,000, wall clock of its last stamped frame), in epoch ms"""
+        import numpy as np
+
+        stamps = columns["datetime"]
+        known = np.flatnonzero(~np.isnat(stamps))
+        if not len(known):
+            return None
+        first, last = known[0], known[-1]
+        epoch_ms = stamps.astype("datetime64[ms]").astype(np.int64)
+        return int(epoch_ms[first] - columns["time_ms"][first]), int(epoch_ms[last])
+
+    @staticmethod
+    def _concatenate(group: Sequence[Tuple[Path, Dict[str, np.ndarray], int]]) -> Flight:
+        import numpy as np
+
+        flight_start = group[0][2]
+        offsets = [start - flight_start for _, _, start in group]
+        names = list(group[0][1])
+        columns = {name: np.concatenate([columns[name] for _, columns, _ in group]) for name in names}
+        lengths = [len(part_columns["time_ms"]) for _, part_columns, _ in group]
+        columns["video_offset_ms"] = np.repeat(np.array(offsets, dtype=np.int64), lengths)
+        columns["flight_time_ms"] = columns["video_offset_ms"] + columns["time_ms"]
+        return Flight([source for source, _, _ in group], columns, offsets)
+
+    @staticmethod
+    def extra_columns(flight: Flight) -> Dict[str, List[str]]:
+        """The COLUMNS of a flight's rows, formatted like TIME"""
+        from app.services.video_metadata_service import VideoMetadataService
+
+        to_hms = VideoMetadataService._ms_to_hms
+        return {
+            "FLIGHT TIME": [to_hms(ms) for ms in flight.columns["flight_time_ms"].tolist()],
+            "VIDEO OFFSET": [to_hms(ms) for ms in flight.columns["video_offset_ms"].tolist()],
+        }
+
+    def write(self, flight: Flight, stream: TextIO, fmt: str = "csv", header: bool = True) -> int:
+        """Write a flight to an open stream (binary for XLSX) and return the number of rows"""
+        from app.services.pipeline_service import PipelineService
+        from app.services.video_metadata_service import VideoMetadataService
+
+        frames = VideoMetadataService().frames_from_columns(flight.columns)
+        return PipelineService().write(frames, stream, fmt, header=header, extra_columns=self.extra_columns(flight))
+
+    def export(self, flight: Flight, output_path: Path, fmt: str = "csv") -> int:
+        """Write a flight to a file and return the number of rows"""
+        binary = is_binary_format(fmt)
+        with open_output(output_path, binary) as f:
+            count = self.write(flight, f, fmt)
+        logger.info(f"Stitched flight saved: {output_path} ({len(flight.sources)} files, {count} frames)")
+        return count
@@ -1,22 +1,66 @@
+from __future__ import annotations
+
 import re
+from array import array
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 import logging
 
-from app.models.video_frame_metadata import VideoFrameMetadata
+from app.services.parser_engine import END_OF_WINDOW, BlockParser, ParserEngine
+from app.services.srt_io import is_packed_source, source_exists, source_name
+
+if TYPE_CHECKING:
+    # pydantic and numpy are only imported when frames or columns are built
+    import numpy as np
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.frame_filter import FrameFilter
 
 logger = logging.getLogger(__name__)
 
 
 class VideoMetadataService:
-    # --- Regex patterns ---
-    TIME_RE = re.compile(r"(\d+):(\d+):(\d+),(\d+)")
-    DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)")
-    
-    # GPS
-    LAT_RE = re.compile(r"\[latitude:\s*([-\d.]+)\]")
-    LON_RE = re.compile(r"\[longitude:\s*([-\d.]+)\]")
-    ABS_ALT_RE = re.compile(r"abs_alt:\s*([-\d.]+)")
+    # column name -> SRT key (in the fields of BlockParser records), for the numeric
+    # fields beyond the CSV columns
+    TELEMETRY_FIELDS = {
+        "frame_cnt": b"FrameCnt",
+        "diff_time_ms": b"DiffTime",
+        "rel_alt": b"rel_alt",
+        "drone_speedx": b"drone_speedx",
+        "drone_speedy": b"drone_speedy",
+        "drone_speedz": b"drone_speedz",
+        "drone_yaw": b"drone_yaw",
+        "drone_pitch": b"drone_pitch",
+        "drone_roll": b"drone_roll",
+        "gb_yaw": b"gb_yaw",
+        "gb_pitch": b"gb_pitch",
+        "gb_roll": b"gb_roll",
+        "focal_len": b"focal_len",
+        "dzoom": b"dzoom",
+        "iso": b"iso",
+        "fnum": b"fnum",
+        "ev": b"ev",
+    }
+
+    # Videos whose embedded telemetry track is read when there is no SRT sidecar
+    VIDEO_SUFFIXES = (".MP4", ".MOV")
+
+    # Parsing modes: "bytes" reads raw bytes and decodes only text fields,
+    # "text" decodes the whole file as UTF-8 (fails on stray bytes)
+    MODES = BlockParser.MODES
+
+    def __init__(self, mode: str = "bytes", dialect: Optional[str] = None, backend: Optional[str] = None):
+        # dialect None: detected per file (see SrtLayout)
+        self.parser = BlockParser(mode, dialect)
+        self.mode = mode
+        self.dialect = self.parser.dialect
+        # None: pick the parser backend per file (see ParserEngine)
+        self.engine = ParserEngine(backend)
+
+    @property
+    def no_gps_ms(self) -> array:
+        """SRT times (ms) of the blocks skipped for missing GPS in the last read (see QualityService)"""
+        return self.parser.no_gps_ms
 
     @staticmethod
     def _ms_to_hms(ms: int) -> str:
@@ -39,72 +83,213 @@ class VideoMetadataService:
         match = pattern.search(text)
         return match.group(1) if match else None
 
-    def extract_from_video(self, video_path: Path) -> List[VideoFrameMetadata]:
-        logger.info(f"מתחיל חילוץ מטאדאטה מ: {video_path}")
-        srt_path = video_path.with_suffix(".SRT")
+    def _resolve_srt_path(self, video_path: Path) -> Path:
+        # Compressed files and archive members are read as given
+        srt_path = video_path if is_packed_source(video_path) else video_path.with_suffix(".SRT")
 
-        if not srt_path.exists():
+        if not source_exists(srt_path):
             logger.error(f"קובץ SRT לא נמצא: {srt_path}")
             raise FileNotFoundError(f"SRT not found: {srt_path}")
+        return srt_path
+
+    def _embedded_source(self, video_path: Path) -> Optional[Path]:
+        """The video itself when its telemetry has to be read from the MP4 (no SRT sidecar)"""
+        if video_path.suffix.upper() not in self.VIDEO_SUFFIXES or not video_path.is_file():
+            return None
+        if video_path.with_suffix(".SRT").exists():
+            return None
+        logger.info(f"קובץ SRT לא נמצא, קורא טלמטריה מתוך הווידאו: {video_path}")
+        return video_path
 
+    def iter_frames(self, video_path: Path, frame_filter: Optional[FrameFilter] = None
+                    ) -> Iterator[VideoFrameMetadata]:
+        """
+        Yield frames one by one while the parser engine reads the SRT.
+
+        The engine's backends hold at most a block window or a memory map,
+        so memory use does not depend on the file size. Frames rejected by
+        frame_filter are skipped without building a model, and reading stops
+        after its window.
+        """
+        self.parser.reset()
+        embedded = self._embedded_source(video_path)
+        if embedded is not None:
+            records = self._embedded_records(embedded, frame_filter)
+            yield from self._frames(records, embedded.stem)
+            return
+
+        srt_path = self._resolve_srt_path(video_path)
         logger.info(f"קורא קובץ SRT: {srt_path}")
-        with srt_path.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        logger.info(f"נקראו {len(lines)} שורות מקובץ SRT")
-        frames: List[VideoFrameMetadata] = []
-        
-        # Extract video name from path
-        video_name = srt_path.stem
-        
-        i = 0
-        while i < len(lines):
-            # Search for timecode
-            time_match = self.TIME_RE.search(lines[i])
-            if not time_match:
-                i += 1
-                continue
-
-            h, m, s, ms = map(int, time_match.groups())
-
-            # Read next block (up to 12 lines)
-            block_text = "".join(lines[i:i + 12])
-
-            # Extract GPS data
-            latitude = self._extract_float(self.LAT_RE, block_text)
-            longitude = self._extract_float(self.LON_RE, block_text)
-            altitude = self._extract_float(self.ABS_ALT_RE, block_text)
-            
-            # Skip frame if no GPS data
-            if latitude is None or longitude is None:
-                i += 1
-                continue
-
-            # Extract date
-            date_str = self._extract_string(self.DATE_RE, block_text)
-            date_only = date_str.split()[0] if date_str else ""
-            
-            # Calculate TIME
-            timestamp_ms = ((h * 60 + m) * 60 + s) * 1000 + ms
-            time_str = self._ms_to_hms(timestamp_ms)
-
-            # Create object with all metadata
-            frame = VideoFrameMetadata(
+
+        count = 0
+        records = self.engine.records(srt_path, frame_filter, fields=False, parser=self.parser)
+        for frame in self._frames(records, source_name(srt_path)):
+            count += 1
+            # Log every 1000 frames
+            if count % 1000 == 0:
+                logger.info(f"חולצו {count} פריימים עד כה...")
+            yield frame
+        if self.no_gps_ms:
+            logger.warning(f"דולגו {len(self.no_gps_ms)} פריימים ללא נתוני GPS: {srt_path}")
+
+    def _frames(self, records: Iterator[tuple], video_name: str) -> Iterator[VideoFrameMetadata]:
+        """The CSV frame models of records (see BlockParser.parse)"""
+        from app.models.video_frame_metadata import VideoFrameMetadata
+
+        for timestamp_ms, date_str, latitude, longitude, altitude, _ in records:
+            yield VideoFrameMetadata(
                 comments="",
                 video_name=video_name,
                 altitude=altitude,
                 longitude=longitude,
                 latitude=latitude,
-                time=time_str,
-                date=date_only,
+                time=self._ms_to_hms(timestamp_ms),
+                date=date_str.split()[0] if date_str else "",
             )
-            
-            frames.append(frame)
-            i += 1
-            
-            # Log every 1000 frames
-            if len(frames) % 1000 == 0:
-                logger.info(f"חולצו {len(frames)} פריימים עד כה...")
 
+    def _embedded_records(self, video_path: Path, frame_filter: Optional[FrameFilter]) -> Iterator[tuple]:
+        """
+        Records of the MP4 telemetry track, with the same frame selection as the
+        SRT parsers. Raises ValueError when filtering on relative altitude and
+        the track has none (djmd tracks only carry abs_alt).
+        """
+        from app.services.mp4_telemetry_service import Mp4TelemetryService
+
+        relative = frame_filter is not None and frame_filter.has_altitude and frame_filter.relative_alt
+        has_relative = False
+        for record in Mp4TelemetryService().iter_records(video_path):
+            if frame_filter is not None:
+                timestamp_ms, date_str, latitude, longitude, altitude, fields = record
+                if frame_filter.past(timestamp_ms):
+                    return
+                if frame_filter.before(timestamp_ms):
+                    continue
+                if relative:
+                    altitude = fields.get(b"rel_alt")
+                    if altitude is not None:
+                        altitude = float(altitude)
+                        has_relative = True
+                    elif not has_relative:
+                        raise ValueError(f"No relative altitude (rel_alt) in the telemetry of {video_path}")
+                keep = BlockParser.filter_values(frame_filter, latitude, longitude, altitude, date_str)
+                if keep is END_OF_WINDOW:
+                    return
+                if not keep:
+                    continue
+            yield record
+
+    def iter_frames_from(self, video_path: Path, offset: int = 0, end_ms: Optional[int] = None,
+                         limit: Optional[int] = None) -> Iterator[VideoFrameMetadata]:
+        """
+        Yield frames starting at a byte offset (a block start, see SrtIndex).
+
+        Stops at the first block whose start time is after end_ms, or after
+        limit frames, so only the requested part of the file is read.
+        Frames are parsed exactly like iter_frames.
+        """
+        from app.services.frame_filter import FrameFilter
+
+        srt_path = self._resolve_srt_path(video_path)
+        # Byte offsets only make sense for the raw bytes
+        parser = self.parser if self.mode == "bytes" else BlockParser("bytes", self.dialect and self.dialect.name)
+        frame_filter = None if end_ms is None else FrameFilter(end_ms=end_ms)
+        records = self.engine.records(srt_path, frame_filter, fields=False, offset=offset, parser=parser)
+        yield from islice(self._frames(records, source_name(srt_path)), limit)
+
+    def extract_from_video(self, video_path: Path, frame_filter: Optional[FrameFilter] = None
+                           ) -> List[VideoFrameMetadata]:
+        logger.info(f"מתחיל חילוץ מטאדאטה מ: {video_path}")
+        frames = list(self.iter_frames(video_path, frame_filter))
         logger.info(f"סיים חילוץ: {len(frames)} פריימים בסך הכל")
         return frames
+
+    def iter_records(self, video_path: Path, frame_filter: Optional[FrameFilter] = None,
+                     fields: bool = True) -> Iterator[tuple]:
+        """
+        Yield the records (see BlockParser.parse) of an SRT or video's frames,
+        without building models or columns. fields is {} unless asked for.
+        """
+        self.parser.reset()
+        embedded = self._embedded_source(video_path)
+        if embedded is not None:
+            return self._embedded_records(embedded, frame_filter)
+        return self.engine.records(self._resolve_srt_path(video_path), frame_filter, fields, parser=self.parser)
+
+    def extract_columns(self, video_path: Path, frame_filter: Optional[FrameFilter] = None
+                        ) -> Dict[str, np.ndarray]:
+        """
+        Extract every frame's telemetry as NumPy columns (one array per field).
+
+        Selects the same frames as extract_from_video. Numeric columns are
+        float64 with NaN for missing values; "time_ms" is the SRT timecode in
+        milliseconds and "datetime" the wall-clock stamp as datetime64[ms].
+        """
+        import numpy as np
+
+        self.parser.reset()
+        embedded = self._embedded_source(video_path)
+        if embedded is not None:
+            srt_path = embedded
+            records = self._embedded_records(embedded, frame_filter)
+        else:
+            srt_path = self._resolve_srt_path(video_path)
+            records = self.engine.records(srt_path, frame_filter, parser=self.parser)
+        logger.info(f"קורא עמודות טלמטריה: {srt_path}")
+
+        times: List[int] = []
+        dates: List[str] = []
+        latitudes: List[float] = []
+        longitudes: List[float] = []
+        altitudes: List[float] = []
+        extras: Dict[str, List[float]] = {name: [] for name in self.TELEMETRY_FIELDS}
+        nan = float("nan")
+
+        for timestamp_ms, date_str, latitude, longitude, altitude, fields in records:
+            times.append(timestamp_ms)
+            dates.append(date_str)
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            altitudes.append(nan if altitude is None else altitude)
+            for name, key in self.TELEMETRY_FIELDS.items():
+                value = fields.get(key)
+                extras[name].append(nan if value is None else float(value))
+
+        count = len(times)
+        columns: Dict[str, np.ndarray] = {
+            "video_name": np.full(count, source_name(srt_path), dtype=object),
+            "time_ms": np.array(times, dtype=np.int64),
+            "date": np.array([d.split()[0] if d else "" for d in dates], dtype=object),
+            "datetime": np.array([d or "NaT" for d in dates], dtype="datetime64[ms]"),
+            "latitude": np.array(latitudes, dtype=np.float64),
+            "longitude": np.array(longitudes, dtype=np.float64),
+            "abs_alt": np.array(altitudes, dtype=np.float64),
+        }
+        for name, values in extras.items():
+            columns[name] = np.array(values, dtype=np.float64)
+
+        if self.no_gps_ms:
+            logger.warning(f"דולגו {len(self.no_gps_ms)} פריימים ללא נתוני GPS: {srt_path}")
+        logger.info(f"סיים חילוץ עמודות: {count} פריימים")
+        return columns
+
+    def frames_from_columns(self, columns: Dict[str, np.ndarray]) -> Iterator[VideoFrameMetadata]:
+        """Yield the CSV frame models for extract_columns output, one at a time"""
+        from app.models.video_frame_metadata import VideoFrameMetadata
+
+        for name, altitude, longitude, latitude, timestamp_ms, date in zip(
+            columns["video_name"].tolist(),
+            columns["abs_alt"].tolist(),
+            columns["longitude"].tolist(),
+            columns["latitude"].tolist(),
+            columns["time_ms"].tolist(),
+            columns["date"].tolist(),
+        ):
+            yield VideoFrameMetadata(
+                comments="",
+                video_name=name,
+                altitude=None if altitude != altitude else altitude,  # NaN -> missing
+                longitude=longitude,
+                latitude=latitude,
+                time=self._ms_to_hms(timestamp_ms),
+                date=date,
+            )
@@ -0,0 +1,391 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from app.services.conversion_service import ConversionService
+from app.services.exporters import format_suffix
+
+if TYPE_CHECKING:
+    from app.services.fingerprint_service import FingerprintService
+
+logger = logging.getLogger(__name__)
+
+SRT_SUFFIX = ".SRT"
+
+
+def _is_srt(path: Path) -> bool:
+    return path.suffix.upper() == SRT_SUFFIX
+
+
+def _scan_tree(root: Path) -> Dict[Path, Tuple[int, int]]:
+    """Return (size, mtime_ns) for every SRT file under root"""
+    found: Dict[Path, Tuple[int, int]] = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if not _is_srt(path):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found[path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+class ProcessedState:
+    """Small JSON file remembering which SRT versions were already converted"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        if path is not None and path.exists():
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as err:
+                logger.warning(f"Ignoring unreadable state file {path}: {err}")
+
+    def is_processed(self, srt_path: Path, size: int, mtime_ns: int) -> bool:
+        entry = self._entries.get(str(srt_path))
+        return entry is not None and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+
+    def mark(self, srt_path: Path, size: int, mtime_ns: int, output: Optional[Path] = None,
+             error: Optional[str] = None, duplicate_of: Optional[Path] = None) -> None:
+        entry = {"size": size, "mtime_ns": mtime_ns}
+        if output is not None:
+            entry["output"] = str(output)
+        if error is not None:
+            entry["error"] = error
+        if duplicate_of is not None:
+            entry["duplicate_of"] = str(duplicate_of)
+        self._entries[str(srt_path)] = entry
+        self.save()
+
+    def save(self) -> None:
+        """Write the state atomically so a crash never leaves a truncated file"""
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def outputs(self) -> Dict[Path, Path]:
+        """Output path -> SRT path for every file converted or linked so far"""
+        return {Path(e["output"]): Path(srt) for srt, e in self._entries.items() if "output" in e}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PollingWatcher:
+    """Portable watcher: rescans the trees and reports SRT files whose size or mtime changed"""
+
+    def __init__(self, roots: Sequence[Path]):
+        self.roots = list(roots)
+        self._known: Dict[Path, Tuple[int, int]] = {}
+
+    def read(self, timeout: float) -> List[Path]:
+        time.sleep(timeout)
+        return self.rescan()
+
+    def rescan(self) -> List[Path]:
+        current: Dict[Path, Tuple[int, int]] = {}
+        for root in self.roots:
+            current.update(_scan_tree(root))
+        changed = [p for p, sig in current.items() if self._known.get(p) != sig]
+        self._known = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher (via ctypes) over whole directory trees"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct("iIII")
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def __init__(self, roots: Sequence[Path]):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = list(roots)
+        self._dirs: Dict[int, Path] = {}
+        for root in self.roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root: Path) -> List[Path]:
+        """Watch root and its sub-directories; return SRT files already inside"""
+        existing: List[Path] = []
+        for dirpath, _, filenames in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                logger.warning(f"Cannot watch {dirpath}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._dirs[wd] = Path(dirpath)
+            existing.extend(Path(dirpath) / name for name in filenames if _is_srt(Path(name)))
+        return existing
+
+    def read(self, timeout: float) -> List[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed: List[Path] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflow, rescanning")
+                for root in self.roots:
+                    changed.extend(_scan_tree(root))
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                # New folder (e.g. a fresh SD-card dump): watch it and pick up its files
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed.extend(self._add_tree(path))
+            elif _is_srt(path):
+                changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class WatchService:
+    """
+    Watch import folders and convert SRT files once they stop changing.
+
+    With dedupe, a settled file is fingerprinted first: copies of a file
+    whose output already exists (a re-copied SD card) get a link to that
+    output instead of a conversion.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[Path],
+        output_root: Optional[Path] = None,
+        fmt: str = "csv",
+        jobs: int = 1,
+        state_path: Optional[Path] = None,
+        settle_seconds: float = 5.0,
+        poll_interval: float = 2.0,
+        use_inotify: Optional[bool] = None,
+        dedupe: Optional["FingerprintService"] = None,
+    ):
+        self.roots = [Path(r).resolve() for r in roots]
+        self.output_root = output_root
+        self._mirror_names = self._mirror_folder_names(self.roots)
+        self.fmt = fmt
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.state = ProcessedState(state_path)
+        self.dedupe = dedupe
+        self._suffix = format_suffix(fmt)
+        if dedupe is not None:
+            from app.services.fingerprint_service import output_profile
+
+            self._profile = output_profile(fmt)
+
+        if use_inotify is None:
+            use_inotify = InotifyWatcher.available()
+        self.watcher = InotifyWatcher(self.roots) if use_inotify else PollingWatcher(self.roots)
+        logger.info(f"Watching {len(self.roots)} folders with {type(self.watcher).__name__}")
+
+        self._executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        # path -> (size, mtime_ns, time the signature was first seen)
+        self._pending: Dict[Path, Tuple[int, int, float]] = {}
+        self._running: Dict[Future, Tuple[Path, int, int, Path]] = {}
+        # output path -> SRT it was written for, so two sources never share one output
+        self._owners: Dict[Path, Path] = self.state.outputs()
+
+        for root in self.roots:
+            for path in _scan_tree(root):
+                self._touch(path)
+
+    def output_path_for(self, srt_path: Path) -> Path:
+        """Output next to the SRT, or at the same relative place in the mirror tree"""
+        if self.output_root is None:
+            return srt_path.with_suffix(self._suffix)
+        for root in self.roots:
+            try:
+                relative = srt_path.relative_to(root)
+            except ValueError:
+                continue
+            return self.output_root / self._mirror_names[root] / relative.with_suffix(self._suffix)
+        return self.output_root / (srt_path.stem + self._suffix)
+
+    @staticmethod
+    def _mirror_folder_names(roots: Sequence[Path]) -> Dict[Path, str]:
+        """
+        Mirror sub-folder of each root: its name, plus a short hash of its path
+        when several roots share a name (two SD-card dumps both ending in DCIM).
+        """
+        counts: Dict[str, int] = {}
+        for root in roots:
+            counts[root.name] = counts.get(root.name, 0) + 1
+        names: Dict[Path, str] = {}
+        for root in roots:
+            if counts[root.name] > 1:
+                digest = hashlib.blake2b(os.fsencode(str(root)), digest_size=4).hexdigest()
+                names[root] = f"{root.name}-{digest}"
+            else:
+                names[root] = root.name
+        return names
+
+    def _touch(self, path: Path) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        previous = self._pending.get(path)
+        if previous is None or previous[:2] != (st.st_size, st.st_mtime_ns):
+            self._pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic())
+
+    def step(self, timeout: Optional[float] = None) -> int:
+        """Wait for changes once, dispatch settled files and collect results; return files dispatched"""
+        if timeout is None:
+            timeout = min(self.poll_interval, self.settle_seconds) if self._pending else self.poll_interval
+        for path in self.watcher.read(timeout):
+            self._touch(path.resolve())
+
+        # Re-stat pending files so writes without events (or polling gaps) reset the timer
+        for path in list(self._pending):
+            self._touch(path)
+
+        now = time.monotonic()
+        dispatched = 0
+        for path, (size, mtime_ns, since) in list(self._pending.items()):
+            if now - since < self.settle_seconds:
+                continue
+            del self._pending[path]
+            if size == 0 or self.state.is_processed(path, size, mtime_ns):
+                continue
+            self._dispatch(path, size, mtime_ns)
+            dispatched += 1
+
+        self._collect(block=False)
+        return dispatched
+
+    def _dispatch(self, srt_path: Path, size: int, mtime_ns: int) -> None:
+        output_path = self.output_path_for(srt_path)
+        owner = self._owners.setdefault(output_path, srt_path)
+        if owner != srt_path:
+            # Converting would silently overwrite the output of another SRT
+            self._record_failure(srt_path, size, mtime_ns,
+                                 FileExistsError(f"{output_path} already belongs to {owner}"))
+            return
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as err:
+            # One unwritable output folder must not stop the daemon
+            self._record_failure(srt_path, size, mtime_ns, err)
+            return
+        if self.dedupe is not None and self._link_duplicate(srt_path, size, mtime_ns, output_path):
+            return
+        logger.info(f"Converting {srt_path} -> {output_path}")
+
+        if self._executor is None:
+            try:
+                count = ConversionService().convert(srt_path, output_path, self.fmt)
+            except Exception as err:
+                self._record_failure(srt_path, size, mtime_ns, err)
+            else:
+                self._record_success(srt_path, size, mtime_ns, output_path, count)
+            return
+
+        future = self._executor.submit(ConversionService().convert, srt_path, output_path, self.fmt)
+        self._running[future] = (srt_path, size, mtime_ns, output_path)
+
+    def _link_duplicate(self, srt_path: Path, size: int, mtime_ns: int, output_path: Path) -> bool:
+        """Link srt_path to the output of an earlier copy; False when it has to be converted"""
+        _, existing = self.dedupe.check(srt_path, self._profile)
+        if existing is None:
+            return False
+        try:
+            self.dedupe.link(srt_path, existing, output_path, self._profile)
+        except OSError as err:
+            logger.warning(f"Cannot link {output_path} to {existing}, converting: {err}")
+            return False
+        self.state.mark(srt_path, size, mtime_ns, output=output_path, duplicate_of=existing)
+        return True
+
+    def _collect(self, block: bool) -> None:
+        for future in list(self._running):
+            if not block and not future.done():
+                continue
+            srt_path, size, mtime_ns, output_path = self._running.pop(future)
+            try:
+                count = future.result()
+            except Exception as err:
+                self._record_failure(srt_path, size, mtime_ns, err)
+            else:
+                self._record_success(srt_path, size, mtime_ns, output_path, count)
+
+    def _record_success(self, srt_path: Path, size: int, mtime_ns: int, output_path: Path, count: int) -> None:
+        logger.info(f"Converted {srt_path} ({count} frames)")
+        self.state.mark(srt_path, size, mtime_ns, output=output_path)
+        if self.dedupe is not None:
+            self.dedupe.record(srt_path, output_path, self._profile)
+
+    def _record_failure(self, srt_path: Path, size: int, mtime_ns: int, err: Exception) -> None:
+        # Remember the failure too: the file is retried only when it changes
+        for output_path, owner in list(self._owners.items()):
+            if owner == srt_path:
+                del self._owners[output_path]
+        logger.error(f"Failed to convert {srt_path}: {err}")
+        self.state.mark(srt_path, size, mtime_ns, error=f"{type(err).__name__}: {err}")
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Run until stop is set (or forever)"""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                self.step()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._collect(block=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.watcher.close()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, List, Mapping, Optional, Sequence
+from xml.sax.saxutils import escape
+import logging
+import math
+import re
+import zipfile
+
+from app.services.exporters import extra_rows, open_output
+
+if TYPE_CHECKING:
+    from app.models.video_frame_metadata import VideoFrameMetadata
+    from app.services.output_template import RowFormatter
+
+logger = logging.getLogger(__name__)
+
+# Rows per worksheet in Excel, header included
+MAX_ROWS = 1048576
+ROWS_PER_WRITE = 1000
+
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+MS_PER_DAY = 86400000
+
+# Cell styles (index into cellXfs of STYLES_XML)
+DATE_STYLE = 1
+TIME_STYLE = 2
+HEADER_STYLE = 3
+
+# Characters XML 1.0 does not allow, even escaped
+ILLEGAL_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+# TIME column: "HH:MM:SS:mmm" (video time)
+VIDEO_TIME_RE = re.compile(r"(\d+):(\d{2}):(\d{2})(?::(\d{3}))?")
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    # Worksheets are the only other .xml parts without an override, so the number of sheets need not be known
+    '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="[h]:mm:ss.000"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">{pane}</sheetView></sheetViews><sheetData>'
+)
+FROZEN_HEADER = '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+SHEET_END = "</sheetData></worksheet>"
+
+
+def _text_cell(value: str, style: int = 0) -> str:
+    styled = f' s="{style}"' if style else ""
+    return f'<c t="inlineStr"{styled}><is><t xml:space="preserve">{escape(ILLEGAL_XML_RE.sub("", value))}</t></is></c>'
+
+
+def _number_cell(value) -> str:
+    return f"<c><v>{value!r}</v></c>" if isinstance(value, float) else f"<c><v>{value}</v></c>"
+
+
+class XlsxExportService:
+    """
+    Export frames as an Excel workbook, written as a stream.
+
+    Rows go straight into the worksheet XML inside the zip (inline strings,
+    no shared string table, no workbook object), so memory does not depend
+    on the number of frames. Numbers are numeric cells, DATE is an Excel
+    date and TIME (HH:MM:SS:mmm video time) a duration, so Excel neither
+    truncates nor misreads them. A new sheet, with the header repeated, is
+    started whenever a sheet reaches Excel's row limit.
+    """
+
+    def __init__(self, max_rows: int = MAX_ROWS):
+        if max_rows < 2:
+            raise ValueError("max_rows must leave room for a header and a row")
+        self.max_rows = max_rows
+        self._dates = {}
+
+    def export(self, frames: Sequence[VideoFrameMetadata], output_path: Path,
+               extra_columns: Optional[Mapping[str, Sequence]] = None,
+               formatter: Optional[RowFormatter] = None) -> None:
+        logger.info(f"Starting XLSX export: {len(frames)} frames")
+
+        if not frames:
+            logger.error("No frames to export")
+            raise ValueError("No frames to export")
+
+        with open_output(output_path, binary=True) as f:
+            self.write(frames, f, extra_columns=extra_columns, formatter=formatter)
+        logger.info(f"XLSX file saved successfully: {output_path}")
+
+    def write(self, frames: Iterable[VideoFrameMetadata], stream: BinaryIO, header: bool = True,
+              extra_columns: Optional[Mapping[str, Sequence]] = None,
+              formatter: Optional[RowFormatter] = None) -> None:
+        """Write a complete workbook of the frames to an open binary stream
+
+        Unlike the text formats this is a whole file, so it is called once
+        with all frames (an iterator is fine). With a formatter (a compiled
+        OutputTemplate) its text is written, with numbers as numeric cells.
+        """
+        names, rows = self._rows(frames, extra_columns, formatter)
+        cell_writers = [self._cell_writer(name, formatter is not None) for name in names]
+        header_xml = "<row>" + "".join(_text_cell(name, HEADER_STYLE) for name in names) + "</row>" if header else ""
+        body_rows = self.max_rows - (1 if header else 0)
+
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+            archive.writestr("_rels/.rels", ROOT_RELS_XML)
+            archive.writestr("xl/styles.xml", STYLES_XML)
+
+            sheets = 0
+            pending = next(rows, None)
+            while pending is not None or sheets == 0:
+                sheets += 1
+                with archive.open(f"xl/worksheets/sheet{sheets}.xml", "w", force_zip64=True) as sheet:
+                    sheet.write(SHEET_START.format(pane=FROZEN_HEADER if header else "").encode("utf-8"))
+                    sheet.write(header_xml.encode("utf-8"))
+                    written = 0
+                    buffer: List[str] = []
+                    while pending is not None and written < body_rows:
+                        buffer.append("<row>" + "".join(w(v) for w, v in zip(cell_writers, pending)) + "</row>")
+                        written += 1
+                        if len(buffer) == ROWS_PER_WRITE:
+                            sheet.write("".join(buffer).encode("utf-8"))
+                            buffer.clear()
+                        pending = next(rows, None)
+                    sheet.write(("".join(buffer) + SHEET_END).encode("utf-8"))
+
+            archive.writestr("xl/workbook.xml", self._workbook_xml(sheets))
+            archive.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels(sheets))
+        if sheets > 1:
+            logger.info(f"Split the rows over {sheets} sheets ({body_rows} rows each)")
+
+    @staticmethod
+    def _rows(frames: Iterable[VideoFrameMetadata], extra_columns: Optional[Mapping[str, Sequence]],
+              formatter: Optional[RowFormatter]):
+        from app.models.video_frame_metadata import VideoFrameMetadata
+
+        if formatter is not None:
+            return formatter.header, iter(formatter.rows(frames, extra_columns))
+        names = [field.alias for field in VideoFrameMetadata.model_fields.values()] + list(extra_columns or ())
+        rows = ([*frame.model_dump(by_alias=True).values(), *extras]
+                for frame, extras in zip(frames, extra_rows(extra_columns)))
+        return names, rows
+
+    def _cell_writer(self, name: str, formatted: bool) -> Callable[[object], str]:
+        if name == "DATE" and not formatted:
+            return self._date_cell
+        if name == "TIME" and not formatted:
+            return self._time_cell
+        return self._text_or_number_cell if formatted else self._value_cell
+
+    @staticmethod
+    def _value_cell(value) -> str:
+        if value is None or value == "":
+            return "<c/>"
+        if isinstance(value, float):
+            return _number_cell(value) if math.isfinite(value) else "<c/>"
+        if isinstance(value, int) and not isinstance(value, bool):
+            return _number_cell(value)
+        return _text_cell(str(value))
+
+    @staticmethod
+    def _text_or_number_cell(value) -> str:
+        if value is None or value == "":
+            return "<c/>"
+        if isinstance(value, str) and NUMBER_RE.fullmatch(value):
+            return f"<c><v>{value}</v></c>"
+        return XlsxExportService._value_cell(value)
+
+    def _date_cell(self, value) -> str:
+        """ISO date → date serial (days since 1899-12-30), cached: every frame of a flight shares it"""
+        cell = self._dates.get(value)
+        if cell is None:
+            try:
+                serial = date.fromisoformat(value).toordinal() - EXCEL_EPOCH_ORDINAL
+                cell = f'<c s="{DATE_STYLE}"><v>{serial}</v></c>'
+            except (TypeError, ValueError):
+                cell = self._value_cell(value)
+            self._dates[value] = cell
+        return cell
+
+    def _time_cell(self, value) -> str:
+        """HH:MM:SS:mmm → fraction of a day, shown as [h]:mm:ss.000"""
+        match = VIDEO_TIME_RE.fullmatch(value) if isinstance(value, str) else None
+        if match is None:
+            return self._value_cell(value)
+        hours, minutes, seconds, ms = match.groups()
+        total_ms = ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(ms or 0)
+        return f'<c s="{TIME_STYLE}"><v>{total_ms / MS_PER_DAY!r}</v></c>'
+
+    @staticmethod
+    def _workbook_xml(sheets: int) -> str:
+        entries = "".join(
+            f'<sheet name="{"Frames" if i == 1 else f"Frames ({i})"}" sheetId="{i}" r:id="rId{i}"/>'
+            for i in range(1, sheets + 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f"<sheets>{entries}</sheets></workbook>"
+        )
+
+    @staticmethod
+    def _workbook_rels(sheets: int) -> str:
+        entries = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, sheets + 1)
+        )
+        styles = (
+            f'<Relationship Id="rId{sheets + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f"{entries}{styles}</Relationships>"
+        )
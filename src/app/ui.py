@@ -3,8 +3,6 @@ from pathlib import Path
 import logging
 import subprocess
 import sys
-from app.services.video_metadata_service import VideoMetadataService
-from app.services.csv_export_service import CsvExportService
 
 # Configure logging
 logging.basicConfig(
@@ -41,7 +39,8 @@ def build_main_view(page: ft.Page) -> ft.Column:
                 )
                 return
             
-            if file_path.suffix.upper() not in ['.SRT', '.srt']:
+            # Videos without an SRT sidecar are read from their embedded telemetry track
+            if file_path.suffix.upper() not in ['.SRT', '.MP4', '.MOV']:
                 status_text.value = "Error: File is not SRT"
                 status_text.color = "red"
                 selected_srt_path.value = "No SRT file selected"
@@ -50,7 +49,7 @@ def build_main_view(page: ft.Page) -> ft.Column:
                 show_error_dialog(
                     "Unsupported File Type",
                     "The selected file is not an SRT file.",
-                    f"File extension: {file_path.suffix}\n\nPlease select a valid SRT file."
+                    f"File extension: {file_path.suffix}\n\nPlease select a valid SRT file (or a DJI MP4 video)."
                 )
                 return
             
@@ -71,7 +70,7 @@ def build_main_view(page: ft.Page) -> ft.Column:
         icon="description",
         on_click=lambda _: file_picker.pick_files(
             allow_multiple=False,
-            allowed_extensions=["srt", "SRT"],
+            allowed_extensions=["srt", "SRT", "mp4", "MP4", "mov", "MOV"],
         ),
     )
 
@@ -97,6 +96,10 @@ def build_main_view(page: ft.Page) -> ft.Column:
         page.update()
 
     def export_to_csv(e):
+        # Services are imported on first export so the window appears sooner
+        from app.services.video_metadata_service import VideoMetadataService
+        from app.services.csv_export_service import CsvExportService
+
         try:
             logger.info("Starting CSV export process")
             status_text.value = "Processing SRT file..."
@@ -138,8 +141,10 @@ def build_main_view(page: ft.Page) -> ft.Column:
             status_text.value = "Extracting metadata..."
             page.update()
             
+            # One parse: the columns give both the CSV frames and the quality report
             metadata_service = VideoMetadataService()
-            frames = metadata_service.extract_from_video(srt_path)
+            columns = metadata_service.extract_columns(srt_path)
+            frames = list(metadata_service.frames_from_columns(columns))
             
             logger.info(f"Extracted {len(frames)} frames from file")
             
@@ -202,6 +207,18 @@ def build_main_view(page: ft.Page) -> ft.Column:
             logger.info(f"CSV file created successfully: {csv_path}")
             status_text.value = f"✓ File created successfully! ({len(frames)} rows)"
             status_text.color = "green"
+
+            # Telemetry quality report: shown below and saved next to the CSV
+            quality_summary = ""
+            try:
+                from app.services.quality_service import QualityService
+
+                quality_service = QualityService()
+                report = quality_service.scan_file(srt_path, columns, no_gps_ms=metadata_service.no_gps_ms)
+                report_path = quality_service.write_sidecar(report, csv_path)
+                quality_summary = f"\n\nTelemetry quality ({report_path.name}):\n{quality_service.summary(report)}"
+            except Exception as err:
+                logger.warning(f"Quality scan failed: {err}")
             
             # Add function to open folder
             def open_folder(e):
@@ -229,6 +246,7 @@ def build_main_view(page: ft.Page) -> ft.Column:
                     f"📄 {csv_path.name}\n"
                     f"📊 {len(frames)} rows created\n\n"
                     f"Full path:\n{csv_path}"
+                    f"{quality_summary}"
                 ),
             )
             page.dialog = dialog
@@ -259,18 +277,6 @@ def build_main_view(page: ft.Page) -> ft.Column:
                 "SRT file not found in the system.",
                 f"{str(err)}\n\nThe file may have been deleted during processing."
             )
-        except UnicodeDecodeError as err:
-            logger.error(f"Encoding error: {err}")
-            status_text.value = "Error: Invalid file encoding"
-            status_text.color = "red"
-            page.update()
-            show_error_dialog(
-                "Encoding Error",
-                "Cannot read the SRT file.",
-                f"The file is not encoded in UTF-8.\n\n"
-                f"Error: {str(err)}\n\n"
-                "Please make sure this is a valid SRT file from a DJI drone."
-            )
         except ValueError as err:
             logger.error(f"Value error: {err}")
             status_text.value = "Error: Invalid data"
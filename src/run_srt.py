@@ -1,10 +1,10 @@
 from pathlib import Path
 
-from app.services.video_metadata_service import VideoMetadataService
-from app.services.csv_export_service import CsvExportService
-
 
 def main():
+    from app.services.video_metadata_service import VideoMetadataService
+    from app.services.csv_export_service import CsvExportService
+
     project_root = Path(__file__).resolve().parent.parent
 
     video_dir = project_root / "DJI_202512221456_005"
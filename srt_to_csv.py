@@ -2,19 +2,16 @@
 DJI SRT to CSV Converter
 ========================
 Drag and drop an SRT file on this script to create a CSV file in the same location.
+For batch scripts use the non-interactive CLI instead: PYTHONPATH=src python -m app --help
 """
 import sys
-import re
 from pathlib import Path
 from typing import List, Optional
 import csv
 
-# Regex patterns
-TIME_RE = re.compile(r"(\d+):(\d+):(\d+),(\d+)")
-DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)")
-LAT_RE = re.compile(r"\[latitude:\s*([-\d.]+)\]")
-LON_RE = re.compile(r"\[longitude:\s*([-\d.]+)\]")
-ABS_ALT_RE = re.compile(r"abs_alt:\s*([-\d.]+)")
+# The SRT parsing itself is the app's parser engine (src/app/services/parser_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+from app.services.parser_engine import ParserEngine  # noqa: E402
 
 
 class VideoFrameMetadata:
@@ -62,18 +59,6 @@ def ms_to_hms(ms: int) -> str:
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
 
 
-def extract_float(pattern: re.Pattern, text: str) -> Optional[float]:
-    """Extract float value from text using regex"""
-    match = pattern.search(text)
-    return float(match.group(1)) if match else None
-
-
-def extract_string(pattern: re.Pattern, text: str) -> Optional[str]:
-    """Extract string from text using regex"""
-    match = pattern.search(text)
-    return match.group(1) if match else None
-
-
 def process_srt(srt_path: Path) -> List[VideoFrameMetadata]:
     """Process SRT file and extract metadata"""
     print(f"Processing file: {srt_path}")
@@ -81,48 +66,13 @@ def process_srt(srt_path: Path) -> List[VideoFrameMetadata]:
     if not srt_path.exists():
         raise FileNotFoundError(f"File not found: {srt_path}")
     
-    # Read SRT file
-    print(f"Reading SRT file: {srt_path}")
-    with srt_path.open("r", encoding="utf-8") as f:
-        lines = f.readlines()
-    
-    print(f"Read {len(lines)} lines from SRT file")
     frames: List[VideoFrameMetadata] = []
     
     # Extract video name from path
     video_name = srt_path.stem
     
-    i = 0
-    while i < len(lines):
-        # Search for timecode
-        time_match = TIME_RE.search(lines[i])
-        if not time_match:
-            i += 1
-            continue
-        
-        h, m, s, ms = map(int, time_match.groups())
-        
-        # Read next block (up to 12 lines)
-        block_text = "".join(lines[i:i + 12])
-        
-        # Extract GPS data
-        latitude = extract_float(LAT_RE, block_text)
-        longitude = extract_float(LON_RE, block_text)
-        altitude = extract_float(ABS_ALT_RE, block_text)
-        
-        # Skip frame if no GPS data
-        if latitude is None or longitude is None:
-            i += 1
-            continue
-        
-        # Extract date
-        date_str = extract_string(DATE_RE, block_text)
-        date_only = date_str.split()[0] if date_str else ""
-        
-        # Calculate TIME
-        timestamp_ms = ((h * 60 + m) * 60 + s) * 1000 + ms
-        time_str = ms_to_hms(timestamp_ms)
-        
+    print(f"Reading SRT file: {srt_path}")
+    for timestamp_ms, date_str, latitude, longitude, altitude, _ in ParserEngine().records(srt_path, fields=False):
         # Create frame metadata
         frame = VideoFrameMetadata(
             comments="",
@@ -130,12 +80,11 @@ def process_srt(srt_path: Path) -> List[VideoFrameMetadata]:
             altitude=altitude,
             longitude=longitude,
             latitude=latitude,
-            time=time_str,
-            date=date_only,
+            time=ms_to_hms(timestamp_ms),
+            date=date_str.split()[0] if date_str else "",
         )
         
         frames.append(frame)
-        i += 1
         
         # Log progress every 1000 frames
         if len(frames) % 1000 == 0:
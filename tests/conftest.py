@@ -2,6 +2,8 @@
 Pytest configuration and shared fixtures
 """
 import pytest
+import math
+import struct
 from pathlib import Path
 from typing import List
 from app.models.video_frame_metadata import VideoFrameMetadata
@@ -94,3 +96,116 @@ def sample_frames() -> List[VideoFrameMetadata]:
 def csv_output_path(tmp_path: Path) -> Path:
     """Create a temporary CSV output path for testing"""
     return tmp_path / "output.csv"
+
+
+def _box(box_type: bytes, *payload: bytes) -> bytes:
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _djmd_sample(frame: int, latitude: float, longitude: float, altitude_mm: int) -> bytes:
+    """DJI frame metadata protobuf: field 6 holds counter, position (radians) and altitude (mm)"""
+    gps = _varint(2 << 3) + _varint(640000000 + frame * 33367)
+    if frame:
+        gps += _varint(3 << 3) + _varint(frame)
+    gps += _varint(4 << 3 | 1) + struct.pack("<d", math.radians(latitude))
+    gps += _varint(5 << 3 | 1) + struct.pack("<d", math.radians(longitude))
+    gps += _varint(6 << 3) + _varint(altitude_mm)
+    return _varint(6 << 3 | 2) + _varint(len(gps)) + gps
+
+
+@pytest.fixture
+def sample_mp4_path(tmp_path: Path) -> Path:
+    """Create a DJI-style MP4 (no SRT sidecar) whose djmd track has the frames of sample_srt_path"""
+    samples = [
+        _djmd_sample(0, 31.123456, 34.567890, 150000),
+        _djmd_sample(1, 31.123457, 34.567891, 150100),
+        _djmd_sample(2, 31.123458, 34.567892, 150200),
+    ]
+    video = b"\x00" * 4096  # stands in for the video payload around the telemetry chunks
+
+    ftyp = _box(b"ftyp", b"isom", struct.pack(">I", 512), b"isomiso2mp41")
+    first_chunk = len(ftyp) + 8 + len(video)
+    second_chunk = first_chunk + len(samples[0]) + len(samples[1]) + len(video)
+    mdat = _box(b"mdat", video, samples[0], samples[1], video, samples[2])
+
+    full = struct.pack(">I", 0)  # version and flags
+    stbl = _box(
+        b"stbl",
+        _box(b"stsd", full, struct.pack(">I", 1), _box(b"djmd", bytes(6), struct.pack(">H", 1))),
+        _box(b"stts", full, struct.pack(">III", 1, 3, 33033)),
+        _box(b"stsc", full, struct.pack(">I", 2), struct.pack(">III", 1, 2, 1), struct.pack(">III", 2, 1, 1)),
+        _box(b"stsz", full, struct.pack(">II", 0, 3), struct.pack(">3I", *(len(s) for s in samples))),
+        _box(b"stco", full, struct.pack(">I", 2), struct.pack(">II", first_chunk, second_chunk)),
+    )
+    mdhd = _box(b"mdhd", full, struct.pack(">IIIIHH", 3817728000, 3817728000, 1000000, 99099, 0, 0))
+    hdlr = _box(b"hdlr", full, struct.pack(">I4s", 0, b"meta"), bytes(12), b"DJI meta\x00")
+    moov = _box(b"moov", _box(b"trak", _box(b"mdia", mdhd, hdlr, _box(b"minf", stbl))))
+
+    mp4_file = tmp_path / "DJI_20241222150801_0001_T.MP4"
+    mp4_file.write_bytes(ftyp + mdat + moov)
+    return mp4_file
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+
+@pytest.fixture
+def sample_jpg_path(tmp_path: Path) -> Path:
+    """Create a DJI-style JPEG (EXIF GPS, drone-dji XMP, a large APP3) taken during sample_srt_path"""
+    def entry(tag: int, kind: int, count: int, value: bytes) -> bytes:
+        return struct.pack("<HHI", tag, kind, count) + value.ljust(4, b"\x00")
+
+    def rationals(*values) -> bytes:
+        return b"".join(struct.pack("<II", numerator, denominator) for numerator, denominator in values)
+
+    # TIFF header, IFD0 (2 entries) at 8, Exif IFD (1 entry) at 38, GPS IFD (5 entries) at 56
+    stamp = b"2024:12:22 15:08:01\x00"
+    gps_data = 56 + 2 + 5 * 12 + 4
+    exif_ifd = entry(0x9003, 2, len(stamp), struct.pack("<I", gps_data + 56))
+    gps_ifd = b"".join([
+        entry(1, 2, 2, b"N\x00"),
+        entry(2, 5, 3, struct.pack("<I", gps_data)),
+        entry(3, 2, 2, b"E\x00"),
+        entry(4, 5, 3, struct.pack("<I", gps_data + 24)),
+        entry(6, 5, 1, struct.pack("<I", gps_data + 48)),
+    ])
+    tiff = b"".join([
+        b"II*\x00", struct.pack("<I", 8),
+        struct.pack("<H", 2), entry(0x8769, 4, 1, struct.pack("<I", 38)), entry(0x8825, 4, 1, struct.pack("<I", 56)),
+        struct.pack("<I", 0),
+        struct.pack("<H", 1), exif_ifd, struct.pack("<I", 0),
+        struct.pack("<H", 5), gps_ifd, struct.pack("<I", 0),
+        rationals((31, 1), (7, 1), (244442, 10000)),   # 31.123457
+        rationals((34, 1), (34, 1), (42408, 10000)),   # 34.567845
+        rationals((150000, 1000)),
+        stamp,
+    ])
+    xmp = (b'<x:xmpmeta><rdf:Description drone-dji:AbsoluteAltitude="+150.050" '
+           b'drone-dji:RelativeAltitude="+50.050" drone-dji:GimbalYawDegree="-28.3" '
+           b'drone-dji:GimbalPitchDegree="-90.0" drone-dji:GimbalRollDegree="+0.0">'
+           b'<drone-dji:GpsLongitude>34.5678905</drone-dji:GpsLongitude></rdf:Description></x:xmpmeta>')
+
+    jpg_file = tmp_path / "DJI_20241222150801_0002_T.JPG"
+    jpg_file.write_bytes(b"".join([
+        b"\xff\xd8",
+        _jpeg_segment(0xE1, b"Exif\x00\x00" + tiff),
+        _jpeg_segment(0xE3, bytes(60000)),  # thermal data, skipped
+        _jpeg_segment(0xE1, b"http://ns.adobe.com/xap/1.0/\x00" + xmp),
+        _jpeg_segment(0xDA, bytes(10)),
+        b"\xff\xd9",
+    ]))
+    return jpg_file
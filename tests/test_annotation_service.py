@@ -0,0 +1,130 @@
+"""
+Tests for AnnotationService
+"""
+import pytest
+from pathlib import Path
+from app.models.video_frame_metadata import VideoFrameMetadata
+from app.services.annotation_service import Annotation, AnnotationService, parse_time_ms
+from app.services.video_metadata_service import VideoMetadataService
+
+REFERENCE_CSV = Path(__file__).parent.parent / "test" / "TSIRA0812_01_01.csv"
+
+
+def _frames(times):
+    return [
+        VideoFrameMetadata(video_name="flight", latitude=31.0, longitude=34.0, time=t, date="2025-12-22")
+        for t in times
+    ]
+
+
+FRAME_TIMES = ["00:00:00:000", "00:00:01:000", "00:00:02:000", "00:00:03:000"]
+
+
+class TestParseTime:
+    """Test cases for parse_time_ms"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("00:10:24", 624000),
+        ("10:24", 624000),
+        ("00:00:01:500", 1500),
+        ("00:00:01.5", 1500),
+        ("00:00:01,250", 1250),
+        ("2.25", 2250),
+    ])
+    def test_formats(self, text, expected):
+        """Test the supported time formats"""
+        assert parse_time_ms(text) == expected
+
+    def test_invalid_time(self):
+        """Test that an unparseable time raises ValueError"""
+        with pytest.raises(ValueError):
+            parse_time_ms("noon")
+
+
+class TestAnnotationService:
+    """Test cases for AnnotationService"""
+
+    def test_nearest_frame(self):
+        """Test that annotations go to the nearest frame"""
+        service = AnnotationService([Annotation(1400, "a"), Annotation(1600, "b")])
+
+        comments = [f.comments for f in service.merge(_frames(FRAME_TIMES))]
+
+        assert comments == ["", "a", "b", ""]
+
+    def test_preceding_frame(self):
+        """Test that annotations go to the last frame at or before them"""
+        service = AnnotationService([Annotation(1999, "a"), Annotation(2000, "b")], mode="preceding")
+
+        comments = [f.comments for f in service.merge(_frames(FRAME_TIMES))]
+
+        assert comments == ["", "a", "b", ""]
+
+    def test_annotations_outside_the_flight(self):
+        """Test that early and late annotations attach to the first and last frames"""
+        service = AnnotationService([Annotation(9000, "late"), Annotation(0, "early")])
+
+        comments = [f.comments for f in service.merge(_frames(FRAME_TIMES))]
+
+        assert comments == ["early", "", "", "late"]
+
+    def test_same_frame_annotations_are_joined(self):
+        """Test that several notes on one frame are joined in time order"""
+        service = AnnotationService([Annotation(2100, "second"), Annotation(1900, "first")])
+
+        comments = [f.comments for f in service.merge(_frames(FRAME_TIMES))]
+
+        assert comments[2] == "first; second"
+
+    def test_tolerance_drops_far_annotations(self):
+        """Test that annotations far from every frame are dropped"""
+        service = AnnotationService([Annotation(60000, "elsewhere")], tolerance_ms=500)
+
+        assert all(f.comments == "" for f in service.merge(_frames(FRAME_TIMES)))
+
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected"""
+        with pytest.raises(ValueError):
+            AnnotationService([], mode="closest")
+
+    def test_from_csv_with_header(self, tmp_path):
+        """Test loading a CSV with a header, skipping empty comments"""
+        path = tmp_path / "notes.csv"
+        path.write_text("comment,time\nbridge,00:00:02\n,00:00:03\n", encoding="utf-8")
+
+        service = AnnotationService.from_csv(path)
+
+        assert service.annotations == [Annotation(2000, "bridge")]
+
+    def test_from_csv_without_header(self, tmp_path):
+        """Test that without a header the first two columns are time and comment"""
+        path = tmp_path / "notes.csv"
+        path.write_text("0:01,take-off\n00:00:00:500,armed\n", encoding="utf-8")
+
+        service = AnnotationService.from_csv(path)
+
+        assert [a.comment for a in service.annotations] == ["armed", "take-off"]
+
+    def test_from_csv_bad_time(self, tmp_path):
+        """Test that a bad time reports the row"""
+        path = tmp_path / "notes.csv"
+        path.write_text("TIME,COMMENTS\nsoon,hello\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="row 1"):
+            AnnotationService.from_csv(path)
+
+    def test_reference_csv(self):
+        """Test loading the reference TSIRA export, whose note belongs to one video"""
+        service = AnnotationService.from_csv(REFERENCE_CSV)
+
+        assert service.annotations == [Annotation(0, "10:24", "TSIRA0812_01_01")]
+        assert service.for_video("TSIRA0812_01_01").annotations
+        assert not service.for_video("DJI_0001").annotations
+
+    def test_merge_extracted_frames(self, sample_srt_path):
+        """Test merging into frames streamed from an SRT"""
+        service = AnnotationService([Annotation(40, "look")])
+
+        frames = list(service.merge(VideoMetadataService().iter_frames(sample_srt_path)))
+
+        assert [f.comments for f in frames] == ["", "look", ""]
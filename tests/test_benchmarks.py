@@ -0,0 +1,100 @@
+"""
+Tests for the benchmark suite (synthetic SRT generator and regression check)
+"""
+import pytest
+from pathlib import Path
+from app.services.video_metadata_service import VideoMetadataService
+from benchmarks.srt_generator import LENSES, generate_srt
+from benchmarks.run_benchmarks import check_regressions, load_baseline, median_results, save_baseline
+
+
+class TestSrtGenerator:
+    """Test cases for the synthetic SRT generator"""
+
+    @pytest.mark.parametrize("lens", LENSES)
+    def test_generated_file_parses(self, tmp_path, lens):
+        """Test that every lens layout is parsed by VideoMetadataService"""
+        srt_path = tmp_path / f"synthetic_{lens}.SRT"
+        count = generate_srt(srt_path, lens=lens, duration_s=2)
+
+        frames = VideoMetadataService().extract_from_video(srt_path)
+
+        assert count == 60
+        assert len(frames) == 60
+        assert frames[0].time == "00:00:00:000"
+        assert frames[1].time == "00:00:00:033"
+        assert frames[0].date == "2025-12-22"
+        assert frames[0].latitude == pytest.approx(31.240786, abs=1e-4)
+
+    def test_generator_is_deterministic(self, tmp_path):
+        """Test that the same seed produces the same file"""
+        first = tmp_path / "first.SRT"
+        second = tmp_path / "second.SRT"
+        generate_srt(first, duration_s=1, seed=7)
+        generate_srt(second, duration_s=1, seed=7)
+
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_gps_dropout_skips_frames(self, tmp_path):
+        """Test that blocks without GPS are written and skipped by the extractor"""
+        srt_path = tmp_path / "dropout.SRT"
+        count = generate_srt(srt_path, duration_s=10, gps_dropout=0.5)
+
+        frames = VideoMetadataService().extract_from_video(srt_path)
+
+        assert 0 < len(frames) < count
+
+    def test_unknown_lens_raises_error(self, tmp_path):
+        """Test that an unknown lens variant raises ValueError"""
+        with pytest.raises(ValueError):
+            generate_srt(tmp_path / "bad.SRT", lens="X", duration_s=1)
+
+
+class TestRegressionCheck:
+    """Test cases for baseline comparison"""
+
+    def test_within_tolerance(self):
+        """Test that results inside the tolerance pass"""
+        baseline = {"service.extract/T/10m": {"seconds": 1.0, "peak_mb": 40.0}}
+        results = {"service.extract/T/10m": {"seconds": 1.2, "peak_mb": 42.0}}
+
+        assert check_regressions(results, baseline) == []
+
+    def test_slowdown_is_reported(self):
+        """Test that time and memory regressions are both reported"""
+        baseline = {"service.extract/T/10m": {"seconds": 1.0, "peak_mb": 40.0}}
+        results = {"service.extract/T/10m": {"seconds": 2.0, "peak_mb": 80.0}}
+
+        regressions = check_regressions(results, baseline)
+
+        assert len(regressions) == 2
+        assert "seconds" in regressions[0]
+        assert "peak_mb" in regressions[1]
+
+    def test_short_cases_allow_timer_noise(self):
+        """Test that sub-100 ms cases get an absolute slack, without hiding real slowdowns"""
+        baseline = {"service.export/T/10m": {"seconds": 0.094, "peak_mb": 0.154}}
+
+        assert check_regressions({"service.export/T/10m": {"seconds": 0.14}}, baseline) == []
+        assert len(check_regressions({"service.export/T/10m": {"seconds": 0.2}}, baseline)) == 1
+        assert len(check_regressions({"service.export/T/10m": {"seconds": 0.14}}, baseline, time_slack=0)) == 1
+
+    def test_median_results(self):
+        """Test that baselines take the median of several runs per metric"""
+        runs = [{"a/T/10m": {"seconds": s, "peak_mb": m}} for s, m in [(0.9, 2.0), (0.1, 1.0), (0.2, 3.0)]]
+
+        assert median_results(runs) == {"a/T/10m": {"seconds": 0.2, "peak_mb": 2.0}}
+
+    def test_missing_baseline_entries_are_ignored(self):
+        """Test that new cases without a baseline do not fail the check"""
+        results = {"service.extract/T/1h": {"seconds": 9.0}}
+
+        assert check_regressions(results, {}) == []
+
+    def test_save_and_load_baseline(self, tmp_path):
+        """Test that saved baselines merge with existing entries"""
+        path = tmp_path / "baselines.json"
+        save_baseline({"a/T/10m": {"seconds": 1.0}}, path)
+        save_baseline({"b/T/10m": {"seconds": 2.0}}, path)
+
+        assert load_baseline(path) == {"a/T/10m": {"seconds": 1.0}, "b/T/10m": {"seconds": 2.0}}
@@ -0,0 +1,454 @@
+"""
+Tests for the command line interface
+"""
+import pytest
+import csv
+import gzip
+import io
+import json
+import os
+import zipfile
+from pathlib import Path
+from app.cli import EXIT_FAILURE, EXIT_OK, EXIT_USAGE, expand_inputs, main
+
+
+@pytest.fixture
+def srt_dir(sample_srt_path: Path) -> Path:
+    """Directory with two valid SRT files and one without GPS data"""
+    folder = sample_srt_path.parent
+    (folder / "second.SRT").write_text(sample_srt_path.read_text(encoding="utf-8"), encoding="utf-8")
+    return folder
+
+
+class TestExpandInputs:
+    """Test cases for input expansion"""
+
+    def test_glob_pattern(self, srt_dir):
+        """Test that glob patterns are expanded and sorted"""
+        paths = expand_inputs([str(srt_dir / "*.SRT")])
+
+        assert [p.name for p in paths] == ["second.SRT", "test_video.SRT"]
+
+    def test_directory_is_searched_recursively(self, srt_dir):
+        """Test that directories are searched for SRT files"""
+        nested = srt_dir / "nested"
+        nested.mkdir()
+        (nested / "third.srt").write_text("", encoding="utf-8")
+
+        paths = expand_inputs([str(srt_dir)])
+
+        assert {p.name for p in paths} == {"second.SRT", "test_video.SRT", "third.srt"}
+
+    def test_compressed_files_and_archives(self, srt_dir):
+        """Test that .SRT.gz files and the SRT members of zip archives are found"""
+        (srt_dir / "third.SRT.gz").write_bytes(gzip.compress(b"1\n"))
+        with zipfile.ZipFile(srt_dir / "flight.zip", "w") as zf:
+            zf.writestr("DJI_0001.SRT", "1\n")
+            zf.writestr("readme.txt", "")
+
+        names = [p.name for p in expand_inputs([str(srt_dir)])]
+        assert names == ["DJI_0001.SRT", "second.SRT", "test_video.SRT", "third.SRT.gz"]
+
+    def test_videos_without_sidecar(self, sample_mp4_path):
+        """Test that only videos without an SRT sidecar are picked from directories"""
+        folder = sample_mp4_path.parent
+        (folder / "DJI_0002.MP4").write_bytes(b"")
+        (folder / "DJI_0002.SRT").write_text("1\n", encoding="utf-8")
+
+        names = [p.name for p in expand_inputs([str(folder)])]
+        assert names == ["DJI_0002.SRT", "DJI_20241222150801_0001_T.MP4"]
+
+    def test_duplicates_are_removed(self, sample_srt_path):
+        """Test that the same file given twice is converted once"""
+        paths = expand_inputs([str(sample_srt_path), str(sample_srt_path.parent / "*.SRT")])
+
+        assert paths == [sample_srt_path]
+
+
+class TestConvertCommand:
+    """Test cases for the convert command"""
+
+    def test_default_output_next_to_input(self, sample_srt_path):
+        """Test that the CSV is written next to the SRT"""
+        assert main([str(sample_srt_path)]) == EXIT_OK
+
+        rows = list(csv.DictReader(sample_srt_path.with_suffix(".csv").open(encoding="utf-8")))
+        assert len(rows) == 3
+
+    def test_stdout_stream_has_single_header(self, srt_dir, capsys):
+        """Test that several inputs stream to stdout as one CSV"""
+        assert main(["convert", str(srt_dir / "*.SRT"), "-o", "-"]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert len(rows) == 6
+        assert rows[0]["VIDEO NAME"] == "second"
+        assert rows[3]["VIDEO NAME"] == "test_video"
+
+    def test_copies_are_linked(self, sample_srt_path, tmp_path):
+        """Test that a re-copied SRT gets a link to the first output instead of a conversion"""
+        copy = tmp_path / "card2" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+        index_path = tmp_path / "fingerprints.json"
+
+        assert main(["convert", str(sample_srt_path), str(copy), "--fingerprints", str(index_path)]) == EXIT_OK
+
+        assert os.path.samefile(copy.with_suffix(".csv"), sample_srt_path.with_suffix(".csv"))
+        assert len(json.loads(index_path.read_text(encoding="utf-8"))) == 2
+
+        copy.with_suffix(".csv").unlink()
+        assert main(["convert", str(copy), "--fingerprints", str(index_path), "-j", "2"]) == EXIT_OK
+        assert os.path.samefile(copy.with_suffix(".csv"), sample_srt_path.with_suffix(".csv"))
+
+        copy.with_suffix(".csv").unlink()
+        assert main(["convert", str(copy), "--fingerprints", str(index_path), "--no-dedupe"]) == EXIT_OK
+        assert not os.path.samefile(copy.with_suffix(".csv"), sample_srt_path.with_suffix(".csv"))
+
+    def test_reconverting_keeps_linked_copies(self, sample_srt_path, tmp_path):
+        """Test that converting the original again with other options leaves its linked copy as it was"""
+        copy = tmp_path / "card2" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+        assert main(["convert", str(sample_srt_path), str(copy)]) == EXIT_OK
+        linked = copy.with_suffix(".csv").read_text(encoding="utf-8")
+
+        assert main(["convert", str(sample_srt_path), "--kinematics"]) == EXIT_OK
+
+        assert copy.with_suffix(".csv").read_text(encoding="utf-8") == linked
+        assert sample_srt_path.with_suffix(".csv").read_text(encoding="utf-8") != linked
+
+    def test_single_output_file_keeps_linked_copies(self, sample_srt_path, tmp_path):
+        """Test that -o FILE replaces a linked output instead of rewriting the file it shares"""
+        copy = tmp_path / "card2" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+        assert main(["convert", str(sample_srt_path), str(copy)]) == EXIT_OK
+        linked = sample_srt_path.with_suffix(".csv").read_text(encoding="utf-8")
+
+        assert main(["convert", str(copy), "-o", str(copy.with_suffix(".csv")),
+                     "--kinematics", "--no-dedupe"]) == EXIT_OK
+
+        assert sample_srt_path.with_suffix(".csv").read_text(encoding="utf-8") == linked
+        assert copy.with_suffix(".csv").read_text(encoding="utf-8") != linked
+        assert not os.path.samefile(copy.with_suffix(".csv"), sample_srt_path.with_suffix(".csv"))
+
+    def test_edited_template_is_not_reused(self, sample_srt_path, tmp_path):
+        """Test that a copy is converted again after the template file changed"""
+        copy = tmp_path / "card2" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+        template = tmp_path / "layout.json"
+        template.write_text('{"columns": ["TIME"]}', encoding="utf-8")
+        index = ["--fingerprints", str(tmp_path / "fingerprints.json"), "--template", str(template)]
+        assert main(["convert", str(sample_srt_path)] + index) == EXIT_OK
+
+        template.write_text('{"columns": ["TIME", "DATE"]}', encoding="utf-8")
+        assert main(["convert", str(copy)] + index) == EXIT_OK
+
+        assert not os.path.samefile(copy.with_suffix(".csv"), sample_srt_path.with_suffix(".csv"))
+        assert copy.with_suffix(".csv").read_text(encoding="utf-8").startswith("TIME,DATE")
+
+    def test_copies_stream_once(self, sample_srt_path, tmp_path, capsys):
+        """Test that a copy in the inputs does not repeat its rows in a stream"""
+        copy = tmp_path / "card2" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+
+        assert main(["convert", str(sample_srt_path), str(copy), "-o", "-"]) == EXIT_OK
+
+        assert len(list(csv.DictReader(io.StringIO(capsys.readouterr().out)))) == 3
+
+    def test_kinematics_columns(self, srt_dir, capsys):
+        """Test that --kinematics adds the derived columns to the stream"""
+        assert main(["convert", str(srt_dir / "*.SRT"), "-o", "-", "--kinematics"]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert len(rows) == 6
+        assert rows[0]["CUMULATIVE DISTANCE"] == "0.0"
+        assert float(rows[2]["CUMULATIVE DISTANCE"]) > 0
+
+    def test_resample(self, sample_srt_path, capsys):
+        """Test that --resample writes one row per grid time"""
+        assert main(["convert", str(sample_srt_path), "-o", "-", "--resample", "60"]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert [row["TIME"] for row in rows] == [
+            "00:00:00:000", "00:00:00:017", "00:00:00:033", "00:00:00:050",
+        ]
+
+    def test_footprint_geojson(self, sample_srt_path, capsys):
+        """Test that --footprint adds the target columns and geojsonl writes features"""
+        assert main(["convert", str(sample_srt_path), "-o", "-", "--footprint", "-f", "geojsonl"]) == EXIT_OK
+
+        features = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(features) == 3
+        assert "TARGET LATITUDE" in features[0]["properties"]
+
+    def test_annotations(self, sample_srt_path, tmp_path, capsys):
+        """Test that --annotations fills the COMMENTS column"""
+        notes = tmp_path / "notes.csv"
+        notes.write_text("TIME,COMMENTS\n00:00:00.060,target\n", encoding="utf-8")
+
+        assert main(["convert", str(sample_srt_path), "-o", "-", "--annotations", str(notes)]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert [row["COMMENTS"] for row in rows] == ["", "", "target"]
+
+    def test_missing_annotations_file(self, sample_srt_path, tmp_path):
+        """Test that a missing annotations file is a usage error"""
+        args = ["convert", str(sample_srt_path), "--annotations", str(tmp_path / "none.csv")]
+        assert main(args) == EXIT_USAGE
+
+    def test_template(self, srt_dir, capsys):
+        """Test that --template changes the layout and keeps one header"""
+        assert main(["convert", str(srt_dir / "*.SRT"), "-o", "-", "--template", "tsira"]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert len(rows) == 6
+        assert rows[0]["DATE"] == "22/12/2024"
+        assert [row["VIDEO NAME"] for row in rows] == ["second", "", "", "test_video", "", ""]
+
+    def test_invalid_template(self, sample_srt_path):
+        """Test that an unknown template is a usage error"""
+        assert main(["convert", str(sample_srt_path), "--template", "nope"]) == EXIT_USAGE
+
+    def test_filters(self, sample_srt_path, tmp_path, capsys):
+        """Test that the filter options select frames"""
+        polygon = tmp_path / "site.geojson"
+        polygon.write_text(json.dumps({"type": "Polygon", "coordinates": [
+            [[34.5, 31.0], [35.0, 31.0], [35.0, 32.0], [34.5, 32.0], [34.5, 31.0]],
+        ]}), encoding="utf-8")
+
+        assert main([str(sample_srt_path), "-o", "-", "--polygon", str(polygon),
+                     "--start", "00:00:00.030", "--min-alt", "150.15"]) == EXIT_OK
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert [row["TIME"] for row in rows] == ["00:00:00:066"]
+
+    def test_invalid_filter(self, sample_srt_path):
+        """Test that malformed filter values are usage errors"""
+        assert main([str(sample_srt_path), "--bbox", "34,31,35"]) == EXIT_USAGE
+        assert main([str(sample_srt_path), "--start", "00:10", "--end", "00:05"]) == EXIT_USAGE
+
+    def test_output_directory_and_format(self, srt_dir, tmp_path):
+        """Test JSONL output into a directory"""
+        out_dir = tmp_path / "out"
+
+        assert main([str(srt_dir / "*.SRT"), "-o", f"{out_dir}/", "--format", "jsonl"]) == EXIT_OK
+
+        lines = (out_dir / "test_video.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])["LATITUDE"] == pytest.approx(31.123456)
+
+    def test_same_name_from_two_folders(self, sample_srt_path, tmp_path):
+        """Test that different inputs with one output name are refused before anything is written"""
+        out_dir = tmp_path / "out"
+        other = tmp_path / "card2" / sample_srt_path.name
+        other.parent.mkdir()
+        other.write_text(sample_srt_path.read_text(encoding="utf-8").replace("31.123456", "32.000001"),
+                         encoding="utf-8")
+        copy = tmp_path / "card3" / sample_srt_path.name
+        copy.parent.mkdir()
+        copy.write_bytes(sample_srt_path.read_bytes())
+
+        assert main([str(sample_srt_path), str(other), "-o", f"{out_dir}/", "-j", "2"]) == EXIT_USAGE
+        assert not list(out_dir.iterdir())
+        # Copies of one file may share their output
+        assert main([str(sample_srt_path), str(copy), "-o", f"{out_dir}/"]) == EXIT_OK
+        assert (out_dir / "test_video.csv").is_file()
+
+    def test_xlsx_output(self, srt_dir, sample_srt_path, tmp_path):
+        """Test XLSX into a directory or a named file, and no XLSX concatenation"""
+        output = tmp_path / "flight.xlsx"
+
+        assert main([str(sample_srt_path), "-o", str(output), "-f", "xlsx"]) == EXIT_OK
+        assert zipfile.is_zipfile(output)
+        assert main([str(srt_dir / "*.SRT"), "-o", f"{tmp_path}/out/", "-f", "xlsx"]) == EXIT_OK
+        assert (tmp_path / "out" / "second.xlsx").is_file()
+        assert main([str(srt_dir / "*.SRT"), "-o", str(output), "-f", "xlsx"]) == EXIT_USAGE
+        assert main([str(sample_srt_path), "-o", "-", "-f", "xlsx"]) == EXIT_USAGE
+
+    def test_zip_archive_members(self, srt_dir, tmp_path):
+        """Test that the SRT members of a zip are converted in parallel, with outputs next to the archive"""
+        archive = srt_dir / "flight.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.write(srt_dir / "test_video.SRT", "DJI_0001.SRT")
+            zf.write(srt_dir / "second.SRT", "DJI_0002.SRT")
+
+        assert main([str(archive), "--jobs", "2"]) == EXIT_OK
+        assert (srt_dir / "DJI_0001.csv").is_file()
+        assert (srt_dir / "DJI_0002.csv").is_file()
+
+    def test_parallel_jobs(self, srt_dir, capsys):
+        """Test that --jobs keeps the output in input order"""
+        assert main(["-q", str(srt_dir / "*.SRT"), "-o", "-", "--jobs", "2"]) == EXIT_OK
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert [r["VIDEO NAME"] for r in rows] == ["second"] * 3 + ["test_video"] * 3
+
+    def test_failed_input_sets_exit_code(self, sample_srt_path, invalid_srt_path, capsys):
+        """Test that a file without GPS data fails without stopping the batch"""
+        assert main([str(sample_srt_path), str(invalid_srt_path), "-o", "-"]) == EXIT_FAILURE
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert len(rows) == 3
+
+    def test_no_matching_inputs(self, tmp_path):
+        """Test that an empty glob is a usage error"""
+        assert main([str(tmp_path / "*.SRT")]) == EXIT_USAGE
+
+    def test_bad_arguments(self):
+        """Test that argparse errors return the usage exit code"""
+        assert main(["convert"]) == EXIT_USAGE
+        assert main([]) == EXIT_USAGE
+
+
+class TestIndexCommand:
+    """Test cases for the index sub-command"""
+
+    def test_writes_sidecar_index(self, srt_dir):
+        """Test that an index is written next to every SRT"""
+        assert main(["index", str(srt_dir)]) == EXIT_OK
+        assert sorted(p.name for p in srt_dir.glob("*.idx")) == ["second.SRT.idx", "test_video.SRT.idx"]
+
+    def test_no_matching_inputs(self, tmp_path):
+        """Test that an empty glob is a usage error"""
+        assert main(["index", str(tmp_path / "*.SRT")]) == EXIT_USAGE
+
+    def test_skips_packed_sources_and_videos(self, srt_dir, sample_mp4_path, caplog):
+        """Test that compressed SRTs, zip members and videos are skipped instead of indexed"""
+        (srt_dir / "third.SRT.gz").write_bytes(gzip.compress(b"1\n"))
+        with zipfile.ZipFile(srt_dir / "flight.zip", "w") as zf:
+            zf.writestr("DJI_0001.SRT", "1\n")
+
+        assert main(["index", str(srt_dir), str(sample_mp4_path)]) == EXIT_OK
+
+        assert sorted(p.name for p in srt_dir.glob("*.idx")) == ["second.SRT.idx", "test_video.SRT.idx"]
+        assert not sample_mp4_path.with_name(sample_mp4_path.name + ".idx").exists()
+        assert "Skipping" in caplog.text and "third.SRT.gz" in caplog.text
+
+
+class TestTrimCommand:
+    """Test cases for the trim sub-command"""
+
+    def test_trim_with_csv(self, sample_srt_path):
+        """Test that the trimmed SRT and its CSV are written next to the input"""
+        assert main(["trim", str(sample_srt_path), "-r", "0:00.03-0:00.1", "--csv"]) == EXIT_OK
+
+        output = sample_srt_path.with_name("test_video_trim.SRT")
+        with output.with_suffix(".csv").open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert output.is_file()
+        assert [row["TIME"] for row in rows] == ["00:00:00:033", "00:00:00:066"]
+
+    def test_invalid_range(self, sample_srt_path):
+        """Test that a malformed range is a usage error"""
+        assert main(["trim", str(sample_srt_path), "-r", "later"]) == EXIT_USAGE
+
+
+class TestPhotosCommand:
+    """Test cases for the photos sub-command"""
+
+    def test_photos_matched_to_srt(self, sample_jpg_path, sample_srt_path):
+        """Test that photos and SRTs in one folder give a photos CSV with the matched frames"""
+        assert main(["photos", str(sample_jpg_path.parent)]) == EXIT_OK
+
+        with (sample_jpg_path.parent / "photos.csv").open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["PHOTO NAME"] for row in rows] == ["DJI_20241222150801_0002_T"]
+        assert rows[0]["VIDEO NAME"] == "test_video"
+        assert rows[0]["VIDEO TIME"] == "00:00:00:000"
+
+    def test_no_photos(self, sample_srt_path):
+        """Test that inputs without photos are a usage error"""
+        assert main(["photos", str(sample_srt_path)]) == EXIT_USAGE
+
+
+class TestQualityCommand:
+    """Test cases for the quality sub-command"""
+
+    def test_writes_sidecar_and_summary(self, sample_srt_path, capsys):
+        """Test that a clean flight gets a sidecar and a one-line summary"""
+        assert main(["quality", str(sample_srt_path), "--strict"]) == EXIT_OK
+
+        assert "no issues found" in capsys.readouterr().out
+        assert sample_srt_path.with_name("test_video.quality.json").is_file()
+
+    def test_strict_fails_on_issues(self, sample_srt_path):
+        """Test that --strict turns issues into a failure exit code"""
+        text = sample_srt_path.read_text(encoding="utf-8").replace("FrameCnt: 3", "FrameCnt: 9")
+        sample_srt_path.write_text(text, encoding="utf-8")
+
+        assert main(["quality", str(sample_srt_path), "--no-sidecar", "--strict"]) == EXIT_FAILURE
+        assert not sample_srt_path.with_name("test_video.quality.json").exists()
+
+
+class TestStitchCommand:
+    """Test cases for the stitch sub-command"""
+
+    def test_writes_one_file_per_flight(self, tmp_path):
+        """Test that split recordings in a folder are written as one stitched CSV"""
+        from benchmarks.srt_generator import generate_srt
+        from datetime import datetime
+
+        generate_srt(tmp_path / "DJI_20251222150000_0001_T.SRT", duration_s=1, start=datetime(2025, 12, 22, 15))
+        generate_srt(tmp_path / "DJI_20251222150001_0002_T.SRT", duration_s=1,
+                     start=datetime(2025, 12, 22, 15, 0, 1))
+        output_dir = tmp_path / "out"
+
+        assert main(["stitch", str(tmp_path), "-o", f"{output_dir}/"]) == EXIT_OK
+
+        with (output_dir / "DJI_20251222150000_0001_T_stitched.csv").open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 60
+        assert {row["VIDEO NAME"] for row in rows} == {"DJI_20251222150000_0001_T", "DJI_20251222150001_0002_T"}
+
+    def test_single_output_needs_one_flight(self, sample_srt_path, tmp_path):
+        """Test that several flights cannot be written to one file"""
+        from benchmarks.srt_generator import generate_srt
+
+        generate_srt(tmp_path / "DJI_20251222150801_0005_W.SRT", lens="W", duration_s=1)
+
+        assert main(["stitch", str(tmp_path), "-o", str(tmp_path / "all.csv")]) == EXIT_USAGE
+        assert not (tmp_path / "all.csv").exists()
+
+
+class TestParsersCommand:
+    """Test cases for the parsers sub-command"""
+
+    def test_benchmark_and_save(self, sample_srt_path, tmp_path, monkeypatch, capsys):
+        """Test that the backends are timed and the choice is saved and shown"""
+        config_path = tmp_path / "parser.json"
+        monkeypatch.setenv("DJI_SRT_PARSER_CONFIG", str(config_path))
+
+        assert main(["parsers", "--benchmark", str(sample_srt_path), "--save", "--repeat", "1", "-j", "1"]) == EXIT_OK
+        assert "mmap" in capsys.readouterr().out
+        saved = json.loads(config_path.read_text(encoding="utf-8"))
+        assert saved["backend"] in ("lines", "mmap")
+
+        assert main(["parsers"]) == EXIT_OK
+        assert f"serial: {saved['backend']}" in capsys.readouterr().out
+
+    def test_missing_file(self, tmp_path):
+        """Test that benchmarking a missing file is a usage error"""
+        assert main(["parsers", "--benchmark", str(tmp_path / "missing.SRT")]) == EXIT_USAGE
+
+
+class TestCoverageCommand:
+    """Test cases for the coverage sub-command"""
+
+    def test_creates_and_updates_grid(self, sample_srt_path, tmp_path, capsys):
+        """Test that the grid is saved with a raster and later runs only add new flights"""
+        grid_path = tmp_path / "site.npz"
+        args = ["coverage", str(sample_srt_path), "-g", str(grid_path), "--cell", "5"]
+
+        assert main(args) == EXIT_OK
+        assert main(args + ["-o", str(tmp_path / "site.npy")]) == EXIT_OK
+
+        assert "1 flights, 1 cells flown" in capsys.readouterr().out.splitlines()[-1]
+        assert (tmp_path / "site.asc").read_text(encoding="ascii").startswith("ncols 1\nnrows 1\n")
+        assert (tmp_path / "site.wld").is_file()
+
+    def test_unknown_raster_format(self, sample_srt_path, tmp_path):
+        """Test that an unsupported raster suffix is a usage error"""
+        assert main(["coverage", str(sample_srt_path), "-g", str(tmp_path / "site.npz"),
+                     "-o", str(tmp_path / "site.tif")]) == EXIT_USAGE
@@ -0,0 +1,152 @@
+"""
+Tests for CoverageService and CoverageGrid
+"""
+import pytest
+import numpy as np
+from app.services.coverage_service import CoverageGrid, CoverageService
+from benchmarks.srt_generator import generate_srt
+
+
+@pytest.fixture
+def grid():
+    """An empty grid of ~10 m cells at the sample latitude"""
+    return CoverageGrid.for_cell_size(10.0, 31.12)
+
+
+def _track(grid, rows, cols):
+    """Positions at the centres of the given cells"""
+    rows, cols = np.asarray(rows, dtype=float), np.asarray(cols, dtype=float)
+    return (rows + 0.5) * grid.dy, (cols + 0.5) * grid.dx
+
+
+class TestCoverageGrid:
+    """Test cases for CoverageGrid"""
+
+    def test_hovering_counts_once_per_flight(self, grid):
+        """Test that repeated frames in a cell count one flight, and flights add up"""
+        latitudes, longitudes = _track(grid, [100, 100, 100, 101], [200, 200, 200, 200])
+
+        assert grid.add("a", latitudes, longitudes) == 2
+        assert grid.add("b", *_track(grid, [100], [200])) == 1
+
+        assert grid.counts.tolist() == [[2], [1]]
+        assert (grid.row_min, grid.col_min) == (100, 200)
+
+    def test_grows_without_moving_cells(self, grid):
+        """Test that a flight outside the grid extends it and keeps earlier counts in place"""
+        grid.add("a", *_track(grid, [100], [200]))
+        grid.add("b", *_track(grid, [98, 100], [203, 200]))
+
+        assert grid.counts.shape == (3, 4)
+        assert (grid.row_min, grid.col_min) == (98, 200)
+        assert grid.counts[2, 0] == 2
+        assert grid.counts[0, 3] == 1
+        assert grid.counts.sum() == 3
+
+    def test_same_source_is_counted_once(self, grid):
+        """Test that adding a flight again changes nothing"""
+        grid.add("a", *_track(grid, [5], [5]))
+
+        assert grid.add("a", *_track(grid, [5], [5])) == 0
+        assert grid.counts.tolist() == [[1]]
+
+    def test_save_and_load(self, grid, tmp_path):
+        """Test that a saved grid loads with its counts, placement and flights"""
+        grid.add("a", *_track(grid, [100, 102], [200, 201]))
+        path = tmp_path / "site.npz"
+        grid.save(path)
+
+        loaded = CoverageGrid.load(path)
+        assert loaded.counts.tolist() == grid.counts.tolist()
+        assert (loaded.dx, loaded.dy, loaded.cell_m) == (grid.dx, grid.dy, 10.0)
+        assert (loaded.row_min, loaded.col_min, loaded.sources) == (100, 200, ["a"])
+
+        (tmp_path / "bad.npz").write_bytes(b"not a grid")
+        with pytest.raises(ValueError):
+            CoverageGrid.load(tmp_path / "bad.npz")
+
+    def test_write_rasters(self, grid, tmp_path):
+        """Test that the rasters are north-up and georeferenced at the grid's corner"""
+        grid.add("a", *_track(grid, [100, 101, 101], [200, 200, 201]))
+
+        grid.write(tmp_path / "site.asc")
+        lines = (tmp_path / "site.asc").read_text(encoding="ascii").splitlines()
+        assert lines[:2] == ["ncols 2", "nrows 2"]
+        assert float(lines[2].split()[1]) == pytest.approx(200 * grid.dx)
+        assert float(lines[3].split()[1]) == pytest.approx(100 * grid.dy)
+        assert lines[6:] == ["1 1", "1 0"]
+        assert "WGS 84" in (tmp_path / "site.prj").read_text(encoding="ascii")
+
+        grid.write(tmp_path / "site.npy")
+        assert np.load(tmp_path / "site.npy").tolist() == [[1, 1], [1, 0]]
+        world = [float(v) for v in (tmp_path / "site.wld").read_text(encoding="ascii").split()]
+        assert world[3] == pytest.approx(-grid.dy)
+        assert world[5] == pytest.approx(101.5 * grid.dy)
+
+        with pytest.raises(ValueError):
+            grid.write(tmp_path / "site.tif")
+
+
+class TestCoverageService:
+    """Test cases for CoverageService"""
+
+    def test_update_is_incremental(self, tmp_path, sample_srt_path, invalid_srt_path):
+        """Test that flights are counted once across updates and unreadable ones are reported"""
+        flight = tmp_path / "DJI_0002.SRT"
+        generate_srt(flight, duration_s=2, origin=(31.123456, 34.56789, 150.0))
+        missing = tmp_path / "missing.SRT"
+        service = CoverageService(cell_m=5.0)
+
+        grid = service.update([sample_srt_path, missing])
+        assert service.failed == [missing]
+        assert grid.counts.sum() == 1
+        assert grid.cell_m == 5.0
+
+        grid = service.update([sample_srt_path, flight, invalid_srt_path], grid)
+        assert service.failed == []
+        assert grid.counts.max() == 2
+        assert len(grid.sources) == 3
+
+    def test_lens_files_count_as_one_flight(self, tmp_path, sample_srt_path):
+        """Test that the S/T/W/Z files of one recording add one flight, also to grids keyed by path"""
+        lenses = []
+        for lens in "STWZ":
+            lenses.append(tmp_path / f"DJI_20251222150801_0005_{lens}.SRT")
+            lenses[-1].write_bytes(sample_srt_path.read_bytes())
+        other = tmp_path / "DJI_20251222150900_0006_T.SRT"
+        other.write_bytes(sample_srt_path.read_bytes())
+        service = CoverageService()
+
+        grid = service.update(lenses + [other])
+        assert grid.sources == ["DJI_20251222150801_0005", "DJI_20251222150900_0006"]
+        assert grid.counts.max() == 2
+
+        old = CoverageGrid.for_cell_size(10.0, 31.12)
+        old.add(str(lenses[1].resolve()), *_track(old, [0], [0]))
+        assert service.update(lenses, old).sources == [str(lenses[1].resolve())]
+
+    def test_flight_without_gps_is_not_reread(self, tmp_path, sample_srt_path, invalid_srt_path, monkeypatch):
+        """Test that a flight without GPS read before the grid exists is still recorded in it"""
+        from app.services import coverage_service
+
+        service = CoverageService()
+        grid = service.update([invalid_srt_path, sample_srt_path])
+        assert service.source_key(invalid_srt_path) in grid.sources
+
+        read = []
+        monkeypatch.setattr(coverage_service, "_read_positions", lambda source: read.append(source))
+        service.update([invalid_srt_path, sample_srt_path], grid)
+        assert read == []
+
+    def test_parallel_matches_serial(self, tmp_path):
+        """Test that reading on worker processes gives the same grid"""
+        sources = []
+        for seed in range(2):
+            sources.append(tmp_path / f"DJI_{seed:04d}.SRT")
+            generate_srt(sources[-1], duration_s=5, seed=seed)
+
+        serial = CoverageService().update(sources)
+        parallel = CoverageService(jobs=2).update(sources)
+
+        assert parallel.counts.tolist() == serial.counts.tolist()
+        assert parallel.sources == serial.sources
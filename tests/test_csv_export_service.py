@@ -110,3 +110,34 @@ class TestCsvExportService:
         first_row = lines[1].split(',')
         assert len(first_row) == 7
         assert first_row[1] == "test_video"
+    
+    def test_write_to_stream(self, service, sample_frames, csv_output_path):
+        """Test that writing to a stream matches the file export"""
+        import io
+        
+        service.export(sample_frames, csv_output_path)
+        stream = io.StringIO()
+        service.write(sample_frames, stream)
+        
+        assert stream.getvalue().splitlines() == csv_output_path.read_text(encoding="utf-8").splitlines()
+    
+    def test_write_header_only(self, service):
+        """Test that an empty write still produces the header"""
+        import io
+        
+        stream = io.StringIO()
+        service.write([], stream)
+        
+        assert stream.getvalue() == "COMMENTS,VIDEO NAME,ALTITUDE,LONGITUDE,LATITUDE,TIME,DATE\n"
+    
+    def test_write_extra_columns(self, service, sample_frames):
+        """Test that optional extra columns are appended and NaN is written as empty"""
+        import io
+        
+        stream = io.StringIO()
+        service.write(sample_frames[:2], stream, extra_columns={"GROUND SPEED": [1.5, float("nan")]})
+        lines = stream.getvalue().splitlines()
+        
+        assert lines[0].endswith(",DATE,GROUND SPEED")
+        assert lines[1].endswith(",1.5")
+        assert lines[2].endswith(",")
@@ -0,0 +1,152 @@
+"""
+Tests for FingerprintService and FingerprintIndex
+"""
+import pytest
+import gzip
+import os
+from pathlib import Path
+from app.services.fingerprint_service import (
+    EDGE_BYTES, FingerprintIndex, FingerprintService, link_output, output_profile,
+)
+from app.services.pipeline_service import ConversionOptions
+from benchmarks.srt_generator import generate_srt
+
+PROFILE = output_profile("csv")
+
+
+@pytest.fixture
+def service():
+    """A FingerprintService with an in-memory index"""
+    return FingerprintService()
+
+
+def _copy(source: Path, target: Path) -> Path:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(source.read_bytes())
+    return target
+
+
+class TestFingerprint:
+    """Test cases for taking fingerprints"""
+
+    def test_copies_match(self, service, tmp_path):
+        """Test that a copy has the fingerprint of the original and an edit changes it"""
+        original = tmp_path / "card1" / "DJI_0001.SRT"
+        original.parent.mkdir()
+        generate_srt(original, duration_s=120)
+        assert original.stat().st_size > 3 * EDGE_BYTES
+        copy = _copy(original, tmp_path / "card2" / "DJI_0001.SRT")
+
+        assert service.fingerprint(copy) == service.fingerprint(original)
+
+        data = bytearray(original.read_bytes())
+        data[-10] ^= 1
+        copy.write_bytes(bytes(data))
+        assert service.fingerprint(copy).content_key != service.fingerprint(original).content_key
+
+    def test_lens_files_share_track(self, service, tmp_path):
+        """Test that the lens files of one recording differ in content but share their GPS track"""
+        fingerprints = []
+        for lens in "TW":
+            srt_path = tmp_path / f"DJI_20251222150801_0001_{lens}.SRT"
+            generate_srt(srt_path, lens=lens, duration_s=120)
+            fingerprints.append(service.fingerprint(srt_path))
+        thermal, wide = fingerprints
+
+        assert thermal.content_key != wide.content_key
+        assert thermal.track_key == wide.track_key
+        assert (thermal.first_ms, thermal.first_stamp) == (0, "2025-12-22 15:08:01.319")
+        assert thermal.last_ms == 119966
+
+    def test_compressed_source(self, service, sample_srt_path, tmp_path):
+        """Test that compressed sources are streamed and keep the track of the plain file"""
+        packed = tmp_path / "test_video.SRT.gz"
+        packed.write_bytes(gzip.compress(sample_srt_path.read_bytes()))
+
+        fingerprint = service.fingerprint(packed)
+        assert fingerprint.size == sample_srt_path.stat().st_size
+        assert fingerprint.track_key == service.fingerprint(sample_srt_path).track_key
+        assert (fingerprint.first_ms, fingerprint.last_ms) == (0, 66)
+
+    def test_no_gps(self, service, invalid_srt_path):
+        """Test that a file without GPS has no track key"""
+        assert service.fingerprint(invalid_srt_path).track_key == ""
+
+
+class TestFingerprintService:
+    """Test cases for duplicate planning and linking"""
+
+    def test_plan(self, service, sample_srt_path, tmp_path):
+        """Test that copies in one run are grouped and other names are converted"""
+        copy = _copy(sample_srt_path, tmp_path / "card2" / sample_srt_path.name)
+        renamed = _copy(sample_srt_path, tmp_path / "other.SRT")
+        missing = tmp_path / "missing.SRT"
+
+        convert, copies, reused = service.plan([sample_srt_path, copy, renamed, missing], PROFILE)
+
+        assert convert == [sample_srt_path, renamed, missing]
+        assert copies == {copy: sample_srt_path}
+        assert reused == {}
+
+    def test_index_links_later_copies(self, sample_srt_path, tmp_path):
+        """Test that a saved index links a copy seen in a later run, for the same output settings only"""
+        index_path = tmp_path / "fingerprints.json"
+        output = tmp_path / "test_video.csv"
+        output.write_text("rows", encoding="utf-8")
+        first = FingerprintService(FingerprintIndex(index_path))
+        first.check(sample_srt_path, PROFILE)
+        first.record(sample_srt_path, output, PROFILE)
+        copy = _copy(sample_srt_path, tmp_path / "card2" / sample_srt_path.name)
+
+        later = FingerprintService(FingerprintIndex(index_path))
+        assert later.check(copy, PROFILE) == (True, output)
+        assert later.check(copy, output_profile("csv", ConversionOptions(kinematics=True))) == (True, None)
+
+        later.link(copy, output, copy.with_suffix(".csv"), PROFILE)
+        assert os.path.samefile(copy.with_suffix(".csv"), output)
+        assert len(FingerprintIndex(index_path)) == 2
+
+        output.unlink()
+        copy.with_suffix(".csv").unlink()
+        assert later.check(copy, PROFILE) == (True, None)
+
+    def test_profile_follows_file_contents(self, tmp_path):
+        """Test that editing the template or annotation file changes the output profile"""
+        template = tmp_path / "layout.json"
+        template.write_text('{"columns": ["TIME"]}', encoding="utf-8")
+        annotations = tmp_path / "notes.csv"
+        annotations.write_text("time,comment\n0:01,start\n", encoding="utf-8")
+        options = ConversionOptions(template=str(template), annotations=str(annotations))
+        profile = output_profile("csv", options)
+
+        assert output_profile("csv", options) == profile
+        template.write_text('{"columns": ["TIME", "DATE"]}', encoding="utf-8")
+        edited = output_profile("csv", options)
+        assert edited != profile
+        annotations.write_text("time,comment\n0:02,start\n", encoding="utf-8")
+        assert output_profile("csv", options) not in (profile, edited)
+        assert output_profile("csv", ConversionOptions(template="tsira")) != PROFILE
+
+    def test_lenses(self, tmp_path):
+        """Test that lens files are only duplicates when asked for"""
+        sources = []
+        for lens in "TW":
+            sources.append(tmp_path / f"DJI_20251222150801_0001_{lens}.SRT")
+            generate_srt(sources[-1], lens=lens, duration_s=2)
+
+        assert FingerprintService().plan(sources, PROFILE)[1] == {}
+        assert FingerprintService(lenses=True).plan(sources, PROFILE)[1] == {sources[1]: sources[0]}
+
+    def test_link_output_replaces_file(self, tmp_path):
+        """Test that linking replaces an older output and is a no-op on itself"""
+        existing = tmp_path / "a.csv"
+        existing.write_text("new", encoding="utf-8")
+        output = tmp_path / "out" / "b.csv"
+        output.parent.mkdir()
+        output.write_text("old", encoding="utf-8")
+
+        link_output(existing, output)
+        link_output(existing, existing)
+
+        assert output.read_text(encoding="utf-8") == "new"
+        assert existing.read_text(encoding="utf-8") == "new"
@@ -0,0 +1,107 @@
+"""
+Tests for FootprintService
+"""
+import pytest
+import numpy as np
+from app.services.footprint_service import FootprintService
+from app.services.video_metadata_service import VideoMetadataService
+from benchmarks.srt_generator import generate_srt
+
+M_PER_DEG_LAT = 111195.08
+
+
+def _columns(gb_yaw, gb_pitch, rel_alt=100.0, focal_len=24.0, gb_roll=0.0, name="DJI_0001_W"):
+    count = len(gb_yaw)
+    return {
+        "video_name": np.full(count, name, dtype=object),
+        "latitude": np.full(count, 31.0),
+        "longitude": np.full(count, 34.0),
+        "rel_alt": np.full(count, rel_alt),
+        "abs_alt": np.full(count, rel_alt + 200.0),
+        "gb_yaw": np.array(gb_yaw, dtype=float),
+        "gb_pitch": np.array(gb_pitch, dtype=float),
+        "gb_roll": np.full(count, gb_roll),
+        "focal_len": np.full(count, focal_len),
+        "dzoom": np.ones(count),
+    }
+
+
+class TestFootprintService:
+    """Test cases for FootprintService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a FootprintService instance"""
+        return FootprintService()
+
+    def test_nadir_target_is_below_drone(self, service):
+        """Test that a camera pointing straight down targets the drone position"""
+        footprint = service.compute(_columns([0.0], [-90.0]))
+
+        assert footprint["TARGET LATITUDE"][0] == pytest.approx(31.0)
+        assert footprint["TARGET LONGITUDE"][0] == pytest.approx(34.0)
+        assert footprint["TARGET DISTANCE"][0] == pytest.approx(100.0)
+
+    @pytest.mark.parametrize("yaw, north, east", [(0, 100, 0), (90, 0, 100), (180, -100, 0), (-90, 0, -100)])
+    def test_oblique_target_follows_yaw(self, service, yaw, north, east):
+        """Test that a 45° down-looking camera hits the ground 100 m away along its yaw"""
+        footprint = service.compute(_columns([yaw], [-45.0]))
+
+        offset_north = (footprint["TARGET LATITUDE"][0] - 31.0) * M_PER_DEG_LAT
+        offset_east = (footprint["TARGET LONGITUDE"][0] - 34.0) * M_PER_DEG_LAT * np.cos(np.radians(31.0))
+        assert offset_north == pytest.approx(north, abs=0.05)
+        assert offset_east == pytest.approx(east, abs=0.05)
+        assert footprint["TARGET DISTANCE"][0] == pytest.approx(100 * np.sqrt(2), abs=0.01)
+
+    def test_nadir_footprint_size(self, service):
+        """Test the ground footprint of a 24 mm (equivalent) 16:9 camera at 100 m"""
+        footprint = service.compute(_columns([0.0], [-90.0]))
+
+        width = (footprint["TOP RIGHT LONGITUDE"][0] - footprint["TOP LEFT LONGITUDE"][0]) \
+            * M_PER_DEG_LAT * np.cos(np.radians(31.0))
+        height = (footprint["TOP LEFT LATITUDE"][0] - footprint["BOTTOM LEFT LATITUDE"][0]) * M_PER_DEG_LAT
+        # 43.27 mm diagonal at 16:9 is 37.7 x 21.2 mm
+        assert width == pytest.approx(100 * 37.71 / 24, rel=1e-3)
+        assert height == pytest.approx(100 * 21.21 / 24, rel=1e-3)
+
+    def test_horizon_gives_no_target(self, service):
+        """Test that a level or upward camera has no ground intersection"""
+        footprint = service.compute(_columns([0.0, 0.0], [0.0, 10.0]))
+
+        assert np.isnan(footprint["TARGET LATITUDE"]).all()
+        assert np.isnan(footprint["TOP LEFT LATITUDE"]).all()
+
+    def test_partial_footprint_beyond_horizon(self, service):
+        """Test that upper corners above the horizon are NaN while the target is kept"""
+        footprint = service.compute(_columns([0.0], [-10.0], focal_len=24.0))
+
+        assert not np.isnan(footprint["TARGET LATITUDE"][0])
+        assert np.isnan(footprint["TOP LEFT LATITUDE"][0])
+        assert not np.isnan(footprint["BOTTOM LEFT LATITUDE"][0])
+
+    def test_constant_ground_elevation(self):
+        """Test that ground_alt uses abs_alt instead of the take-off height"""
+        footprint = FootprintService(ground_alt=250.0).compute(_columns([0.0], [-90.0]))
+
+        assert footprint["TARGET DISTANCE"][0] == pytest.approx(50.0)
+
+    def test_thermal_lens_aspect(self, service):
+        """Test that _T files use the 640 x 512 thermal aspect ratio"""
+        footprint = service.compute(_columns([0.0], [-90.0], name="DJI_0001_T"))
+
+        width = footprint["TOP RIGHT LONGITUDE"][0] - footprint["TOP LEFT LONGITUDE"][0]
+        height = footprint["TOP LEFT LATITUDE"][0] - footprint["BOTTOM LEFT LATITUDE"][0]
+        ratio = width * np.cos(np.radians(31.0)) / height
+        assert ratio == pytest.approx(1.25, rel=1e-3)
+
+    def test_generated_flight(self, service, tmp_path):
+        """Test projecting every frame of a synthetic nadir survey"""
+        srt_path = tmp_path / "DJI_SYNTH_W.SRT"
+        generate_srt(srt_path, lens="W", duration_s=10)
+        columns = VideoMetadataService().extract_columns(srt_path)
+
+        footprint = service.compute(columns)
+
+        assert set(footprint) == set(FootprintService.COLUMNS)
+        assert len(footprint["TARGET LATITUDE"]) == len(columns["latitude"])
+        assert np.allclose(footprint["TARGET LATITUDE"], columns["latitude"], atol=1e-6)
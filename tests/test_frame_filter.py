@@ -0,0 +1,83 @@
+"""
+Tests for FrameFilter
+"""
+import json
+import pickle
+import pytest
+from app.services.frame_filter import FrameFilter
+
+SQUARE = ((34.0, 31.0), (35.0, 31.0), (35.0, 32.0), (34.0, 32.0))
+
+
+class TestFrameFilter:
+    """Test cases for FrameFilter"""
+
+    def test_time_window(self):
+        """Test the video time window and the end-of-window signal"""
+        frame_filter = FrameFilter(start_ms=1000, end_ms=2000)
+
+        assert frame_filter.before(999)
+        assert not frame_filter.before(1000)
+        assert not frame_filter.past(2000)
+        assert frame_filter.past(2001)
+
+    def test_bbox(self):
+        """Test the bounding box in (min_lon, min_lat, max_lon, max_lat) order"""
+        frame_filter = FrameFilter(bbox=(34.0, 31.0, 35.0, 32.0))
+
+        assert frame_filter.accepts_position(31.5, 34.5)
+        assert not frame_filter.accepts_position(34.5, 31.5)
+
+    def test_polygon(self):
+        """Test point-in-polygon for a concave outline"""
+        # L-shape: the top right quarter of the square is cut out
+        outline = ((34.0, 31.0), (35.0, 31.0), (35.0, 31.5), (34.5, 31.5), (34.5, 32.0), (34.0, 32.0))
+        frame_filter = FrameFilter(polygon=outline)
+
+        assert frame_filter.accepts_position(31.25, 34.75)
+        assert frame_filter.accepts_position(31.75, 34.25)
+        assert not frame_filter.accepts_position(31.75, 34.75)
+        assert not frame_filter.accepts_position(33.0, 34.25)
+
+    def test_altitude(self):
+        """Test the altitude band (frames without altitude are dropped)"""
+        frame_filter = FrameFilter(min_alt=100.0, max_alt=200.0)
+
+        assert frame_filter.accepts_altitude(150.0)
+        assert not frame_filter.accepts_altitude(99.9)
+        assert not frame_filter.accepts_altitude(None)
+
+    def test_wall_clock_window(self):
+        """Test the wall-clock window against SRT date lines"""
+        frame_filter = FrameFilter.between("2025-12-22T15:08:01", "2025-12-22 15:08:02.500")
+
+        assert frame_filter.datetime_state(b"2025-12-22 15:08:00.967") == -1
+        assert frame_filter.datetime_state(b"2025-12-22 15:08:01.000") == 0
+        assert frame_filter.datetime_state("2025-12-22 15:08:02.500") == 0
+        assert frame_filter.datetime_state(b"2025-12-22 15:08:02.533") == 1
+
+    def test_empty_range_raises_error(self):
+        """Test that inverted ranges are rejected"""
+        with pytest.raises(ValueError):
+            FrameFilter(start_ms=2000, end_ms=1000)
+        with pytest.raises(ValueError):
+            FrameFilter(bbox=(35.0, 31.0, 34.0, 32.0))
+
+    def test_load_polygon(self, tmp_path):
+        """Test reading the first polygon of a GeoJSON FeatureCollection"""
+        path = tmp_path / "site.geojson"
+        ring = [list(p) for p in SQUARE + SQUARE[:1]]
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [0, 0]}, "properties": {}},
+            {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]}, "properties": {}},
+        ]}), encoding="utf-8")
+
+        assert FrameFilter.load_polygon(path)[:4] == SQUARE
+
+    def test_picklable(self):
+        """Test that filters can be sent to worker processes"""
+        frame_filter = FrameFilter(polygon=SQUARE, end_ms=5000)
+        restored = pickle.loads(pickle.dumps(frame_filter))
+
+        assert restored == frame_filter
+        assert restored.accepts_position(31.5, 34.5)
@@ -0,0 +1,53 @@
+"""
+Tests for GeoJsonExportService
+"""
+import pytest
+import io
+import json
+from app.services.footprint_service import CORNER_COLUMNS
+from app.services.geojson_export_service import GeoJsonExportService
+
+
+class TestGeoJsonExportService:
+    """Test cases for GeoJsonExportService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a GeoJsonExportService instance"""
+        return GeoJsonExportService()
+
+    def test_export_points(self, service, sample_frames, tmp_path):
+        """Test that frames without footprint columns become Point features"""
+        output_path = tmp_path / "output.geojsonl"
+        service.export(sample_frames, output_path)
+
+        features = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+
+        assert len(features) == 3
+        assert features[0]["type"] == "Feature"
+        assert features[0]["geometry"] == {"type": "Point", "coordinates": [34.567890, 31.123456, 150.0]}
+        assert features[0]["properties"]["VIDEO NAME"] == "test_video"
+
+    def test_export_empty_list_raises_error(self, service, tmp_path):
+        """Test that exporting empty list raises ValueError"""
+        with pytest.raises(ValueError, match="No frames to export"):
+            service.export([], tmp_path / "output.geojsonl")
+
+    def test_footprint_polygon(self, service, sample_frames):
+        """Test that footprint columns give a closed counterclockwise polygon"""
+        # Square around the frame: TL, TR, BR, BL as (lat, lon)
+        corners = [(2.0, 0.0), (2.0, 1.0), (1.0, 1.0), (1.0, 0.0)]
+        values = [v for lat_lon in corners for v in lat_lon]
+        extra = {name: [value, None] for name, value in zip(CORNER_COLUMNS, values)}
+
+        stream = io.StringIO()
+        service.write(sample_frames[:2], stream, extra_columns=extra)
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        ring = first["geometry"]["coordinates"][0]
+        assert first["geometry"]["type"] == "Polygon"
+        assert ring[0] == ring[-1]
+        assert ring[:4] == [[0.0, 1.0], [1.0, 1.0], [1.0, 2.0], [0.0, 2.0]]
+        # A frame whose footprint could not be projected falls back to its position
+        assert second["geometry"]["type"] == "Point"
+        assert second["properties"]["TOP LEFT LATITUDE"] is None
@@ -0,0 +1,153 @@
+"""
+Tests for the HTTP conversion service
+"""
+import csv
+import http.client
+import io
+import json
+import threading
+import pytest
+from pathlib import Path
+from app.services.http_service import ConversionServer, JobQueue, QueueFullError
+
+
+@pytest.fixture
+def server(tmp_path, sample_srt_path):
+    queue = JobQueue(jobs=1, spool_dir=tmp_path / "spool", max_pending=4)
+    server = ConversionServer(("127.0.0.1", 0), queue, roots=[sample_srt_path.parent], max_upload=64 * 1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+    try:
+        headers = headers or {}
+        connection.request(method, path, body=body, headers=headers,
+                           encode_chunked=headers.get("Transfer-Encoding") == "chunked")
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestConversionServer:
+    """Test cases for ConversionServer"""
+
+    def test_convert_upload_streams_csv(self, server, sample_srt_path):
+        """Test that an uploaded SRT comes back as a chunked CSV named after the upload"""
+        status, headers, body = _request(server, "POST", "/convert?name=flight.SRT", sample_srt_path.read_bytes())
+
+        rows = list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+        assert status == 200
+        assert headers["Transfer-Encoding"] == "chunked"
+        assert headers["Content-Type"].startswith("text/csv")
+        assert [row["VIDEO NAME"] for row in rows] == ["flight"] * 3
+        assert server.queue.list() == []  # /convert jobs are not kept
+
+    def test_chunked_upload(self, server, sample_srt_path):
+        """Test an upload sent with chunked transfer encoding"""
+        body = iter([sample_srt_path.read_bytes()[:100], sample_srt_path.read_bytes()[100:]])
+        status, _, data = _request(server, "PUT", "/convert?name=a.SRT&format=jsonl", body,
+                                   {"Transfer-Encoding": "chunked"})
+
+        assert status == 200
+        assert [json.loads(line)["LATITUDE"] for line in data.splitlines()] == [31.123456, 31.123457, 31.123458]
+
+    def test_job_by_server_path(self, server, sample_srt_path):
+        """Test the job life cycle for a file on the server"""
+        status, headers, body = _request(server, "POST", f"/jobs?path={sample_srt_path}&format=geojsonl")
+        job_id = json.loads(body)["id"]
+        assert status == 202
+        assert headers["Location"] == f"/jobs/{job_id}"
+
+        server.queue.get(job_id).future.result(timeout=30)
+        status, _, body = _request(server, "GET", f"/jobs/{job_id}")
+        assert json.loads(body)["status"] == "done"
+        assert json.loads(body)["frames"] == 3
+
+        status, _, body = _request(server, "GET", f"/jobs/{job_id}/result")
+        assert status == 200
+        assert json.loads(body.splitlines()[0])["type"] == "Feature"
+
+        assert _request(server, "DELETE", f"/jobs/{job_id}")[0] == 200
+        assert _request(server, "GET", f"/jobs/{job_id}")[0] == 404
+        assert not server.queue.job_dir(job_id).exists()
+
+    def test_failed_job(self, server, invalid_srt_path):
+        """Test that a conversion error is reported in the job status"""
+        status, _, body = _request(server, "POST", "/convert?name=bad.SRT", invalid_srt_path.read_bytes())
+
+        assert status == 422
+        assert json.loads(body)["status"] == "failed"
+        assert json.loads(body)["error"].startswith("ValueError")
+
+    @pytest.mark.parametrize("path, status", [
+        ("/convert?format=parquet", 400),
+        ("/convert?name=notes.txt", 400),
+        ("/jobs?path=/etc/passwd", 403),
+        ("/unknown", 404),
+    ])
+    def test_rejected_requests(self, server, path, status):
+        """Test that bad formats, names, paths and URLs are refused"""
+        assert _request(server, "POST", path, b"x")[0] == status
+
+    def test_upload_too_large(self, server):
+        """Test that uploads over the limit get 413"""
+        assert _request(server, "POST", "/convert", b"x" * (65 * 1024))[0] == 413
+
+    @pytest.mark.parametrize("size", [b"-56c", b"+1388", b"0x40", b"1_0", b"zz", b""])
+    def test_invalid_chunk_size(self, server, size):
+        """Test that chunk sizes that are not plain hex get 400 instead of lowering the upload count"""
+        connection = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+        try:
+            connection.putrequest("POST", "/convert?name=a.SRT")
+            connection.putheader("Transfer-Encoding", "chunked")
+            connection.endheaders()
+            connection.send(size + b"\r\n" + b"x" * 5000 + b"\r\n0\r\n\r\n")
+            assert connection.getresponse().status == 400
+        finally:
+            connection.close()
+        assert list(Path(server.queue.spool_dir).rglob("a.SRT")) == []
+
+    def test_busy_server(self, server, sample_srt_path):
+        """Test that new requests get 503 with Retry-After once the queue is full"""
+        server.queue.max_pending = 0
+        status, headers, _ = _request(server, "POST", "/convert", sample_srt_path.read_bytes())
+
+        assert status == 503
+        assert headers["Retry-After"] == "5"
+
+
+class TestJobQueue:
+    """Test cases for JobQueue"""
+
+    def test_queue_full(self, tmp_path, sample_srt_path):
+        """Test that submit refuses jobs beyond max_pending"""
+        queue = JobQueue(spool_dir=tmp_path, max_pending=0)
+        try:
+            with pytest.raises(QueueFullError):
+                queue.submit(sample_srt_path, "csv")
+            with pytest.raises(ValueError):
+                queue.submit(sample_srt_path, "parquet")
+        finally:
+            queue.close()
+
+    def test_finished_jobs_expire(self, tmp_path, sample_srt_path):
+        """Test that only the last max_finished results are kept"""
+        queue = JobQueue(spool_dir=tmp_path, max_finished=1)
+        try:
+            first = queue.submit(sample_srt_path, "csv")
+            first.future.result(timeout=30)
+            second = queue.submit(sample_srt_path, "csv")
+            second.future.result(timeout=30)
+            queue.pending()  # callbacks run right after the result is set
+        finally:
+            queue.close()
+
+        assert [job.id for job in queue.list()] == [second.id]
+        assert not queue.job_dir(first.id).exists()
+        assert Path(tmp_path).exists()  # a given spool directory is kept
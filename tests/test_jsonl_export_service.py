@@ -0,0 +1,48 @@
+"""
+Tests for JsonlExportService
+"""
+import pytest
+import io
+import json
+from app.services.jsonl_export_service import JsonlExportService
+
+
+class TestJsonlExportService:
+    """Test cases for JsonlExportService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a JsonlExportService instance"""
+        return JsonlExportService()
+
+    def test_export_valid_frames(self, service, sample_frames, tmp_path):
+        """Test exporting frames writes one JSON object per line"""
+        output_path = tmp_path / "output.jsonl"
+        service.export(sample_frames, output_path)
+
+        records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+
+        assert len(records) == 3
+        assert list(records[0].keys()) == ["COMMENTS", "VIDEO NAME", "ALTITUDE", "LONGITUDE", "LATITUDE", "TIME", "DATE"]
+        assert records[1]["TIME"] == "00:00:00:033"
+
+    def test_export_empty_list_raises_error(self, service, tmp_path):
+        """Test that exporting empty list raises ValueError"""
+        with pytest.raises(ValueError, match="No frames to export"):
+            service.export([], tmp_path / "output.jsonl")
+
+    def test_write_to_stream(self, service, sample_frames):
+        """Test writing to an open stream"""
+        stream = io.StringIO()
+        service.write(sample_frames, stream)
+
+        assert stream.getvalue().count("\n") == 3
+
+    def test_write_extra_columns(self, service, sample_frames):
+        """Test that extra columns become keys and NaN becomes null"""
+        stream = io.StringIO()
+        service.write(sample_frames[:2], stream, extra_columns={"HEADING": [90.0, float("nan")]})
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        assert records[0]["HEADING"] == 90.0
+        assert records[1]["HEADING"] is None
@@ -0,0 +1,90 @@
+"""
+Tests for KinematicsService
+"""
+import pytest
+import numpy as np
+from app.services.kinematics_service import KinematicsService
+from app.services.video_metadata_service import VideoMetadataService
+from benchmarks.srt_generator import generate_srt
+
+
+def _columns(latitude, longitude, altitude, time_ms):
+    count = len(latitude)
+    return {
+        "latitude": np.array(latitude, dtype=float),
+        "longitude": np.array(longitude, dtype=float),
+        "abs_alt": np.array(altitude, dtype=float),
+        "time_ms": np.array(time_ms, dtype=np.int64),
+        "drone_speedx": np.zeros(count),
+        "drone_speedy": np.zeros(count),
+        "drone_speedz": np.zeros(count),
+    }
+
+
+class TestKinematicsService:
+    """Test cases for KinematicsService"""
+
+    def test_haversine_one_degree_of_latitude(self):
+        """Test the haversine distance of one degree along a meridian"""
+        distance = KinematicsService.haversine(np.array([0.0]), np.array([0.0]), np.array([1.0]), np.array([0.0]))
+        assert distance[0] == pytest.approx(111195, rel=1e-3)
+
+    @pytest.mark.parametrize("lat2, lon2, expected", [(1, 0, 0), (0, 1, 90), (-1, 0, 180), (0, -1, 270)])
+    def test_bearing_cardinal_directions(self, lat2, lon2, expected):
+        """Test that the bearing is measured clockwise from north"""
+        bearing = KinematicsService.bearing(np.array([0.0]), np.array([0.0]), np.array([lat2]), np.array([lon2]))
+        assert bearing[0] == pytest.approx(expected)
+
+    def test_straight_climb(self):
+        """Test distance, speed, heading and climb rate of a steady eastbound climb"""
+        step_deg = 10 / 111195  # about 10 m of longitude at the equator
+        columns = _columns(
+            latitude=[0.0] * 4,
+            longitude=[i * step_deg for i in range(4)],
+            altitude=[100.0, 102.0, 104.0, 106.0],
+            time_ms=[0, 1000, 2000, 3000],
+        )
+
+        metrics = KinematicsService(span=1).compute(columns)
+
+        assert metrics["STEP DISTANCE"].tolist() == pytest.approx([0, 10, 10, 10], abs=0.01)
+        assert metrics["CUMULATIVE DISTANCE"][-1] == pytest.approx(30, abs=0.01)
+        assert np.isnan(metrics["GROUND SPEED"][0])
+        assert metrics["GROUND SPEED"][1:].tolist() == pytest.approx([10, 10, 10], abs=0.01)
+        assert metrics["HEADING"][1:].tolist() == pytest.approx([90, 90, 90])
+        assert metrics["VERTICAL SPEED"][1:].tolist() == pytest.approx([2, 2, 2])
+
+    def test_hovering_has_no_heading(self):
+        """Test that frames without movement get an undefined heading"""
+        columns = _columns([31.0] * 3, [34.0] * 3, [50.0] * 3, [0, 33, 66])
+
+        metrics = KinematicsService(span=1).compute(columns)
+
+        assert np.isnan(metrics["HEADING"]).all()
+        assert metrics["GROUND SPEED"][1:].tolist() == [0.0, 0.0]
+
+    def test_empty_columns(self):
+        """Test that an empty flight gives empty metric columns"""
+        metrics = KinematicsService().compute(_columns([], [], [], []))
+
+        assert set(metrics) == set(KinematicsService.COLUMNS)
+        assert all(len(values) == 0 for values in metrics.values())
+
+    def test_invalid_span(self):
+        """Test that a span below one frame is rejected"""
+        with pytest.raises(ValueError):
+            KinematicsService(span=0)
+
+    def test_matches_srt_speeds_on_generated_flight(self, tmp_path):
+        """Test that derived speeds agree with the drone_speed fields of a synthetic flight"""
+        srt_path = tmp_path / "flight.SRT"
+        generate_srt(srt_path, lens="W", duration_s=60)
+        columns = VideoMetadataService().extract_columns(srt_path)
+
+        metrics = KinematicsService().compute(columns)
+
+        # Skip the first second (no full span yet) and compare on straight legs
+        residual = metrics["SPEED RESIDUAL"][30:]
+        assert np.nanmedian(np.abs(residual)) < 0.2
+        assert np.nanmedian(np.abs(metrics["VERTICAL SPEED RESIDUAL"][30:])) < 0.1
+        assert metrics["CUMULATIVE DISTANCE"][-1] == pytest.approx(8.0 * 60, rel=0.05)
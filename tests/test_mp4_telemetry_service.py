@@ -0,0 +1,71 @@
+"""
+Tests for Mp4TelemetryService
+"""
+import mmap
+import pytest
+from pathlib import Path
+from app.services.mp4_telemetry_service import Mp4TelemetryService, iter_protobuf, read_varint
+
+SAMPLE_MP4 = Path(__file__).parent.parent / "DJI_202512221456_005" / "DJI_20251222150704_0004_T.MP4"
+
+
+class TestProtobuf:
+    """Test cases for the schema-less protobuf reader"""
+
+    def test_read_varint(self):
+        """Test multi-byte varint decoding"""
+        assert read_varint(b"\xac\x02", 0) == (300, 2)
+        assert read_varint(b"\x01\x7f", 1) == (127, 2)
+
+    def test_iter_protobuf(self):
+        """Test decoding fields of every wire type"""
+        message = b"\x08\x96\x01" + b"\x12\x03abc" + b"\x19" + bytes(8) + b"\x25" + bytes(4)
+        fields = [(field, wire) for field, wire, _ in iter_protobuf(message)]
+
+        assert fields == [(1, 0), (2, 2), (3, 1), (4, 5)]
+        assert list(iter_protobuf(message))[1][2] == b"abc"
+
+
+class TestMp4TelemetryService:
+    """Test cases for Mp4TelemetryService"""
+
+    @pytest.fixture
+    def service(self):
+        return Mp4TelemetryService()
+
+    def test_sample_table(self, service, sample_mp4_path):
+        """Test that sample offsets follow the chunk offsets and samples-per-chunk runs"""
+        with sample_mp4_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            table = service.find_track(buf)
+
+        assert table.format == b"djmd"
+        assert table.timescale == 1000000
+        assert table.offsets[1] == table.offsets[0] + table.sizes[0]
+        assert table.offsets[2] > table.offsets[1] + table.sizes[1]
+        assert table.times == [0, 33033, 66066]
+
+    def test_iter_records(self, service, sample_mp4_path):
+        """Test that the djmd samples decode to degrees, metres and video times"""
+        records = list(service.iter_records(sample_mp4_path))
+
+        assert [r[0] for r in records] == [0, 33, 66]
+        assert [r[2] for r in records] == [31.123456, 31.123457, 31.123458]
+        assert [r[4] for r in records] == [150.0, 150.1, 150.2]
+        assert records[0][1] == "2024-12-22 15:08:01.000"  # start time from the DJI file name
+        assert [r[5][b"FrameCnt"] for r in records] == [0, 1, 2]
+
+    def test_file_without_telemetry_raises_error(self, service, tmp_path):
+        """Test that a file without a moov box is rejected"""
+        path = tmp_path / "clip.MP4"
+        path.write_bytes(b"\x00\x00\x00\x10ftypisom\x00\x00\x02\x00")
+        with pytest.raises(ValueError):
+            list(service.iter_records(path))
+
+    @pytest.mark.skipif(not SAMPLE_MP4.exists(), reason="sample video not available")
+    def test_sample_video(self, service):
+        """Test the embedded track of a real recording"""
+        records = list(service.iter_records(SAMPLE_MP4))
+
+        assert len(records) == 33
+        assert records[0][2] == pytest.approx(31.2408, abs=1e-3)
+        assert records[0][3] == pytest.approx(34.7880, abs=1e-3)
@@ -0,0 +1,111 @@
+"""
+Tests for output templates
+"""
+import pytest
+import csv
+import io
+from pathlib import Path
+from app.services.csv_export_service import CsvExportService
+from app.services.output_template import TEMPLATES, OutputTemplate
+
+REFERENCE_CSV = Path(__file__).parent.parent / "test" / "TSIRA0812_01_01.csv"
+
+
+class TestOutputTemplate:
+    """Test cases for OutputTemplate and its compiled RowFormatter"""
+
+    def test_tsira_header_matches_reference(self):
+        """Test that the built-in TSIRA template has the reference column layout"""
+        with open(REFERENCE_CSV, "r", encoding="utf-8") as f:
+            reference_header = next(csv.reader(f))
+
+        assert OutputTemplate.load("tsira").header == reference_header
+
+    def test_tsira_rows(self, sample_frames):
+        """Test date/time formats, precision, derived and show-once columns"""
+        rows = list(OutputTemplate.load("tsira").compile().rows(sample_frames))
+
+        assert rows[0] == [
+            "22/12/2024", "00:00:00", "31.123456", "34.567890", "150",
+            "test_video", "31.123456, 34.567890", "",
+        ]
+        # VIDEO NAME is only written when it changes
+        assert rows[1][5] == ""
+        assert rows[2][1] == "00:00:00"
+
+    def test_rename_default_and_extra_column(self, sample_frames):
+        """Test renamed sources, defaults for missing values and extra columns"""
+        template = OutputTemplate.load({
+            "columns": [
+                {"name": "LAT", "source": "LATITUDE", "precision": 2},
+                {"name": "NOTE", "source": "COMMENTS", "default": "-"},
+                {"name": "SPEED", "source": "GROUND SPEED", "precision": 1},
+                {"name": "MS", "source": "TIME", "time_format": "%S.%f"},
+            ],
+        })
+
+        rows = list(template.compile().rows(sample_frames[:2], {"GROUND SPEED": [4.26, None]}))
+
+        assert rows == [["31.12", "-", "4.3", "00.000"], ["31.12", "-", "", "00.033"]]
+
+    def test_derived_column_with_missing_value(self, sample_frames):
+        """Test that a derived column is blank when a referenced value is missing"""
+        frame = sample_frames[0].model_copy(update={"altitude": None})
+        template = OutputTemplate.load({"columns": [{"name": "POS", "format": "{LATITUDE:.1f}/{ALTITUDE}"}]})
+
+        assert list(template.compile().rows([frame])) == [[""]]
+
+    def test_show_once_state_is_per_formatter(self, sample_frames):
+        """Test that every compiled formatter starts with fresh show-once state"""
+        template = OutputTemplate.load("tsira")
+
+        first = list(template.compile().rows(sample_frames[:1]))
+        second = list(template.compile().rows(sample_frames[:1]))
+
+        assert first[0][5] == second[0][5] == "test_video"
+
+    def test_template_from_json_file(self, tmp_path):
+        """Test loading a template from a JSON file"""
+        path = tmp_path / "layout.json"
+        path.write_text('{"columns": ["TIME", "DATE"]}', encoding="utf-8")
+
+        assert OutputTemplate.load(path).header == ["TIME", "DATE"]
+
+    @pytest.mark.parametrize("spec", [
+        {"columns": []},
+        {"columns": [{"source": "TIME"}]},
+        {"columns": [{"name": "TIME", "colour": "red"}]},
+        {"columns": [{"name": "TIME", "precision": "2"}]},
+    ])
+    def test_invalid_templates(self, spec):
+        """Test that malformed templates are rejected"""
+        with pytest.raises(ValueError):
+            OutputTemplate.load(spec)
+
+    def test_unknown_source(self):
+        """Test that a column without a source is reported when compiled"""
+        formatter = OutputTemplate.load({"columns": ["HEIGHT"]}).compile()
+
+        with pytest.raises(ValueError, match="HEIGHT"):
+            formatter.function()
+
+    def test_unsupported_directive(self):
+        """Test that unsupported date directives are reported"""
+        formatter = OutputTemplate.load({"columns": [{"name": "DATE", "date_format": "%A"}]}).compile()
+
+        with pytest.raises(ValueError, match="%A"):
+            formatter.function()
+
+    def test_unknown_template_name(self):
+        """Test that an unknown name lists the built-in templates"""
+        with pytest.raises(ValueError, match=", ".join(sorted(TEMPLATES))):
+            OutputTemplate.load("nope")
+
+    def test_csv_export_with_template(self, sample_frames):
+        """Test that the CSV exporter writes the template header and rows"""
+        stream = io.StringIO()
+        CsvExportService().write(sample_frames, stream, formatter=OutputTemplate.load("tsira").compile())
+
+        lines = stream.getvalue().splitlines()
+        assert lines[0] == "DATE,TIME,LATITUDE,LONGITUDE,ALTITUDE,VIDEO NAME,COORDINATE,COMMENTS"
+        assert len(lines) == 4
@@ -0,0 +1,139 @@
+"""
+Tests for the SRT parser engine and its backends
+"""
+import pytest
+import gzip
+import json
+from app.services.frame_filter import FrameFilter
+from app.services.parser_engine import BACKENDS, BlockParser, ParallelBackend, ParserEngine
+from benchmarks.srt_generator import generate_srt
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """An empty parser config, so a saved choice on this machine does not leak into tests"""
+    path = tmp_path / "parser.json"
+    monkeypatch.setenv("DJI_SRT_PARSER_CONFIG", str(path))
+    return path
+
+
+@pytest.fixture
+def flight_path(tmp_path):
+    """A synthetic flight with every camera field and some blocks without GPS"""
+    srt_path = tmp_path / "DJI_20251222150801_0001_Z.SRT"
+    generate_srt(srt_path, lens="Z", duration_s=4, gps_dropout=0.1)
+    return srt_path
+
+
+def _read(backend, srt_path, frame_filter=None):
+    """(records, no-GPS times) of one backend"""
+    parser = BlockParser()
+    records = list(backend.records(parser, srt_path, frame_filter))
+    return records, list(parser.no_gps_ms)
+
+
+class TestParserEngine:
+    """Test cases for ParserEngine and the parser backends"""
+
+    def test_backends_agree(self, flight_path):
+        """Test that every backend yields the same records and skipped blocks"""
+        expected = _read(BACKENDS["lines"], flight_path)
+
+        assert len(expected[0]) > 100
+        assert expected[1]
+        assert _read(BACKENDS["mmap"], flight_path) == expected
+        assert _read(ParallelBackend(jobs=3, chunk_bytes=4096), flight_path) == expected
+
+    def test_backends_agree_with_filter(self, flight_path):
+        """Test that a FrameFilter stops every backend at the same frame"""
+        frame_filter = FrameFilter(start_ms=1000, end_ms=2000)
+        expected = _read(BACKENDS["lines"], flight_path, frame_filter)
+
+        assert expected[0][0][0] >= 1000 and expected[0][-1][0] <= 2000
+        assert _read(BACKENDS["mmap"], flight_path, frame_filter) == expected
+        assert _read(ParallelBackend(jobs=3, chunk_bytes=4096), flight_path, frame_filter) == expected
+
+    def test_bom_and_crlf(self, sample_srt_path):
+        """Test that the mmap backend skips a UTF-8 BOM and keeps CRLF lines whole"""
+        text = sample_srt_path.read_text(encoding="utf-8").replace("\n", "\r\n")
+        sample_srt_path.write_bytes(b"\xef\xbb\xbf" + text.encode("utf-8"))
+
+        records = _read(BACKENDS["mmap"], sample_srt_path)
+        assert records == _read(BACKENDS["lines"], sample_srt_path)
+        assert [record[0] for record in records[0]] == [0, 33, 66]
+
+    def test_choose(self, config_path, flight_path, tmp_path):
+        """Test that the backend is picked from the source, the file size and the saved config"""
+        packed = tmp_path / "DJI_0002.SRT.gz"
+        packed.write_bytes(gzip.compress(flight_path.read_bytes()))
+        parser = BlockParser()
+        engine = ParserEngine(jobs=2)
+
+        assert engine.choose(parser, flight_path).name == "mmap"
+        assert engine.choose(parser, packed).name == "lines"
+        assert engine.choose(BlockParser(mode="text"), flight_path).name == "lines"
+        assert engine.choose(parser, flight_path, offset=10).name == "lines"
+        assert ParserEngine("mmap").choose(parser, packed).name == "lines"
+
+        engine.save({"lines": 2.0, "mmap": 1.0, "parallel": 0.75}, flight_path)
+        assert engine.choose(parser, flight_path).name == "parallel"
+        assert engine.choose(parser, flight_path, FrameFilter(end_ms=10)).name == "mmap"
+        assert ParserEngine(jobs=1).choose(parser, flight_path).name == "mmap"
+
+    def test_save(self, config_path, flight_path):
+        """Test that a benchmark is saved with the size at which parallel parsing pays off"""
+        engine = ParserEngine(jobs=2)
+        size = flight_path.stat().st_size
+
+        # Parallel costs 0.25 s on top of a perfect split: worth it from half this file's size
+        config = engine.save({"lines": 2.0, "mmap": 1.0, "parallel": 0.75}, flight_path)
+        assert config["backend"] == "mmap"
+        assert config["parallel_min_bytes"] == size // 2
+        assert json.loads(config_path.read_text(encoding="utf-8")) == config
+
+        config = engine.save({"lines": 0.9, "mmap": 1.0, "parallel": 1.5}, flight_path)
+        assert (config["backend"], config["parallel_min_bytes"]) == ("lines", None)
+        assert engine.choose(BlockParser(), flight_path).name == "lines"
+
+        with pytest.raises(ValueError, match="serial"):
+            engine.save({"parallel": 0.5}, flight_path)
+        assert json.loads(config_path.read_text(encoding="utf-8")) == config
+
+    def test_benchmark(self, config_path, sample_srt_path):
+        """Test that every available backend is timed"""
+        results = ParserEngine(jobs=1).benchmark(sample_srt_path, repeat=1)
+
+        assert sorted(results) == ["lines", "mmap"]
+        assert all(seconds > 0 for seconds in results.values())
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            ParserEngine("simd")
+
+
+class TestBlockParser:
+    """Test cases for BlockParser"""
+
+    def test_parse_block(self, sample_srt_path):
+        """Test that a block window gives its record and that blocks without GPS are remembered"""
+        lines = sample_srt_path.read_bytes().splitlines(keepends=True)
+        parser = BlockParser()
+        parser.detect_layout(lines)
+
+        record = parser.parse(lines[1:1 + parser.BLOCK_LINES])
+        assert record[:5] == (0, "2024-12-22 15:08:01.000", 31.123456, 34.56789, 150.0)
+        assert record[5][b"FrameCnt"] == b"1"
+        assert parser.parse(lines[0:1]) is None
+
+        assert parser.parse([b"00:00:00,099 --> 00:00:00,132\n", b"FrameCnt: 4\n"]) is None
+        assert list(parser.no_gps_ms) == [99]
+        parser.reset()
+        assert list(parser.no_gps_ms) == []
+
+    def test_unknown_mode_and_dialect(self):
+        """Test that unknown modes and dialects are rejected"""
+        with pytest.raises(ValueError):
+            BlockParser(mode="utf-16")
+        with pytest.raises(ValueError):
+            BlockParser(dialect="phantom")
@@ -0,0 +1,92 @@
+"""
+Tests for PhotoMetadataService
+"""
+import csv
+import pytest
+from pathlib import Path
+from app.models.photo_metadata import PhotoMetadata
+from app.services.photo_metadata_service import PhotoMetadataService
+
+SAMPLE_JPG = Path(__file__).parent.parent / "DJI_202512221456_005" / "DJI_20251222145745_0001_T.JPG"
+
+
+class TestPhotoMetadataService:
+    """Test cases for PhotoMetadataService"""
+
+    @pytest.fixture
+    def service(self):
+        return PhotoMetadataService()
+
+    def test_read_exif_and_xmp(self, service, sample_jpg_path):
+        """Test that EXIF gives time and latitude, and XMP values override EXIF"""
+        photo = service.read(sample_jpg_path)
+
+        assert photo.photo_name == "DJI_20241222150801_0002_T"
+        assert photo.date == "2024-12-22"
+        assert photo.time == "15:08:01"
+        assert photo.latitude == pytest.approx(31.123457, abs=1e-6)
+        assert photo.longitude == 34.5678905  # XMP
+        assert photo.altitude == 150.05  # XMP, EXIF has 150.0
+        assert photo.relative_altitude == 50.05
+        assert (photo.gimbal_yaw, photo.gimbal_pitch, photo.gimbal_roll) == (-28.3, -90.0, 0.0)
+
+    def test_not_a_jpeg(self, service, sample_srt_path):
+        """Test that other files are rejected, and skipped by read_many"""
+        with pytest.raises(ValueError):
+            service.read(sample_srt_path)
+        assert service.read_many([sample_srt_path]) == []
+
+    def test_correlate_nearest_frame(self, service, sample_jpg_path, sample_srt_path):
+        """Test that a photo is attached to the nearest frame by wall-clock time"""
+        photo = service.read(sample_jpg_path).model_copy(update={"time": "15:08:01.040"})
+        columns = service.track_columns([sample_srt_path])
+
+        matched = service.correlate([photo], columns)[0]
+
+        assert matched.video_name == "test_video"
+        assert matched.video_time == "00:00:00:033"
+        assert matched.time_offset == pytest.approx(0.007)
+        assert photo.video_name == ""  # the input is not modified
+
+    def test_correlate_outside_tolerance(self, service, sample_jpg_path, sample_srt_path):
+        """Test that photos far from every frame stay unmatched"""
+        photo = service.read(sample_jpg_path).model_copy(update={"time": "15:09:00"})
+        matched = service.correlate([photo], service.track_columns([sample_srt_path]), max_offset_s=2.0)
+
+        assert matched[0].video_name == ""
+        assert matched[0].time_offset is None
+        assert service.correlate([photo], service.track_columns([]))[0].video_name == ""
+
+    def test_zeroed_exif_stamp(self, service, sample_jpg_path, sample_srt_path):
+        """Test that a camera with an unset clock gives no date and leaves the photo unmatched"""
+        sample_jpg_path.write_bytes(sample_jpg_path.read_bytes().replace(b"2024:12:22 15:08:01", b"0000:00:00 00:00:00"))
+        photo = service.read(sample_jpg_path)
+        columns = service.track_columns([sample_srt_path])
+
+        assert (photo.date, photo.time) == ("", "")
+        assert photo.latitude == pytest.approx(31.123457, abs=1e-6)
+        assert service.correlate([photo], columns)[0].video_name == ""
+
+        unreadable = photo.model_copy(update={"date": "0000-00-00", "time": "00:00:00"})
+        assert service.correlate([unreadable], columns)[0].video_name == ""
+
+    def test_export_csv(self, service, sample_jpg_path, tmp_path):
+        """Test the CSV header and empty cells for missing values"""
+        output = tmp_path / "photos.csv"
+        service.export_csv([service.read(sample_jpg_path), PhotoMetadata(photo_name="blank")], output)
+
+        with output.open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["LATITUDE"] == "31.1234567"
+        assert rows[1]["LATITUDE"] == ""
+        assert list(rows[0]) == [field.alias for field in PhotoMetadata.model_fields.values()]
+
+    @pytest.mark.skipif(not SAMPLE_JPG.exists(), reason="sample photo not available")
+    def test_sample_photo(self, service):
+        """Test the metadata of a real DJI thermal photo"""
+        photo = service.read(SAMPLE_JPG)
+
+        assert (photo.date, photo.time) == ("2025-12-22", "14:57:45")
+        assert photo.latitude == 31.2407968
+        assert photo.altitude == 298.13
+        assert photo.gimbal_yaw == -28.3
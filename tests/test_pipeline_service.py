@@ -0,0 +1,115 @@
+"""
+Tests for PipelineService
+"""
+import pytest
+import csv
+import io
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from app.services import parser_engine, video_metadata_service
+from app.services.pipeline_service import PipelineService
+from app.services.video_metadata_service import VideoMetadataService
+from benchmarks.srt_generator import generate_srt
+
+# Peak traced memory allowed for a pipeline run, whatever the input size
+MEMORY_CEILING_MB = 4.0
+
+
+def _peak_mb(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+class TestPipelineService:
+    """Test cases for PipelineService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a PipelineService instance"""
+        return PipelineService(batch_size=2)
+
+    def test_run_matches_export(self, service, sample_srt_path, tmp_path):
+        """Test that the streaming pipeline writes the same CSV as extract + export"""
+        from app.services.csv_export_service import CsvExportService
+
+        expected = tmp_path / "expected.csv"
+        CsvExportService().export(VideoMetadataService().extract_from_video(sample_srt_path), expected)
+        output = tmp_path / "pipeline.csv"
+
+        assert service.run(sample_srt_path, output) == 3
+        assert output.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+    def test_write_without_header(self, service, sample_srt_path):
+        """Test that header=False writes data rows only"""
+        stream = io.StringIO()
+        service.write(VideoMetadataService().iter_frames(sample_srt_path), stream, header=False)
+
+        assert len(stream.getvalue().splitlines()) == 3
+        assert not stream.getvalue().startswith("COMMENTS")
+
+    def test_no_gps_data_raises_without_output(self, service, invalid_srt_path, tmp_path):
+        """Test that an SRT without GPS frames raises and leaves no file behind"""
+        output = tmp_path / "output.csv"
+
+        with pytest.raises(ValueError, match="No frames to export"):
+            service.run(invalid_srt_path, output)
+        assert not output.exists()
+
+    def test_invalid_batch_size(self):
+        """Test that a batch size below one is rejected"""
+        with pytest.raises(ValueError):
+            PipelineService(batch_size=0)
+
+    def test_peak_memory_is_bounded(self, tmp_path):
+        """Test that peak memory stays under a fixed ceiling as the input grows 10x"""
+        small = tmp_path / "small.SRT"
+        large = tmp_path / "large.SRT"
+        generate_srt(small, lens="Z", duration_s=20)
+        generate_srt(large, lens="Z", duration_s=200)
+        # Both inputs are larger than one batch, so both runs fill the buffer
+        service = PipelineService(batch_size=200)
+
+        small_peak = _peak_mb(lambda: service.run(small, tmp_path / "small.csv"))
+        large_peak = _peak_mb(lambda: service.run(large, tmp_path / "large.csv"))
+
+        with open(tmp_path / "large.csv", "r", encoding="utf-8") as f:
+            assert sum(1 for _ in csv.reader(f)) == 6001
+        assert small_peak < MEMORY_CEILING_MB
+        assert large_peak < MEMORY_CEILING_MB
+        # A 10x larger input must not need noticeably more memory
+        assert large_peak < small_peak * 1.5 + 0.5
+
+    def test_parallel_peak_memory_is_bounded(self, tmp_path, monkeypatch):
+        """Test that the parallel parser backend keeps peak memory under the same ceiling"""
+        small = tmp_path / "small.SRT"
+        large = tmp_path / "large.SRT"
+        generate_srt(small, lens="Z", duration_s=20)
+        generate_srt(large, lens="Z", duration_s=200)
+        # Many chunks per job, so only some of them can be in flight at once
+        monkeypatch.setattr(parser_engine, "PARALLEL_CHUNK_BYTES", 256 << 10)
+        monkeypatch.setattr(video_metadata_service, "ParserEngine", partial(parser_engine.ParserEngine, "parallel", 2))
+        service = PipelineService(batch_size=200)
+
+        small_peak = _peak_mb(lambda: service.run(small, tmp_path / "small.csv"))
+        large_peak = _peak_mb(lambda: service.run(large, tmp_path / "large.csv"))
+
+        with open(tmp_path / "large.csv", "r", encoding="utf-8") as f:
+            assert sum(1 for _ in csv.reader(f)) == 6001
+        assert small_peak < MEMORY_CEILING_MB
+        assert large_peak < MEMORY_CEILING_MB
+        assert large_peak < small_peak * 1.5 + 0.5
+
+    def test_run_xlsx(self, service, sample_srt_path, tmp_path):
+        """Test that a binary format is written in one pass and counted"""
+        import zipfile
+
+        output = tmp_path / "output.xlsx"
+
+        assert service.run(sample_srt_path, output, "xlsx") == 3
+        assert "xl/worksheets/sheet1.xml" in zipfile.ZipFile(output).namelist()
@@ -0,0 +1,127 @@
+"""
+Tests for QualityService
+"""
+import json
+import pytest
+import numpy as np
+from pathlib import Path
+from app.services.quality_service import QualityService, sidecar_path_for
+
+
+def _columns(count: int = 10) -> dict:
+    """Clean telemetry: 30 fps, 1 m/s north, GPS updated every third frame"""
+    time_ms = np.arange(count, dtype=np.int64) * 33
+    latitude = 31.0 + (np.arange(count) // 3 * 3) * 0.033 / 111195
+    return {
+        "time_ms": time_ms,
+        "frame_cnt": np.arange(1, count + 1, dtype=np.float64),
+        "diff_time_ms": np.full(count, 33.0),
+        "latitude": latitude,
+        "longitude": np.full(count, 34.5),
+        "abs_alt": np.full(count, 150.0),
+    }
+
+
+class TestQualityService:
+    """Test cases for QualityService"""
+
+    @pytest.fixture
+    def service(self):
+        return QualityService()
+
+    def test_clean_flight(self, service):
+        """Test that held GPS fixes and steady timing report no issues"""
+        report = service.scan(_columns())
+
+        assert report["issues"] == 0
+        assert report["frames"] == 10
+        assert report["nominal_diff_time_ms"] == 33.0
+        assert list(report["checks"]) == ["frame_cnt_gaps", "frame_cnt_repeats", "diff_time_jitter",
+                                          "non_monotonic_time", "gps_jumps", "altitude_spikes", "missing_gps"]
+
+    def test_frame_counter_and_timing(self, service):
+        """Test FrameCnt gaps and repeats, DiffTime jitter and timecodes going back"""
+        columns = _columns()
+        columns["frame_cnt"][5:] += 3          # 3 frames missing before row 5
+        columns["frame_cnt"][9] = columns["frame_cnt"][8]
+        columns["diff_time_ms"][2:4] = 70.0
+        columns["time_ms"][9] = columns["time_ms"][8]
+
+        checks = service.scan(columns)["checks"]
+
+        assert checks["frame_cnt_gaps"]["frames"] == 3
+        assert checks["frame_cnt_gaps"]["ranges"] == [{"first": 5, "last": 5, "time": "00:00:00:165"}]
+        assert checks["frame_cnt_repeats"]["ranges"][0]["first"] == 9
+        assert checks["diff_time_jitter"]["ranges"][0] == {"first": 2, "last": 3, "time": "00:00:00:066"}
+        assert checks["diff_time_jitter"]["rows"] == 2
+        assert checks["non_monotonic_time"]["events"] == 1
+
+    def test_gps_jump_and_altitude_spike(self, service):
+        """Test that a position glitch and an altitude spike are flagged where they start and end"""
+        columns = _columns()
+        columns["longitude"][4] = 34.51   # about 950 m away for one frame
+        columns["abs_alt"][7] = 180.0
+
+        checks = service.scan(columns)["checks"]
+
+        assert [r["first"] for r in checks["gps_jumps"]["ranges"]] == [4]
+        assert checks["gps_jumps"]["rows"] == 2  # away and back
+        assert [r["first"] for r in checks["altitude_spikes"]["ranges"]] == [7]
+
+    def test_missing_gps_runs(self, service):
+        """Test that skipped frames are grouped by the row they precede"""
+        report = service.scan(_columns(), no_gps_ms=[100, 110, 400])
+        check = report["checks"]["missing_gps"]
+
+        assert check["frames"] == 3
+        assert check["events"] == 2
+        assert check["ranges"][0] == {"before": 4, "frames": 2, "time": "00:00:00:100"}
+
+    def test_ranges_are_truncated(self):
+        """Test that only max_ranges ranges are listed"""
+        columns = _columns(20)
+        columns["diff_time_ms"][::4] = 70.0
+
+        check = QualityService(max_ranges=3).scan(columns)["checks"]["diff_time_jitter"]
+
+        assert check["events"] == 5
+        assert len(check["ranges"]) == 3
+        assert check["truncated"] is True
+
+    def test_empty_columns(self, service):
+        """Test that a flight without frames gives an empty report"""
+        columns = {name: values[:0] for name, values in _columns().items()}
+        report = service.scan(columns)
+
+        assert report["frames"] == 0
+        assert report["issues"] == 0
+
+    def test_scan_file_with_sidecar(self, service, tmp_path, sample_srt_path):
+        """Test scanning an SRT whose last block has no GPS and writing the JSON sidecar"""
+        with sample_srt_path.open("a", encoding="utf-8") as f:
+            f.write("\n4\n00:00:00,099 --> 00:00:00,132\n<font size=\"28\">FrameCnt: 4, DiffTime: 33ms\n"
+                    "2024-12-22 15:08:01.099\n</font>\n")
+
+        report = service.scan_file(sample_srt_path)
+        path = service.write_sidecar(report, sample_srt_path)
+
+        assert path == tmp_path / "test_video.quality.json"
+        assert json.loads(path.read_text(encoding="utf-8"))["checks"]["missing_gps"]["frames"] == 1
+        assert report["source"] == "test_video"
+        assert "Frames skipped for missing GPS: 1" in service.summary(report)
+
+    def test_scan_file_with_extracted_columns(self, service, sample_srt_path, mocker):
+        """Test that columns extracted for the export are scanned without parsing the file again"""
+        from app.services.video_metadata_service import VideoMetadataService
+
+        metadata = VideoMetadataService()
+        columns = metadata.extract_columns(sample_srt_path)
+        expected = service.scan_file(sample_srt_path)
+        extract = mocker.patch.object(VideoMetadataService, "extract_columns")
+
+        assert service.scan_file(sample_srt_path, columns, no_gps_ms=metadata.no_gps_ms) == expected
+        extract.assert_not_called()
+
+    def test_sidecar_path_for_compressed_source(self):
+        """Test the sidecar name of a compressed SRT"""
+        assert sidecar_path_for(Path("a/DJI_0001.SRT.gz")) == Path("a/DJI_0001.quality.json")
@@ -0,0 +1,96 @@
+"""
+Tests for ResampleService
+"""
+import pytest
+import numpy as np
+from app.services.resample_service import ResampleService
+from app.services.video_metadata_service import VideoMetadataService
+
+
+def _columns(time_ms, latitude, yaw):
+    count = len(time_ms)
+    return {
+        "video_name": np.full(count, "flight", dtype=object),
+        "time_ms": np.array(time_ms, dtype=np.int64),
+        "datetime": np.datetime64("2025-12-22T15:08:01", "ms") + np.array(time_ms, dtype="timedelta64[ms]"),
+        "latitude": np.array(latitude, dtype=float),
+        "drone_yaw": np.array(yaw, dtype=float),
+        "frame_cnt": np.arange(1, count + 1, dtype=float),
+    }
+
+
+class TestResampleService:
+    """Test cases for ResampleService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a ResampleService instance"""
+        return ResampleService()
+
+    def test_grid_is_anchored_at_zero(self):
+        """Test that the fixed-rate grid lines up with video frame times"""
+        grid = ResampleService.grid(40, 210, 10)
+        assert grid.tolist() == pytest.approx([100, 200])
+
+    def test_linear_position_interpolation(self, service):
+        """Test that positions are interpolated linearly between samples"""
+        columns = _columns([0, 100, 200], [31.0, 31.001, 31.002], [0, 0, 0])
+
+        resampled = service.resample(columns, timestamps_ms=[50, 150])
+
+        assert resampled["latitude"].tolist() == pytest.approx([31.0005, 31.0015])
+        assert resampled["time_ms"].tolist() == [50, 150]
+
+    def test_yaw_takes_shortest_arc(self, service):
+        """Test that yaw crossing ±180 is not interpolated through 0"""
+        columns = _columns([0, 100], [31.0, 31.0], [170.0, -170.0])
+
+        resampled = service.resample(columns, timestamps_ms=[50])
+
+        assert abs(resampled["drone_yaw"][0]) == pytest.approx(180.0)
+
+    def test_discrete_fields_hold_previous_sample(self, service):
+        """Test that the frame counter and names are not interpolated"""
+        columns = _columns([0, 100, 200], [31.0, 31.001, 31.002], [0, 0, 0])
+
+        resampled = service.resample(columns, timestamps_ms=[99, 100])
+
+        assert resampled["frame_cnt"].tolist() == [1.0, 2.0]
+        assert resampled["video_name"].tolist() == ["flight", "flight"]
+        assert str(resampled["datetime"][0]) == "2025-12-22T15:08:01.099"
+
+    def test_outside_range_is_nan(self, service):
+        """Test that timestamps outside the recording are not extrapolated"""
+        columns = _columns([0, 100], [31.0, 31.001], [0, 0])
+
+        resampled = service.resample(columns, timestamps_ms=[-10, 110])
+
+        assert np.isnan(resampled["latitude"]).all()
+        assert np.isnat(resampled["datetime"]).all()
+
+    def test_max_gap(self):
+        """Test that long gaps (e.g. GPS dropouts) are left empty when max_gap_ms is set"""
+        columns = _columns([0, 33, 1000], [31.0, 31.0, 31.01], [0, 0, 0])
+
+        resampled = ResampleService(max_gap_ms=100).resample(columns, timestamps_ms=[20, 500])
+
+        assert not np.isnan(resampled["latitude"][0])
+        assert np.isnan(resampled["latitude"][1])
+
+    def test_requires_rate_or_timestamps(self, service):
+        """Test that exactly one target specification is required"""
+        columns = _columns([0, 100], [31.0, 31.001], [0, 0])
+        with pytest.raises(ValueError):
+            service.resample(columns)
+        with pytest.raises(ValueError):
+            service.resample(columns, rate_hz=10, timestamps_ms=[0])
+
+    def test_resample_extracted_srt(self, service, sample_srt_path):
+        """Test resampling the columns of a real SRT to 60 Hz"""
+        columns = VideoMetadataService().extract_columns(sample_srt_path)
+
+        resampled = service.resample(columns, rate_hz=60)
+
+        assert resampled["time_ms"].tolist() == [0, 17, 33, 50]  # 66.7 ms is after the last frame
+        assert set(resampled) == set(columns)
+        assert not np.isnan(resampled["latitude"]).any()
@@ -0,0 +1,120 @@
+"""
+Tests for SRT dialect detection
+"""
+import pytest
+from app.services.srt_dialect import DIALECTS, SrtLayout, iso_date
+from app.services.video_metadata_service import VideoMetadataService
+
+# Phantom 4 / Mavic Pro layout: longitude first, dotted dates, no fix written as zeros
+GPS_SRT = """1
+00:00:00,000 --> 00:00:01,000
+HOME(149.0251,-20.2532) 2017.08.05 14:11:51
+GPS(0.0000,0.0000,0) BAROMETER:1.9
+ISO:100 Shutter:60 EV: Fnum:2.2
+
+2
+00:00:01,000 --> 00:00:02,000
+HOME(149.0251,-20.2532) 2017.08.05 14:11:52
+GPS(149.0251,-20.2533,16) BAROMETER:1.9
+ISO:100 Shutter:60 EV: Fnum:2.2
+
+3
+00:00:02,000 --> 00:00:03,000
+HOME(149.0251,-20.2532) 2017.08.05 14:11:53
+GPS(149.0252,-20.2534,17) BAROMETER:2.4
+ISO:100 Shutter:60 EV: Fnum:2.2
+"""
+
+# Mavic Air 2 layout: one camera line, "longtitude", comma-separated date fractions
+LEGACY_SRT = """1
+00:00:00,000 --> 00:00:00,033
+<font size="36">SrtCnt : 1, DiffTime : 33ms
+2020-07-25 17:13:26,427,016
+[iso : 100] [shutter : 1/1000.0] [fnum : 280] [ev : 0] [latitude : 22.541200] [longtitude : 113.951300] [altitude: 27.104000] </font>
+
+2
+00:00:00,033 --> 00:00:00,066
+<font size="36">SrtCnt : 2, DiffTime : 33ms
+2020-07-25 17:13:26,460,123
+[iso : 100] [shutter : 1/1000.0] [fnum : 280] [ev : 0] [latitude : 22.541210] [longtitude : 113.951310] [altitude: 27.204000] </font>
+"""
+
+
+def _head(text: str) -> list:
+    return text.encode("utf-8").splitlines()
+
+
+class TestSrtDialect:
+    """Test cases for dialect detection and the dialect-specific parsers"""
+
+    @pytest.mark.parametrize("text, name, lines", [
+        (GPS_SRT, "gps", (2, 2, 2, 1)),
+        (LEGACY_SRT, "legacy_bracket", (3, 3, 3, 2)),
+    ])
+    def test_detects_dialect_and_field_lines(self, text, name, lines):
+        """Test that the dialect and the fixed field lines come from the first blocks"""
+        layout = SrtLayout.detect(_head(text))
+
+        assert layout.dialect.name == name
+        assert layout.lines == lines
+
+    def test_detects_current_layout(self, sample_srt_path):
+        """Test that the current DJI layout is detected as the bracket dialect"""
+        layout = SrtLayout.detect(sample_srt_path.read_bytes().splitlines())
+
+        assert layout.dialect is DIALECTS["bracket"]
+        assert layout.lines == (3, 3, 3, 2)
+
+    def test_no_position_falls_back_to_default(self, invalid_srt_path):
+        """Test that a file without any position uses the default dialect and searches whole blocks"""
+        layout = SrtLayout.detect(invalid_srt_path.read_bytes().splitlines())
+
+        assert layout.dialect is DIALECTS["bracket"]
+        assert layout.lines == (None, None, None, None)
+
+    @pytest.mark.parametrize("stamp, expected", [
+        (b"2017.08.05 14:11:51", b"2017-08-05 14:11:51"),
+        (b"2020-07-25 17:13:26,427,016", b"2020-07-25 17:13:26.427"),
+        ("2024-12-22 15:08:01.000", "2024-12-22 15:08:01.000"),
+    ])
+    def test_iso_date(self, stamp, expected):
+        """Test that dialect dates are rewritten to ISO form"""
+        assert iso_date(stamp) == expected
+
+    def test_gps_dialect_frames(self, tmp_path):
+        """Test that GPS(lon, lat, alt) files give frames and skip the no-fix zeros"""
+        srt_path = tmp_path / "DJI_0001.SRT"
+        srt_path.write_text(GPS_SRT, encoding="utf-8")
+        service = VideoMetadataService()
+
+        frames = service.extract_from_video(srt_path)
+
+        assert [(f.latitude, f.longitude, f.altitude) for f in frames] == [
+            (-20.2533, 149.0251, 16.0), (-20.2534, 149.0252, 17.0),
+        ]
+        assert frames[0].date == "2017-08-05"
+        assert list(service.no_gps_ms) == [0]
+        columns = service.extract_columns(srt_path)
+        assert str(columns["datetime"][0]) == "2017-08-05T14:11:52.000"
+
+    def test_legacy_dialect_frames(self, tmp_path):
+        """Test that date lines are not taken for timecodes and modes agree"""
+        srt_path = tmp_path / "DJI_0002.SRT"
+        srt_path.write_text(LEGACY_SRT, encoding="utf-8")
+
+        frames = VideoMetadataService().extract_from_video(srt_path)
+        text_frames = VideoMetadataService(mode="text").extract_from_video(srt_path)
+
+        assert [f.time for f in frames] == ["00:00:00:000", "00:00:00:033"]
+        assert frames[1].longitude == pytest.approx(113.95131)
+        assert [f.model_dump() for f in text_frames] == [f.model_dump() for f in frames]
+        columns = VideoMetadataService().extract_columns(srt_path)
+        assert str(columns["datetime"][1]) == "2020-07-25T17:13:26.460"
+
+    def test_forced_dialect(self, sample_srt_path):
+        """Test that a forced dialect skips detection and unknown names are rejected"""
+        service = VideoMetadataService(dialect="gps")
+
+        assert service.extract_from_video(sample_srt_path) == []
+        with pytest.raises(ValueError):
+            VideoMetadataService(dialect="phantom")
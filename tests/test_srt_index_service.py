@@ -0,0 +1,124 @@
+"""
+Tests for SrtIndex and SrtIndexService
+"""
+import os
+import pytest
+from pathlib import Path
+from app.services.annotation_service import parse_time_ms
+from app.services.srt_index_service import SrtIndex, SrtIndexService, index_path_for
+from app.services.video_metadata_service import VideoMetadataService
+
+
+def _write_srt(path: Path, count: int, gps_every: int = 1) -> Path:
+    """Write an SRT with one block per 33 ms; only every gps_every-th block has GPS"""
+    blocks = []
+    for i in range(count):
+        start, end = i * 33, (i + 1) * 33
+        gps = f"[latitude: {31 + i / 1e6:.6f}] [longitude: 34.500000] " if i % gps_every == 0 else ""
+        blocks.append(
+            f"{i + 1}\n"
+            f"00:00:{start // 1000:02d},{start % 1000:03d} --> 00:00:{end // 1000:02d},{end % 1000:03d}\n"
+            f'<font size="28">FrameCnt: {i + 1}, DiffTime: 33ms\n'
+            f"2025-12-22 15:08:01.000\n"
+            f"[iso : 100] {gps}[rel_alt: 50.000 abs_alt: 150.000] \n"
+            f"</font>\n"
+        )
+    path.write_text("\n".join(blocks), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def long_srt_path(tmp_path: Path) -> Path:
+    return _write_srt(tmp_path / "long.SRT", 300, gps_every=3)
+
+
+class TestSrtIndex:
+    """Test cases for SrtIndex"""
+
+    def test_build(self, sample_srt_path):
+        """Test that every block is indexed with its offset, FrameCnt and start time"""
+        index = SrtIndex.build(sample_srt_path)
+        data = sample_srt_path.read_bytes()
+
+        assert len(index) == 3
+        assert list(index.frame_counts) == [1, 2, 3]
+        assert list(index.times_ms) == [0, 33, 66]
+        assert [data[offset:offset + 2] for offset in index.offsets] == [b"1\n", b"2\n", b"3\n"]
+
+    @pytest.mark.parametrize("name", ["copy.SRT.gz", "DJI_0001.MP4"])
+    def test_build_rejects_other_sources(self, tmp_path, name):
+        """Test that compressed SRTs and videos are refused instead of indexed as empty"""
+        path = tmp_path / name
+        path.write_bytes(b"\x1f\x8b")
+        with pytest.raises(ValueError):
+            SrtIndex.build(path)
+
+    def test_save_and_load(self, long_srt_path, tmp_path):
+        """Test that an index survives a round trip through its file"""
+        index = SrtIndex.build(long_srt_path)
+        path = tmp_path / "long.SRT.idx"
+        index.save(path)
+        loaded = SrtIndex.load(path)
+
+        assert loaded.offsets == index.offsets
+        assert loaded.frame_counts == index.frame_counts
+        assert loaded.times_ms == index.times_ms
+        assert loaded.is_current(long_srt_path)
+        assert path.stat().st_size == SrtIndex.HEADER.size + 16 * 300
+
+    def test_load_rejects_other_files(self, sample_srt_path):
+        """Test that a file that is not an index is rejected"""
+        with pytest.raises(ValueError):
+            SrtIndex.load(sample_srt_path)
+
+    def test_lookups(self, long_srt_path):
+        """Test the FrameCnt and time range lookups"""
+        index = SrtIndex.build(long_srt_path)
+
+        assert index.position_of_frame(1) == 0
+        assert index.position_of_frame(150) == 149
+        assert index.position_of_frame(301) is None
+        assert index.positions_between(66, 131) == range(2, 4)
+        assert not index.positions_between(20000, 30000)
+
+
+class TestSrtIndexService:
+    """Test cases for SrtIndexService"""
+
+    @pytest.fixture
+    def service(self):
+        return SrtIndexService()
+
+    def test_index_is_saved_next_to_the_srt(self, service, sample_srt_path):
+        """Test that the first use writes the .SRT.idx sidecar"""
+        service.index(sample_srt_path)
+        assert index_path_for(sample_srt_path) == sample_srt_path.with_name("test_video.SRT.idx")
+        assert index_path_for(sample_srt_path).is_file()
+
+    def test_stale_index_is_rebuilt(self, service, sample_srt_path):
+        """Test that an index of an older version of the file is not used"""
+        service.index(sample_srt_path)
+        _write_srt(sample_srt_path, 10)
+        os.utime(sample_srt_path, ns=(0, 0))
+
+        assert len(service.index(sample_srt_path)) == 10
+
+    @pytest.mark.parametrize("start_ms, end_ms", [(0, 0), (0, 500), (1000, 2000), (5000, 20000), (9000, 9999)])
+    def test_read_range_matches_full_parse(self, service, long_srt_path, start_ms, end_ms):
+        """Test that a seeked range read returns exactly the frames of a full parse in that range"""
+        expected = [
+            f.model_dump() for f in VideoMetadataService().iter_frames(long_srt_path)
+            if start_ms <= parse_time_ms(f.time) <= end_ms
+        ]
+        frames = service.read_range(long_srt_path, start_ms, end_ms)
+
+        assert [f.model_dump() for f in frames] == expected
+
+    def test_read_frame(self, service, long_srt_path):
+        """Test reading a single frame by FrameCnt"""
+        frame = service.read_frame(long_srt_path, 4)
+
+        assert frame.latitude == pytest.approx(31.000003)
+        assert frame.time == "00:00:00:099"
+        assert service.read_frame(long_srt_path, 5) is None  # no GPS in that block
+        assert service.read_frame(long_srt_path, 1000) is None
@@ -0,0 +1,145 @@
+"""
+Tests for SRT byte-level reading and encoding detection
+"""
+import pytest
+import codecs
+import gzip
+import io
+import zipfile
+from pathlib import Path
+from app.services.srt_io import (
+    PrefetchReader, decode_text, detect_encoding, is_srt_source, iter_byte_lines, list_archive_srts,
+    open_source, source_base, source_name,
+)
+
+
+class TestDetectEncoding:
+    """Test cases for detect_encoding"""
+
+    def test_ascii_is_read_as_bytes(self):
+        """Test that ASCII-compatible files need no decoding"""
+        assert detect_encoding(b"1\n00") is None
+
+    def test_utf8_bom_is_read_as_bytes(self):
+        """Test that a UTF-8 BOM does not switch to text decoding"""
+        assert detect_encoding(codecs.BOM_UTF8 + b"1") is None
+
+    def test_utf16_bom(self):
+        """Test UTF-16 detection from the BOM"""
+        assert detect_encoding(codecs.BOM_UTF16_LE + b"1\x00") == "utf-16-le"
+        assert detect_encoding(codecs.BOM_UTF16_BE + b"\x001") == "utf-16-be"
+
+    def test_utf16_without_bom(self):
+        """Test UTF-16 detection from NUL bytes"""
+        assert detect_encoding("1\n".encode("utf-16-le")) == "utf-16-le"
+        assert detect_encoding("1\n".encode("utf-16-be")) == "utf-16-be"
+
+
+class TestIterByteLines:
+    """Test cases for iter_byte_lines"""
+
+    def test_plain_bytes_pass_through(self):
+        """Test that stray non-UTF-8 bytes are kept as-is"""
+        data = b"1\n\xff\xfe garbage\n"
+        assert list(iter_byte_lines(io.BufferedReader(io.BytesIO(data)))) == [b"1\n", b"\xff\xfe garbage\n"]
+
+    def test_utf8_bom_is_dropped(self):
+        """Test that the UTF-8 BOM is removed from the first line"""
+        data = codecs.BOM_UTF8 + b"1\n2\n"
+        assert list(iter_byte_lines(io.BufferedReader(io.BytesIO(data)))) == [b"1\n", b"2\n"]
+
+    def test_utf16_is_transcoded(self):
+        """Test that UTF-16 files come out as UTF-8 bytes"""
+        data = codecs.BOM_UTF16_LE + "1\nabs_alt: 2.5\n".encode("utf-16-le")
+        assert list(iter_byte_lines(io.BufferedReader(io.BytesIO(data)))) == [b"1\n", b"abs_alt: 2.5\n"]
+
+
+class TestDecodeText:
+    """Test cases for decode_text"""
+
+    def test_utf8(self):
+        """Test that UTF-8 text is decoded as UTF-8"""
+        assert decode_text("טיסה".encode("utf-8")) == "טיסה"
+
+    def test_fallback(self):
+        """Test that invalid UTF-8 falls back instead of failing"""
+        assert decode_text(b"caf\xe9") == "café"
+
+
+class TestPackedSources:
+    """Test cases for compressed and archived SRT sources"""
+
+    @pytest.fixture
+    def archive_path(self, sample_srt_path: Path) -> Path:
+        archive = sample_srt_path.parent / "flight.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.write(sample_srt_path, "clips/DJI_0001.SRT")
+            zf.writestr("notes.txt", "not telemetry")
+        return archive
+
+    def test_names(self, tmp_path):
+        """Test which names are SRT sources and what they are called"""
+        assert is_srt_source(Path("DJI_0001.SRT"))
+        assert is_srt_source(Path("DJI_0001.srt.gz"))
+        assert is_srt_source(Path("DJI_0001.SRT.zst"))
+        assert not is_srt_source(Path("DJI_0001.csv.gz"))
+        assert not is_srt_source(Path("DJI_0001.MP4"))
+        assert source_base(tmp_path / "DJI_0001.SRT.gz") == tmp_path / "DJI_0001.SRT"
+        assert source_name(tmp_path / "DJI_0001.SRT.zst") == "DJI_0001"
+
+    def test_gzip(self, sample_srt_path):
+        """Test that a .gz file is read decompressed"""
+        packed = sample_srt_path.with_name("test_video.SRT.gz")
+        packed.write_bytes(gzip.compress(sample_srt_path.read_bytes()))
+
+        with open_source(packed) as f:
+            assert f.read() == sample_srt_path.read_bytes()
+
+    def test_zstandard(self, sample_srt_path):
+        """Test that a .zst file is read decompressed"""
+        zstandard = pytest.importorskip("zstandard")
+        packed = sample_srt_path.with_name("test_video.SRT.zst")
+        packed.write_bytes(zstandard.ZstdCompressor().compress(sample_srt_path.read_bytes()))
+
+        with open_source(packed) as f:
+            assert list(f) == sample_srt_path.read_bytes().splitlines(keepends=True)
+
+    def test_zip_members(self, sample_srt_path, archive_path):
+        """Test that SRT members are listed as paths below the archive and read in place"""
+        members = list_archive_srts(archive_path)
+
+        assert members == [archive_path / "clips" / "DJI_0001.SRT"]
+        assert source_base(members[0]) == archive_path.parent / "DJI_0001.SRT"
+        with open_source(members[0]) as f:
+            assert f.read() == sample_srt_path.read_bytes()
+
+
+class TestPrefetchReader:
+    """Test cases for PrefetchReader"""
+
+    def test_reads_everything_in_small_chunks(self):
+        """Test that the data comes through unchanged across chunk boundaries"""
+        data = b"".join(b"line %d\n" % i for i in range(1000))
+        with io.BufferedReader(PrefetchReader(io.BytesIO(data), chunk_size=7, depth=2)) as f:
+            assert f.read() == data
+
+    def test_errors_reach_the_reader(self):
+        """Test that a failure in the background thread is raised to the consumer"""
+        class Broken(io.RawIOBase):
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                raise OSError("bad sector")
+
+        with pytest.raises(OSError, match="bad sector"):
+            with io.BufferedReader(PrefetchReader(Broken())) as f:
+                f.read()
+
+    def test_close_before_end(self):
+        """Test that closing early stops the background thread"""
+        reader = PrefetchReader(io.BytesIO(b"x" * 100000), chunk_size=10, depth=1)
+        reader.read(10)
+        reader.close()
+
+        assert not reader._thread.is_alive()
@@ -0,0 +1,83 @@
+"""
+Tests for SrtTrimService
+"""
+import pytest
+from pathlib import Path
+from app.services.annotation_service import parse_time_ms
+from app.services.srt_index_service import SrtIndexService
+from app.services.srt_trim_service import SrtTrimService
+from app.services.video_metadata_service import VideoMetadataService
+
+SAMPLE_SRT = Path(__file__).parent.parent / "DJI_202512221456_005" / "DJI_20251222150801_0005_Z.SRT"
+
+
+class TestSrtTrimService:
+    """Test cases for SrtTrimService"""
+
+    @pytest.fixture
+    def service(self):
+        return SrtTrimService(SrtIndexService(persist=False))
+
+    def test_trim_keeps_blocks_in_window(self, service, sample_srt_path, tmp_path):
+        """Test that only the blocks starting within the window are written, renumbered"""
+        output = tmp_path / "clip.SRT"
+        count = service.trim(sample_srt_path, output, [(30, 100)])
+        frames = VideoMetadataService().extract_from_video(output)
+
+        assert count == 2
+        assert [f.time for f in frames] == ["00:00:00:033", "00:00:00:066"]
+        assert output.read_text(encoding="utf-8").startswith("1\n00:00:00,033 --> 00:00:00,066\n")
+        assert "\n2\n00:00:00,066" in output.read_text(encoding="utf-8")
+
+    def test_blocks_are_copied_unchanged(self, service, sample_srt_path, tmp_path):
+        """Test that a window covering the whole file reproduces it"""
+        output = tmp_path / "copy.SRT"
+        service.trim(sample_srt_path, output, [(0, 10 ** 6)])
+
+        assert output.read_text(encoding="utf-8").rstrip("\n") == sample_srt_path.read_text(encoding="utf-8").rstrip("\n")
+
+    def test_rebase(self, service, sample_srt_path, tmp_path):
+        """Test that rebased windows start at 0 and follow each other"""
+        output = tmp_path / "clip.SRT"
+        service.trim(sample_srt_path, output, [(66, 66), (0, 0)], rebase=True)
+        frames = VideoMetadataService().extract_from_video(output)
+
+        assert [f.time for f in frames] == ["00:00:00:000", "00:00:00:033"]
+        assert [f.latitude for f in frames] == [31.123456, 31.123458]
+
+    @pytest.mark.skipif(not SAMPLE_SRT.exists(), reason="sample flight not available")
+    def test_windows_on_real_file(self, service, tmp_path):
+        """Test that overlapping windows are merged and match a filtered full parse"""
+        windows = [(1000, 2000), (1500, 2500), (5000, 6000)]
+        output = tmp_path / "clip.SRT"
+        service.trim(SAMPLE_SRT, output, windows)
+        expected = [
+            f.model_dump(exclude={"video_name"}) for f in VideoMetadataService().iter_frames(SAMPLE_SRT)
+            if any(start <= parse_time_ms(f.time) <= end for start, end in windows)
+        ]
+
+        frames = VideoMetadataService().extract_from_video(output)
+        assert [f.model_dump(exclude={"video_name"}) for f in frames] == expected
+
+    def test_empty_window_raises_error(self, service, sample_srt_path, tmp_path):
+        """Test that a window without blocks is an error"""
+        with pytest.raises(ValueError):
+            service.trim(sample_srt_path, tmp_path / "clip.SRT", [(5000, 6000)])
+
+    def test_failed_trim_keeps_existing_output(self, service, sample_srt_path, tmp_path, monkeypatch):
+        """Test that an error while writing leaves the previous output instead of a truncated SRT"""
+        output = tmp_path / "clip.SRT"
+        service.trim(sample_srt_path, output, [(0, 100)])
+        before = output.read_bytes()
+
+        def fail(block, number, shift_ms):
+            if number == 2:
+                raise OSError("disk full")
+            return block, None
+
+        monkeypatch.setattr(SrtTrimService, "_rewrite_block", staticmethod(fail))
+        with pytest.raises(OSError):
+            service.trim(sample_srt_path, output, [(0, 10 ** 6)])
+
+        assert output.read_bytes() == before
+        assert list(tmp_path.glob("*.tmp")) == []
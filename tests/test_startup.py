@@ -0,0 +1,50 @@
+"""
+Tests for lazy imports in the entry points and services
+"""
+import pytest
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def _loaded(module: str, candidates) -> list:
+    """Import a module in a fresh interpreter and return which candidates got loaded"""
+    code = f"import sys, {module}; print(','.join(m for m in {tuple(candidates)!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+class TestLazyImports:
+    """Heavy libraries must load only on the code path that needs them"""
+
+    def test_cli_has_no_heavy_imports(self):
+        """Test that importing the CLI loads no heavy library"""
+        assert _loaded("app.cli", ("pydantic", "pandas", "numpy", "flet", "multiprocessing")) == []
+
+    @pytest.mark.parametrize("module", [
+        "app.services.video_metadata_service",
+        "app.services.csv_export_service",
+        "app.services.jsonl_export_service",
+        "app.services.pipeline_service",
+        "app.services.conversion_service",
+    ])
+    def test_services_do_not_import_pydantic(self, module):
+        """Test that importing a service does not load pydantic or pandas"""
+        assert _loaded(module, ("pydantic", "pandas")) == []
+
+    def test_ui_defers_services(self):
+        """Test that the UI module does not load pydantic before the first export"""
+        pytest.importorskip("flet")
+        assert _loaded("app.ui", ("pydantic", "pandas")) == []
+
+    def test_cli_help_exits_cleanly(self):
+        """Test that the CLI no-op runs without touching the services"""
+        env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+        result = subprocess.run([sys.executable, "-m", "app", "--help"], env=env, capture_output=True, text=True)
+
+        assert result.returncode == 0
+        assert "convert" in result.stdout
@@ -0,0 +1,88 @@
+"""
+Tests for StitchService
+"""
+import pytest
+import csv
+from datetime import datetime, timedelta
+from pathlib import Path
+from app.services.stitch_service import StitchService
+from benchmarks.srt_generator import generate_srt
+
+START = datetime(2025, 12, 22, 15, 0, 0)
+
+
+def _recording(folder: Path, index: int, lens: str = "T", offset_s: int = 0, duration_s: float = 2) -> Path:
+    """A synthetic DJI file of a recording that started at START + offset_s"""
+    start = START + timedelta(seconds=offset_s)
+    srt_path = folder / f"DJI_{start:%Y%m%d%H%M%S}_{index:04d}_{lens}.SRT"
+    generate_srt(srt_path, lens=lens, duration_s=duration_s, seed=index, start=start)
+    return srt_path
+
+
+class TestStitchService:
+    """Test cases for StitchService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create a StitchService instance"""
+        return StitchService()
+
+    def test_consecutive_files_become_one_flight(self, service, tmp_path):
+        """Test that split files of one stream are joined in wall-clock order, per lens"""
+        first = _recording(tmp_path, 1)
+        second = _recording(tmp_path, 2, offset_s=2)
+        wide = _recording(tmp_path, 1, lens="W")
+
+        flights = service.stitch([second, wide, first])
+
+        assert [flight.sources for flight in flights] == [[first, second], [wide]]
+        stitched = flights[0]
+        assert stitched.frames == 120
+        assert stitched.offsets_ms[0] == 0
+        assert abs(stitched.offsets_ms[1] - 2000) <= 4
+        flight_time = stitched.columns["flight_time_ms"]
+        assert flight_time[60] == stitched.offsets_ms[1]
+        assert (flight_time[1:] > flight_time[:-1]).all()
+        assert set(stitched.columns["video_name"][60:]) == {second.stem}
+
+    def test_gap_starts_new_flight(self, service, tmp_path):
+        """Test that a file starting more than max_gap_s after the previous one is a new flight"""
+        first = _recording(tmp_path, 1)
+        later = _recording(tmp_path, 2, offset_s=60)
+
+        assert [flight.sources for flight in service.stitch([first, later])] == [[first], [later]]
+        assert len(StitchService(max_gap_s=60).stitch([first, later])) == 1
+
+    def test_parallel_read_matches_serial(self, tmp_path):
+        """Test that parsing on worker processes gives the same flight"""
+        sources = [_recording(tmp_path, 1), _recording(tmp_path, 2, offset_s=2)]
+
+        serial = StitchService().stitch(sources)[0]
+        parallel = StitchService(jobs=2).stitch(sources)[0]
+
+        assert parallel.sources == serial.sources
+        assert (parallel.columns["flight_time_ms"] == serial.columns["flight_time_ms"]).all()
+
+    def test_unreadable_source_is_left_out(self, service, tmp_path, invalid_srt_path):
+        """Test that missing or frameless files are reported and skipped"""
+        first = _recording(tmp_path, 1)
+        missing = tmp_path / "DJI_20251222150100_0002_T.SRT"
+
+        flights = service.stitch([first, missing, invalid_srt_path])
+
+        assert [flight.sources for flight in flights] == [[first]]
+        assert service.failed == [missing]
+
+    def test_export_adds_time_columns(self, service, tmp_path):
+        """Test that the exported flight has FLIGHT TIME and VIDEO OFFSET columns"""
+        sources = [_recording(tmp_path, 1), _recording(tmp_path, 2, offset_s=2)]
+        output_path = tmp_path / "flight.csv"
+
+        assert service.export(service.stitch(sources)[0], output_path) == 120
+
+        with output_path.open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["FLIGHT TIME"] == "00:00:00:000"
+        assert rows[60]["TIME"] == "00:00:00:000"
+        assert rows[60]["VIDEO OFFSET"] == rows[60]["FLIGHT TIME"]
+        assert rows[60]["VIDEO OFFSET"].startswith("00:00:0")
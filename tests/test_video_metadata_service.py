@@ -2,7 +2,9 @@
 Tests for VideoMetadataService
 """
 import pytest
+import gzip
 from pathlib import Path
+from app.services.frame_filter import FrameFilter
 from app.services.video_metadata_service import VideoMetadataService
 
 
@@ -112,3 +114,138 @@ class TestVideoMetadataService:
         
         # Video name should be the filename without extension
         assert frames[0].video_name == "test_video"
+    
+    def test_stray_bytes_do_not_abort_parsing(self, service, sample_srt_path):
+        """Test that undecodable bytes are skipped in bytes mode"""
+        data = sample_srt_path.read_bytes().replace(b"FrameCnt: 2", b"FrameCnt: 2 \xff\xfe\x80")
+        sample_srt_path.write_bytes(data)
+        
+        frames = service.extract_from_video(sample_srt_path)
+        
+        assert len(frames) == 3
+        assert frames[1].latitude == pytest.approx(31.123457)
+    
+    def test_text_mode_rejects_stray_bytes(self, sample_srt_path):
+        """Test that the strict text mode still raises UnicodeDecodeError"""
+        sample_srt_path.write_bytes(sample_srt_path.read_bytes() + b"\xff\xfe\x80\n")
+        
+        with pytest.raises(UnicodeDecodeError):
+            VideoMetadataService(mode="text").extract_from_video(sample_srt_path)
+    
+    @pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "utf-8-sig"])
+    def test_wide_and_bom_encodings(self, service, sample_srt_path, encoding):
+        """Test that UTF-16 and BOM-prefixed files parse like plain files"""
+        text = sample_srt_path.read_text(encoding="utf-8")
+        sample_srt_path.write_bytes(text.encode(encoding))
+        
+        frames = service.extract_from_video(sample_srt_path)
+        
+        assert len(frames) == 3
+        assert frames[0].date == "2024-12-22"
+        assert frames[2].time == "00:00:00:066"
+    
+    def test_modes_give_same_frames(self, sample_srt_path):
+        """Test that bytes and text modes extract identical frames"""
+        text_frames = VideoMetadataService(mode="text").extract_from_video(sample_srt_path)
+        bytes_frames = VideoMetadataService(mode="bytes").extract_from_video(sample_srt_path)
+        
+        assert [f.model_dump() for f in text_frames] == [f.model_dump() for f in bytes_frames]
+    
+    def test_unknown_mode_raises_error(self):
+        """Test that an unknown parsing mode is rejected"""
+        with pytest.raises(ValueError):
+            VideoMetadataService(mode="fast")
+    
+    def test_extract_columns(self, service, sample_srt_path):
+        """Test that the columnar extraction returns one array per field"""
+        columns = service.extract_columns(sample_srt_path)
+        
+        assert columns["latitude"].tolist() == pytest.approx([31.123456, 31.123457, 31.123458])
+        assert columns["time_ms"].tolist() == [0, 33, 66]
+        assert columns["date"].tolist() == ["2024-12-22"] * 3
+        assert str(columns["datetime"].dtype) == "datetime64[ms]"
+        assert all(len(values) == 3 for values in columns.values())
+    
+    def test_iter_frames_from_offset(self, service, sample_srt_path):
+        """Test parsing from a byte offset up to an end time"""
+        offset = sample_srt_path.read_bytes().index(b"2\n00:00:00,033")
+        frames = list(service.iter_frames_from(sample_srt_path, offset, end_ms=33))
+        
+        assert [f.time for f in frames] == ["00:00:00:033"]
+    
+    def test_compressed_source(self, service, sample_srt_path):
+        """Test that a gzip-compressed SRT gives the same frames and video name"""
+        packed = sample_srt_path.with_name("test_video.SRT.gz")
+        packed.write_bytes(gzip.compress(sample_srt_path.read_bytes()))
+        
+        frames = service.extract_from_video(packed)
+        assert [f.model_dump() for f in frames] == [f.model_dump() for f in service.extract_from_video(sample_srt_path)]
+        assert service.extract_columns(packed)["video_name"].tolist() == ["test_video"] * 3
+    
+    @pytest.mark.parametrize("frame_filter, expected", [
+        (FrameFilter(start_ms=30, end_ms=40), ["00:00:00:033"]),
+        (FrameFilter(bbox=(34.567891, 31.0, 35.0, 32.0)), ["00:00:00:033", "00:00:00:066"]),
+        (FrameFilter(min_alt=150.05), ["00:00:00:033", "00:00:00:066"]),
+        (FrameFilter(max_alt=50.05, relative_alt=True), ["00:00:00:000"]),
+        (FrameFilter.between(end="2024-12-22 15:08:01.033"), ["00:00:00:000", "00:00:00:033"]),
+    ])
+    def test_frame_filter(self, service, sample_srt_path, frame_filter, expected):
+        """Test that filtered extraction keeps exactly the matching frames"""
+        assert [f.time for f in service.extract_from_video(sample_srt_path, frame_filter)] == expected
+        assert service.extract_columns(sample_srt_path, frame_filter)["time_ms"].tolist() == [
+            int(t[-3:]) for t in expected
+        ]
+    
+    def test_frame_filter_stops_after_window(self, service, sample_srt_path, mocker):
+        """Test that the scan stops at the first frame past the time window"""
+        parse_record = mocker.spy(service.parser, "parse")
+        frames = service.extract_from_video(sample_srt_path, FrameFilter(end_ms=10))
+        
+        assert len(frames) == 1
+        # Windows start at timecode lines; the scan ends at the second one
+        assert parse_record.call_count == 2
+        
+        line_service = VideoMetadataService(backend="lines")
+        parse_record = mocker.spy(line_service.parser, "parse")
+        frames = line_service.extract_from_video(sample_srt_path, FrameFilter(end_ms=10))
+        
+        assert len(frames) == 1
+        # Line windows start at every line; the scan ends at the second timecode (line 9 of 19)
+        assert parse_record.call_count == 9
+    
+    def test_mp4_without_sidecar(self, service, sample_mp4_path, sample_frames):
+        """Test that the embedded telemetry is read when the MP4 has no SRT sidecar"""
+        frames = service.extract_from_video(sample_mp4_path)
+        
+        assert [(f.latitude, f.longitude, f.altitude, f.time, f.date) for f in frames] == [
+            (f.latitude, f.longitude, f.altitude, f.time, f.date) for f in sample_frames
+        ]
+        assert frames[0].video_name == "DJI_20241222150801_0001_T"
+        assert service.extract_columns(sample_mp4_path)["frame_cnt"].tolist() == [0, 1, 2]
+    
+    def test_mp4_relative_altitude_filter(self, service, sample_mp4_path, mocker):
+        """Test that rel_alt text values are compared as numbers, and that a track without them is an error"""
+        frame_filter = FrameFilter(min_alt=-10, max_alt=1000, relative_alt=True)
+        with pytest.raises(ValueError):
+            service.extract_from_video(sample_mp4_path, frame_filter)
+
+        records = [(i * 33, "2024-12-22 15:08:01.000", 31.1, 34.5, 150.0, {b"rel_alt": alt})
+                   for i, alt in enumerate([b"49.900", b"50.100"])]
+        mocker.patch("app.services.mp4_telemetry_service.Mp4TelemetryService.iter_records", return_value=records)
+        frames = service.extract_from_video(sample_mp4_path, FrameFilter(max_alt=50.0, relative_alt=True))
+        assert [f.time for f in frames] == ["00:00:00:000"]
+
+    def test_mp4_prefers_sidecar(self, service, sample_mp4_path, sample_srt_path):
+        """Test that an existing SRT sidecar is still used"""
+        sidecar = sample_srt_path.read_text(encoding="utf-8").replace("31.123456", "32.000001")
+        sample_mp4_path.with_suffix(".SRT").write_text(sidecar, encoding="utf-8")
+        frames = service.extract_from_video(sample_mp4_path)
+        
+        assert frames[0].latitude == 32.000001
+    
+    def test_columns_match_frames(self, service, sample_srt_path):
+        """Test that frames rebuilt from columns equal the streamed frames"""
+        frames = service.extract_from_video(sample_srt_path)
+        rebuilt = list(service.frames_from_columns(service.extract_columns(sample_srt_path)))
+        
+        assert [f.model_dump() for f in rebuilt] == [f.model_dump() for f in frames]
@@ -0,0 +1,214 @@
+"""
+Tests for WatchService
+"""
+import pytest
+import csv
+import json
+import os
+from pathlib import Path
+from app.services.watch_service import InotifyWatcher, PollingWatcher, ProcessedState, WatchService
+
+
+@pytest.fixture
+def import_dir(tmp_path: Path, sample_srt_path: Path) -> Path:
+    """Import folder with one SD-card dump containing an SRT"""
+    folder = tmp_path / "ingest"
+    dump = folder / "DJI_001"
+    dump.mkdir(parents=True)
+    (dump / "flight.SRT").write_bytes(sample_srt_path.read_bytes())
+    return folder
+
+
+def _rows(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestProcessedState:
+    """Test cases for ProcessedState"""
+
+    def test_state_survives_reload(self, tmp_path):
+        """Test that marked files are remembered across instances"""
+        state_path = tmp_path / "state.json"
+        ProcessedState(state_path).mark(Path("/a.SRT"), 10, 20, output=Path("/a.csv"))
+
+        state = ProcessedState(state_path)
+
+        assert state.is_processed(Path("/a.SRT"), 10, 20)
+        assert not state.is_processed(Path("/a.SRT"), 11, 20)
+
+    def test_corrupt_state_is_ignored(self, tmp_path):
+        """Test that an unreadable state file starts an empty state"""
+        state_path = tmp_path / "state.json"
+        state_path.write_text("{not json", encoding="utf-8")
+
+        assert len(ProcessedState(state_path)) == 0
+
+
+class TestWatchService:
+    """Test cases for WatchService (polling backend, synchronous conversion)"""
+
+    def _service(self, import_dir, tmp_path, **kwargs):
+        return WatchService([import_dir], state_path=tmp_path / "state.json",
+                            settle_seconds=0, poll_interval=0, use_inotify=False, **kwargs)
+
+    def test_existing_files_are_converted_next_to_srt(self, import_dir, tmp_path):
+        """Test that files already in the folder are converted on start"""
+        service = self._service(import_dir, tmp_path)
+
+        assert service.step() == 1
+        service.close()
+
+        assert len(_rows(import_dir / "DJI_001" / "flight.csv")) == 3
+
+    def test_mirror_tree(self, import_dir, tmp_path):
+        """Test that outputs go to the same relative place in a mirror tree"""
+        mirror = tmp_path / "mirror"
+        service = self._service(import_dir, tmp_path, output_root=mirror, fmt="jsonl")
+
+        service.step()
+        service.close()
+
+        assert (mirror / "ingest" / "DJI_001" / "flight.jsonl").exists()
+        assert not (import_dir / "DJI_001" / "flight.jsonl").exists()
+
+    def test_mirror_tree_keeps_roots_with_same_name_apart(self, tmp_path, sample_srt_path):
+        """Test that two roots with the same folder name get separate mirror folders"""
+        roots = []
+        for card in ("card1", "card2"):
+            root = tmp_path / card / "DCIM"
+            root.mkdir(parents=True)
+            (root / "DJI_0001.SRT").write_bytes(sample_srt_path.read_bytes())
+            roots.append(root)
+        mirror = tmp_path / "mirror"
+        service = WatchService(roots, output_root=mirror, state_path=tmp_path / "state.json",
+                               settle_seconds=0, poll_interval=0, use_inotify=False)
+
+        outputs = {service.output_path_for(root.resolve() / "DJI_0001.SRT") for root in roots}
+        assert service.step() == 2
+        service.close()
+
+        assert len(outputs) == 2
+        for output in outputs:
+            assert output.parent.name.startswith("DCIM-")
+            assert len(_rows(output)) == 3
+
+    def test_second_source_for_one_output_is_refused(self, import_dir, tmp_path):
+        """Test that an SRT whose output belongs to another SRT is recorded as failed, not converted"""
+        dump = import_dir / "DJI_001"
+        if (dump / "FLIGHT.SRT").exists():
+            pytest.skip("case-insensitive file system")
+        (dump / "flight.srt").write_bytes((dump / "flight.SRT").read_bytes())
+        service = self._service(import_dir, tmp_path)
+        service.step()
+        service.close()
+
+        state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+        assert sum("output" in v for v in state.values()) == 1
+        assert sum("already belongs to" in v.get("error", "") for v in state.values()) == 1
+        assert len(_rows(dump / "flight.csv")) == 3
+
+    def test_restart_skips_processed_files(self, import_dir, tmp_path):
+        """Test that the state file prevents re-conversion after a restart"""
+        service = self._service(import_dir, tmp_path)
+        service.step()
+        service.close()
+
+        restarted = self._service(import_dir, tmp_path)
+        assert restarted.step() == 0
+        restarted.close()
+
+    def test_copy_is_linked(self, import_dir, tmp_path):
+        """Test that a second dump of the same card links to the first output"""
+        from app.services.fingerprint_service import FingerprintIndex, FingerprintService
+
+        service = self._service(import_dir, tmp_path, dedupe=FingerprintService(FingerprintIndex()))
+        service.step()
+        copy = import_dir / "DJI_002" / "flight.SRT"
+        copy.parent.mkdir()
+        copy.write_bytes((import_dir / "DJI_001" / "flight.SRT").read_bytes())
+        service.step()
+        service.close()
+
+        first = import_dir / "DJI_001" / "flight.csv"
+        assert os.path.samefile(import_dir / "DJI_002" / "flight.csv", first)
+        state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+        assert state[str(copy.resolve())]["duplicate_of"] == str(first.resolve())
+
+    def test_new_file_is_picked_up(self, import_dir, tmp_path, sample_srt_path):
+        """Test that a file added while running is converted"""
+        service = self._service(import_dir, tmp_path)
+        service.step()
+
+        new_dump = import_dir / "DJI_002"
+        new_dump.mkdir()
+        (new_dump / "second.SRT").write_bytes(sample_srt_path.read_bytes())
+
+        assert service.step() == 1
+        service.close()
+        assert (new_dump / "second.csv").exists()
+
+    def test_unsettled_file_waits(self, import_dir, tmp_path):
+        """Test that files are not converted before the settle time"""
+        service = WatchService([import_dir], state_path=tmp_path / "state.json",
+                               settle_seconds=60, poll_interval=0, use_inotify=False)
+
+        assert service.step() == 0
+        service.close()
+        assert not (import_dir / "DJI_001" / "flight.csv").exists()
+
+    def test_failure_is_recorded(self, import_dir, tmp_path, invalid_srt_path):
+        """Test that a file without GPS data is recorded as failed and not retried"""
+        (import_dir / "bad.SRT").write_bytes(invalid_srt_path.read_bytes())
+        service = self._service(import_dir, tmp_path)
+        service.step()
+        service.close()
+
+        state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+        bad = next(v for k, v in state.items() if k.endswith("bad.SRT"))
+        assert "error" in bad
+
+    def test_unwritable_output_folder_is_recorded(self, import_dir, tmp_path):
+        """Test that a file whose output folder cannot be made fails alone and later files still convert"""
+        mirror = tmp_path / "mirror"
+        (mirror / "ingest").mkdir(parents=True)
+        # A file where the output folder of DJI_001 should be
+        (mirror / "ingest" / "DJI_001").write_text("", encoding="utf-8")
+        service = self._service(import_dir, tmp_path, output_root=mirror)
+        service.step()
+        (import_dir / "DJI_002").mkdir()
+        (import_dir / "DJI_002" / "flight.SRT").write_bytes((import_dir / "DJI_001" / "flight.SRT").read_bytes())
+        service.step()
+        service.close()
+
+        state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+        failed = next(v for k, v in state.items() if k.endswith(os.path.join("DJI_001", "flight.SRT")))
+        assert "error" in failed
+        assert len(_rows(mirror / "ingest" / "DJI_002" / "flight.csv")) == 3
+
+
+class TestWatchers:
+    """Test cases for the file system watchers"""
+
+    def test_polling_watcher_reports_changes_once(self, import_dir):
+        """Test that unchanged files are only reported on the first scan"""
+        watcher = PollingWatcher([import_dir])
+
+        assert len(watcher.rescan()) == 1
+        assert watcher.rescan() == []
+
+    @pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify is Linux-only")
+    def test_inotify_watcher_sees_new_folder(self, import_dir, sample_srt_path):
+        """Test that files in a newly created folder are reported"""
+        watcher = InotifyWatcher([import_dir])
+        try:
+            new_dump = import_dir / "DJI_003"
+            new_dump.mkdir()
+            (new_dump / "third.SRT").write_bytes(sample_srt_path.read_bytes())
+
+            seen = set()
+            for _ in range(5):
+                seen.update(p.name for p in watcher.read(0.2))
+            assert "third.SRT" in seen
+        finally:
+            watcher.close()
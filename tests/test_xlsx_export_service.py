@@ -0,0 +1,92 @@
+"""
+Tests for XlsxExportService
+"""
+import pytest
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from app.services.output_template import OutputTemplate
+from app.services.xlsx_export_service import XlsxExportService
+
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _sheets(data: bytes):
+    """Cells of every worksheet as lists of (style, type, value) per row"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        names = [sheet.get("name") for sheet in workbook.findall("x:sheets/x:sheet", NS)]
+        sheets = []
+        for i in range(1, len(names) + 1):
+            root = ET.fromstring(archive.read(f"xl/worksheets/sheet{i}.xml"))
+            rows = []
+            for row in root.findall("x:sheetData/x:row", NS):
+                rows.append([
+                    (cell.get("s"), cell.get("t"), cell.findtext("x:v", namespaces=NS) or cell.findtext("x:is/x:t", namespaces=NS))
+                    for cell in row.findall("x:c", NS)
+                ])
+            sheets.append(rows)
+    return names, sheets
+
+
+class TestXlsxExportService:
+    """Test cases for XlsxExportService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create an XlsxExportService instance"""
+        return XlsxExportService()
+
+    def test_export_typed_cells(self, service, sample_frames, tmp_path):
+        """Test that numbers, DATE and TIME are written as typed cells"""
+        output_path = tmp_path / "output.xlsx"
+        service.export(sample_frames, output_path)
+
+        names, sheets = _sheets(output_path.read_bytes())
+        header, first, second = sheets[0][:3]
+
+        assert names == ["Frames"]
+        assert [value for _, _, value in header] == ["COMMENTS", "VIDEO NAME", "ALTITUDE", "LONGITUDE", "LATITUDE", "TIME", "DATE"]
+        assert first[0] == (None, None, None)  # empty COMMENTS
+        assert first[1] == (None, "inlineStr", "test_video")
+        assert first[2] == (None, None, "150.0")
+        assert first[6] == ("1", None, "45648")  # 2024-12-22 as an Excel date serial
+        assert second[5][0] == "2"
+        assert float(second[5][2]) * 86400000 == pytest.approx(33)
+
+    def test_export_empty_list_raises_error(self, service, tmp_path):
+        """Test that exporting empty list raises ValueError"""
+        with pytest.raises(ValueError, match="No frames to export"):
+            service.export([], tmp_path / "output.xlsx")
+
+    def test_rolls_over_to_new_sheet(self, sample_frames):
+        """Test that a full sheet continues on a new one with the header repeated"""
+        stream = io.BytesIO()
+        XlsxExportService(max_rows=3).write(iter(sample_frames * 2), stream)
+
+        names, sheets = _sheets(stream.getvalue())
+        assert names == ["Frames", "Frames (2)", "Frames (3)"]
+        assert [len(rows) for rows in sheets] == [3, 3, 3]
+        assert all(rows[0][0][2] == "COMMENTS" for rows in sheets)
+
+    def test_write_extra_columns_and_text(self, service, sample_frames):
+        """Test extra columns, NaN as an empty cell and XML escaping"""
+        sample_frames[0].comments = "R&D <check>\x01"
+        stream = io.BytesIO()
+        service.write(sample_frames[:2], stream, extra_columns={"HEADING": [90.0, float("nan")]})
+
+        _, sheets = _sheets(stream.getvalue())
+        assert sheets[0][0][-1][2] == "HEADING"
+        assert sheets[0][1][0][2] == "R&D <check>"
+        assert sheets[0][1][-1][2] == "90.0"
+        assert sheets[0][2][-1] == (None, None, None)
+
+    def test_write_with_template(self, service, sample_frames):
+        """Test that template output keeps its text, with numbers as numeric cells"""
+        formatter = OutputTemplate({"columns": ["DATE", {"name": "LAT", "source": "LATITUDE"}],
+                                    "date_format": "%d/%m/%Y"}).compile()
+        stream = io.BytesIO()
+        service.write(sample_frames[:1], stream, formatter=formatter)
+
+        _, sheets = _sheets(stream.getvalue())
+        assert sheets[0][1] == [(None, "inlineStr", "22/12/2024"), (None, None, "31.123456")]